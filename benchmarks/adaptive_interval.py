@@ -0,0 +1,130 @@
+"""Buckets stored and staleness of served prices when fetching on fixed intervals and on the adaptive one.
+
+A price path of one second resolution is replayed on a virtual clock. It is either recorded, as Binance kline files
+of one second (e.g. BTCUSDT-1s-2025-01-01.csv from data.binance.vision, the symbol taken from the file name), or
+simulated as a random walk that is calm except for a spike of volatility in the middle. Every second the price served
+is the one of the latest fetch, and its error is measured against the price of that second.
+
+Usage: python -m benchmarks.adaptive_interval [--klines BTCUSDT-1s-2025-01-01.csv ...] [--symbols 20]
+                                              [--duration 21600] [--min-interval 5] [--max-interval 120]
+                                              [--target-price-move 0.001]
+"""
+
+import argparse
+import array
+import csv
+import datetime
+import pathlib
+import random
+import statistics
+
+from src.quote_consumer.domain import model
+from src.quote_consumer.services.currency_pairs import get_next_tick
+from src.quote_consumer.services.fetch_interval import AdaptiveFetchInterval
+from src.quote_consumer.settings import AppSettings
+
+from .common import generate_symbols
+
+
+# Prices of every symbol, one per second.
+PricePath = dict[str, list[float]]
+
+
+def read_klines(paths: list[str]) -> PricePath:
+    price_path: PricePath = {}
+    for path in paths:
+        with pathlib.Path(path).open() as klines:
+            # The close price is the fifth column.
+            price_path[pathlib.Path(path).name.split("-")[0]] = [float(row[4]) for row in csv.reader(klines)]
+    length = min(map(len, price_path.values()))
+    return {symbol: prices[:length] for symbol, prices in price_path.items()}
+
+
+def simulate_price_path(number_of_symbols: int, duration: int, seed: int = 0) -> PricePath:
+    rng = random.Random(seed)
+    price_path: PricePath = {}
+    for symbol in generate_symbols(number_of_symbols, seed):
+        price = rng.uniform(1, 100000)
+        prices = []
+        for second in range(duration):
+            # Volatility per second is 0.5 bp when calm, and 8 bp during the spike in the middle sixth of the path.
+            volatility = 0.0008 if duration * 5 / 12 <= second < duration * 7 / 12 else 0.00005
+            price *= 1 + rng.gauss(0, volatility)
+            prices.append(price)
+        price_path[symbol] = prices
+    return price_path
+
+
+def replay(price_path: PricePath, adaptive_interval: AdaptiveFetchInterval | None, fixed_interval: float) -> None:
+    symbols = tuple(price_path)
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    duration = len(next(iter(price_path.values())))
+    interval = adaptive_interval.interval if adaptive_interval else fixed_interval
+
+    buckets = 0
+    next_fetch = 0.0
+    served: list[float] = []
+    fetched_at = 0
+    staleness: list[int] = []
+    errors: list[float] = []
+    for second in range(duration):
+        if second >= next_fetch:
+            served = [price_path[symbol][second] for symbol in symbols]
+            fetched_at = second
+            buckets += 1
+            if adaptive_interval:
+                interval = adaptive_interval.update(
+                    model.CurrencyPairBucket.from_prices(
+                        symbols=symbols,
+                        prices=array.array("d", served),
+                        timestamp=start + datetime.timedelta(seconds=second),
+                    ),
+                )
+            next_fetch = get_next_tick(second, interval)
+        staleness.append(second - fetched_at)
+        errors.extend(
+            abs(served_price / price_path[symbol][second] - 1) * 10000
+            for symbol, served_price in zip(symbols, served, strict=True)
+        )
+
+    errors.sort()
+    name = "adaptive" if adaptive_interval else f"every {fixed_interval:g} s"
+    print(
+        f"{name:>12}: {buckets:>5} buckets, staleness {statistics.fmean(staleness):>6.1f} s, "
+        f"error mean {statistics.fmean(errors):>6.2f} bp, p99 {errors[int(len(errors) * 0.99)]:>6.2f} bp, "
+        f"max {errors[-1]:>7.2f} bp",
+    )
+
+
+def main(arguments: argparse.Namespace) -> None:
+    if arguments.klines:
+        price_path = read_klines(arguments.klines)
+        print(f"{len(next(iter(price_path.values())))} s of {', '.join(price_path)} replayed from klines")
+    else:
+        price_path = simulate_price_path(arguments.symbols, arguments.duration)
+        print(f"{arguments.duration} s of {arguments.symbols} simulated symbols replayed, with a spike of volatility")
+
+    AppSettings.exchange_fetch_interval = 30
+    for fixed_interval in (arguments.min_interval, 30, arguments.max_interval):
+        replay(price_path, None, fixed_interval)
+    replay(
+        price_path,
+        AdaptiveFetchInterval(
+            min_interval=arguments.min_interval,
+            max_interval=arguments.max_interval,
+            target_price_move=arguments.target_price_move,
+            symbols=(),
+        ),
+        AppSettings.exchange_fetch_interval,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--klines", nargs="+")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--duration", type=int, default=21600)
+    parser.add_argument("--min-interval", type=float, default=5)
+    parser.add_argument("--max-interval", type=float, default=120)
+    parser.add_argument("--target-price-move", type=float, default=0.001)
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+"""Memory, allocations and symbol lookup time of one currency pair bucket, before and after the compact layout.
+
+Usage: python -m benchmarks.bucket_memory [--symbols 2500]
+"""
+
+import argparse
+import array
+import datetime
+import gc
+import time
+import tracemalloc
+import typing
+
+from src.quote_consumer.domain import model
+
+from .common import generate_symbols
+
+
+class LegacyCurrencyPair:
+    def __init__(self, *, symbol: str, conversion_rate: float) -> None:
+        self.symbol = symbol
+        self.conversion_rate = conversion_rate
+
+
+class LegacyCurrencyPairBucket:
+    def __init__(self, *, currency_pairs: list[LegacyCurrencyPair], timestamp: datetime.datetime) -> None:
+        self.currency_pairs = currency_pairs
+        self.timestamp = timestamp
+
+    def get_conversion_rate(self, symbol: str) -> float | None:
+        currency_pairs = [currency_pair for currency_pair in self.currency_pairs if currency_pair.symbol == symbol]
+        return currency_pairs[0].conversion_rate if currency_pairs else None
+
+
+def create_legacy_bucket(symbols: list[str], prices: list[float]) -> LegacyCurrencyPairBucket:
+    return LegacyCurrencyPairBucket(
+        currency_pairs=[
+            LegacyCurrencyPair(symbol=symbol, conversion_rate=price)
+            for symbol, price in zip(symbols, prices, strict=True)
+        ],
+        timestamp=datetime.datetime.now(datetime.timezone.utc),
+    )
+
+
+def create_compact_bucket(symbols: list[str], prices: list[float]) -> model.CurrencyPairBucket:
+    return model.CurrencyPairBucket.from_prices(
+        symbols=tuple(symbols),
+        prices=array.array("d", prices),
+        timestamp=datetime.datetime.now(datetime.timezone.utc),
+    )
+
+
+def measure(create: typing.Callable[[], typing.Any]) -> tuple[typing.Any, int, int]:
+    gc.collect()
+    tracemalloc.start()
+    bucket = create()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    statistics = snapshot.statistics("filename")
+    return bucket, sum(stat.size for stat in statistics), sum(stat.count for stat in statistics)
+
+
+def main(number_of_symbols: int) -> None:
+    # Symbols and prices arrive as fresh objects from every parsed response, exactly like here.
+    symbols = generate_symbols(number_of_symbols)
+    prices = [index / 7 for index in range(number_of_symbols)]
+    create_compact_bucket(symbols, prices)  # The first bucket of a universe pays for the shared symbol index.
+
+    print(f"{number_of_symbols} symbols, one more bucket of an already known universe")
+    for name, create in (("legacy", create_legacy_bucket), ("compact", create_compact_bucket)):
+        bucket, size, count = measure(lambda create=create: create(list(symbols), list(prices)))  # type: ignore[misc]
+        start = time.perf_counter()
+        for symbol in symbols[::25]:
+            bucket.get_conversion_rate(symbol)
+        lookup = (time.perf_counter() - start) / len(symbols[::25])
+        print(f"{name:>8}: {size / 1024:>8.1f} KiB, {count:>6} allocations, {lookup * 1_000_000:>8.2f} us per lookup")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=2500)
+    arguments = parser.parse_args()
+    main(arguments.symbols)
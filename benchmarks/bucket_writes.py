@@ -0,0 +1,57 @@
+"""Round trips and wall time of writing one currency pair bucket, before and after pipelining.
+
+Usage: python -m benchmarks.bucket_writes [--symbols 2500] [--rtt-ms 0.2]
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+
+import redis.asyncio
+
+from src.quote_consumer.adapters.currency_pair_repository import RedisCurrencyPairRepository
+from src.quote_consumer.domain import model
+from src.quote_consumer.settings import AppSettings
+
+from .common import CountingConnection, generate_symbols, get_counting_client
+
+
+async def write_sequentially(client: redis.asyncio.Redis, currency_pair_bucket: model.CurrencyPairBucket) -> None:
+    """Write one HSET per symbol, then EXPIRE and ZADD, as the previous implementation did."""
+    timestamp_str = currency_pair_bucket.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+    for currency_pair in currency_pair_bucket.currency_pairs:
+        await client.hset(timestamp_str, currency_pair.symbol, str(currency_pair.conversion_rate))
+    await client.expire(timestamp_str, AppSettings.currency_pair_ttl)
+    await client.zadd("available_currency_pair_timestamps", {timestamp_str: currency_pair_bucket.timestamp.timestamp()})
+
+
+async def write_pipelined(client: redis.asyncio.Redis, currency_pair_bucket: model.CurrencyPairBucket) -> None:
+    await RedisCurrencyPairRepository(client).create_currency_pair_bucket(currency_pair_bucket)
+
+
+async def main(number_of_symbols: int, rtt_ms: float) -> None:
+    currency_pair_bucket = model.CurrencyPairBucket(
+        currency_pairs=[
+            model.CurrencyPair(symbol=symbol, conversion_rate=index / 7)
+            for index, symbol in enumerate(generate_symbols(number_of_symbols))
+        ],
+        timestamp=datetime.datetime.now(datetime.timezone.utc),
+    )
+
+    print(f"{number_of_symbols} symbols, simulated RTT {rtt_ms} ms")
+    for name, write in (("sequential", write_sequentially), ("pipelined", write_pipelined)):
+        client = get_counting_client(rtt_ms)
+        start = time.perf_counter()
+        await write(client, currency_pair_bucket)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {CountingConnection.round_trips:>5} round trips, {elapsed * 1000:>9.2f} ms")
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=2500)
+    parser.add_argument("--rtt-ms", type=float, default=0.2)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.symbols, arguments.rtt_ms))
@@ -0,0 +1,39 @@
+"""Helpers shared by benchmarks."""
+
+import asyncio
+import random
+import string
+import typing
+
+import fakeredis
+from fakeredis.aioredis import FakeAsyncRedisConnection
+
+
+class CountingConnection(FakeAsyncRedisConnection):
+    """Fake Redis connection that counts round trips and bytes sent, and optionally simulates network latency."""
+
+    round_trips = 0
+    bytes_sent = 0
+    rtt = 0.0
+
+    async def send_packed_command(self, command: typing.Any, check_health: bool = True) -> None:
+        type(self).round_trips += 1
+        type(self).bytes_sent += len(command) if isinstance(command, bytes) else sum(map(len, command))
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+        await super().send_packed_command(command, check_health)
+
+
+def get_counting_client(rtt_ms: float) -> fakeredis.FakeAsyncRedis:
+    CountingConnection.round_trips = 0
+    CountingConnection.bytes_sent = 0
+    CountingConnection.rtt = rtt_ms / 1000
+    return fakeredis.FakeAsyncRedis(connection_class=CountingConnection, decode_responses=True)
+
+
+def generate_symbols(number_of_symbols: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    symbols: set[str] = set()
+    while len(symbols) < number_of_symbols:
+        symbols.add("".join(rng.choices(string.ascii_uppercase, k=rng.randint(6, 10))))
+    return sorted(symbols)
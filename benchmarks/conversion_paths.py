@@ -0,0 +1,76 @@
+"""Build time of the index of conversion paths, and time and length of the paths looked up in it.
+
+A universe shaped like the one of Binance is generated: the quote assets are traded against each other, and every base
+asset against USDT mostly, against BTC often, and against the other quote assets seldom. The index is built from the
+symbols with the quote assets of the settings as bridges, then every pair of a sample of assets is looked up.
+
+Usage: python -m benchmarks.conversion_paths [--symbols 2500] [--repeats 20] [--lookups 100000]
+"""
+
+import argparse
+import collections
+import random
+import statistics
+import string
+import time
+
+from src.quote_consumer.domain import model
+from src.quote_consumer.services.conversion_paths import get_bridge_assets
+
+
+def generate_universe(number_of_symbols: int, quote_assets: tuple[str, ...], seed: int = 0) -> tuple[str, ...]:
+    rng = random.Random(seed)
+    symbols: dict[str, None] = {}
+    for index, base_asset in enumerate(quote_assets):
+        for quote_asset in quote_assets[:index]:
+            if rng.random() < 0.5:  # noqa: PLR2004
+                symbols[f"{base_asset}{quote_asset}"] = None
+    # The more liquid a quote asset is, the more base assets are traded against it.
+    weights = [1 / (rank + 1) ** 1.5 for rank in range(len(quote_assets))]
+    while len(symbols) < number_of_symbols:
+        base_asset = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 6)))
+        if model.split_symbol(base_asset, quote_assets):
+            continue
+        for quote_asset in {*rng.choices(quote_assets, weights, k=rng.randint(1, 4))}:
+            symbols[f"{base_asset}{quote_asset}"] = None
+    return tuple(symbols)[:number_of_symbols]
+
+
+def main(arguments: argparse.Namespace) -> None:
+    bridge_assets = get_bridge_assets()
+    symbols = generate_universe(arguments.symbols, bridge_assets)
+
+    build_times = []
+    for _ in range(arguments.repeats):
+        start = time.perf_counter()
+        conversion_path_index = model.ConversionPathIndex(symbols, bridge_assets)
+        build_times.append(time.perf_counter() - start)
+    model.get_conversion_path_index(symbols, bridge_assets)
+    start = time.perf_counter()
+    for _ in range(arguments.repeats):
+        model.get_conversion_path_index(symbols, bridge_assets)
+    cached_time = (time.perf_counter() - start) / arguments.repeats
+    print(
+        f"{len(symbols)} symbols of {len(conversion_path_index)} assets, {len(bridge_assets)} bridges: "
+        f"build {statistics.median(build_times) * 1000:.1f} ms, unchanged universe {cached_time * 1000000:.1f} us",
+    )
+
+    rng = random.Random(1)
+    assets = sorted(conversion_path_index.assets)
+    pairs = [(rng.choice(assets), rng.choice(assets)) for _ in range(arguments.lookups)]
+    start = time.perf_counter()
+    paths = [conversion_path_index.find(base_asset, quote_asset) for base_asset, quote_asset in pairs]
+    lookup_time = (time.perf_counter() - start) / len(pairs)
+    lengths = collections.Counter(len(path) for path in paths if path)
+    print(
+        f"lookup {lookup_time * 1000000000:.0f} ns, reachable {sum(lengths.values()) / len(pairs):.1%}, legs "
+        + ", ".join(f"{legs}: {count / len(pairs):.1%}" for legs, count in sorted(lengths.items())),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=2500)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=100000)
+    main(parser.parse_args())
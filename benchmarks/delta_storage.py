@@ -0,0 +1,123 @@
+"""Bytes written, bytes stored and read cost of a stream of currency pair buckets, with and without delta buckets.
+
+The stream is either recorded, as JSON lines each holding one response of the exchange API, or simulated as a random
+walk in which every price changes with the given probability between two polls.
+
+Usage: python -m benchmarks.delta_storage [--stream prices.jsonl] [--symbols 2500] [--buckets 100] [--change-rate 0.2]
+                                          [--keyframe-interval 10]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import pathlib
+import random
+import time
+import typing
+
+import redis.asyncio
+
+from src.quote_consumer.adapters.currency_pair_repository import RedisCurrencyPairRepository
+from src.quote_consumer.services import currency_pairs
+from src.quote_consumer.settings import AppSettings
+
+from .common import CountingConnection, generate_symbols, get_counting_client
+
+
+def read_recorded_stream(path: str) -> typing.Iterator[list[dict]]:
+    with pathlib.Path(path).open() as stream:
+        for line in stream:
+            yield json.loads(line)
+
+
+def simulate_stream(
+    number_of_symbols: int,
+    number_of_buckets: int,
+    change_rate: float,
+    seed: int = 0,
+) -> typing.Iterator[list[dict]]:
+    rng = random.Random(seed)
+    prices = {symbol: rng.uniform(0.0001, 100000) for symbol in generate_symbols(number_of_symbols, seed)}
+    for _ in range(number_of_buckets):
+        yield [{"symbol": symbol, "price": f"{price:.8f}"} for symbol, price in prices.items()]
+        for symbol in prices:
+            if rng.random() < change_rate:
+                prices[symbol] *= rng.gauss(1, 0.001)
+
+
+async def get_stored_bytes(client: redis.asyncio.Redis) -> int:
+    stored_bytes = 0
+    async for key in client.scan_iter("????-??-??T??:??:??Z"):
+        stored_bytes += len(key) + sum(
+            len(field) + len(value) for field, value in (await client.hgetall(key)).items()
+        )
+    return stored_bytes
+
+
+async def run(stream: list[list[dict]], keyframe_interval: int) -> None:
+    AppSettings.currency_pair_keyframe_interval = keyframe_interval
+    client = get_counting_client(0)
+    currency_pair_repo = RedisCurrencyPairRepository(client)
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+    previous_currency_pair_bucket = None
+    buckets_since_keyframe = 0
+    for index, currency_pairs_json in enumerate(stream):
+        currency_pair_bucket = currency_pairs.create_currency_pair_bucket_from_json(currency_pairs_json)
+        currency_pair_bucket.timestamp = start + datetime.timedelta(seconds=30 * index)
+        changed_currency_pair_bucket = currency_pairs.get_changed_currency_pair_bucket(
+            currency_pair_bucket,
+            previous_currency_pair_bucket,
+            buckets_since_keyframe,
+        )
+        await currency_pair_repo.create_currency_pair_bucket(currency_pair_bucket, changed_currency_pair_bucket)
+        previous_currency_pair_bucket = currency_pair_bucket
+        buckets_since_keyframe = buckets_since_keyframe + 1 if changed_currency_pair_bucket else 0
+    bytes_sent = CountingConnection.bytes_sent
+    stored_bytes = await get_stored_bytes(client)
+
+    rng = random.Random(0)
+    symbols = rng.choices(previous_currency_pair_bucket.symbols if previous_currency_pair_bucket else ["AAABBB"], k=200)
+    CountingConnection.round_trips = 0
+    started = time.perf_counter()
+    for symbol in symbols:
+        await currency_pair_repo.retrieve_latest_currency_pair(symbol, None)
+    script_elapsed = (time.perf_counter() - started) / len(symbols)
+    CountingConnection.round_trips = 0
+    started = time.perf_counter()
+    for symbol in symbols:
+        await currency_pair_repo.retrieve_currency_pairs([symbol], None)
+    pipelined_elapsed = (time.perf_counter() - started) / len(symbols)
+    pipelined_round_trips = CountingConnection.round_trips / len(symbols)
+
+    print(
+        f"keyframe every {keyframe_interval:>3}: {bytes_sent / 1024:>9.1f} KiB written, "
+        f"{stored_bytes / 1024:>9.1f} KiB stored, quote {script_elapsed * 1e6:>7.1f} µs, "
+        f"pair lookup {pipelined_elapsed * 1e6:>7.1f} µs in {pipelined_round_trips:.1f} round trips",
+    )
+    await client.aclose()
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    if arguments.stream:
+        stream = list(read_recorded_stream(arguments.stream))
+        print(f"{len(stream)} recorded buckets from {arguments.stream}")
+    else:
+        stream = list(simulate_stream(arguments.symbols, arguments.buckets, arguments.change_rate))
+        print(
+            f"{arguments.buckets} simulated buckets of {arguments.symbols} symbols, "
+            f"{arguments.change_rate:.0%} of prices changing between polls",
+        )
+    for keyframe_interval in (1, arguments.keyframe_interval):
+        await run(stream, keyframe_interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stream")
+    parser.add_argument("--symbols", type=int, default=2500)
+    parser.add_argument("--buckets", type=int, default=100)
+    parser.add_argument("--change-rate", type=float, default=0.2)
+    parser.add_argument("--keyframe-interval", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+"""Latency of quotes served while currency pairs are ingested on the same event loop, by parse executor.
+
+Quotes are requested at a fixed rate and their latency is measured from the moment they were due, so the time a
+request waits for a stalled event loop counts towards it. Every ingest tick fetches a fresh response of the given
+number of symbols from a fake exchange, parses it and stores it.
+
+Usage: python -m benchmarks.ingest_stall [--symbols 2500] [--fetch-interval 0.25] [--duration 5]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import statistics
+import time
+import typing
+
+import fakeredis
+import httpx
+
+from src.quote_consumer.adapters.currency_pair_repository import PackedRedisCurrencyPairRepository
+from src.quote_consumer.adapters.currency_pair_source import BinanceCurrencyPairSource, Prices
+from src.quote_consumer.adapters.http_client import AbstractHttpClient
+from src.quote_consumer.metrics import AppMetrics, monitor_event_loop_lag
+from src.quote_consumer.services import currency_pairs, dependencies
+from src.quote_consumer.settings import AppSettings
+
+from .common import generate_symbols
+
+
+class FakeExchangeClient(AbstractHttpClient):
+    """Serves responses of a random walk of prices generated in advance, so every one is parsed and stored anew."""
+
+    def __init__(self, symbols: list[str], number_of_responses: int) -> None:
+        rng = random.Random(0)
+        prices = {symbol: rng.uniform(0.0001, 100000) for symbol in symbols}
+        self.responses: list[bytes] = []
+        for _ in range(number_of_responses):
+            for symbol in prices:
+                prices[symbol] *= rng.gauss(1, 0.001)
+            self.responses.append(
+                json.dumps([{"symbol": symbol, "price": f"{price:.8f}"} for symbol, price in prices.items()]).encode(),
+            )
+        self.requests = 0
+
+    async def get(self, url: str) -> typing.Any:  # noqa: ARG002
+        self.requests += 1
+        return httpx.Response(status_code=200, content=self.responses[self.requests % len(self.responses)])
+
+
+async def request_quotes(
+    currency_pair_repo: PackedRedisCurrencyPairRepository,
+    symbols: list[str],
+    latencies: list[float],
+    rate: float,
+) -> None:
+    rng = random.Random(1)
+    due = time.perf_counter()
+    while True:
+        due += 1 / rate
+        await asyncio.sleep(max(due - time.perf_counter(), 0))
+        await currency_pair_repo.retrieve_latest_currency_pair(rng.choice(symbols), None)
+        latencies.append(time.perf_counter() - due)
+
+
+async def run(parse_executor: str, symbols: list[str], fetch_interval: float, duration: float) -> None:
+    AppSettings.exchange_parse_executor = parse_executor  # type: ignore[assignment]
+    AppSettings.exchange_fetch_interval = fetch_interval  # type: ignore[assignment]
+    dependencies.get_parse_executor.cache_clear()
+    currency_pair_repo = PackedRedisCurrencyPairRepository(fakeredis.FakeAsyncRedis())
+    source = BinanceCurrencyPairSource("https://exchange.test", fetch_interval)
+    snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue(maxsize=AppSettings.exchange_queue_size)
+    http_client = FakeExchangeClient(symbols, round(duration / fetch_interval) + 2)
+
+    # The worker is started and the first bucket stored before measuring.
+    prices_by_source: dict[str, Prices] = {}
+    await currency_pairs.update_prices_from_source(http_client, source, prices_by_source, {})
+    await currency_pair_repo.create_currency_pair_bucket(
+        currency_pairs.merge_currency_pairs(prices_by_source, datetime.datetime.now(datetime.timezone.utc)),
+    )
+
+    latencies: list[float] = []
+    AppMetrics.observations.pop("event_loop_lag_seconds", None)
+    tasks = [
+        asyncio.create_task(currency_pairs.fetch_currency_pairs_on_schedule(http_client, snapshots, [source])),
+        asyncio.create_task(currency_pairs.store_currency_pairs(snapshots, currency_pair_repo)),
+        asyncio.create_task(request_quotes(currency_pair_repo, symbols, latencies, rate=100)),
+        asyncio.create_task(monitor_event_loop_lag(0.005)),
+    ]
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    print(
+        f"{parse_executor:>7}: {len(latencies):>5} quotes, p50 {statistics.median(latencies) * 1000:>6.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:>6.2f} ms, max {latencies[-1] * 1000:>6.2f} ms, "
+        f"event loop lag p99 {AppMetrics.quantile('event_loop_lag_seconds', 0.99) * 1000:>6.2f} ms",  # type: ignore[operator]
+    )
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    symbols = generate_symbols(arguments.symbols)
+    print(f"{arguments.symbols} symbols fetched every {arguments.fetch_interval} s for {arguments.duration} s")
+    for parse_executor in ("inline", "thread", "process"):
+        await run(parse_executor, symbols, arguments.fetch_interval, arguments.duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=2500)
+    parser.add_argument("--fetch-interval", type=float, default=0.25)
+    parser.add_argument("--duration", type=float, default=5)
+    asyncio.run(main(parser.parse_args()))
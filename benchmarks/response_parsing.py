@@ -0,0 +1,68 @@
+"""Peak memory and time of turning one response of the exchange into a currency pair bucket.
+
+Compares decoding the response whole with collecting its tickers as they are decoded.
+
+Usage: python -m benchmarks.response_parsing [--symbols 2500]
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import random
+import time
+import tracemalloc
+import typing
+
+from src.quote_consumer.adapters.currency_pair_source import BinanceCurrencyPairSource
+from src.quote_consumer.domain import model
+from src.quote_consumer.services import currency_pairs
+
+from .common import generate_symbols
+
+
+def parse_whole(content: bytes) -> model.CurrencyPairBucket:
+    """Decode the whole response, then build the bucket from the decoded tickers, as the previous implementation did."""
+    return currency_pairs.create_currency_pair_bucket_from_json(json.loads(content))
+
+
+def parse_collecting(content: bytes) -> model.CurrencyPairBucket:
+    return currency_pairs.merge_currency_pairs(
+        {"binance": BinanceCurrencyPairSource("https://exchange.test", 30).parse(content)},
+        datetime.datetime.now(datetime.timezone.utc),
+    )
+
+
+def measure(parse: typing.Callable[[bytes], model.CurrencyPairBucket], content: bytes) -> tuple[int, float]:
+    parse(content)
+    gc.collect()
+    tracemalloc.start()
+    parse(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(20):
+        parse(content)
+    return peak, (time.perf_counter() - start) / 20
+
+
+def main(number_of_symbols: int) -> None:
+    rng = random.Random(0)
+    content = json.dumps(
+        [
+            {"symbol": symbol, "price": f"{rng.uniform(0.0001, 100000):.8f}"}
+            for symbol in generate_symbols(number_of_symbols)
+        ],
+    ).encode()
+
+    print(f"{number_of_symbols} symbols, a response of {len(content) / 1024:.1f} KiB")
+    for name, parse in (("whole", parse_whole), ("collecting", parse_collecting)):
+        peak, elapsed = measure(parse, content)
+        print(f"{name:>10}: {peak / 1024:>8.1f} KiB peak, {elapsed * 1000:>6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=2500)
+    arguments = parser.parse_args()
+    main(arguments.symbols)
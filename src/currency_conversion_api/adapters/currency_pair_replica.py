@@ -0,0 +1,134 @@
+"""In-memory replica of the latest currency pairs published by Quote Consumer."""
+
+import array
+import asyncio
+import datetime
+import logging
+import struct
+import sys
+import typing
+
+import redis.asyncio
+
+from ..metrics import AppMetrics
+
+
+# The format of updates is the one Quote Consumer publishes them in: an update header followed by the prices of the
+# bucket, preceded by its length-prefixed symbols if flagged so.
+CURRENCY_PAIR_UPDATES_CHANNEL = "currency_pair_updates"
+CURRENCY_PAIR_SNAPSHOT_KEY = "currency_pair_snapshot"
+# Format version, flags, publisher, sequence number, epoch of the bucket and dictionary version.
+UPDATE_HEADER = struct.Struct("<BBQQdQ")
+SYMBOLS_LENGTH = struct.Struct("<I")
+FORMAT_VERSION = 1
+SYMBOLS = 0x04
+# Seconds before subscribing again once replication fails, e.g. as the connection to Redis is lost.
+RECONNECT_DELAY = 1
+
+
+class Update(typing.NamedTuple):
+    publisher: int
+    sequence: int
+    timestamp: datetime.datetime
+    dictionary_version: int
+    symbols: tuple[str, ...] | None
+    prices: array.array
+
+
+class CurrencyPairTable(typing.NamedTuple):
+    publisher: int
+    sequence: int
+    timestamp: datetime.datetime
+    dictionary_version: int
+    indexes: dict[str, int]
+    prices: array.array
+
+
+def unpack_update(payload: bytes) -> Update:
+    format_version, flags, publisher, sequence, epoch, dictionary_version = UPDATE_HEADER.unpack_from(payload)
+    if format_version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported currency pair update format version: {format_version}.")
+    offset = UPDATE_HEADER.size
+    symbols = None
+    if flags & SYMBOLS:
+        (length,) = SYMBOLS_LENGTH.unpack_from(payload, offset)
+        offset += SYMBOLS_LENGTH.size
+        symbols = tuple(payload[offset:offset + length].decode().split("\n")) if length else ()
+        offset += length
+    prices = array.array("d")
+    prices.frombytes(payload[offset:])
+    if sys.byteorder == "big":
+        prices.byteswap()
+    return Update(
+        publisher=publisher,
+        sequence=sequence,
+        timestamp=datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc),
+        dictionary_version=dictionary_version,
+        symbols=symbols,
+        prices=prices,
+    )
+
+
+class CurrencyPairReplica:
+    """Holds the latest prices of all symbols, swapped for newer ones as soon as Quote Consumer publishes them.
+
+    Updates follow one another by sequence number and reference the symbols they were resynced with. On a gap, a new
+    publisher or new symbols the replica resyncs from the latest update stored along with its symbols.
+    """
+
+    def __init__(self, client: redis.asyncio.Redis) -> None:
+        self._client = client
+        self._table: CurrencyPairTable | None = None
+
+    def retrieve_conversion_rate(self, symbol: str) -> tuple[float, datetime.datetime] | None:
+        # The table is replaced as a whole, so the price and the timestamp always belong to the same bucket.
+        if not (table := self._table) or (index := table.indexes.get(symbol)) is None:
+            return None
+        return table.prices[index], table.timestamp
+
+    async def replicate(self) -> None:
+        while True:
+            await self._replicate_until_failure()
+            # Updates may be missed until subscribed again, so the table can not be trusted meanwhile.
+            self._table = None
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _replicate_until_failure(self) -> None:
+        try:
+            async with self._client.pubsub() as pubsub:
+                await pubsub.subscribe(CURRENCY_PAIR_UPDATES_CHANNEL)
+                # Updates published meanwhile are either in the snapshot or received after it.
+                await self.resync()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await self.apply_update(message["data"])
+        except Exception:
+            logging.exception("Failed to replicate currency pairs, the replica is resynced.")
+
+    async def apply_update(self, payload: bytes) -> None:
+        update = unpack_update(payload)
+        table = self._table
+        if table and update.publisher == table.publisher:
+            if update.sequence <= table.sequence:
+                # Already part of the snapshot resynced from.
+                return
+            if update.sequence == table.sequence + 1 and update.dictionary_version == table.dictionary_version:
+                self._table = table._replace(sequence=update.sequence, timestamp=update.timestamp, prices=update.prices)
+                AppMetrics.increment("currency_pair_replica_updates")
+                return
+        await self.resync()
+
+    async def resync(self) -> None:
+        AppMetrics.increment("currency_pair_replica_resyncs")
+        if not (payload := await self._client.get(CURRENCY_PAIR_SNAPSHOT_KEY)):
+            self._table = None
+            return
+        update = unpack_update(typing.cast(bytes, payload))
+        self._table = CurrencyPairTable(
+            publisher=update.publisher,
+            sequence=update.sequence,
+            timestamp=update.timestamp,
+            dictionary_version=update.dictionary_version,
+            indexes={symbol: index for index, symbol in enumerate(update.symbols or ())},
+            prices=update.prices,
+        )
@@ -1,5 +1,6 @@
 """Class to fetch data from controllers."""
 
+import time
 import types
 import typing
 import typing_extensions
@@ -7,6 +8,7 @@ import typing_extensions
 import httpx
 
 from ..domain import exceptions
+from ..metrics import AppMetrics
 
 
 class AbstractHttpClient(typing.Protocol):
@@ -24,10 +26,33 @@ class AbstractHttpClient(typing.Protocol):
     async def get(self, url: str, params: dict) -> typing.Any:
         pass
 
+    async def post(self, url: str, json: typing.Any) -> typing.Any:
+        pass
+
 
 class HttpxClient(AbstractHttpClient):
-    def __init__(self) -> None:
-        self.client = httpx.AsyncClient()
+    """Shares a pool of kept alive connections between conversions, reporting its usage to the metrics."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        connect_timeout: float = 3,
+        read_timeout: float = 5,
+        pool_timeout: float = 5,
+        http2: bool = False,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60,
+    ) -> None:
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=pool_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
+        self._requests_in_flight = 0
 
     async def __aenter__(self) -> typing_extensions.Self:
         await super().__aenter__()
@@ -45,10 +70,31 @@ class HttpxClient(AbstractHttpClient):
         return None
 
     async def get(self, url: str, params: dict) -> httpx.Response:
+        return await self._request("GET", url, params=params)
+
+    async def post(self, url: str, json: typing.Any) -> httpx.Response:
+        return await self._request("POST", url, json=json)
+
+    async def _request(self, method: str, url: str, **kwargs: typing.Any) -> httpx.Response:
+        started = time.perf_counter()
+        connection_acquired = False
+
+        async def trace(event_name: str, _: dict) -> None:
+            # A request either opens a new connection or sends itself over a kept alive one once it gets a connection.
+            nonlocal connection_acquired
+            if not connection_acquired and event_name.endswith(("connect_tcp.started", "send_request_headers.started")):
+                connection_acquired = True
+                AppMetrics.observe("quote_consumer_pool_wait_seconds", time.perf_counter() - started)
+
+        self._requests_in_flight += 1
+        AppMetrics.set("quote_consumer_requests_in_flight", self._requests_in_flight)
         try:
-            response = await self.client.get(url, params=params)
+            response = await self.client.request(method, url, extensions={"trace": trace}, **kwargs)
         except httpx.RequestError as ex:
             raise exceptions.HTTPBadRequestError(ex.args[0]) from ex
+        finally:
+            self._requests_in_flight -= 1
+            AppMetrics.set("quote_consumer_requests_in_flight", self._requests_in_flight)
         try:
             response.raise_for_status()
         except httpx.HTTPStatusError as ex:
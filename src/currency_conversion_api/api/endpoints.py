@@ -8,7 +8,9 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
 from .. import domain
-from ..adapters import http_client
+from ..adapters import currency_pair_replica, http_client
+from ..metrics import AppMetrics
+from ..services import dependencies
 from ..views import currency_pairs
 from ..settings import AppSettings
 
@@ -20,7 +22,10 @@ api_router = APIRouter()
 async def convert(
     request: typing.Annotated[domain.schemata.ConversionGetRequest, fastapi.Depends()],
     http_client: typing.Annotated[
-        http_client.AbstractHttpClient, fastapi.Depends(http_client.HttpxClient),
+        http_client.AbstractHttpClient, fastapi.Depends(dependencies.get_http_client),
+    ],
+    currency_pair_replica: typing.Annotated[
+        currency_pair_replica.CurrencyPairReplica | None, fastapi.Depends(dependencies.get_currency_pair_replica),
     ],
 ) -> JSONResponse:
     conversion = domain.model.Conversion(
@@ -28,10 +33,11 @@ async def convert(
         base_currency=request.from_.strip().upper(),
         quote_currency=request.to.strip().upper(),
         desired_timestamp=request.desired_timestamp,
+        exchange=request.exchange.strip().lower() if request.exchange else None,
     )
 
     try:
-        await currency_pairs.convert(conversion, http_client)
+        await currency_pairs.convert(conversion, http_client, currency_pair_replica)
     except domain.exceptions.FetchCurrencyPairsError as ex:
         raise fastapi.HTTPException(
             detail=f"Error. Failed to get the currency pair due to unreachanble Quote Consumer endpoint. {ex.args[0]}",
@@ -55,6 +61,63 @@ async def convert(
                 "actual_timestamp_closest_to_desired": conversion.actual_timestamp_closest_to_desired.strftime(
                     "%Y-%m-%dT%H:%M:%SZ",
                 ),
+                "conversion_path": conversion.conversion_path,
             },
         ),
     )
+
+
+@api_router.post("/convert/batch", status_code=200, response_model=domain.schemata.ConversionBatchResponse)
+async def convert_batch(
+    request: domain.schemata.ConversionBatchRequest,
+    http_client: typing.Annotated[
+        http_client.AbstractHttpClient, fastapi.Depends(dependencies.get_http_client),
+    ],
+    currency_pair_replica: typing.Annotated[
+        currency_pair_replica.CurrencyPairReplica | None, fastapi.Depends(dependencies.get_currency_pair_replica),
+    ],
+) -> JSONResponse:
+    conversions = [
+        domain.model.Conversion(
+            amount=item.amount,
+            base_currency=item.from_.strip().upper(),
+            quote_currency=item.to.strip().upper(),
+            desired_timestamp=item.desired_timestamp,
+            exchange=item.exchange.strip().lower() if item.exchange else None,
+        )
+        for item in request.items
+    ]
+
+    try:
+        errors = await currency_pairs.convert_batch(conversions, http_client, currency_pair_replica)
+    except domain.exceptions.FetchCurrencyPairsError as ex:
+        raise fastapi.HTTPException(
+            detail=f"Error. Failed to get the currency pairs due to unreachanble Quote Consumer endpoint. {ex.args[0]}",
+            status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR,
+        ) from ex
+
+    # A conversion failing is reported in its place, the others are converted anyway.
+    items: list[dict] = []
+    for conversion, error in zip(conversions, errors, strict=True):
+        if error:
+            items.append({"detail": "Conversion is not possible. We don't have quotes for this pair."})
+        elif conversion.conversion_rate_age_seconds > AppSettings.max_quote_age:
+            items.append({"detail": "quotes_outdated"})
+        else:
+            items.append(
+                {
+                    "converted_amount": conversion.converted_amount,
+                    "conversion_rate": conversion.conversion_rate,
+                    "conversion_rate_age_seconds": conversion.conversion_rate_age_seconds,
+                    "actual_timestamp_closest_to_desired": conversion.actual_timestamp_closest_to_desired.strftime(
+                        "%Y-%m-%dT%H:%M:%SZ",
+                    ),
+                    "conversion_path": conversion.conversion_path,
+                },
+            )
+    return JSONResponse(content=jsonable_encoder({"items": items}))
+
+
+@api_router.get("/metrics", status_code=200)
+async def get_metrics() -> JSONResponse:
+    return JSONResponse(content=AppMetrics.snapshot())
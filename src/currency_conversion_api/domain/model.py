@@ -11,11 +11,15 @@ class Conversion:
         base_currency: str,
         quote_currency: str,
         desired_timestamp: datetime.datetime | None,
+        exchange: str | None = None,
     ) -> None:
         self.amount = amount
         self.base_currency = base_currency
         self.quote_currency = quote_currency
         self.desired_timestamp = desired_timestamp
+        self.exchange = exchange
+        # Symbols the conversion rate is the product of, or of their inverses, as Quote Consumer returns them.
+        self.conversion_path: list[dict] = []
         self._converted_amount: float
         self._conversion_rate: float
         self._conversion_rate_age_seconds: float
@@ -43,10 +47,11 @@ class Conversion:
         return self._actual_timestamp_closest_to_desired
 
     @actual_timestamp_closest_to_desired.setter
-    def actual_timestamp_closest_to_desired(self, value: str) -> None:
-        self._actual_timestamp_closest_to_desired = datetime.datetime.strptime(
-            value, "%Y-%m-%dT%H:%M:%SZ",
-        ).replace(tzinfo=datetime.timezone.utc)
+    def actual_timestamp_closest_to_desired(self, value: datetime.datetime | str) -> None:
+        # Quote Consumer returns timestamps formatted, the replica holds them parsed already.
+        if isinstance(value, str):
+            value = datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
+        self._actual_timestamp_closest_to_desired = value
         current_time = datetime.datetime.now(datetime.timezone.utc)
         self._conversion_rate_age_seconds = (current_time - self._actual_timestamp_closest_to_desired).total_seconds()
 
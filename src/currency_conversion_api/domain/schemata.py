@@ -7,11 +7,17 @@ import pydantic
 from fastapi import Query
 
 
+# Number of conversions one batch request may ask for.
+BATCH_MAX_ITEMS = 1000
+
+
 class ConversionGetRequest(pydantic.BaseModel):
     amount: float = pydantic.Field(Query(..., example="100", gt=0))
     from_: str = pydantic.Field(Query(..., alias="from", example="LTC"))
     to: str = pydantic.Field(Query(..., example="BTC"))
     desired_timestamp: datetime.datetime | None = pydantic.Field(Query(None, example="2024-11-24T12:00:00Z"))
+    # Exchange the quote is of, when Quote Consumer stores the quotes of every exchange apart.
+    exchange: str | None = pydantic.Field(Query(None, example="okx"))
 
     model_config: typing.ClassVar = {
         "json_schema_extra": {
@@ -27,11 +33,18 @@ class ConversionGetRequest(pydantic.BaseModel):
     }
 
 
+class ConversionLeg(pydantic.BaseModel):
+    symbol: str
+    inverted: bool
+
+
 class ConversionGetResponse(pydantic.BaseModel):
     converted_amount: float
     conversion_rate: float
     conversion_rate_age_seconds: float
     actual_timestamp_closest_to_desired: str
+    # Symbols the conversion rate is the product of, or of their inverses, as there may be no symbol of the currencies.
+    conversion_path: list[ConversionLeg]
 
     model_config: typing.ClassVar = {
         "json_schema_extra": {
@@ -41,7 +54,41 @@ class ConversionGetResponse(pydantic.BaseModel):
                     "conversion_rate": "0.00101200",
                     "conversion_rate_age_seconds": "15.0",
                     "actual_timestamp_closest_to_desired": "2024-11-23T16:45:31Z",
+                    "conversion_path": [{"symbol": "LTCBTC", "inverted": False}],
                 },
             ],
         },
     }
+
+
+class ConversionBatchItem(pydantic.BaseModel):
+    amount: float = pydantic.Field(..., gt=0)
+    from_: str = pydantic.Field(..., alias="from")
+    to: str
+    desired_timestamp: datetime.datetime | None = None
+    exchange: str | None = None
+
+
+class ConversionBatchRequest(pydantic.BaseModel):
+    items: list[ConversionBatchItem] = pydantic.Field(..., max_length=BATCH_MAX_ITEMS)
+
+    model_config: typing.ClassVar = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "items": [
+                        {"amount": "100", "from": "LTC", "to": "BTC"},
+                        {"amount": "2", "from": "ETH", "to": "BTC", "desired_timestamp": "2024-11-23T16:45:31Z"},
+                    ],
+                },
+            ],
+        },
+    }
+
+
+class ConversionBatchError(pydantic.BaseModel):
+    detail: str
+
+
+class ConversionBatchResponse(pydantic.BaseModel):
+    items: list[ConversionGetResponse | ConversionBatchError]
@@ -1,13 +1,37 @@
 """App entrypoint."""
 
+import asyncio
+import contextlib
+import typing
+
 import fastapi
 import uvicorn
 
 from .api import endpoints
+from .services import dependencies
 from .settings import AppSettings
 
 
+@contextlib.asynccontextmanager
+async def lifespan(_: fastapi.FastAPI) -> typing.AsyncIterator[None]:
+    currency_pair_replica = dependencies.get_currency_pair_replica()
+    replication = asyncio.create_task(currency_pair_replica.replicate()) if currency_pair_replica else None
+    # Requests share the client, which closes its connections on shutdown.
+    async with dependencies.get_http_client():
+        yield
+    if replication:
+        replication.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await replication
+    if dependencies.get_db_client.cache_info().currsize:
+        await dependencies.get_db_client().aclose()
+    dependencies.get_http_client.cache_clear()
+    dependencies.get_db_client.cache_clear()
+    dependencies.get_currency_pair_replica.cache_clear()
+
+
 app = fastapi.FastAPI(
+    lifespan=lifespan,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     title="Currency Conversion API",
@@ -0,0 +1,48 @@
+"""App metrics."""
+
+import collections
+import math
+
+
+class Metrics:
+    def __init__(self, window: int = 1024) -> None:
+        self.counters: collections.Counter[str] = collections.Counter()
+        self.gauges: dict[str, float] = {}
+        # The latest observations of every summary, from which its quantiles are computed.
+        self.observations: collections.defaultdict[str, collections.deque[float]] = collections.defaultdict(
+            lambda: collections.deque(maxlen=window),
+        )
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def set(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        self.observations[name].append(value)
+
+    def quantile(self, name: str, quantile: float) -> float | None:
+        if not (observations := self.observations.get(name)):
+            return None
+        ordered = sorted(observations)
+        return ordered[min(math.ceil(quantile * len(ordered)), len(ordered)) - 1]
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "summaries": {
+                name: {
+                    "count": len(observations),
+                    "p50": self.quantile(name, 0.5),
+                    "p95": self.quantile(name, 0.95),
+                    "p99": self.quantile(name, 0.99),
+                    "max": max(observations, default=None),
+                }
+                for name, observations in self.observations.items()
+            },
+        }
+
+
+AppMetrics = Metrics()
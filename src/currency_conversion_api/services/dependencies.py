@@ -0,0 +1,33 @@
+"""Services related to Quote Consumer and database."""
+
+from functools import lru_cache
+
+import redis.asyncio
+
+from ..adapters import currency_pair_replica, http_client
+from ..settings import AppSettings
+
+
+@lru_cache
+def get_http_client() -> http_client.AbstractHttpClient:
+    return http_client.HttpxClient(
+        connect_timeout=AppSettings.quote_consumer_connect_timeout,
+        read_timeout=AppSettings.quote_consumer_read_timeout,
+        pool_timeout=AppSettings.quote_consumer_pool_timeout,
+        http2=AppSettings.quote_consumer_http2,
+        max_connections=AppSettings.quote_consumer_max_connections,
+        max_keepalive_connections=AppSettings.quote_consumer_max_keepalive_connections,
+        keepalive_expiry=AppSettings.quote_consumer_keepalive_expiry,
+    )
+
+
+@lru_cache
+def get_db_client() -> redis.asyncio.Redis:
+    return redis.asyncio.Redis(host=AppSettings.db_host, port=AppSettings.db_port)
+
+
+@lru_cache
+def get_currency_pair_replica() -> currency_pair_replica.CurrencyPairReplica | None:
+    if not AppSettings.currency_pair_replica:
+        return None
+    return currency_pair_replica.CurrencyPairReplica(get_db_client())
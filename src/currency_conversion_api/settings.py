@@ -8,6 +8,25 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     max_quote_age: int = pydantic.Field(default="", env="MAX_QUOTE_AGE")
     quote_consumer_api_url: str = pydantic.Field(default="", env="QUOTE_CONSUMER_API_URL")
+    quote_consumer_connect_timeout: float = pydantic.Field(default=3, env="QUOTE_CONSUMER_CONNECT_TIMEOUT")
+    quote_consumer_read_timeout: float = pydantic.Field(default=5, env="QUOTE_CONSUMER_READ_TIMEOUT")
+    # Seconds a request may wait for a connection of the pool to become available.
+    quote_consumer_pool_timeout: float = pydantic.Field(default=5, env="QUOTE_CONSUMER_POOL_TIMEOUT")
+    quote_consumer_max_connections: int = pydantic.Field(default=100, env="QUOTE_CONSUMER_MAX_CONNECTIONS")
+    quote_consumer_max_keepalive_connections: int = pydantic.Field(
+        default=20, env="QUOTE_CONSUMER_MAX_KEEPALIVE_CONNECTIONS",
+    )
+    # Seconds an idle connection is kept alive for.
+    quote_consumer_keepalive_expiry: float = pydantic.Field(default=60, env="QUOTE_CONSUMER_KEEPALIVE_EXPIRY")
+    quote_consumer_http2: bool = pydantic.Field(default=False, env="QUOTE_CONSUMER_HTTP2")
+    # Number of cached conversion rates, and seconds a latest one is served for at most.
+    conversion_cache_size: int = pydantic.Field(default=10000, env="CONVERSION_CACHE_SIZE")
+    conversion_cache_latest_ttl: float = pydantic.Field(default=1, env="CONVERSION_CACHE_LATEST_TTL")
+
+    # Related to the replica of the latest currency pairs published by Quote Consumer
+    db_host: str = pydantic.Field(default="", env="DB_HOST")
+    db_port: int = pydantic.Field(default="", env="DB_PORT")
+    currency_pair_replica: bool = pydantic.Field(default=False, env="CURRENCY_PAIR_REPLICA")
 
     # Related to Currency Conversion API
     currency_conversion_api_host: str = pydantic.Field(
@@ -1,21 +1,276 @@
 """Views related to currency pairs."""
 
+import asyncio
+import collections
+import datetime
+import time
+import typing
+
+from ..adapters.currency_pair_replica import CurrencyPairReplica
 from ..adapters.http_client import AbstractHttpClient
 from ..domain import exceptions, model
+from ..metrics import AppMetrics
 
 from ..settings import AppSettings
 
 
-async def convert(conversion: model.Conversion, http_client: AbstractHttpClient) -> None:
-        currency_pairs = await fetch_currency_pairs(conversion, http_client)
+# Base currency, quote currency, desired timestamp, None standing for the latest one, and exchange, if any.
+ConversionRateKey = tuple[str, str, str | None, str | None]
+
+
+class ConversionRateCache:
+        """Keeps conversion rates fetched from Quote Consumer in memory, and fetches each missing one only once.
+
+        Rates for timestamps older than the maximum quote age are immutable, so they are only evicted when the least
+        recently used. The latest rates expire after the TTL, or once their bucket is older than the maximum quote age.
+        """
+
+        def __init__(
+                self,
+                size: int = AppSettings.conversion_cache_size,
+                latest_ttl: float = AppSettings.conversion_cache_latest_ttl,
+        ) -> None:
+                self._size = size
+                self._latest_ttl = latest_ttl
+                # Currency pairs along with the monotonic time they expire at, None for never.
+                self._entries: collections.OrderedDict[ConversionRateKey, tuple[dict, float | None]] = (
+                        collections.OrderedDict()
+                )
+                self._fetches: dict[ConversionRateKey, asyncio.Task[dict]] = {}
+
+        def clear(self) -> None:
+                self._entries.clear()
+                self._fetches.clear()
+
+        def retrieve_currency_pairs(self, key: ConversionRateKey) -> dict | None:
+                if (currency_pairs := self._retrieve_entry(key)) is not None:
+                        self._count("conversion_cache_hits")
+                return currency_pairs
+
+        def retrieve_all_currency_pairs(self, keys: list[ConversionRateKey]) -> list[dict] | None:
+                """Return the currency pairs of every key, or None if any of them is missing."""
+                all_currency_pairs = []
+                for key in keys:
+                        if (currency_pairs := self._retrieve_entry(key)) is None:
+                                return None
+                        all_currency_pairs.append(currency_pairs)
+                for _ in keys:
+                        self._count("conversion_cache_hits")
+                return all_currency_pairs
+
+        async def fetch_currency_pairs(self, conversion: model.Conversion, http_client: AbstractHttpClient) -> dict:
+                key = get_conversion_rate_key(conversion)
+                if currency_pairs := self.retrieve_currency_pairs(key):
+                        return currency_pairs
+
+                if fetch := self._fetches.get(key):
+                        self._count("conversion_cache_coalesced")
+                else:
+                        self.count_miss()
+                        fetch = asyncio.create_task(fetch_currency_pairs(conversion, http_client))
+                        self._fetches[key] = fetch
+                        fetch.add_done_callback(lambda fetch: self._complete_fetch(key, fetch))
+                # A request cancelled while waiting does not cancel the fetch the others wait for.
+                return await asyncio.shield(fetch)
+
+        def count_miss(self) -> None:
+                self._count("conversion_cache_misses")
+
+        def remember_currency_pairs(self, key: ConversionRateKey, currency_pairs: dict) -> None:
+                now = datetime.datetime.now(datetime.timezone.utc)
+                if key[2] and is_historical(datetime.datetime.fromisoformat(key[2]), now):
+                        expires = None
+                else:
+                        actual_timestamp = datetime.datetime.fromisoformat(
+                                currency_pairs["actual_timestamp_closest_to_desired"],
+                        )
+                        freshness = AppSettings.max_quote_age - (now - actual_timestamp).total_seconds()
+                        if min(freshness, self._latest_ttl) <= 0:
+                                return
+                        expires = time.monotonic() + min(freshness, self._latest_ttl)
+                self._entries[key] = currency_pairs, expires
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._size:
+                        self._entries.popitem(last=False)
+
+        def _retrieve_entry(self, key: ConversionRateKey) -> dict | None:
+                if entry := self._entries.get(key):
+                        currency_pairs, expires = entry
+                        if expires is None or expires > time.monotonic():
+                                self._entries.move_to_end(key)
+                                return currency_pairs
+                        del self._entries[key]
+                return None
+
+        def _complete_fetch(self, key: ConversionRateKey, fetch: asyncio.Task[dict]) -> None:
+                if self._fetches.get(key) is fetch:
+                        del self._fetches[key]
+                if not fetch.cancelled() and not fetch.exception():
+                        self.remember_currency_pairs(key, fetch.result())
+
+        @staticmethod
+        def _count(name: str) -> None:
+                AppMetrics.increment(name)
+                hits, misses, coalesced = (
+                        AppMetrics.counters[f"conversion_cache_{outcome}"]
+                        for outcome in ("hits", "misses", "coalesced")
+                )
+                AppMetrics.set("conversion_cache_hit_ratio", hits / (hits + misses + coalesced))
+
+
+AppConversionRateCache = ConversionRateCache()
+
+
+def get_conversion_rate_key(conversion: model.Conversion) -> ConversionRateKey:
+        desired_timestamp = conversion.desired_timestamp
+        return (
+                conversion.base_currency,
+                conversion.quote_currency,
+                desired_timestamp.strftime("%Y-%m-%dT%H:%M:%SZ") if desired_timestamp else None,
+                conversion.exchange,
+        )
+
+
+def is_historical(desired_timestamp: datetime.datetime, now: datetime.datetime) -> bool:
+        # Buckets still arriving could be closer to more recent timestamps.
+        return (now - desired_timestamp).total_seconds() > AppSettings.max_quote_age
+
+
+async def convert(
+        conversion: model.Conversion,
+        http_client: AbstractHttpClient,
+        currency_pair_replica: CurrencyPairReplica | None = None,
+) -> None:
+        if convert_from_replica(conversion, currency_pair_replica):
+                return
+        apply_currency_pairs(conversion, await AppConversionRateCache.fetch_currency_pairs(conversion, http_client))
+
+
+async def convert_batch(
+        conversions: list[model.Conversion],
+        http_client: AbstractHttpClient,
+        currency_pair_replica: CurrencyPairReplica | None = None,
+) -> list[exceptions.FetchCurrencyPairsNotFoundError | None]:
+        """Convert all the conversions at once, and return the error of every one of them failed, in order.
+
+        The conversions sharing a desired timestamp are converted from a single source, so that they are as of the same
+        buckets. Groups neither in the replica nor in the cache in full are fetched from Quote Consumer in one request.
+        """
+        errors: list[exceptions.FetchCurrencyPairsNotFoundError | None] = [None] * len(conversions)
+        # Indexes of the conversions waiting for every missing conversion rate.
+        pending: dict[ConversionRateKey, list[int]] = {}
+        for indexes in group_by_desired_timestamp(conversions):
+                if convert_group_without_request([conversions[index] for index in indexes], currency_pair_replica):
+                        continue
+                for index in indexes:
+                        pending.setdefault(get_conversion_rate_key(conversions[index]), []).append(index)
+        if not pending:
+                return errors
+
+        for _ in pending:
+                AppConversionRateCache.count_miss()
+
+        results = await fetch_currency_pairs_batch(
+                [conversions[indexes[0]] for indexes in pending.values()],
+                http_client,
+        )
+        for (key, indexes), currency_pairs in zip(pending.items(), results, strict=True):
+                if currency_pairs:
+                        AppConversionRateCache.remember_currency_pairs(key, currency_pairs)
+                for index in indexes:
+                        if currency_pairs:
+                                apply_currency_pairs(conversions[index], currency_pairs)
+                        else:
+                                errors[index] = exceptions.FetchCurrencyPairsNotFoundError()
+        return errors
+
+
+def group_by_desired_timestamp(conversions: list[model.Conversion]) -> typing.Iterable[list[int]]:
+        groups: dict[str | None, list[int]] = collections.defaultdict(list)
+        for index, conversion in enumerate(conversions):
+                groups[get_conversion_rate_key(conversion)[2]].append(index)
+        return groups.values()
+
+
+def convert_group_without_request(
+        conversions: list[model.Conversion],
+        currency_pair_replica: CurrencyPairReplica | None,
+) -> bool:
+        # The latest conversion rates cached may have been fetched as of different buckets, unlike the replica, whose
+        # table is replaced as a whole. Historical ones are as of the same bucket for good.
+        if not conversions[0].desired_timestamp:
+                results = [
+                        result
+                        for conversion in conversions
+                        if (result := retrieve_from_replica(conversion, currency_pair_replica))
+                ]
+                if len(results) < len(conversions):
+                        return False
+                for conversion, (conversion_rate, timestamp) in zip(conversions, results, strict=True):
+                        apply_conversion_rate(conversion, conversion_rate, timestamp)
+                return True
+        keys = [get_conversion_rate_key(conversion) for conversion in conversions]
+        if not (all_currency_pairs := AppConversionRateCache.retrieve_all_currency_pairs(keys)):
+                return False
+        for conversion, currency_pairs in zip(conversions, all_currency_pairs, strict=True):
+                apply_currency_pairs(conversion, currency_pairs)
+        return True
+
+
+def apply_currency_pairs(conversion: model.Conversion, currency_pairs: dict) -> None:
         conversion.conversion_rate = currency_pairs["conversion_rate"]
         conversion.actual_timestamp_closest_to_desired = currency_pairs["actual_timestamp_closest_to_desired"]
+        conversion.conversion_path = currency_pairs["conversion_path"]
 
 
-async def fetch_currency_pairs(conversion: model.Conversion, http_client: AbstractHttpClient) -> dict:
+def convert_from_replica(conversion: model.Conversion, currency_pair_replica: CurrencyPairReplica | None) -> bool:
+        if not (result := retrieve_from_replica(conversion, currency_pair_replica)):
+                return False
+        conversion_rate, timestamp = result
+        apply_conversion_rate(conversion, conversion_rate, timestamp)
+        return True
+
+
+def retrieve_from_replica(
+        conversion: model.Conversion,
+        currency_pair_replica: CurrencyPairReplica | None,
+) -> tuple[float, datetime.datetime] | None:
+        # The latest conversion rates are read from the replica when it has them, without a request at all.
+        if conversion.desired_timestamp or not currency_pair_replica:
+                return None
+        if not (result := currency_pair_replica.retrieve_conversion_rate(get_symbol(conversion))):
+                return None
+        if is_historical(result[1], datetime.datetime.now(datetime.timezone.utc)):
+                # Updates have stopped coming, so Quote Consumer tells whether it has more recent ones.
+                AppMetrics.increment("currency_pair_replica_stale")
+                return None
+        return result
+
+
+def apply_conversion_rate(conversion: model.Conversion, conversion_rate: float, timestamp: datetime.datetime) -> None:
+        conversion.conversion_rate = conversion_rate
+        conversion.actual_timestamp_closest_to_desired = timestamp
+        # The replica only holds the symbols themselves.
+        conversion.conversion_path = [{"symbol": get_symbol(conversion), "inverted": False}]
+
+
+def get_symbol(conversion: model.Conversion) -> str:
+        # Quote Consumer namespaces symbols by exchange when it stores the quotes of every exchange apart.
+        symbol = f"{conversion.base_currency}{conversion.quote_currency}"
+        return f"{conversion.exchange}:{symbol}" if conversion.exchange else symbol
+
+
+def get_params(conversion: model.Conversion) -> dict:
         params: dict = {"base_currency": conversion.base_currency, "quote_currency": conversion.quote_currency}
         if conversion.desired_timestamp:
                 params.update({"desired_timestamp": conversion.desired_timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")})
+        if conversion.exchange:
+                params.update({"exchange": conversion.exchange})
+        return params
+
+
+async def fetch_currency_pairs(conversion: model.Conversion, http_client: AbstractHttpClient) -> dict:
+        params = get_params(conversion)
         try:
                 response = await http_client.get(
                         f"{AppSettings.quote_consumer_api_url}/api/currency-pair",
@@ -26,3 +281,18 @@ async def fetch_currency_pairs(conversion: model.Conversion, http_client: Abstra
                         raise exceptions.FetchCurrencyPairsNotFoundError from ex
                 raise exceptions.FetchCurrencyPairsError(f"Failed to fetch currency pairs. {ex.args[0]}") from ex
         return dict(response.json())
+
+
+async def fetch_currency_pairs_batch(
+        conversions: list[model.Conversion],
+        http_client: AbstractHttpClient,
+) -> list[dict | None]:
+        items = [get_params(conversion) for conversion in conversions]
+        try:
+                response = await http_client.post(
+                        f"{AppSettings.quote_consumer_api_url}/api/currency-pairs",
+                        json={"items": items},
+                )
+        except (exceptions.HTTPBadRequestError, exceptions.HTTPBadResponseError) as ex:
+                raise exceptions.FetchCurrencyPairsError(f"Failed to fetch currency pairs. {ex.args[0]}") from ex
+        return list(response.json()["items"])
@@ -1,3 +1,5 @@
 """Simplifying imports."""
 
+from . import backfill  # noqa: F401
 from . import main  # noqa: F401
+from . import migrations  # noqa: F401
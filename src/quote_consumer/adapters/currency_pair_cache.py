@@ -0,0 +1,363 @@
+"""In-process read-through cache of the currency pair repository."""
+
+import asyncio
+import bisect
+import collections
+import datetime
+import functools
+import logging
+
+from ..domain import exceptions, model
+from ..metrics import AppMetrics
+from ..settings import AppSettings
+from .currency_pair_repository import (
+    AbstractCurrencyPairRepository,
+    get_partial_bucket_limit,
+    get_redis_currency_pair_repository,
+)
+# mypy: disable-error-code="misc"
+
+
+class CachedCurrencyPairRepository(AbstractCurrencyPairRepository):
+    """Keeps the latest bucket, the buckets written most recently and a mirror of the index of timestamps in memory.
+
+    Only the buckets this process writes are cached, reads of other buckets go to the repository, which reads just the
+    symbols asked for. Writes, compactions and deletions of this process update the mirror and invalidate the buckets
+    they rewrite. Those of other processes, e.g. the backfill command or another instance, are picked up by reloading
+    the mirror in the background.
+    """
+
+    def __init__(
+        self,
+        currency_pair_repo: AbstractCurrencyPairRepository,
+        size: int = AppSettings.currency_pair_cache_size,
+    ) -> None:
+        self._currency_pair_repo = currency_pair_repo
+        self._size = size
+        self._latest_currency_pair_bucket: model.CurrencyPairBucket | None = None
+        self._currency_pair_buckets: collections.OrderedDict[int, model.CurrencyPairBucket] = (
+            collections.OrderedDict()
+        )
+        # Universes of symbols of recently converted timestamps, which do not change while their buckets exist.
+        self._universes: collections.OrderedDict[int, tuple[str, ...]] = collections.OrderedDict()
+        self._epochs: list[int] = []
+        self._epochs_loaded = False
+        # Epochs this process writes and deletes while the mirror is being reloaded.
+        self._pending_epochs: tuple[set[int], set[int]] | None = None
+
+    async def load_timestamps(self) -> None:
+        """Reload the mirror of the index of timestamps, and drop the cached buckets others may have rewritten.
+
+        Buckets no longer indexed are gone, and partial ones are rewritten in full when the buckets before them are
+        compacted or deleted.
+        """
+        written_epochs: set[int] = set()
+        deleted_epochs: set[int] = set()
+        self._pending_epochs = written_epochs, deleted_epochs
+        try:
+            timestamps = await self._currency_pair_repo._retrieve_timestamps()  # noqa: SLF001
+        finally:
+            self._pending_epochs = None
+        epochs = {int(timestamp.timestamp()) for timestamp in timestamps} - deleted_epochs | written_epochs
+        self._epochs = sorted(epochs)
+        for epoch, currency_pair_bucket in list(self._currency_pair_buckets.items()):
+            if epoch not in epochs or currency_pair_bucket.partial:
+                del self._currency_pair_buckets[epoch]
+        for epoch in [epoch for epoch in self._universes if epoch not in epochs]:
+            del self._universes[epoch]
+        if (
+            self._latest_currency_pair_bucket
+            and int(self._latest_currency_pair_bucket.timestamp.timestamp()) not in epochs
+        ):
+            self._latest_currency_pair_bucket = None
+        self._epochs_loaded = True
+
+    async def _reconcile_timestamps(self) -> None:
+        # The mirror is loaded at startup and reloaded in the background, reads only load it if neither happened yet.
+        if not self._epochs_loaded:
+            await self.load_timestamps()
+
+    async def retrieve_latest_currency_pair(
+        self,
+        symbol: str,
+        desired_timestamp: datetime.datetime | None,
+    ) -> model.CurrencyPairBucket | None:
+        """Serve the symbol from the buckets in memory, or read it from the repository in one go if any is missing."""
+        timestamp = await self._retrieve_relevant_timestamp(desired_timestamp)
+        for _ in range(get_partial_bucket_limit() + 1):
+            if not timestamp or not (currency_pair_bucket := self._get_cached_currency_pair_bucket(timestamp)):
+                break
+            if currency_pair := currency_pair_bucket.get_currency_pair(symbol):
+                AppMetrics.increment("currency_pair_cache_hits")
+                return model.CurrencyPairBucket(currency_pairs=[currency_pair], timestamp=timestamp)
+            # A symbol missing in a partial bucket is as of the closest preceding bucket holding it.
+            if not currency_pair_bucket.partial:
+                AppMetrics.increment("currency_pair_cache_hits")
+                return None
+            timestamp = await self._retrieve_previous_timestamp(timestamp)
+        AppMetrics.increment("currency_pair_cache_misses")
+        return await self._currency_pair_repo.retrieve_latest_currency_pair(symbol, desired_timestamp)
+
+    async def retrieve_currency_pair_symbols(
+        self,
+        desired_timestamp: datetime.datetime | None,
+    ) -> tuple[str, ...] | None:
+        if not (timestamp := await self._retrieve_relevant_timestamp(desired_timestamp)):
+            return None
+        epoch = int(timestamp.timestamp())
+        if symbols := self._universes.get(epoch):
+            self._universes.move_to_end(epoch)
+            return symbols
+        if not (symbols := await AbstractCurrencyPairRepository.retrieve_currency_pair_symbols(self, timestamp)):
+            return symbols
+        self._universes[epoch] = symbols
+        while len(self._universes) > self._size:
+            self._universes.popitem(last=False)
+        return symbols
+
+    async def create_currency_pair_bucket(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        changed_currency_pair_bucket: model.CurrencyPairBucket | None = None,
+    ) -> None:
+        await self._currency_pair_repo.create_currency_pair_bucket(currency_pair_bucket, changed_currency_pair_bucket)
+        self._remember_currency_pair_bucket(currency_pair_bucket)
+
+    async def create_currency_pair_alias(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        target_timestamp: datetime.datetime,
+    ) -> None:
+        await self._currency_pair_repo.create_currency_pair_alias(currency_pair_bucket, target_timestamp)
+        self._remember_currency_pair_bucket(currency_pair_bucket)
+
+    async def create_currency_pair_partial_bucket(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        partial_currency_pair_bucket: model.CurrencyPairBucket,
+    ) -> None:
+        await self._currency_pair_repo.create_currency_pair_partial_bucket(
+            currency_pair_bucket,
+            partial_currency_pair_bucket,
+        )
+        # Symbols of the rest of the universe keep being read from the bucket they were last fetched for.
+        self._remember_currency_pair_bucket(partial_currency_pair_bucket)
+
+    async def create_currency_pair_ohlc_bucket(
+        self,
+        ohlc_bucket: model.OhlcBucket,
+        tier: int,
+        compacted_timestamps: list[datetime.datetime],
+        source_tier: int = 0,
+    ) -> None:
+        await self._currency_pair_repo.create_currency_pair_ohlc_bucket(
+            ohlc_bucket,
+            tier,
+            compacted_timestamps,
+            source_tier,
+        )
+        # Compacted buckets are gone but the one of the close prices, which is no longer cached as it may have been
+        # a delta or partial one.
+        epoch = int(ohlc_bucket.timestamp.timestamp())
+        for compacted_timestamp in compacted_timestamps:
+            compacted_epoch = int(compacted_timestamp.timestamp())
+            self._forget_currency_pair_bucket(compacted_epoch)
+            if compacted_epoch == epoch and ohlc_bucket.symbols:
+                continue
+            self._forget_epoch(compacted_epoch)
+        if self._latest_currency_pair_bucket and self._latest_currency_pair_bucket.timestamp <= ohlc_bucket.timestamp:
+            self._latest_currency_pair_bucket = None
+        if not source_tier and compacted_timestamps:
+            self._forget_rebased_currency_pair_bucket(compacted_timestamps[-1])
+
+    async def delete_oldest_currency_pair_buckets(
+        self,
+        tier: int,
+        count: int,
+        before: datetime.datetime | None = None,
+    ) -> list[datetime.datetime]:
+        timestamps = await self._currency_pair_repo.delete_oldest_currency_pair_buckets(tier, count, before)
+        if not timestamps:
+            return timestamps
+        for timestamp in timestamps:
+            epoch = int(timestamp.timestamp())
+            self._forget_currency_pair_bucket(epoch)
+            self._forget_epoch(epoch)
+        if not tier:
+            self._forget_rebased_currency_pair_bucket(timestamps[-1])
+        elif self._latest_currency_pair_bucket and self._latest_currency_pair_bucket.timestamp <= timestamps[-1]:
+            self._latest_currency_pair_bucket = None
+        return timestamps
+
+    async def retrieve_oldest_currency_pair_timestamp(self, tier: int) -> datetime.datetime | None:
+        return await self._currency_pair_repo.retrieve_oldest_currency_pair_timestamp(tier)
+
+    async def retrieve_currency_pair_ohlc_buckets(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        tier: int,
+    ) -> list[model.OhlcBucket]:
+        return await self._currency_pair_repo.retrieve_currency_pair_ohlc_buckets(start, end, tier)
+
+    async def retrieve_currency_pair_footprint(self) -> dict[int, tuple[int, int]]:
+        return await self._currency_pair_repo.retrieve_currency_pair_footprint()
+
+    def _remember_currency_pair_bucket(self, currency_pair_bucket: model.CurrencyPairBucket) -> None:
+        if not currency_pair_bucket.symbols:
+            return
+
+        # Buckets are stored with a precision of one second, cache them the same way.
+        epoch = int(currency_pair_bucket.timestamp.timestamp())
+        currency_pair_bucket = model.CurrencyPairBucket.from_prices(
+            symbols=currency_pair_bucket.symbols,
+            prices=currency_pair_bucket.prices,
+            timestamp=datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc),
+            partial=currency_pair_bucket.partial,
+        )
+
+        index = bisect.bisect_left(self._epochs, epoch)
+        if index == len(self._epochs) or self._epochs[index] != epoch:
+            self._epochs.insert(index, epoch)
+        if self._pending_epochs:
+            self._pending_epochs[0].add(epoch)
+
+        self._cache_currency_pair_bucket(epoch, currency_pair_bucket)
+        if epoch == self._epochs[-1]:
+            self._latest_currency_pair_bucket = currency_pair_bucket
+
+    def _get_cached_currency_pair_bucket(self, timestamp: datetime.datetime) -> model.CurrencyPairBucket | None:
+        if self._latest_currency_pair_bucket and self._latest_currency_pair_bucket.timestamp == timestamp:
+            return self._latest_currency_pair_bucket
+        epoch = int(timestamp.timestamp())
+        if currency_pair_bucket := self._currency_pair_buckets.get(epoch):
+            self._currency_pair_buckets.move_to_end(epoch)
+        return currency_pair_bucket
+
+    async def _retrieve_currency_pair_bucket(self, timestamp: datetime.datetime) -> model.CurrencyPairBucket:
+        if currency_pair_bucket := self._get_cached_currency_pair_bucket(timestamp):
+            AppMetrics.increment("currency_pair_cache_hits")
+            return currency_pair_bucket
+        AppMetrics.increment("currency_pair_cache_misses")
+        return await self._currency_pair_repo._retrieve_currency_pair_bucket(timestamp)  # noqa: SLF001
+
+    async def _is_partial_currency_pair_bucket(self, timestamp: datetime.datetime) -> bool:
+        # The bucket has just been read, so it is looked up again without counting another cache hit.
+        if currency_pair_bucket := self._get_cached_currency_pair_bucket(timestamp):
+            return currency_pair_bucket.partial
+        return await self._currency_pair_repo._is_partial_currency_pair_bucket(timestamp)  # noqa: SLF001
+
+    async def _retrieve_currency_pair(self, timestamp: datetime.datetime, symbol: str) -> model.CurrencyPair | None:
+        if currency_pair_bucket := self._get_cached_currency_pair_bucket(timestamp):
+            AppMetrics.increment("currency_pair_cache_hits")
+            return currency_pair_bucket.get_currency_pair(symbol)
+        AppMetrics.increment("currency_pair_cache_misses")
+        return await self._currency_pair_repo._retrieve_currency_pair(timestamp, symbol)  # noqa: SLF001
+
+    async def _retrieve_currency_pairs(
+        self,
+        timestamp: datetime.datetime,
+        symbols: list[str],
+    ) -> list[model.CurrencyPair]:
+        if not (currency_pair_bucket := self._get_cached_currency_pair_bucket(timestamp)):
+            AppMetrics.increment("currency_pair_cache_misses")
+            return await self._currency_pair_repo._retrieve_currency_pairs(timestamp, symbols)  # noqa: SLF001
+        AppMetrics.increment("currency_pair_cache_hits")
+        return [
+            currency_pair
+            for symbol in symbols
+            if (currency_pair := currency_pair_bucket.get_currency_pair(symbol))
+        ]
+
+    async def _retrieve_currency_pair_groups(
+        self,
+        groups: list[tuple[datetime.datetime, list[str]]],
+    ) -> list[list[model.CurrencyPair]]:
+        currency_pair_buckets = [self._get_cached_currency_pair_bucket(timestamp) for timestamp, _ in groups]
+        AppMetrics.increment("currency_pair_cache_hits", sum(map(bool, currency_pair_buckets)))
+        AppMetrics.increment("currency_pair_cache_misses", currency_pair_buckets.count(None))
+        # Groups missing in the cache are read from the repository all at once.
+        missed_groups = [
+            group for group, currency_pair_bucket in zip(groups, currency_pair_buckets, strict=True)
+            if not currency_pair_bucket
+        ]
+        missed_currency_pair_groups = iter(
+            await self._currency_pair_repo._retrieve_currency_pair_groups(missed_groups) if missed_groups else [],  # noqa: SLF001
+        )
+        return [
+            [currency_pair for symbol in symbols if (currency_pair := currency_pair_bucket.get_currency_pair(symbol))]
+            if currency_pair_bucket
+            else next(missed_currency_pair_groups)
+            for (_, symbols), currency_pair_bucket in zip(groups, currency_pair_buckets, strict=True)
+        ]
+
+    async def _retrieve_latest_timestamp(self) -> datetime.datetime | None:
+        await self._reconcile_timestamps()
+        if not self._epochs:
+            return None
+        return datetime.datetime.fromtimestamp(self._epochs[-1], datetime.timezone.utc)
+
+    async def _retrieve_previous_timestamp(self, timestamp: datetime.datetime) -> datetime.datetime | None:
+        await self._reconcile_timestamps()
+        if not (index := bisect.bisect_left(self._epochs, timestamp.timestamp())):
+            return None
+        return datetime.datetime.fromtimestamp(self._epochs[index - 1], datetime.timezone.utc)
+
+    async def _retrieve_neighbouring_timestamps(
+        self,
+        desired_timestamp: datetime.datetime,
+    ) -> list[datetime.datetime]:
+        await self._reconcile_timestamps()
+        desired_epoch = desired_timestamp.timestamp()
+        index = bisect.bisect_right(self._epochs, desired_epoch)
+        return [
+            datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc)
+            for epoch in (*self._epochs[max(index - 1, 0):index], *self._epochs[index:index + 1])
+            if abs(epoch - desired_epoch) < AppSettings.currency_pair_lookup_window
+        ]
+
+    async def _retrieve_timestamps(self) -> list[datetime.datetime]:
+        await self._reconcile_timestamps()
+        return [datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc) for epoch in self._epochs]
+
+    def _forget_rebased_currency_pair_bucket(self, timestamp: datetime.datetime) -> None:
+        """Forget the bucket following the timestamp, which is rewritten in full once buckets of tier 0 up to it go."""
+        stale_epoch = int(timestamp.timestamp())
+        if (index := bisect.bisect_right(self._epochs, stale_epoch)) < len(self._epochs):
+            stale_epoch = self._epochs[index]
+            self._forget_currency_pair_bucket(stale_epoch)
+        if self._latest_currency_pair_bucket and self._latest_currency_pair_bucket.timestamp.timestamp() <= stale_epoch:
+            self._latest_currency_pair_bucket = None
+
+    def _forget_currency_pair_bucket(self, epoch: int) -> None:
+        self._currency_pair_buckets.pop(epoch, None)
+        self._universes.pop(epoch, None)
+
+    def _forget_epoch(self, epoch: int) -> None:
+        index = bisect.bisect_left(self._epochs, epoch)
+        if index < len(self._epochs) and self._epochs[index] == epoch:
+            del self._epochs[index]
+        if self._pending_epochs:
+            self._pending_epochs[0].discard(epoch)
+            self._pending_epochs[1].add(epoch)
+
+    def _cache_currency_pair_bucket(self, epoch: int, currency_pair_bucket: model.CurrencyPairBucket) -> None:
+        self._currency_pair_buckets[epoch] = currency_pair_bucket
+        self._currency_pair_buckets.move_to_end(epoch)
+        while len(self._currency_pair_buckets) > self._size:
+            self._currency_pair_buckets.popitem(last=False)
+
+
+@functools.lru_cache
+def get_cached_currency_pair_repository() -> CachedCurrencyPairRepository:
+    return CachedCurrencyPairRepository(get_redis_currency_pair_repository())
+
+
+async def reconcile_timestamps_on_schedule(currency_pair_repo: CachedCurrencyPairRepository) -> None:
+    """Reload the mirror of the index of timestamps every reconcile interval, off the path of requests."""
+    while True:
+        await asyncio.sleep(AppSettings.currency_pair_cache_reconcile_interval)
+        try:
+            await currency_pair_repo.load_timestamps()
+        except exceptions.DBConnectionError as ex:
+            logging.exception(f"Failed to reconcile the cache with the repository. {ex.args[0]}")
@@ -0,0 +1,113 @@
+"""Binary encoding of currency pair buckets.
+
+A packed bucket is a header followed by the prices of all symbols as little-endian float64 values, optionally
+compressed with zlib. The header references a symbol dictionary by its version, so the symbols are stored once per
+universe instead of once per bucket. An alias is a header followed by the key of the bucket it repeats.
+
+An update of the replicas of the latest currency pairs is an update header followed by the prices of the bucket,
+preceded by its length-prefixed symbols if flagged so.
+"""
+
+import array
+import functools
+import hashlib
+import struct
+import sys
+import zlib
+
+from ..domain import model
+
+
+# Format version, flags and dictionary version.
+HEADER = struct.Struct("<BBQ")
+PRICE = struct.Struct("<d")
+FORMAT_VERSION = 1
+COMPRESSED = 0x01
+ALIAS = 0x02
+SYMBOLS = 0x04
+# Format version, flags, publisher, sequence number, epoch of the bucket and dictionary version.
+UPDATE_HEADER = struct.Struct("<BBQQdQ")
+SYMBOLS_LENGTH = struct.Struct("<I")
+
+
+@functools.lru_cache(maxsize=8)
+def get_dictionary_version(symbols: tuple[str, ...]) -> int:
+    return int.from_bytes(hashlib.blake2b(pack_symbols(symbols), digest_size=8).digest(), "little")
+
+
+def pack_symbols(symbols: tuple[str, ...]) -> bytes:
+    return "\n".join(symbols).encode()
+
+
+def unpack_symbols(payload: bytes) -> tuple[str, ...]:
+    return tuple(payload.decode().split("\n")) if payload else ()
+
+
+def get_price_bytes(prices: model.PriceArray) -> bytes:
+    if sys.byteorder == "big":
+        prices = array.array("d", prices)
+        prices.byteswap()
+    return prices.tobytes()
+
+
+def pack_prices(prices: model.PriceArray, dictionary_version: int, compress: bool) -> bytes:
+    body = get_price_bytes(prices)
+    if compress:
+        body = zlib.compress(body)
+    return HEADER.pack(FORMAT_VERSION, COMPRESSED if compress else 0, dictionary_version) + body
+
+
+def pack_alias(target_key: str) -> bytes:
+    return HEADER.pack(FORMAT_VERSION, ALIAS, 0) + target_key.encode()
+
+
+def pack_update(  # noqa: PLR0913
+    publisher: int,
+    sequence: int,
+    epoch: float,
+    symbols: tuple[str, ...],
+    prices: model.PriceArray,
+    with_symbols: bool,
+) -> bytes:
+    header = UPDATE_HEADER.pack(
+        FORMAT_VERSION,
+        SYMBOLS if with_symbols else 0,
+        publisher,
+        sequence,
+        epoch,
+        get_dictionary_version(symbols),
+    )
+    if not with_symbols:
+        return header + get_price_bytes(prices)
+    packed_symbols = pack_symbols(symbols)
+    return header + SYMBOLS_LENGTH.pack(len(packed_symbols)) + packed_symbols + get_price_bytes(prices)
+
+
+def unpack_header(payload: bytes) -> tuple[int, int]:
+    format_version, flags, dictionary_version = HEADER.unpack_from(payload)
+    if format_version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported currency pair bucket format version: {format_version}.")
+    return dictionary_version, flags
+
+
+def unpack_alias(payload: bytes) -> str | None:
+    _, flags = unpack_header(payload)
+    return payload[HEADER.size:].decode() if flags & ALIAS else None
+
+
+def unpack_prices(payload: bytes) -> tuple[int, model.PriceArray]:
+    """Decode a packed bucket into its dictionary version and prices, without copying uncompressed prices."""
+    dictionary_version, flags = unpack_header(payload)
+    body = memoryview(payload)[HEADER.size:]
+    if flags & COMPRESSED:
+        body = memoryview(zlib.decompress(body))
+    if sys.byteorder == "big":
+        prices = array.array("d")
+        prices.frombytes(body)
+        prices.byteswap()
+        return dictionary_version, prices
+    return dictionary_version, body.cast("d")
+
+
+def get_price_offset(index: int) -> int:
+    return HEADER.size + index * PRICE.size
@@ -0,0 +1,60 @@
+"""Publisher of the latest currency pairs to their replicas."""
+
+import functools
+import secrets
+import typing
+
+import redis.asyncio
+import redis.exceptions
+
+from ..domain import exceptions, model
+from ..services import dependencies
+from . import currency_pair_codec
+
+
+# Channel updates are published on, and key of the latest update along with its symbols, which replicas resync from.
+CURRENCY_PAIR_UPDATES_CHANNEL = "currency_pair_updates"
+CURRENCY_PAIR_SNAPSHOT_KEY = "currency_pair_snapshot"
+
+
+class AbstractCurrencyPairPublisher(typing.Protocol):
+    async def publish_currency_pair_bucket(self, currency_pair_bucket: model.CurrencyPairBucket) -> None:
+        pass
+
+
+class RedisCurrencyPairPublisher(AbstractCurrencyPairPublisher):
+    """Publishes every bucket over Redis pub/sub with a sequence number, so replicas notice missed ones.
+
+    Updates carry no symbols, only the version of their dictionary. The latest update is stored along with its symbols
+    in the same transaction, so a replica missing an update or a dictionary can always resync from it.
+    """
+
+    def __init__(self, client: redis.asyncio.Redis) -> None:
+        self._client = client
+        # Sequence numbers of another process start over, so replicas tell them apart by the publisher.
+        self._publisher = secrets.randbits(64)
+        self._sequence = 0
+
+    async def publish_currency_pair_bucket(self, currency_pair_bucket: model.CurrencyPairBucket) -> None:
+        # A failed update still takes its sequence number, so replicas resync instead of waiting for it.
+        self._sequence += 1
+        update = functools.partial(
+            currency_pair_codec.pack_update,
+            self._publisher,
+            self._sequence,
+            currency_pair_bucket.timestamp.timestamp(),
+            currency_pair_bucket.symbols,
+            currency_pair_bucket.prices,
+        )
+        try:
+            async with self._client.pipeline(transaction=True) as pipeline:
+                pipeline.set(CURRENCY_PAIR_SNAPSHOT_KEY, update(with_symbols=True))
+                pipeline.publish(CURRENCY_PAIR_UPDATES_CHANNEL, update(with_symbols=False))
+                await pipeline.execute()
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError("Error. Failed to publish currency pairs to Redis.") from ex
+
+
+@functools.lru_cache
+def get_redis_currency_pair_publisher() -> RedisCurrencyPairPublisher:
+    return RedisCurrencyPairPublisher(dependencies.get_binary_db_client())
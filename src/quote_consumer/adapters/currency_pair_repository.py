@@ -1,35 +1,150 @@
 """Installation repository."""
 
+import array
+import asyncio
 import datetime
+import itertools
+import json
+import math
 import typing
 
 import fastapi
+import numpy as np
 import redis.asyncio
 import redis.exceptions
 
 from ..domain import exceptions, model
 from ..services import dependencies
 from ..settings import AppSettings
+from . import currency_pair_codec
 # mypy: disable-error-code="misc"
 
 
-class AbstractCurrencyPairRepository(typing.Protocol):
-    async def create_currency_pair_bucket(self, currency_pair_bucket: model.CurrencyPairBucket) -> None:
-        await self._create_currency_pairs(currency_pair_bucket.currency_pairs, currency_pair_bucket.timestamp)
-        await self._set_ttl(currency_pair_bucket.timestamp)
-        await self._update_ordered_set_of_timestamps(currency_pair_bucket.timestamp)
+# Field marking a bucket holding only the currency pairs changed since the previous bucket.
+DELTA_FIELD = "__delta__"
+# Field of a bucket registered for a snapshot identical to the previous one, holding the key of the bucket it repeats.
+ALIAS_FIELD = "__alias__"
+# Field marking a bucket holding only the hot tier, fetched in between fetches of all symbols.
+PARTIAL_FIELD = "__partial__"
+# Widths in seconds of the OHLC buckets of the tiers old buckets are compacted into, from the finest to the coarsest.
+# Tier 0 is the one of buckets as they are stored.
+CURRENCY_PAIR_TIERS = (300, 3600)
+# Number of buckets of every tier the footprint is estimated from.
+FOOTPRINT_SAMPLE_SIZE = 16
+# Approximate bytes Redis spends on every key and on every member of an index, besides their content.
+KEY_OVERHEAD = 64
+
+
+def get_index_key(tier: int) -> str:
+    """Return the key of the ordered set of timestamps of buckets of the tier."""
+    return f"available_currency_pair_timestamps:{tier}" if tier else "available_currency_pair_timestamps"
+
+
+def get_ohlc_key(key: str) -> str:
+    """Return the key of the OHLC bucket whose close prices are stored as the bucket of the key."""
+    return f"currency_pair_ohlc:{key}"
+
+
+def get_partial_bucket_limit() -> int:
+    """Return how many partial buckets may be stored in a row, i.e. how many hot ticks fit between full fetches."""
+    if not AppSettings.exchange_hot_symbols.strip() or AppSettings.exchange_hot_fetch_interval <= 0:
+        return 0
+    return max(math.ceil(AppSettings.exchange_fetch_interval / AppSettings.exchange_hot_fetch_interval) - 1, 0)
+
+
+def get_walk_back_limit() -> int:
+    """Return how many preceding buckets a read may walk back through, up to the previous keyframe.
+
+    Every full bucket of a chain of deltas may be followed by partial buckets, which are not keyframes.
+    """
+    return AppSettings.currency_pair_keyframe_interval * (get_partial_bucket_limit() + 1) - 1
+
 
-    async def _create_currency_pairs(
+def get_closest_timestamp(
+    neighbours: list[datetime.datetime],
+    desired_timestamp: datetime.datetime,
+) -> datetime.datetime | None:
+    # Neighbours are looked up in every tier. Tiers cover consecutive spans of time, the coarser the older, so the
+    # closest neighbour falls in the tier covering the desired time.
+    return min(neighbours, key=lambda ts: abs(ts.timestamp() - desired_timestamp.timestamp()), default=None)
+
+
+def is_wrong_type(ex: redis.exceptions.ResponseError) -> bool:
+    # Raised for a bucket stored in the other storage format, e.g. while migrating to the packed one.
+    return "WRONGTYPE" in str(ex)
+
+
+def get_format_error(ex: redis.exceptions.ResponseError, timestamp: datetime.datetime | None) -> Exception:
+    if not is_wrong_type(ex):
+        return ex
+    return exceptions.CurrencyPairFormatError(
+        f"Error. The bucket for the {timestamp=} is not stored in the "
+        f"{AppSettings.currency_pair_storage_format} format, run the migrate-storage command.",
+    )
+
+
+def decode_fields(fields: dict) -> dict[str, str]:
+    # Hash buckets are also read by the packed repository, the client of which does not decode responses.
+    return {
+        (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+        for key, value in fields.items()
+    }
+
+
+class AbstractCurrencyPairRepository(typing.Protocol):
+    async def create_currency_pair_bucket(
         self,
-        currency_pairs: list[model.CurrencyPair],
-        timestamp: datetime.datetime,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        changed_currency_pair_bucket: model.CurrencyPairBucket | None = None,
     ) -> None:
+        """Store the bucket, only its changed currency pairs if given and no keyframe is due."""
         raise NotImplementedError
 
-    async def _set_ttl(self, timestamp: datetime.datetime) -> None:
+    async def create_currency_pair_alias(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        target_timestamp: datetime.datetime,  # noqa: ARG002
+    ) -> None:
+        """Register the timestamp of a snapshot identical to the bucket stored for the target timestamp."""
+        await self.create_currency_pair_bucket(currency_pair_bucket)
+
+    async def create_currency_pair_partial_bucket(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        partial_currency_pair_bucket: model.CurrencyPairBucket,  # noqa: ARG002
+    ) -> None:
+        """Store the hot tier of a snapshot, the rest of which is as of the buckets stored before it."""
+        await self.create_currency_pair_bucket(currency_pair_bucket)
+
+    async def create_currency_pair_buckets(self, currency_pair_buckets: list[model.CurrencyPairBucket]) -> None:
+        """Store buckets in full, e.g. ones of the history before the stored buckets."""
+        for currency_pair_bucket in currency_pair_buckets:
+            await self.create_currency_pair_bucket(currency_pair_bucket)
+
+    async def create_currency_pair_ohlc_bucket(
+        self,
+        ohlc_bucket: model.OhlcBucket,
+        tier: int,
+        compacted_timestamps: list[datetime.datetime],
+        source_tier: int = 0,
+    ) -> None:
+        """Store the OHLC bucket of a tier in place of the buckets of the source tier it is compacted from.
+
+        Its close prices are stored as a full bucket for its timestamp, so reads find them like any other bucket.
+        """
         raise NotImplementedError
 
-    async def _update_ordered_set_of_timestamps(self, timestamp: datetime.datetime) -> None:
+    async def delete_oldest_currency_pair_buckets(
+        self,
+        tier: int,
+        count: int,
+        before: datetime.datetime | None = None,
+    ) -> list[datetime.datetime]:
+        """Delete up to the count of the oldest buckets of the tier along with their timestamps, and return these.
+
+        Only buckets older than the given timestamp are deleted, if any. Buckets following the deleted ones remain
+        readable.
+        """
         raise NotImplementedError
 
     async def retrieve_latest_currency_pair(
@@ -39,20 +154,121 @@ class AbstractCurrencyPairRepository(typing.Protocol):
     ) -> model.CurrencyPairBucket | None:
         if not (retrieved_timestamp := await self._retrieve_relevant_timestamp(desired_timestamp)):
             return None
-        currency_pair_bucket = await self._retrieve_currency_pair_bucket(retrieved_timestamp)
+        walked = 0
+        while not (currency_pair := await self._retrieve_currency_pair(retrieved_timestamp, symbol)):
+            # A symbol missing in a partial bucket is as of the closest preceding bucket holding it.
+            if (
+                walked == get_partial_bucket_limit()
+                or not await self._is_partial_currency_pair_bucket(retrieved_timestamp)
+                or not (previous_timestamp := await self._retrieve_previous_timestamp(retrieved_timestamp))
+            ):
+                return None
+            retrieved_timestamp = previous_timestamp
+            walked += 1
 
-        if not (
-            currency_pairs := [
-                currency_pair for currency_pair in currency_pair_bucket.currency_pairs if currency_pair.symbol == symbol
-            ]
-        ):
+        return model.CurrencyPairBucket(
+            currency_pairs=[currency_pair],
+            timestamp=retrieved_timestamp,
+        )
+
+    async def retrieve_currency_pairs(
+        self,
+        symbols: list[str],
+        desired_timestamp: datetime.datetime | None,
+    ) -> model.CurrencyPairBucket | None:
+        if not (retrieved_timestamp := await self._retrieve_relevant_timestamp(desired_timestamp)):
             return None
+        return await self._retrieve_missing_currency_pairs(
+            symbols,
+            retrieved_timestamp,
+            await self._retrieve_currency_pairs(retrieved_timestamp, symbols),
+        )
+
+    async def retrieve_currency_pair_groups(
+        self,
+        groups: list[tuple[list[str], datetime.datetime | None]],
+    ) -> list[model.CurrencyPairBucket | None]:
+        """Return the currency pairs of the symbols of every group as of its desired timestamp, in order.
+
+        Every group is read like by retrieve_currency_pairs, but the timestamps of all of them are looked up at once,
+        and then all their symbols.
+        """
+        retrieved_timestamps = await self._retrieve_relevant_timestamps(
+            [desired_timestamp for _, desired_timestamp in groups],
+        )
+        retrieved_groups = [
+            (retrieved_timestamp, symbols)
+            for (symbols, _), retrieved_timestamp in zip(groups, retrieved_timestamps, strict=True)
+            if retrieved_timestamp
+        ]
+        currency_pair_groups = await self._retrieve_currency_pair_groups(retrieved_groups)
+        currency_pair_buckets = iter(
+            await asyncio.gather(
+                *(
+                    self._retrieve_missing_currency_pairs(symbols, retrieved_timestamp, currency_pairs)
+                    for (retrieved_timestamp, symbols), currency_pairs in zip(
+                        retrieved_groups,
+                        currency_pair_groups,
+                        strict=True,
+                    )
+                ),
+            ),
+        )
+        return [
+            next(currency_pair_buckets) if retrieved_timestamp else None for retrieved_timestamp in retrieved_timestamps
+        ]
+
+    async def _retrieve_missing_currency_pairs(
+        self,
+        symbols: list[str],
+        retrieved_timestamp: datetime.datetime,
+        currency_pairs: list[model.CurrencyPair],
+    ) -> model.CurrencyPairBucket:
+        """Return the bucket of the currency pairs found for the timestamp, with the ones missing in it looked up."""
+        found = {currency_pair.symbol: currency_pair for currency_pair in currency_pairs}
+        timestamp = retrieved_timestamp
+        timestamps: dict[str, datetime.datetime] = {}
+        for _ in range(get_partial_bucket_limit()):
+            # Symbols missing in a partial bucket are as of the closest preceding buckets holding them.
+            if (
+                not (missing_symbols := [symbol for symbol in symbols if symbol not in found])
+                or not await self._is_partial_currency_pair_bucket(timestamp)
+                or not (previous_timestamp := await self._retrieve_previous_timestamp(timestamp))
+            ):
+                break
+            timestamp = previous_timestamp
+            for currency_pair in await self._retrieve_currency_pairs(timestamp, missing_symbols):
+                found[currency_pair.symbol] = currency_pair
+                timestamps[typing.cast(str, currency_pair.symbol)] = timestamp
 
         return model.CurrencyPairBucket(
-            currency_pairs=[currency_pairs[0]],
+            currency_pairs=[found[symbol] for symbol in symbols if symbol in found],
             timestamp=retrieved_timestamp,
+            timestamps=timestamps,
         )
 
+    async def retrieve_currency_pair_symbols(
+        self,
+        desired_timestamp: datetime.datetime | None,
+    ) -> tuple[str, ...] | None:
+        """Return the universe of symbols of the bucket closest to the desired timestamp.
+
+        A partial bucket holds the hot tier only, so the symbols of the buckets before it are part of its universe too.
+        """
+        if not (timestamp := await self._retrieve_relevant_timestamp(desired_timestamp)):
+            return None
+        currency_pair_bucket = await self._retrieve_currency_pair_bucket(timestamp)
+        symbols = dict.fromkeys(currency_pair_bucket.symbols)
+        for _ in range(get_partial_bucket_limit()):
+            if not currency_pair_bucket.partial or not (
+                previous_timestamp := await self._retrieve_previous_timestamp(timestamp)
+            ):
+                break
+            timestamp = previous_timestamp
+            currency_pair_bucket = await self._retrieve_currency_pair_bucket(timestamp)
+            symbols.update(dict.fromkeys(currency_pair_bucket.symbols))
+        return tuple(symbols)
+
     async def _retrieve_relevant_timestamp(
         self,
         desired_timestamp: datetime.datetime | None,
@@ -70,103 +286,1145 @@ class AbstractCurrencyPairRepository(typing.Protocol):
             return None
         return latest_timestamp
 
+    async def _retrieve_relevant_timestamps(
+        self,
+        desired_timestamps: list[datetime.datetime | None],
+    ) -> list[datetime.datetime | None]:
+        return list(await asyncio.gather(*map(self._retrieve_relevant_timestamp, desired_timestamps)))
+
     async def _retrieve_timestamp_closest_to_desired(
         self,
         desired_timestamp: datetime.datetime,
     ) -> datetime.datetime | None:
-        start_of_day = datetime.datetime.combine(desired_timestamp.date(), datetime.datetime.min.time()).timestamp()
-        end_of_day = datetime.datetime.combine(desired_timestamp.date(), datetime.datetime.max.time()).timestamp()
+        return get_closest_timestamp(await self._retrieve_neighbouring_timestamps(desired_timestamp), desired_timestamp)
 
-        if not (timestamps := await self._retrieve_timestamp_range(start_of_day, end_of_day)):
-            return None
+    async def _retrieve_currency_pair_bucket(self, timestamp: datetime.datetime) -> model.CurrencyPairBucket:
+        raise NotImplementedError
 
-        return min(timestamps, key=lambda ts: abs(ts.timestamp() - desired_timestamp.timestamp()))
+    async def _retrieve_currency_pair(self, timestamp: datetime.datetime, symbol: str) -> model.CurrencyPair | None:
+        raise NotImplementedError
 
-    async def _retrieve_currency_pair_bucket(self, timestamp: datetime.datetime) -> model.CurrencyPairBucket:
+    async def _is_partial_currency_pair_bucket(self, timestamp: datetime.datetime) -> bool:  # noqa: ARG002
+        """Tell whether the bucket holds the hot tier only and symbols missing in it are to be looked up before it.
+
+        Repositories storing partial buckets in full never report one.
+        """
+        return False
+
+    async def _retrieve_currency_pairs(
+        self,
+        timestamp: datetime.datetime,
+        symbols: list[str],
+    ) -> list[model.CurrencyPair]:
         raise NotImplementedError
 
+    async def _retrieve_currency_pair_groups(
+        self,
+        groups: list[tuple[datetime.datetime, list[str]]],
+    ) -> list[list[model.CurrencyPair]]:
+        return list(
+            await asyncio.gather(*(self._retrieve_currency_pairs(timestamp, symbols) for timestamp, symbols in groups)),
+        )
+
     async def _retrieve_latest_timestamp(self) -> datetime.datetime | None:
         raise NotImplementedError
 
-    async def _retrieve_timestamp_range(self, start: float, end: float) -> list[datetime.datetime]:
+    async def _retrieve_previous_timestamp(self, timestamp: datetime.datetime) -> datetime.datetime | None:
+        raise NotImplementedError
+
+    async def _retrieve_neighbouring_timestamps(
+        self,
+        desired_timestamp: datetime.datetime,
+    ) -> list[datetime.datetime]:
+        raise NotImplementedError
+
+    async def _retrieve_timestamps(self) -> list[datetime.datetime]:
+        raise NotImplementedError
+
+    async def retrieve_oldest_currency_pair_timestamp(self, tier: int) -> datetime.datetime | None:
         raise NotImplementedError
 
+    async def retrieve_currency_pair_ohlc_buckets(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        tier: int,
+    ) -> list[model.OhlcBucket]:
+        """Return OHLC buckets of the tier from the start up to the end, in chronological order.
+
+        Buckets of tier 0 are returned as OHLC buckets of a single price.
+        """
+        raise NotImplementedError
+
+    async def retrieve_currency_pair_footprint(self) -> dict[int, tuple[int, int]]:
+        """Return the number of buckets of every tier and an estimate of how many bytes of memory they take."""
+        raise NotImplementedError
+
+
+# Resolves the bucket closest to the desired timestamp (or the latest one) and reads the symbol from it in one call.
+# KEYS are the indexes of timestamps of every tier, from tier 0 on; ARGV holds the symbol, the desired epoch (empty for
+# the latest bucket), the lookup window and the number of preceding buckets the walk back through delta and partial
+# buckets of tier 0 is bounded by.
+# A symbol missing in a partial bucket is returned with the timestamp of the bucket it is found in, as partial buckets
+# are newer for the hot tier only. Bucket keys are derived from the resolved epoch, so the script runs on a single
+# Redis instance only.
+RETRIEVE_CURRENCY_PAIR_SCRIPT = """
+local function bucket_key(epoch)
+    local days = math.floor(epoch / 86400)
+    local seconds = epoch - days * 86400
+    local z = days + 719468
+    local era = math.floor(z / 146097)
+    local doe = z - era * 146097
+    local yoe = math.floor((doe - math.floor(doe / 1460) + math.floor(doe / 36524) - math.floor(doe / 146096)) / 365)
+    local doy = doe - (365 * yoe + math.floor(yoe / 4) - math.floor(yoe / 100))
+    local mp = math.floor((5 * doy + 2) / 153)
+    local day = doy - math.floor((153 * mp + 2) / 5) + 1
+    local month = mp < 10 and mp + 3 or mp - 9
+    local year = yoe + era * 400 + (month <= 2 and 1 or 0)
+    return string.format(
+        "%04d-%02d-%02dT%02d:%02d:%02dZ",
+        year, month, day, math.floor(seconds / 3600), math.floor(seconds % 3600 / 60), seconds % 60
+    )
+end
+
+local symbol, desired, window, walk_back_limit = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local timestamp
+
+for _, index in ipairs(KEYS) do
+    if desired == nil then
+        local latest = redis.call("ZRANGE", index, -1, -1, "WITHSCORES")
+        if #latest > 0 and (timestamp == nil or tonumber(latest[2]) > timestamp) then
+            timestamp = tonumber(latest[2])
+        end
+    else
+        -- Tiers cover consecutive spans of time, so the closest neighbour is in the one covering the desired time.
+        local before = redis.call(
+            "ZREVRANGEBYSCORE", index, desired, "(" .. (desired - window), "WITHSCORES", "LIMIT", 0, 1
+        )
+        local after = redis.call(
+            "ZRANGEBYSCORE", index, desired, "(" .. (desired + window), "WITHSCORES", "LIMIT", 0, 1
+        )
+        if #before > 0 and (timestamp == nil or desired - tonumber(before[2]) < math.abs(timestamp - desired)) then
+            timestamp = tonumber(before[2])
+        end
+        if #after > 0 and (timestamp == nil or tonumber(after[2]) - desired < math.abs(timestamp - desired)) then
+            timestamp = tonumber(after[2])
+        end
+    end
+end
+if timestamp == nil then
+    return nil
+end
+
+local values = redis.call("HMGET", bucket_key(timestamp), symbol, "__delta__", "__alias__", "__partial__")
+if values[3] then
+    values = redis.call("HMGET", values[3], symbol, "__delta__", "__alias__", "__partial__")
+end
+local conversion_rate = values[1]
+if not conversion_rate and (values[2] or values[4]) and walk_back_limit > 0 then
+    -- The timestamp follows the walk back until it passes a full bucket, which holds every symbol as of its own.
+    local passed_full = not values[4]
+    local preceding = redis.call(
+        "ZREVRANGEBYSCORE", KEYS[1], "(" .. timestamp, "-inf", "WITHSCORES", "LIMIT", 0, walk_back_limit
+    )
+    for i = 2, #preceding, 2 do
+        local epoch = tonumber(preceding[i])
+        values = redis.call("HMGET", bucket_key(epoch), symbol, "__delta__", "__alias__", "__partial__")
+        if not passed_full then
+            timestamp = epoch
+            passed_full = not values[4]
+        end
+        if not values[3] and (values[1] or not (values[2] or values[4])) then
+            conversion_rate = values[1]
+            break
+        end
+    end
+end
+if not conversion_rate then
+    return nil
+end
+return {string.format("%d", timestamp), conversion_rate}
+"""
+
+
+# Returns how many bytes the names and the content of the KEYS take, counting every field and value of hashes.
+MEASURE_KEYS_SCRIPT = """
+local size = 0
+for _, key in ipairs(KEYS) do
+    local key_type = redis.call("TYPE", key)["ok"]
+    if key_type == "hash" then
+        for _, item in ipairs(redis.call("HGETALL", key)) do
+            size = size + #item
+        end
+    elseif key_type == "string" then
+        size = size + redis.call("STRLEN", key)
+    end
+    if key_type ~= "none" then
+        size = size + #key
+    end
+end
+return size
+"""
+
 
 class RedisCurrencyPairRepository(AbstractCurrencyPairRepository):
     def __init__(self, client: redis.asyncio.Redis = fastapi.Depends(dependencies.get_db_client)) -> None:
         self._client = client
+        self._retrieve_currency_pair_script = client.register_script(RETRIEVE_CURRENCY_PAIR_SCRIPT)
+        self._measure_keys_script = client.register_script(MEASURE_KEYS_SCRIPT)
+        # Keys the latest written bucket depends on, ending with the key of the bucket itself.
+        self._delta_chain: list[str] = []
 
-    async def _create_currency_pairs(
+    async def load_scripts(self) -> None:
+        try:
+            await self._client.script_load(RETRIEVE_CURRENCY_PAIR_SCRIPT)
+            await self._client.script_load(MEASURE_KEYS_SCRIPT)
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError("Error. Failed to load Lua scripts into Redis.") from ex
+
+    async def retrieve_latest_currency_pair(
         self,
-        currency_pairs: list[model.CurrencyPair],
-        timestamp: datetime.datetime,
+        symbol: str,
+        desired_timestamp: datetime.datetime | None,
+    ) -> model.CurrencyPairBucket | None:
+        try:
+            result = await self._retrieve_currency_pair_script(
+                keys=[get_index_key(tier) for tier in (0, *CURRENCY_PAIR_TIERS)],
+                args=[
+                    symbol,
+                    desired_timestamp.timestamp() if desired_timestamp else "",
+                    AppSettings.currency_pair_lookup_window,
+                    get_walk_back_limit(),
+                ],
+            )
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve the {symbol=} from Redis for the {desired_timestamp=}.",
+            ) from ex
+        except redis.exceptions.ResponseError as ex:
+            raise get_format_error(ex, desired_timestamp) from ex
+        if not result:
+            return None
+
+        timestamp, conversion_rate = result
+        return model.CurrencyPairBucket(
+            currency_pairs=[model.CurrencyPair(symbol=symbol, conversion_rate=float(conversion_rate))],
+            timestamp=datetime.datetime.fromtimestamp(int(timestamp), datetime.timezone.utc),
+        )
+
+    async def create_currency_pair_bucket(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        changed_currency_pair_bucket: model.CurrencyPairBucket | None = None,
     ) -> None:
+        if not currency_pair_bucket.symbols:
+            return
+
+        timestamp = currency_pair_bucket.timestamp
+        timestamp_str = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        epoch = int(timestamp.timestamp())
+        # A delta can only be written on top of a keyframe written by this repository.
+        written_currency_pair_bucket = currency_pair_bucket
+        if is_delta := changed_currency_pair_bucket is not None and bool(self._delta_chain):
+            written_currency_pair_bucket = changed_currency_pair_bucket
+        mapping = dict(
+            zip(written_currency_pair_bucket.symbols, map(str, written_currency_pair_bucket.prices), strict=True),
+        )
+        if is_delta:
+            mapping[DELTA_FIELD] = "1"
         try:
-            for currency_pair in currency_pairs:
-                await self._client.hset(
-                    timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    currency_pair.symbol,
-                    str(currency_pair.conversion_rate),
-                )
+            # MULTI/EXEC: one round trip, and readers never observe a partially written bucket.
+            async with self._client.pipeline(transaction=True) as pipeline:
+                pipeline.hset(timestamp_str, mapping=mapping)
+                pipeline.zadd("available_currency_pair_timestamps", {str(epoch): epoch})
+                await pipeline.execute()
         except redis.exceptions.ConnectionError as ex:
             raise exceptions.DBConnectionError(
                 f"Error. Failed to save all currency pairs in Redis for the {timestamp=}.",
             ) from ex
+        if is_delta:
+            self._delta_chain.append(timestamp_str)
+        else:
+            self._delta_chain = [timestamp_str]
+
+    async def create_currency_pair_alias(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        target_timestamp: datetime.datetime,
+    ) -> None:
+        timestamp = currency_pair_bucket.timestamp
+        timestamp_str = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        target_timestamp_str = target_timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        if timestamp_str == target_timestamp_str:
+            return
+        # Only the latest bucket written by this repository is known to exist, anything else is written in full.
+        if not self._delta_chain or self._delta_chain[-1] != target_timestamp_str:
+            await self.create_currency_pair_bucket(currency_pair_bucket)
+            return
 
-    async def _set_ttl(self, timestamp: datetime.datetime) -> None:
+        epoch = int(timestamp.timestamp())
         try:
-            await self._client.expire(timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"), AppSettings.currency_pair_ttl)
+            async with self._client.pipeline(transaction=True) as pipeline:
+                self._queue_alias(pipeline, timestamp_str, target_timestamp_str)
+                pipeline.zadd("available_currency_pair_timestamps", {str(epoch): epoch})
+                await pipeline.execute()
         except redis.exceptions.ConnectionError as ex:
-            raise exceptions.DBConnectionError(f"Error. Failed to set the TTL for the {timestamp=}.") from ex
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to save the alias of the {target_timestamp=} in Redis for the {timestamp=}.",
+            ) from ex
+
+    async def create_currency_pair_partial_bucket(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        partial_currency_pair_bucket: model.CurrencyPairBucket,
+    ) -> None:
+        # Missing symbols are read from the buckets before, so the bucket is written in full if none is known to exist.
+        if not self._delta_chain:
+            await self.create_currency_pair_bucket(currency_pair_bucket)
+            return
 
-    async def _update_ordered_set_of_timestamps(self, timestamp: datetime.datetime) -> None:
+        timestamp = partial_currency_pair_bucket.timestamp
         timestamp_str = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        epoch = int(timestamp.timestamp())
+        mapping = dict(
+            zip(partial_currency_pair_bucket.symbols, map(str, partial_currency_pair_bucket.prices), strict=True),
+        )
+        mapping[PARTIAL_FIELD] = "1"
         try:
-            await self._client.zadd(
-                "available_currency_pair_timestamps",
-                {
-                    timestamp_str: datetime.datetime.strptime(timestamp_str, "%Y-%m-%dT%H:%M:%SZ")
-                    .replace(tzinfo=datetime.timezone.utc).timestamp(),
-                },
+            async with self._client.pipeline(transaction=True) as pipeline:
+                pipeline.hset(timestamp_str, mapping=mapping)
+                pipeline.zadd("available_currency_pair_timestamps", {str(epoch): epoch})
+                await pipeline.execute()
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to save hot currency pairs in Redis for the {timestamp=}.",
+            ) from ex
+        self._delta_chain.append(timestamp_str)
+
+    async def create_currency_pair_buckets(self, currency_pair_buckets: list[model.CurrencyPairBucket]) -> None:
+        currency_pair_buckets = [
+            currency_pair_bucket for currency_pair_bucket in currency_pair_buckets if currency_pair_bucket.symbols
+        ]
+        if not currency_pair_buckets:
+            return
+        epochs = [int(currency_pair_bucket.timestamp.timestamp()) for currency_pair_bucket in currency_pair_buckets]
+        try:
+            # Every bucket is a keyframe, so all of them are written in one round trip whatever their order.
+            async with self._client.pipeline(transaction=True) as pipeline:
+                for currency_pair_bucket in currency_pair_buckets:
+                    self._queue_keyframe(
+                        pipeline,
+                        currency_pair_bucket.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        currency_pair_bucket,
+                    )
+                pipeline.zadd("available_currency_pair_timestamps", {str(epoch): epoch for epoch in epochs})
+                await pipeline.execute()
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to save {len(currency_pair_buckets)} buckets of currency pairs in Redis.",
+            ) from ex
+
+    async def create_currency_pair_ohlc_bucket(
+        self,
+        ohlc_bucket: model.OhlcBucket,
+        tier: int,
+        compacted_timestamps: list[datetime.datetime],
+        source_tier: int = 0,
+    ) -> None:
+        timestamp = ohlc_bucket.timestamp
+        timestamp_str = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        compacted_keys = [
+            compacted_timestamp.strftime("%Y-%m-%dT%H:%M:%SZ") for compacted_timestamp in compacted_timestamps
+        ]
+        close_currency_pair_bucket = ohlc_bucket.close_currency_pair_bucket
+        # The bucket of the timestamp is overwritten by the close prices, unless nothing is left of the compacted ones.
+        deleted_keys = [key for key in compacted_keys if key != timestamp_str or not ohlc_bucket.symbols]
+        try:
+            if not source_tier and compacted_timestamps:
+                await self._rebase_currency_pair_buckets(compacted_timestamps[-1])
+            async with self._client.pipeline(transaction=True) as pipeline:
+                if ohlc_bucket.symbols:
+                    self._queue_keyframe(pipeline, timestamp_str, close_currency_pair_bucket)
+                    pipeline.set(get_ohlc_key(timestamp_str), self._pack_ohlc_bucket(ohlc_bucket))
+                    pipeline.zadd(get_index_key(tier), {str(int(timestamp.timestamp())): timestamp.timestamp()})
+                if compacted_timestamps:
+                    pipeline.zrem(
+                        get_index_key(source_tier),
+                        *(str(int(compacted_timestamp.timestamp())) for compacted_timestamp in compacted_timestamps),
+                    )
+                if deleted_keys:
+                    pipeline.delete(*deleted_keys, *(map(get_ohlc_key, deleted_keys) if source_tier else ()))
+                await pipeline.execute()
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to save the OHLC bucket of the {tier=} in Redis for the {timestamp=}.",
+            ) from ex
+        if not set(compacted_keys).isdisjoint(self._delta_chain):
+            # The latest written bucket depends on compacted ones, so the next one is written as a keyframe.
+            self._delta_chain = []
+
+    async def delete_oldest_currency_pair_buckets(
+        self,
+        tier: int,
+        count: int,
+        before: datetime.datetime | None = None,
+    ) -> list[datetime.datetime]:
+        try:
+            oldest = await self._client.zrangebyscore(
+                get_index_key(tier),
+                "-inf",
+                f"({before.timestamp()}" if before else "+inf",
+                start=0,
+                num=count,
+                withscores=True,
             )
+            if not oldest:
+                return []
+            timestamps = [datetime.datetime.fromtimestamp(score, datetime.timezone.utc) for _, score in oldest]
+            deleted_keys = [self._get_bucket_key(score) for _, score in oldest]
+            if not tier:
+                await self._rebase_currency_pair_buckets(timestamps[-1])
+            # The timestamps go along with the buckets, so the index never points at a missing bucket.
+            async with self._client.pipeline(transaction=True) as pipeline:
+                pipeline.zrem(get_index_key(tier), *(member for member, _ in oldest))
+                pipeline.delete(*deleted_keys, *(map(get_ohlc_key, deleted_keys) if tier else ()))
+                await pipeline.execute()
         except redis.exceptions.ConnectionError as ex:
             raise exceptions.DBConnectionError(
-                f"Error. Failed to add the {timestamp=} to the 'available_currency_pair_timestamps' sorted set.",
+                f"Error. Failed to delete the oldest buckets of the {tier=} from Redis.",
             ) from ex
+        if not set(deleted_keys).isdisjoint(self._delta_chain):
+            self._delta_chain = []
+        return timestamps
+
+    async def _rebase_currency_pair_buckets(self, timestamp: datetime.datetime) -> None:
+        """Rewrite the bucket following the timestamp as a keyframe, so it no longer depends on the buckets up to it.
+
+        It is read while the buckets up to the timestamp still exist, a partial one on top of the buckets before it.
+        Aliases following it that repeat a bucket up to the timestamp are retargeted to it.
+        """
+        following = await self._client.zrangebyscore(
+            "available_currency_pair_timestamps",
+            f"({int(timestamp.timestamp())}",
+            "+inf",
+            start=0,
+            num=1,
+            withscores=True,
+        )
+        if not following:
+            return
+        score = typing.cast(float, following[0][1])
+        following_timestamp = datetime.datetime.fromtimestamp(score, datetime.timezone.utc)
+        following_key = self._get_bucket_key(score)
+        following_currency_pair_bucket = await self._retrieve_currency_pair_bucket(following_timestamp)
+        preceding_timestamp = following_timestamp
+        for _ in range(get_partial_bucket_limit()):
+            if not following_currency_pair_bucket.partial or not (
+                previous_timestamp := await self._retrieve_previous_timestamp(preceding_timestamp)
+            ):
+                break
+            preceding_timestamp = previous_timestamp
+            preceding_currency_pair_bucket = await self._retrieve_currency_pair_bucket(preceding_timestamp)
+            following_currency_pair_bucket = preceding_currency_pair_bucket.merge(following_currency_pair_bucket)
+            following_currency_pair_bucket.partial = preceding_currency_pair_bucket.partial
+        if not following_currency_pair_bucket.symbols:
+            return
+        async with self._client.pipeline(transaction=True) as pipeline:
+            self._queue_keyframe(pipeline, following_key, following_currency_pair_bucket)
+            await pipeline.execute()
+
+        while following := await self._client.zrangebyscore(
+            "available_currency_pair_timestamps",
+            f"({int(score)}",
+            "+inf",
+            start=0,
+            num=1,
+            withscores=True,
+        ):
+            score = typing.cast(float, following[0][1])
+            key = self._get_bucket_key(score)
+            # Aliases repeat the latest bucket written before them that is not an alias.
+            if not (target_key := await self._retrieve_alias_target(key)) or target_key >= following_key:
+                break
+            async with self._client.pipeline(transaction=True) as pipeline:
+                self._queue_alias(pipeline, key, following_key)
+                await pipeline.execute()
+
+    def _queue_alias(self, pipeline: redis.asyncio.client.Pipeline, key: str, target_key: str) -> None:
+        pipeline.hset(key, ALIAS_FIELD, target_key)
+
+    def _queue_keyframe(
+        self,
+        pipeline: redis.asyncio.client.Pipeline,
+        key: str,
+        currency_pair_bucket: model.CurrencyPairBucket,
+    ) -> None:
+        """Queue the write of the bucket in full over whatever is stored for the key."""
+        pipeline.delete(key)
+        pipeline.hset(
+            key,
+            mapping=dict(zip(currency_pair_bucket.symbols, map(str, currency_pair_bucket.prices), strict=True)),
+        )
+
+    async def _retrieve_alias_target(self, key: str) -> str | None:
+        return typing.cast(str | None, await self._client.hget(key, ALIAS_FIELD))
+
+    @staticmethod
+    def _pack_ohlc_bucket(ohlc_bucket: model.OhlcBucket) -> str:
+        return json.dumps({"symbols": ohlc_bucket.symbols, "prices": ohlc_bucket.prices.tolist()})
+
+    @staticmethod
+    def _unpack_ohlc_bucket(payload: str | bytes | None, timestamp: datetime.datetime) -> model.OhlcBucket:
+        ohlc_bucket = json.loads(payload) if payload else {"symbols": [], "prices": [[]] * 4}
+        return model.OhlcBucket(
+            symbols=tuple(ohlc_bucket["symbols"]),
+            prices=np.array(ohlc_bucket["prices"], dtype=np.float64).reshape(4, -1),
+            timestamp=timestamp,
+        )
 
     async def _retrieve_currency_pair_bucket(self, timestamp: datetime.datetime) -> model.CurrencyPairBucket:
         try:
-            currency_pairs: dict[str, str] = await self._client.hgetall(timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"))
+            async with self._client.pipeline(transaction=False) as pipeline:
+                pipeline.hgetall(timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"))
+                self._retrieve_preceding_timestamps(pipeline, timestamp)
+                currency_pairs, *preceding_timestamps = await pipeline.execute()
+            currency_pairs = decode_fields(currency_pairs)
+            if target_key := currency_pairs.get(ALIAS_FIELD):
+                currency_pair_bucket = await self._retrieve_currency_pair_bucket(self._get_bucket_timestamp(target_key))
+                return model.CurrencyPairBucket.from_prices(
+                    symbols=currency_pair_bucket.symbols,
+                    prices=currency_pair_bucket.prices,
+                    timestamp=timestamp,
+                )
+            if currency_pairs.pop(PARTIAL_FIELD, None):
+                return model.CurrencyPairBucket.from_prices(
+                    symbols=tuple(currency_pairs),
+                    prices=array.array("d", map(float, currency_pairs.values())),
+                    timestamp=timestamp,
+                    partial=True,
+                )
+            if currency_pairs.pop(DELTA_FIELD, None) and preceding_timestamps and preceding_timestamps[0]:
+                currency_pairs = await self._replay_delta_chain(currency_pairs, preceding_timestamps[0])
         except redis.exceptions.ConnectionError as ex:
             raise exceptions.DBConnectionError(
                 f"Error. Failed to retrieve currency pairs from Redis for the {timestamp=}.",
             ) from ex
-        return model.CurrencyPairBucket(
-            currency_pairs=[
-                model.CurrencyPair(symbol=symbol, conversion_rate=float(conversion_rate))
-                for symbol, conversion_rate in currency_pairs.items()
-            ],
+        except redis.exceptions.ResponseError as ex:
+            raise get_format_error(ex, timestamp) from ex
+        return model.CurrencyPairBucket.from_prices(
+            symbols=tuple(currency_pairs),
+            prices=array.array("d", map(float, currency_pairs.values())),
             timestamp=timestamp,
         )
 
+    async def _replay_delta_chain(
+        self,
+        currency_pairs: dict[str, str],
+        preceding_timestamps: list[tuple[str, float]],
+    ) -> dict[str, str]:
+        """Walk back from a delta to its keyframe, then replay the deltas and partial buckets on top of it in order.
+
+        Only the markers of the preceding buckets are read first, so that just the buckets of the chain are read whole.
+        """
+        async with self._client.pipeline(transaction=False) as pipeline:
+            for _, score in preceding_timestamps:
+                pipeline.hmget(self._get_bucket_key(score), [DELTA_FIELD, ALIAS_FIELD, PARTIAL_FIELD])
+            markers = await pipeline.execute()
+        chain_keys = []
+        for (_, score), (is_delta, target_key, is_partial) in zip(preceding_timestamps, markers, strict=True):
+            if target_key:
+                continue
+            chain_keys.append(self._get_bucket_key(score))
+            if not is_delta and not is_partial:
+                break
+        async with self._client.pipeline(transaction=False) as pipeline:
+            for key in chain_keys:
+                pipeline.hgetall(key)
+            delta_chain = [currency_pairs, *map(decode_fields, await pipeline.execute())]
+        replayed_currency_pairs: dict[str, str] = {}
+        for one_currency_pairs in reversed(delta_chain):
+            one_currency_pairs.pop(DELTA_FIELD, None)
+            one_currency_pairs.pop(PARTIAL_FIELD, None)
+            replayed_currency_pairs.update(one_currency_pairs)
+        return replayed_currency_pairs
+
+    async def _is_partial_currency_pair_bucket(self, timestamp: datetime.datetime) -> bool:
+        try:
+            target_key, is_partial = await self._client.hmget(
+                timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                [ALIAS_FIELD, PARTIAL_FIELD],
+            )
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve currency pairs from Redis for the {timestamp=}.",
+            ) from ex
+        except redis.exceptions.ResponseError as ex:
+            raise get_format_error(ex, timestamp) from ex
+        if target_key:
+            return await self._is_partial_currency_pair_bucket(self._get_bucket_timestamp(typing.cast(str, target_key)))
+        return bool(is_partial)
+
+    async def _retrieve_currency_pair(self, timestamp: datetime.datetime, symbol: str) -> model.CurrencyPair | None:
+        currency_pairs = await self._retrieve_currency_pairs(timestamp, [symbol])
+        return currency_pairs[0] if currency_pairs else None
+
+    async def _retrieve_currency_pairs(
+        self,
+        timestamp: datetime.datetime,
+        symbols: list[str],
+    ) -> list[model.CurrencyPair]:
+        if not symbols:
+            return []
+        try:
+            async with self._client.pipeline(transaction=False) as pipeline:
+                self._queue_currency_pairs(pipeline, timestamp, symbols)
+                results = await pipeline.execute()
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve the {symbols=} from Redis for the {timestamp=}.",
+            ) from ex
+        except redis.exceptions.ResponseError as ex:
+            raise get_format_error(ex, timestamp) from ex
+        return await self._get_currency_pairs(timestamp, symbols, results)
+
+    async def _retrieve_currency_pair_groups(
+        self,
+        groups: list[tuple[datetime.datetime, list[str]]],
+    ) -> list[list[model.CurrencyPair]]:
+        queued_groups = [(timestamp, symbols) for timestamp, symbols in groups if symbols]
+        try:
+            async with self._client.pipeline(transaction=False) as pipeline:
+                for timestamp, symbols in queued_groups:
+                    self._queue_currency_pairs(pipeline, timestamp, symbols)
+                results = iter(await pipeline.execute())
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError("Error. Failed to retrieve currency pairs from Redis.") from ex
+        except redis.exceptions.ResponseError as ex:
+            raise get_format_error(ex, None) from ex
+        # The bucket and, if the walk back is not disabled, the buckets preceding it are looked up for every group.
+        lookups = 2 if get_walk_back_limit() else 1
+        currency_pair_groups = iter(
+            await asyncio.gather(
+                *(
+                    self._get_currency_pairs(timestamp, symbols, list(itertools.islice(results, lookups)))
+                    for timestamp, symbols in queued_groups
+                ),
+            ),
+        )
+        return [next(currency_pair_groups) if symbols else [] for _, symbols in groups]
+
+    def _queue_currency_pairs(
+        self,
+        pipeline: redis.asyncio.client.Pipeline,
+        timestamp: datetime.datetime,
+        symbols: list[str],
+    ) -> None:
+        pipeline.hmget(timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"), [*symbols, DELTA_FIELD, ALIAS_FIELD])
+        self._retrieve_preceding_timestamps(pipeline, timestamp)
+
+    async def _get_currency_pairs(
+        self,
+        timestamp: datetime.datetime,
+        symbols: list[str],
+        results: list,
+    ) -> list[model.CurrencyPair]:
+        """Return the currency pairs of the queued lookups, following an alias and a delta to the buckets before it."""
+        (*conversion_rates, is_delta, target_key), *preceding_timestamps = results
+        try:
+            if target_key:
+                return await self._retrieve_currency_pairs(self._get_bucket_timestamp(target_key), symbols)
+            # Symbols missing in a partial bucket are left to the caller, they are as of an older timestamp.
+            found = dict(zip(symbols, conversion_rates, strict=True))
+            if is_delta and preceding_timestamps and (
+                missing_symbols := [symbol for symbol, conversion_rate in found.items() if conversion_rate is None]
+            ):
+                found.update(await self._retrieve_preceding_conversion_rates(preceding_timestamps[0], missing_symbols))
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve the {symbols=} from Redis for the {timestamp=}.",
+            ) from ex
+        except redis.exceptions.ResponseError as ex:
+            raise get_format_error(ex, timestamp) from ex
+        return [
+            model.CurrencyPair(symbol=symbol, conversion_rate=float(conversion_rate))
+            for symbol in symbols
+            if (conversion_rate := found[symbol]) is not None
+        ]
+
+    async def _retrieve_preceding_conversion_rates(
+        self,
+        preceding_timestamps: list[tuple[str, float]],
+        symbols: list[str],
+    ) -> dict[str, str | None]:
+        """Look up symbols missing in a delta or partial bucket in the closest preceding buckets holding them."""
+        found: dict[str, str | None] = dict.fromkeys(symbols)
+        async with self._client.pipeline(transaction=False) as pipeline:
+            for _, score in preceding_timestamps:
+                pipeline.hmget(self._get_bucket_key(score), [*symbols, DELTA_FIELD, ALIAS_FIELD, PARTIAL_FIELD])
+            for *conversion_rates, is_delta, target_key, is_partial in await pipeline.execute():
+                if target_key:
+                    continue
+                for symbol, conversion_rate in zip(symbols, conversion_rates, strict=True):
+                    if found[symbol] is None:
+                        found[symbol] = conversion_rate
+                if not is_delta and not is_partial:
+                    break
+        return found
+
+    @staticmethod
+    def _retrieve_preceding_timestamps(pipeline: redis.asyncio.client.Pipeline, timestamp: datetime.datetime) -> None:
+        """Queue the lookup of the buckets a delta or partial bucket may be read from, up to the previous keyframe."""
+        if walk_back_limit := get_walk_back_limit():
+            pipeline.zrevrangebyscore(
+                "available_currency_pair_timestamps",
+                f"({int(timestamp.timestamp())}",
+                "-inf",
+                start=0,
+                num=walk_back_limit,
+                withscores=True,
+            )
+
+    @staticmethod
+    def _get_bucket_key(score: float) -> str:
+        return datetime.datetime.fromtimestamp(score, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    @staticmethod
+    def _get_bucket_timestamp(key: str) -> datetime.datetime:
+        return datetime.datetime.strptime(key, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
+
     async def _retrieve_latest_timestamp(self) -> datetime.datetime | None:
         try:
-            latest_timestamp_str = await self._client.zrange("available_currency_pair_timestamps", -1, -1)
+            async with self._client.pipeline(transaction=False) as pipeline:
+                self._queue_latest_timestamps(pipeline)
+                return self._get_latest_timestamp(await pipeline.execute())
         except redis.exceptions.ConnectionError as ex:
             raise exceptions.DBConnectionError("Error. Failed to retrieve the latest timestamp from Redis.") from ex
-        return datetime.datetime.strptime(
-            latest_timestamp_str[0], "%Y-%m-%dT%H:%M:%SZ").replace(
-                tzinfo=datetime.timezone.utc,
+
+    @staticmethod
+    def _queue_latest_timestamps(pipeline: redis.asyncio.client.Pipeline) -> None:
+        for tier in (0, *CURRENCY_PAIR_TIERS):
+            pipeline.zrange(get_index_key(tier), -1, -1, withscores=True)
+
+    @staticmethod
+    def _get_latest_timestamp(latest_timestamps: list[list[tuple[str, float]]]) -> datetime.datetime | None:
+        if not (scores := [score for latest in latest_timestamps for _, score in latest]):
+            return None
+        return datetime.datetime.fromtimestamp(max(scores), datetime.timezone.utc)
+
+    async def _retrieve_previous_timestamp(self, timestamp: datetime.datetime) -> datetime.datetime | None:
+        try:
+            previous_timestamps = await self._client.zrevrangebyscore(
+                "available_currency_pair_timestamps",
+                f"({int(timestamp.timestamp())}",
+                "-inf",
+                start=0,
+                num=1,
+                withscores=True,
+            )
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve the timestamp preceding the {timestamp=} from Redis.",
+            ) from ex
+        if not previous_timestamps:
+            return None
+        return datetime.datetime.fromtimestamp(previous_timestamps[0][1], datetime.timezone.utc)
+
+    async def _retrieve_neighbouring_timestamps(
+        self,
+        desired_timestamp: datetime.datetime,
+    ) -> list[datetime.datetime]:
+        try:
+            # The bounded lookups of every tier travel in one round trip and cost O(log n) regardless of the index size.
+            async with self._client.pipeline(transaction=False) as pipeline:
+                self._queue_neighbouring_timestamps(pipeline, desired_timestamp)
+                neighbours = await pipeline.execute()
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve timestamps neighbouring the {desired_timestamp=} from Redis.",
+            ) from ex
+        return self._get_neighbouring_timestamps(neighbours)
+
+    @staticmethod
+    def _queue_neighbouring_timestamps(
+        pipeline: redis.asyncio.client.Pipeline,
+        desired_timestamp: datetime.datetime,
+    ) -> None:
+        desired_epoch = desired_timestamp.timestamp()
+        for tier in (0, *CURRENCY_PAIR_TIERS):
+            pipeline.zrevrangebyscore(
+                get_index_key(tier),
+                desired_epoch,
+                f"({desired_epoch - AppSettings.currency_pair_lookup_window}",
+                start=0,
+                num=1,
+                withscores=True,
+            )
+            pipeline.zrangebyscore(
+                get_index_key(tier),
+                desired_epoch,
+                f"({desired_epoch + AppSettings.currency_pair_lookup_window}",
+                start=0,
+                num=1,
+                withscores=True,
+            )
+
+    @staticmethod
+    def _get_neighbouring_timestamps(neighbours: list[list[tuple[str, float]]]) -> list[datetime.datetime]:
+        return [
+            datetime.datetime.fromtimestamp(score, datetime.timezone.utc)
+            for one_neighbours in neighbours
+            for _, score in one_neighbours
+        ]
+
+    async def _retrieve_relevant_timestamps(
+        self,
+        desired_timestamps: list[datetime.datetime | None],
+    ) -> list[datetime.datetime | None]:
+        # Every tier is looked up twice for a desired timestamp and once for the latest one.
+        lookups = 2 * (len(CURRENCY_PAIR_TIERS) + 1)
+        try:
+            async with self._client.pipeline(transaction=False) as pipeline:
+                for desired_timestamp in desired_timestamps:
+                    if desired_timestamp:
+                        self._queue_neighbouring_timestamps(pipeline, desired_timestamp)
+                    else:
+                        self._queue_latest_timestamps(pipeline)
+                results = iter(await pipeline.execute())
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError("Error. Failed to retrieve timestamps from Redis.") from ex
+        return [
+            get_closest_timestamp(
+                self._get_neighbouring_timestamps(list(itertools.islice(results, lookups))),
+                desired_timestamp,
+            )
+            if desired_timestamp
+            else self._get_latest_timestamp(list(itertools.islice(results, lookups // 2)))
+            for desired_timestamp in desired_timestamps
+        ]
+
+    async def _retrieve_timestamps(self) -> list[datetime.datetime]:
+        # Buckets are only evicted along with their timestamps, so the index holds exactly the stored ones.
+        try:
+            async with self._client.pipeline(transaction=False) as pipeline:
+                for tier in (0, *CURRENCY_PAIR_TIERS):
+                    pipeline.zrange(get_index_key(tier), 0, -1, withscores=True)
+                scores = sorted(score for timestamps in await pipeline.execute() for _, score in timestamps)
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError("Error. Failed to retrieve timestamps from Redis.") from ex
+        return [datetime.datetime.fromtimestamp(score, datetime.timezone.utc) for score in scores]
+
+    async def retrieve_oldest_currency_pair_timestamp(self, tier: int) -> datetime.datetime | None:
+        try:
+            oldest_timestamps = await self._client.zrange(get_index_key(tier), 0, 0, withscores=True)
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve the oldest timestamp of the {tier=} from Redis.",
+            ) from ex
+        if not oldest_timestamps:
+            return None
+        return datetime.datetime.fromtimestamp(oldest_timestamps[0][1], datetime.timezone.utc)
+
+    async def retrieve_currency_pair_ohlc_buckets(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        tier: int,
+    ) -> list[model.OhlcBucket]:
+        try:
+            scores = [
+                score
+                for _, score in await self._client.zrangebyscore(
+                    get_index_key(tier),
+                    int(start.timestamp()),
+                    f"({int(end.timestamp())}",
+                    withscores=True,
+                )
+            ]
+            if tier and scores:
+                payloads = await self._client.mget([get_ohlc_key(self._get_bucket_key(score)) for score in scores])
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve OHLC buckets of the {tier=} from Redis from the {start=} to the {end=}.",
+            ) from ex
+        timestamps = [datetime.datetime.fromtimestamp(score, datetime.timezone.utc) for score in scores]
+        if tier:
+            return [
+                self._unpack_ohlc_bucket(payload, timestamp)
+                for payload, timestamp in zip(payloads if scores else [], timestamps, strict=True)
+            ]
+        # Buckets are read one by one, so that only the ones of a single window are held in memory.
+        return [
+            model.OhlcBucket.from_currency_pair_bucket(await self._retrieve_currency_pair_bucket(timestamp))
+            for timestamp in timestamps
+        ]
+
+    async def retrieve_currency_pair_footprint(self) -> dict[int, tuple[int, int]]:
+        tiers = (0, *CURRENCY_PAIR_TIERS)
+        footprint = {}
+        try:
+            async with self._client.pipeline(transaction=False) as pipeline:
+                for tier in tiers:
+                    pipeline.zcard(get_index_key(tier))
+                    pipeline.zrandmember(get_index_key(tier), FOOTPRINT_SAMPLE_SIZE)
+                results = await pipeline.execute()
+            for tier, number_of_buckets, members in zip(tiers, results[::2], results[1::2], strict=True):
+                if not members:
+                    footprint[tier] = (number_of_buckets, 0)
+                    continue
+                # Buckets of a tier are alike, so their footprint is extrapolated from a random sample of them.
+                keys = [self._get_bucket_key(float(member)) for member in members]
+                if tier:
+                    keys += [get_ohlc_key(key) for key in keys]
+                sample_size = await self._measure_keys_script(keys=keys) + KEY_OVERHEAD * (len(keys) + len(members))
+                footprint[tier] = (number_of_buckets, round(number_of_buckets * sample_size / len(members)))
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError("Error. Failed to estimate the footprint of buckets in Redis.") from ex
+        return footprint
+
+
+class PackedRedisCurrencyPairRepository(RedisCurrencyPairRepository):
+    """Stores every bucket as a single packed binary value referencing a symbol dictionary stored once per universe.
+
+    Requires a client that does not decode responses.
+    """
+
+    def __init__(
+        self,
+        client: redis.asyncio.Redis = fastapi.Depends(dependencies.get_binary_db_client),
+        compress: bool = AppSettings.currency_pair_compression,
+    ) -> None:
+        super().__init__(client)
+        self._compress = compress
+        self._symbol_dictionaries: dict[int, tuple[tuple[str, ...], dict[str, int]]] = {}
+        self._stored_dictionary_versions: set[int] = set()
+
+    async def retrieve_latest_currency_pair(
+        self,
+        symbol: str,
+        desired_timestamp: datetime.datetime | None,
+    ) -> model.CurrencyPairBucket | None:
+        return await AbstractCurrencyPairRepository.retrieve_latest_currency_pair(self, symbol, desired_timestamp)
+
+    async def create_currency_pair_bucket(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        changed_currency_pair_bucket: model.CurrencyPairBucket | None = None,  # noqa: ARG002
+    ) -> None:
+        # Packed buckets are already compact, every one of them is written as a keyframe.
+        if not currency_pair_bucket.symbols:
+            return
+
+        timestamp = currency_pair_bucket.timestamp
+        epoch = int(timestamp.timestamp())
+        dictionary_version = currency_pair_codec.get_dictionary_version(currency_pair_bucket.symbols)
+        dictionary_key = f"currency_pair_symbols:{dictionary_version:016x}"
+        dictionary_stored = dictionary_version in self._stored_dictionary_versions
+        try:
+            async with self._client.pipeline(transaction=True) as pipeline:
+                if not dictionary_stored:
+                    pipeline.set(
+                        dictionary_key,
+                        currency_pair_codec.pack_symbols(currency_pair_bucket.symbols),
+                        nx=True,
+                    )
+                # The dictionary has to outlive every bucket referencing it.
+                if AppSettings.currency_pair_ttl > 0:
+                    pipeline.expire(dictionary_key, AppSettings.currency_pair_ttl)
+                else:
+                    pipeline.exists(dictionary_key)
+                pipeline.set(
+                    timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    currency_pair_codec.pack_prices(currency_pair_bucket.prices, dictionary_version, self._compress),
+                )
+                pipeline.zadd("available_currency_pair_timestamps", {str(epoch): epoch})
+                results = await pipeline.execute()
+            if dictionary_stored and not results[0]:
+                # The dictionary has been lost since it was stored, e.g. because Redis was flushed.
+                await self._client.set(
+                    dictionary_key,
+                    currency_pair_codec.pack_symbols(currency_pair_bucket.symbols),
+                    ex=AppSettings.currency_pair_ttl or None,
+                )
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to save all currency pairs in Redis for the {timestamp=}.",
+            ) from ex
+        self._remember_symbol_dictionary(dictionary_version, currency_pair_bucket.symbols)
+        self._stored_dictionary_versions.add(dictionary_version)
+        self._delta_chain = [dictionary_key, timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")]
+
+    async def create_currency_pair_partial_bucket(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        partial_currency_pair_bucket: model.CurrencyPairBucket,  # noqa: ARG002
+    ) -> None:
+        # Partial buckets would be read whole just like full ones, so the merged bucket is written instead.
+        await self.create_currency_pair_bucket(currency_pair_bucket)
+
+    async def _is_partial_currency_pair_bucket(self, timestamp: datetime.datetime) -> bool:  # noqa: ARG002
+        return False
+
+    def _queue_alias(self, pipeline: redis.asyncio.client.Pipeline, key: str, target_key: str) -> None:
+        pipeline.set(key, currency_pair_codec.pack_alias(target_key))
+
+    def _queue_keyframe(
+        self,
+        pipeline: redis.asyncio.client.Pipeline,
+        key: str,
+        currency_pair_bucket: model.CurrencyPairBucket,
+    ) -> None:
+        dictionary_version = currency_pair_codec.get_dictionary_version(currency_pair_bucket.symbols)
+        dictionary_key = f"currency_pair_symbols:{dictionary_version:016x}"
+        pipeline.set(dictionary_key, currency_pair_codec.pack_symbols(currency_pair_bucket.symbols), nx=True)
+        # Keyframes are rewritten in place of older buckets, so they only expire dictionaries not expiring already.
+        if AppSettings.currency_pair_ttl > 0:
+            pipeline.expire(dictionary_key, AppSettings.currency_pair_ttl, nx=True)
+        pipeline.set(
+            key,
+            currency_pair_codec.pack_prices(
+                array.array("d", currency_pair_bucket.prices),
+                dictionary_version,
+                self._compress,
+            ),
+        )
+        self._remember_symbol_dictionary(dictionary_version, currency_pair_bucket.symbols)
+
+    async def _retrieve_alias_target(self, key: str) -> str | None:
+        payload = await self._client.get(key)
+        return currency_pair_codec.unpack_alias(payload) if payload else None
+
+    async def _retrieve_currency_pair_bucket(self, timestamp: datetime.datetime) -> model.CurrencyPairBucket:
+        try:
+            payload = await self._client.get(timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve currency pairs from Redis for the {timestamp=}.",
+            ) from ex
+        except redis.exceptions.ResponseError as ex:
+            if not is_wrong_type(ex):
+                raise
+            # Buckets not migrated to the packed format yet are still hashes.
+            return await super()._retrieve_currency_pair_bucket(timestamp)
+        return await self._unpack_currency_pair_bucket(typing.cast(bytes | None, payload), timestamp)
+
+    async def _unpack_currency_pair_bucket(
+        self,
+        payload: bytes | None,
+        timestamp: datetime.datetime,
+    ) -> model.CurrencyPairBucket:
+        if not payload:
+            return model.CurrencyPairBucket(currency_pairs=[], timestamp=timestamp)
+        if target_key := currency_pair_codec.unpack_alias(payload):
+            currency_pair_bucket = await self._retrieve_currency_pair_bucket(self._get_bucket_timestamp(target_key))
+            return model.CurrencyPairBucket.from_prices(
+                symbols=currency_pair_bucket.symbols,
+                prices=currency_pair_bucket.prices,
+                timestamp=timestamp,
             )
 
-    async def _retrieve_timestamp_range(self, start: float, end: float) -> list[datetime.datetime]:
+        dictionary_version, prices = currency_pair_codec.unpack_prices(payload)
+        symbols, _ = await self._retrieve_symbol_dictionary(dictionary_version)
+        return model.CurrencyPairBucket.from_prices(symbols=symbols, prices=prices, timestamp=timestamp)
+
+    async def _retrieve_currency_pair(self, timestamp: datetime.datetime, symbol: str) -> model.CurrencyPair | None:
+        if self._compress or not self._symbol_dictionaries:
+            return (await self._retrieve_currency_pair_bucket(timestamp)).get_currency_pair(symbol)
+
+        # Optimistically read eight bytes at the offset of the symbol in the latest known dictionary, and fall back to
+        # the dictionary the bucket actually references if it is a different one.
+        dictionary_version, (_, indexes) = next(reversed(self._symbol_dictionaries.items()))
+        key = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        index = indexes.get(symbol)
         try:
-            timestamps_str = await self._client.zrangebyscore("available_currency_pair_timestamps", start, end)
+            async with self._client.pipeline(transaction=False) as pipeline:
+                pipeline.getrange(key, 0, currency_pair_codec.HEADER.size - 1)
+                if index is not None:
+                    offset = currency_pair_codec.get_price_offset(index)
+                    pipeline.getrange(key, offset, offset + currency_pair_codec.PRICE.size - 1)
+                header, *price = await pipeline.execute()
         except redis.exceptions.ConnectionError as ex:
             raise exceptions.DBConnectionError(
-                f"Error. Failed to retrieve timestamp range from {start} to {end} from Redis.",
+                f"Error. Failed to retrieve the {symbol=} from Redis for the {timestamp=}.",
             ) from ex
+        except redis.exceptions.ResponseError as ex:
+            if not is_wrong_type(ex):
+                raise
+            return (await self._retrieve_currency_pair_bucket(timestamp)).get_currency_pair(symbol)
+        if not header:
+            return None
+        if currency_pair_codec.unpack_header(header) != (dictionary_version, 0):
+            return (await self._retrieve_currency_pair_bucket(timestamp)).get_currency_pair(symbol)
+        if not price:
+            return None
+        return model.CurrencyPair(symbol=symbol, conversion_rate=currency_pair_codec.PRICE.unpack(price[0])[0])
+
+    async def _retrieve_currency_pairs(
+        self,
+        timestamp: datetime.datetime,
+        symbols: list[str],
+    ) -> list[model.CurrencyPair]:
+        currency_pair_bucket = await self._retrieve_currency_pair_bucket(timestamp)
         return [
-            datetime.datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
-            for ts in timestamps_str
+            currency_pair
+            for symbol in symbols
+            if (currency_pair := currency_pair_bucket.get_currency_pair(symbol))
         ]
+
+    async def _retrieve_currency_pair_groups(
+        self,
+        groups: list[tuple[datetime.datetime, list[str]]],
+    ) -> list[list[model.CurrencyPair]]:
+        try:
+            async with self._client.pipeline(transaction=False) as pipeline:
+                for timestamp, _ in groups:
+                    pipeline.get(timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"))
+                payloads = await pipeline.execute(raise_on_error=False)
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError("Error. Failed to retrieve currency pairs from Redis.") from ex
+        currency_pair_buckets = await asyncio.gather(
+            *(
+                # Buckets not migrated to the packed format yet are read one by one, as hashes.
+                self._retrieve_currency_pair_bucket(timestamp)
+                if isinstance(payload, redis.exceptions.ResponseError)
+                else self._unpack_currency_pair_bucket(payload, timestamp)
+                for (timestamp, _), payload in zip(groups, payloads, strict=True)
+            ),
+        )
+        return [
+            [currency_pair for symbol in symbols if (currency_pair := currency_pair_bucket.get_currency_pair(symbol))]
+            for (_, symbols), currency_pair_bucket in zip(groups, currency_pair_buckets, strict=True)
+        ]
+
+    async def _retrieve_symbol_dictionary(
+        self,
+        dictionary_version: int,
+    ) -> tuple[tuple[str, ...], dict[str, int]]:
+        if symbol_dictionary := self._symbol_dictionaries.get(dictionary_version):
+            return symbol_dictionary
+        try:
+            payload = await self._client.get(f"currency_pair_symbols:{dictionary_version:016x}")
+        except redis.exceptions.ConnectionError as ex:
+            raise exceptions.DBConnectionError(
+                f"Error. Failed to retrieve the symbol dictionary {dictionary_version=} from Redis.",
+            ) from ex
+        if payload is None:
+            raise exceptions.DBConnectionError(
+                f"Error. The symbol dictionary {dictionary_version=} is missing in Redis.",
+            )
+        return self._remember_symbol_dictionary(dictionary_version, currency_pair_codec.unpack_symbols(payload))
+
+    def _remember_symbol_dictionary(
+        self,
+        dictionary_version: int,
+        symbols: tuple[str, ...],
+    ) -> tuple[tuple[str, ...], dict[str, int]]:
+        # The most recently used dictionary goes last, it is the one new buckets most likely reference.
+        self._symbol_dictionaries.pop(dictionary_version, None)
+        symbol_dictionary = self._symbol_dictionaries[dictionary_version] = model.intern_symbols(symbols)
+        return symbol_dictionary
+
+
+def get_redis_currency_pair_repository() -> RedisCurrencyPairRepository:
+    if AppSettings.currency_pair_storage_format == "packed":
+        return PackedRedisCurrencyPairRepository(dependencies.get_binary_db_client())
+    return RedisCurrencyPairRepository(dependencies.get_db_client())
@@ -0,0 +1,153 @@
+"""Adapters of exchanges currency pairs are fetched from."""
+
+import array
+import json
+import typing
+import urllib.parse
+
+from ..settings import AppSettings
+
+
+# Symbols of an exchange and a parallel array of their prices, i.e. the parts of a currency pair bucket.
+Prices = tuple[tuple[str, ...], array.array]
+
+
+def normalise_symbol(symbol: str) -> str:
+    """Bring symbols of all exchanges to the form used by Binance, e.g. BTC-USDT and btc/usdt to BTCUSDT."""
+    return symbol.replace("-", "").replace("/", "").replace("_", "").upper()
+
+
+class AbstractCurrencyPairSource(typing.Protocol):
+    name: str
+    # Fields of a ticker holding its symbol and price.
+    symbol_field: str
+    price_field: str
+    url: str
+    fetch_interval: float
+    mirror_urls: typing.Sequence[str]
+    tier: typing.Literal["all", "hot"]
+
+    def __init__(
+        self,
+        url: str,
+        fetch_interval: float,
+        mirror_urls: typing.Sequence[str] = (),
+        tier: typing.Literal["all", "hot"] = "all",
+    ) -> None:
+        self.url = url
+        self.fetch_interval = fetch_interval
+        self.mirror_urls = mirror_urls
+        self.tier = tier
+
+    @property
+    def key(self) -> str:
+        """Name of the source, distinct for every tier of the same exchange."""
+        return self.name if self.tier == "all" else f"{self.name}:{self.tier}"
+
+    def parse(self, content: bytes) -> Prices:
+        """Return normalised symbols and their prices from a response of the exchange, skipping malformed tickers.
+
+        The raw response is read whole, but every ticker is moved into the symbols and the array of prices as soon as it
+        is decoded, so no list of ticker dicts is built. A response without tickers, e.g. an error of the exchange, has
+        no prices.
+        """
+        symbols: list[str] = []
+        prices = array.array("d")
+
+        def collect_ticker(ticker: dict) -> dict | None:
+            symbol, price = ticker.get(self.symbol_field), ticker.get(self.price_field)
+            if not symbol or price is None or price == "":
+                return ticker
+            symbols.append(normalise_symbol(symbol))
+            prices.append(float(price))
+            return None
+
+        try:
+            json.loads(content, object_hook=collect_ticker)
+        except ValueError as ex:
+            raise ValueError(f"Malformed response of {self.name}: {ex}") from ex
+        return tuple(symbols), prices
+
+
+class BinanceCurrencyPairSource(AbstractCurrencyPairSource):
+    name = "binance"
+    symbol_field = "symbol"
+    price_field = "price"
+
+
+class BybitCurrencyPairSource(AbstractCurrencyPairSource):
+    name = "bybit"
+    symbol_field = "symbol"
+    price_field = "lastPrice"
+
+
+class OkxCurrencyPairSource(AbstractCurrencyPairSource):
+    name = "okx"
+    symbol_field = "instId"
+    price_field = "last"
+
+
+def get_filtered_url(url: str, symbols: typing.Sequence[str]) -> str:
+    """Return the URL of the tickers of the given symbols only, by the symbols filter of Binance."""
+    query = urllib.parse.urlencode({"symbols": json.dumps(list(symbols), separators=(",", ":"))})
+    return f"{url}{'&' if '?' in url else '?'}{query}"
+
+
+def parse_exchange_info(content: bytes) -> dict[str, tuple[str, str]]:
+    """Return the base and the quote asset of every symbol from the exchange information of Binance."""
+    try:
+        return {
+            symbol["symbol"]: (symbol["baseAsset"], symbol["quoteAsset"]) for symbol in json.loads(content)["symbols"]
+        }
+    except (KeyError, TypeError) as ex:
+        raise ValueError(f"Malformed exchange information of binance: {ex!r}") from ex
+
+
+def get_hot_symbols() -> list[str]:
+    return [symbol.strip() for symbol in AppSettings.exchange_hot_symbols.split(",") if symbol.strip()]
+
+
+def get_currency_pair_sources() -> list[AbstractCurrencyPairSource]:
+    urls = {
+        BinanceCurrencyPairSource.name: AppSettings.exchange_api_url.unicode_string(),
+        BybitCurrencyPairSource.name: AppSettings.bybit_api_url.unicode_string(),
+        OkxCurrencyPairSource.name: AppSettings.okx_api_url.unicode_string(),
+    }
+    source_classes: dict[str, type[AbstractCurrencyPairSource]] = {
+        source_class.name: source_class
+        for source_class in (BinanceCurrencyPairSource, BybitCurrencyPairSource, OkxCurrencyPairSource)
+    }
+    fetch_intervals = {
+        name.strip(): float(fetch_interval)
+        for name, fetch_interval in (
+            item.split(":") for item in AppSettings.exchange_source_fetch_intervals.split(",") if item.strip()
+        )
+    }
+    mirror_urls = {
+        BinanceCurrencyPairSource.name: [
+            url.strip() for url in AppSettings.exchange_api_mirror_urls.split(",") if url.strip()
+        ],
+    }
+    names = [name.strip() for name in AppSettings.exchange_sources.split(",") if name.strip()]
+    if unknown_names := set(names) - source_classes.keys():
+        raise ValueError(f"Unknown exchanges: {', '.join(sorted(unknown_names))}.")
+    sources: list[AbstractCurrencyPairSource] = [
+        source_classes[name](
+            urls[name],
+            fetch_intervals.get(name, AppSettings.exchange_fetch_interval),
+            mirror_urls.get(name, ()),
+        )
+        for name in names
+    ]
+    hot_symbols = get_hot_symbols()
+    if hot_symbols and BinanceCurrencyPairSource.name in names:
+        # Only Binance filters its tickers by a list of symbols, so the hot tier is fetched from it alone.
+        sources.append(
+            BinanceCurrencyPairSource(
+                get_filtered_url(urls[BinanceCurrencyPairSource.name], hot_symbols),
+                AppSettings.exchange_hot_fetch_interval,
+                [get_filtered_url(url, hot_symbols) for url in mirror_urls[BinanceCurrencyPairSource.name]],
+                tier="hot",
+            ),
+        )
+    return sources
@@ -26,8 +26,24 @@ class AbstractHttpClient(typing.Protocol):
 
 
 class HttpxClient(AbstractHttpClient):
-    def __init__(self) -> None:
-        self.client = httpx.AsyncClient()
+    """Keeps connections alive between requests, so a periodic fetch does not pay for a TLS handshake every time."""
+
+    def __init__(
+        self,
+        connect_timeout: float = 3,
+        read_timeout: float = 10,
+        http2: bool = False,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 300,
+    ) -> None:
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
 
     async def __aenter__(self) -> typing_extensions.Self:
         await super().__aenter__()
@@ -0,0 +1,41 @@
+"""Class to subscribe to streams of controllers."""
+
+import asyncio
+import logging
+import typing
+
+import websockets.asyncio.client
+import websockets.exceptions
+
+from ..metrics import AppMetrics
+
+
+class AbstractWebSocketClient(typing.Protocol):
+    def listen(self, url: str) -> typing.AsyncIterator[str | bytes]:
+        raise NotImplementedError
+
+
+class WebSocketsClient(AbstractWebSocketClient):
+    """Yields messages of a stream forever, reconnecting with an exponential backoff whenever the connection drops."""
+
+    def __init__(self, reconnect_delay: float = 1, max_reconnect_delay: float = 30) -> None:
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+    async def listen(self, url: str) -> typing.AsyncIterator[str | bytes]:
+        reconnect_delay = self.reconnect_delay
+        while True:
+            try:
+                async with websockets.asyncio.client.connect(url) as websocket:
+                    logging.info(f"Subscribed to {url}.")
+                    reconnect_delay = self.reconnect_delay
+                    async for message in websocket:
+                        yield message
+                logging.warning(f"The stream {url} has been closed.")
+            except (OSError, websockets.exceptions.WebSocketException) as ex:
+                logging.warning(f"The stream {url} has failed. {ex!r}")
+
+            AppMetrics.increment("websocket_reconnects")
+            logging.info(f"Reconnecting to {url} in {reconnect_delay} s.")
+            await asyncio.sleep(reconnect_delay)
+            reconnect_delay = min(reconnect_delay * 2, self.max_reconnect_delay)
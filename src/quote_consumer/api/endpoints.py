@@ -8,7 +8,8 @@ from fastapi.responses import JSONResponse
 
 from .. import domain
 from ..views import currency_pairs
-from ..adapters import currency_pair_repository
+from ..adapters import currency_pair_cache, currency_pair_repository
+from ..metrics import AppMetrics
 
 
 api_router = APIRouter()
@@ -19,21 +20,18 @@ async def get_currency_pair(
     request: Annotated[domain.schemata.CurrencyPairGetRequest, fastapi.Depends()],
     currency_pair_repo: Annotated[
         currency_pair_repository.AbstractCurrencyPairRepository,
-        fastapi.Depends(currency_pair_repository.RedisCurrencyPairRepository),
+        fastapi.Depends(currency_pair_cache.get_cached_currency_pair_repository),
     ],
 ) -> JSONResponse:
     try:
-        if result := await currency_pairs.fetch_currency_pair(
-            symbol = f"{request.base_currency.strip()}{request.quote_currency.strip()}".upper(),
+        if result := await currency_pairs.fetch_conversion_rate(
+            base_asset=request.base_currency.strip().upper(),
+            quote_asset=request.quote_currency.strip().upper(),
             timestamp=request.desired_timestamp,
             currency_pair_repo=currency_pair_repo,
+            exchange=request.exchange.strip().lower() if request.exchange else None,
         ):
-            return JSONResponse(
-                content={
-                    "conversion_rate": result.currency_pairs[0].conversion_rate,
-                    "actual_timestamp_closest_to_desired": result.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                },
-            )
+            return JSONResponse(content=get_conversion_rate_content(result))
     except domain.exceptions.DBConnectionError as ex:
         raise fastapi.HTTPException(
             detail=f"Error. Failed to get the currency pair due to unreachanble database. {ex.args[0]}",
@@ -44,3 +42,48 @@ async def get_currency_pair(
         content="Conversion is not possible. We don't have quotes for this pair.",
         status_code=fastapi.status.HTTP_404_NOT_FOUND,
     )
+
+
+@api_router.post("/currency-pairs", status_code=200, response_model=domain.schemata.CurrencyPairBatchResponse)
+async def get_currency_pairs(
+    request: domain.schemata.CurrencyPairBatchRequest,
+    currency_pair_repo: Annotated[
+        currency_pair_repository.AbstractCurrencyPairRepository,
+        fastapi.Depends(currency_pair_cache.get_cached_currency_pair_repository),
+    ],
+) -> JSONResponse:
+    try:
+        results = await currency_pairs.fetch_currency_pairs(
+            [
+                (
+                    item.base_currency.strip().upper(),
+                    item.quote_currency.strip().upper(),
+                    item.desired_timestamp,
+                    item.exchange.strip().lower() if item.exchange else None,
+                )
+                for item in request.items
+            ],
+            currency_pair_repo=currency_pair_repo,
+        )
+    except domain.exceptions.DBConnectionError as ex:
+        raise fastapi.HTTPException(
+            detail=f"Error. Failed to get the currency pairs due to unreachanble database. {ex.args[0]}",
+            status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR,
+        ) from ex
+
+    return JSONResponse(
+        content={"items": [get_conversion_rate_content(result) if result else None for result in results]},
+    )
+
+
+@api_router.get("/metrics", status_code=200)
+async def get_metrics() -> JSONResponse:
+    return JSONResponse(content=AppMetrics.snapshot())
+
+
+def get_conversion_rate_content(conversion_rate: domain.model.ConversionRate) -> dict:
+    return {
+        "conversion_rate": conversion_rate.conversion_rate,
+        "actual_timestamp_closest_to_desired": conversion_rate.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "conversion_path": [{"symbol": symbol, "inverted": inverted} for symbol, inverted in conversion_rate.path],
+    }
@@ -0,0 +1,234 @@
+"""Backfill of the history of currency pairs from archives of the exchange.
+
+Archives are kline and aggTrades files as published at data.binance.vision, zipped or not, one symbol each and named
+after it, e.g. BTCUSDT-1m-2025-01-01.zip or ETHUSDT-aggTrades-2025-01-01.csv.
+"""
+
+import argparse
+import array
+import asyncio
+import contextlib
+import csv
+import datetime
+import heapq
+import io
+import itertools
+import logging
+import math
+import pathlib
+import sys
+import tempfile
+import time
+import typing
+import zipfile
+
+from .adapters import currency_pair_repository
+from .domain import model
+from .settings import AppSettings
+
+
+# Number of buckets written in one round trip, and number of round trips in flight.
+BATCH_SIZE = 64
+CONCURRENCY = 4
+# Seconds between reports of the progress.
+PROGRESS_INTERVAL = 10
+# Number of archives of a day open at a time, more are merged in groups through temporary files first.
+MAX_OPEN_ARCHIVES = 256
+
+# Epoch in seconds, symbol and price.
+Row = tuple[float, str, float]
+
+
+class Progress:
+    def __init__(self) -> None:
+        self.rows = 0
+        self.buckets = 0
+        self.started = time.perf_counter()
+        self.reported = self.started
+
+    def report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self.reported < PROGRESS_INTERVAL:
+            return
+        self.reported = now
+        logging.info(
+            f"{self.rows} rows read and {self.buckets} buckets stored in {now - self.started:.1f} s, "
+            f"{self.rows / max(now - self.started, 1e-9):.0f} rows/s.",
+        )
+
+
+@contextlib.contextmanager
+def open_archive(path: str) -> typing.Iterator[typing.IO[bytes]]:
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive, archive.open(archive.namelist()[0]) as csv_file:
+            yield csv_file
+    else:
+        with pathlib.Path(path).open("rb") as csv_file:
+            yield csv_file
+
+
+def read_archive(path: str) -> typing.Iterator[Row]:
+    """Yield prices of the archive in chronological order, one row at a time.
+
+    Prices of klines are their close prices as of the end of the kline, prices of aggregate trades as of the trade.
+    """
+    symbol, kind = pathlib.Path(path).name.split("-")[:2]
+    is_kline = kind != "aggTrades"
+    price_column, time_column = (4, 6) if is_kline else (1, 5)
+    with open_archive(path) as csv_file:
+        for row in csv.reader(io.TextIOWrapper(csv_file, encoding="utf-8", newline="")):
+            # Some archives start with a header.
+            if not row or not row[0].isdigit():
+                continue
+            # Klines close a millisecond before the next one opens. Times are in microseconds since 2025.
+            epoch = int(row[time_column]) + (1 if is_kline else 0)
+            yield epoch / (1_000_000 if epoch >= 10**14 else 1000), symbol, float(row[price_column])
+
+
+def read_archives(paths: list[str], max_open_archives: int = MAX_OPEN_ARCHIVES) -> typing.Iterator[Row]:
+    """Yield prices of all the archives in chronological order, with at most max_open_archives of them open at a time.
+
+    Archives of a day only hold prices of that day, so days are read one after the other and only archives of the same
+    day are merged. Beyond max_open_archives they are merged in groups, each into a temporary file, and the files are
+    merged in turn.
+    """
+    # Merging fewer than two at a time would never reduce their number.
+    max_open_archives = max(max_open_archives, 2)
+    paths_by_day: dict[tuple[str, ...], list[str]] = {}
+    for path in paths:
+        # Names end with the date of the archive, e.g. BTCUSDT-1m-2025-01-01.zip.
+        paths_by_day.setdefault(tuple(pathlib.Path(path).stem.split("-")[2:]), []).append(path)
+    with tempfile.TemporaryDirectory() as directory:
+        spilled = (pathlib.Path(directory) / str(index) for index in itertools.count())
+        for day in sorted(paths_by_day):
+            chains: list[typing.Iterable[Row]] = [read_archive(path) for path in paths_by_day[day]]
+            while len(chains) > max_open_archives:
+                chains = [
+                    spill_rows(heapq.merge(*chains[index : index + max_open_archives]), next(spilled))
+                    for index in range(0, len(chains), max_open_archives)
+                ]
+            yield from heapq.merge(*chains)
+
+
+def spill_rows(rows: typing.Iterable[Row], path: pathlib.Path) -> typing.Iterator[Row]:
+    """Write the rows into the file, and return an iterator reading them back from it, then deleting it."""
+    with path.open("w", newline="") as rows_file:
+        csv.writer(rows_file).writerows(rows)
+    return read_spilled_rows(path)
+
+
+def read_spilled_rows(path: pathlib.Path) -> typing.Iterator[Row]:
+    with path.open(newline="") as rows_file:
+        for epoch, symbol, price in csv.reader(rows_file):
+            yield float(epoch), symbol, float(price)
+    path.unlink()
+
+
+def generate_currency_pair_buckets(
+    rows: typing.Iterable[Row],
+    interval: float,
+) -> typing.Iterator[model.CurrencyPairBucket]:
+    """Yield a bucket at the end of every interval holding rows, of the latest prices of all symbols seen so far."""
+    prices: dict[str, float] = {}
+    end: float | None = None
+    for epoch, symbol, price in rows:
+        row_end = math.ceil(epoch / interval) * interval
+        if end is not None and row_end > end:
+            yield get_currency_pair_bucket(prices, end)
+        end = row_end
+        prices[symbol] = price
+    if end is not None:
+        yield get_currency_pair_bucket(prices, end)
+
+
+def get_currency_pair_bucket(prices: dict[str, float], epoch: float) -> model.CurrencyPairBucket:
+    return model.CurrencyPairBucket.from_prices(
+        symbols=tuple(prices),
+        prices=array.array("d", prices.values()),
+        timestamp=datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc),
+    )
+
+
+def count_rows(rows: typing.Iterable[Row], progress: Progress) -> typing.Iterator[Row]:
+    for row in rows:
+        progress.rows += 1
+        yield row
+
+
+async def backfill_currency_pairs(  # noqa: PLR0913
+    currency_pair_repo: currency_pair_repository.AbstractCurrencyPairRepository,
+    paths: list[str],
+    interval: float,
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = CONCURRENCY,
+    now: datetime.datetime | None = None,
+    max_open_archives: int = MAX_OPEN_ARCHIVES,
+) -> Progress:
+    """Store buckets of the archives at the interval, and return how many rows were read and buckets stored.
+
+    Archives are merged by time, so memory grows with neither their size nor their number of days. Buckets are only
+    stored before the oldest stored one, so they never split a chain of deltas, and within the lifetime of buckets.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    start = (
+        now - datetime.timedelta(seconds=AppSettings.currency_pair_ttl) if AppSettings.currency_pair_ttl > 0 else None
+    )
+    end = min(
+        [
+            timestamp
+            for tier in (0, *currency_pair_repository.CURRENCY_PAIR_TIERS)
+            if (timestamp := await currency_pair_repo.retrieve_oldest_currency_pair_timestamp(tier))
+        ],
+        default=None,
+    )
+
+    progress = Progress()
+    pending: set[asyncio.Task] = set()
+    batch: list[model.CurrencyPairBucket] = []
+    rows = count_rows(read_archives(paths, max_open_archives), progress)
+    for currency_pair_bucket in generate_currency_pair_buckets(rows, interval):
+        if end and currency_pair_bucket.timestamp >= end:
+            break
+        if start and currency_pair_bucket.timestamp < start:
+            continue
+        batch.append(currency_pair_bucket)
+        if len(batch) < batch_size:
+            continue
+        if len(pending) >= concurrency:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        pending.add(asyncio.create_task(currency_pair_repo.create_currency_pair_buckets(batch)))
+        progress.buckets += len(batch)
+        batch = []
+        # Let the batch be sent while the next one is being read.
+        await asyncio.sleep(0)
+        progress.report()
+    if batch:
+        pending.add(asyncio.create_task(currency_pair_repo.create_currency_pair_buckets(batch)))
+        progress.buckets += len(batch)
+    await asyncio.gather(*pending)
+    progress.report(force=True)
+    return progress
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    await backfill_currency_pairs(
+        currency_pair_repository.get_redis_currency_pair_repository(),
+        arguments.paths,
+        arguments.interval,
+        arguments.batch_size,
+        arguments.concurrency,
+        max_open_archives=arguments.max_open_archives,
+    )
+
+
+def run() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(prog="python run.py backfill", description=__doc__)
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--interval", type=float, default=AppSettings.exchange_fetch_interval)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--max-open-archives", type=int, default=MAX_OPEN_ARCHIVES)
+    asyncio.run(main(parser.parse_args(sys.argv[2:])))
@@ -10,3 +10,7 @@ class HTTPBadResponseError(Exception):
 
 class DBConnectionError(Exception):
     pass
+
+
+class CurrencyPairFormatError(DBConnectionError):
+    pass
@@ -1,9 +1,17 @@
 """Domain model."""
 
+import array
 import datetime
+import functools
+import sys
+import typing
+
+import numpy as np
 
 
 class CurrencyPair:
+    __slots__ = ("conversion_rate", "symbol")
+
     def __init__(
         self,
         *,
@@ -13,19 +21,355 @@ class CurrencyPair:
         self.symbol = symbol
         self.conversion_rate = conversion_rate
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CurrencyPair):
+            return NotImplemented
+        return self.symbol == other.symbol and self.conversion_rate == other.conversion_rate
+
     def __hash__(self) -> int:
         raise NotImplementedError
 
 
+# Prices of a bucket, possibly viewed in place in the bytes they were unpacked from.
+PriceArray: typing.TypeAlias = "array.array[float] | memoryview[float]"
+
+
+@functools.lru_cache(maxsize=8)
+def intern_symbols(symbols: tuple[str, ...]) -> tuple[tuple[str, ...], dict[str, int]]:
+    """Return the canonical tuple of symbols and its symbol-to-index map, shared by buckets of the same universe."""
+    symbols = tuple(sys.intern(symbol) for symbol in symbols)
+    return symbols, {symbol: index for index, symbol in enumerate(symbols)}
+
+
 class CurrencyPairBucket:
+    """Snapshot of conversion rates stored as a tuple of symbols and a parallel array of prices.
+
+    A partial bucket holds only the symbols fetched more often than the rest, the others are as of preceding buckets.
+    A bucket read across partial buckets keeps the timestamp of every symbol found before its own one.
+    """
+
+    __slots__ = ("_indexes", "_timestamps", "partial", "prices", "symbols", "timestamp")
+
+    prices: PriceArray
+
     def __init__(
         self,
         *,
-        currency_pairs: list[CurrencyPair],
+        currency_pairs: typing.Iterable[CurrencyPair],
         timestamp: datetime.datetime,
+        partial: bool = False,
+        timestamps: dict[str, datetime.datetime] | None = None,
     ) -> None:
-        self.currency_pairs = currency_pairs
+        symbols: list[str] = []
+        prices = array.array("d")
+        for currency_pair in currency_pairs:
+            symbols.append(typing.cast(str, currency_pair.symbol))
+            prices.append(float(typing.cast(float, currency_pair.conversion_rate)))
+        self.symbols, self._indexes = intern_symbols(tuple(symbols))
+        self.prices = prices
+        self.timestamp = timestamp
+        self.partial = partial
+        self._timestamps = timestamps
+
+    @classmethod
+    def from_prices(
+        cls,
+        *,
+        symbols: tuple[str, ...],
+        prices: PriceArray,
+        timestamp: datetime.datetime,
+        partial: bool = False,
+    ) -> typing.Self:
+        currency_pair_bucket = cls.__new__(cls)
+        currency_pair_bucket.symbols, currency_pair_bucket._indexes = intern_symbols(symbols)  # noqa: SLF001
+        currency_pair_bucket.prices = prices
+        currency_pair_bucket.timestamp = timestamp
+        currency_pair_bucket.partial = partial
+        currency_pair_bucket._timestamps = None  # noqa: SLF001
+        return currency_pair_bucket
+
+    @property
+    def currency_pairs(self) -> list[CurrencyPair]:
+        return [
+            CurrencyPair(symbol=symbol, conversion_rate=conversion_rate)
+            for symbol, conversion_rate in zip(self.symbols, self.prices, strict=True)
+        ]
+
+    def get_conversion_rate(self, symbol: str) -> float | None:
+        if (index := self._indexes.get(symbol)) is None:
+            return None
+        return self.prices[index]
+
+    def get_timestamp(self, symbol: str) -> datetime.datetime:
+        """Return the timestamp the price of the symbol is as of."""
+        if self._timestamps:
+            return self._timestamps.get(symbol, self.timestamp)
+        return self.timestamp
+
+    def get_currency_pair(self, symbol: str) -> CurrencyPair | None:
+        if (conversion_rate := self.get_conversion_rate(symbol)) is None:
+            return None
+        return CurrencyPair(symbol=symbol, conversion_rate=conversion_rate)
+
+    def diff(self, previous_currency_pair_bucket: "CurrencyPairBucket") -> typing.Self | None:
+        """Return a bucket of symbols added or repriced since the previous bucket, or None if any symbol was removed."""
+        if self.symbols is previous_currency_pair_bucket.symbols:
+            changed = [
+                index
+                for index, (price, previous_price) in enumerate(
+                    zip(self.prices, previous_currency_pair_bucket.prices, strict=True),
+                )
+                if price != previous_price
+            ]
+        else:
+            if not self._indexes.keys() >= previous_currency_pair_bucket._indexes.keys():  # noqa: SLF001
+                return None
+            changed = [
+                index
+                for index, (symbol, price) in enumerate(zip(self.symbols, self.prices, strict=True))
+                if previous_currency_pair_bucket.get_conversion_rate(symbol) != price
+            ]
+        # Changed symbols differ from one bucket to another, so they are not interned to keep the universe interned.
+        changed_currency_pair_bucket = type(self).__new__(type(self))
+        changed_currency_pair_bucket.symbols = tuple(self.symbols[index] for index in changed)
+        changed_currency_pair_bucket._indexes = {  # noqa: SLF001
+            symbol: index for index, symbol in enumerate(changed_currency_pair_bucket.symbols)
+        }
+        changed_currency_pair_bucket.prices = array.array("d", (self.prices[index] for index in changed))
+        changed_currency_pair_bucket.timestamp = self.timestamp
+        changed_currency_pair_bucket.partial = False
+        changed_currency_pair_bucket._timestamps = None  # noqa: SLF001
+        return changed_currency_pair_bucket
+
+    def merge(self, newer_currency_pair_bucket: "CurrencyPairBucket") -> typing.Self:
+        """Return a full bucket as of the newer bucket, with the prices of the newer one for symbols of both."""
+        prices = dict(zip(self.symbols, self.prices, strict=True))
+        prices.update(zip(newer_currency_pair_bucket.symbols, newer_currency_pair_bucket.prices, strict=True))
+        return type(self).from_prices(
+            symbols=tuple(prices),
+            prices=array.array("d", prices.values()),
+            timestamp=newer_currency_pair_bucket.timestamp,
+        )
+
+    def __hash__(self) -> int:
+        raise NotImplementedError
+
+
+class OhlcBucket:
+    """Open, high, low and close prices of every symbol over a window, stored as a 4 x n array of prices.
+
+    Its timestamp is the one of the latest bucket of the window, the close prices are as of it.
+    """
+
+    __slots__ = ("prices", "symbols", "timestamp")
+
+    OPEN, HIGH, LOW, CLOSE = range(4)
+
+    def __init__(self, *, symbols: tuple[str, ...], prices: np.ndarray, timestamp: datetime.datetime) -> None:
+        self.symbols = symbols
+        self.prices = prices
         self.timestamp = timestamp
 
+    @classmethod
+    def from_currency_pair_bucket(cls, currency_pair_bucket: CurrencyPairBucket) -> typing.Self:
+        prices = np.frombuffer(currency_pair_bucket.prices, dtype=np.float64)
+        return cls(
+            symbols=currency_pair_bucket.symbols,
+            prices=np.tile(prices, (4, 1)),
+            timestamp=currency_pair_bucket.timestamp,
+        )
+
+    @classmethod
+    def merge(cls, ohlc_buckets: typing.Sequence["OhlcBucket"]) -> typing.Self:
+        """Return the OHLC bucket of the window spanned by chronologically ordered buckets, across all symbols at once.
+
+        Buckets of different universes are aligned on the union of their symbols, a symbol missing in a bucket being
+        left out of the open, high, low and close of the window.
+        """
+        symbols = ohlc_buckets[0].symbols
+        if all(ohlc_bucket.symbols == symbols for ohlc_bucket in ohlc_buckets):
+            stacked = np.stack([ohlc_bucket.prices for ohlc_bucket in ohlc_buckets])
+        else:
+            symbols = tuple(dict.fromkeys(symbol for ohlc_bucket in ohlc_buckets for symbol in ohlc_bucket.symbols))
+            indexes = {symbol: index for index, symbol in enumerate(symbols)}
+            stacked = np.full((len(ohlc_buckets), 4, len(symbols)), np.nan)
+            for one_prices, ohlc_bucket in zip(stacked, ohlc_buckets, strict=True):
+                one_prices[:, [indexes[symbol] for symbol in ohlc_bucket.symbols]] = ohlc_bucket.prices
+
+        observed = ~np.isnan(stacked[:, cls.CLOSE])
+        first = observed.argmax(axis=0)
+        last = len(ohlc_buckets) - 1 - observed[::-1].argmax(axis=0)
+        columns = np.arange(len(symbols))
+        return cls(
+            symbols=symbols,
+            prices=np.stack(
+                [
+                    stacked[first, cls.OPEN, columns],
+                    np.nanmax(stacked[:, cls.HIGH], axis=0, initial=-np.inf),
+                    np.nanmin(stacked[:, cls.LOW], axis=0, initial=np.inf),
+                    stacked[last, cls.CLOSE, columns],
+                ],
+            ),
+            timestamp=ohlc_buckets[-1].timestamp,
+        )
+
+    @property
+    def close_currency_pair_bucket(self) -> CurrencyPairBucket:
+        return CurrencyPairBucket.from_prices(
+            symbols=self.symbols,
+            prices=array.array("d", self.prices[self.CLOSE].tobytes()),
+            timestamp=self.timestamp,
+        )
+
     def __hash__(self) -> int:
         raise NotImplementedError
+
+
+# A leg of a conversion path: the symbol converted by, and whether by its inverse.
+ConversionLeg = tuple[str, bool]
+
+
+class ConversionRate(typing.NamedTuple):
+    conversion_rate: float
+    timestamp: datetime.datetime
+    path: tuple[ConversionLeg, ...]
+
+
+def get_symbol(base_asset: str, quote_asset: str, exchange: str | None = None) -> str:
+    """Return the symbol of the assets, namespaced by the exchange for buckets merged in the namespace mode."""
+    return f"{exchange}:{base_asset}{quote_asset}" if exchange else f"{base_asset}{quote_asset}"
+
+
+def split_symbol(symbol: str, quote_assets: typing.Sequence[str]) -> tuple[str, str] | None:
+    """Return the base and the quote asset of the symbol, trying the quote assets in order."""
+    for quote_asset in quote_assets:
+        if symbol.endswith(quote_asset) and len(symbol) > len(quote_asset):
+            return symbol[:-len(quote_asset)], quote_asset
+    return None
+
+
+class SymbolAssets:
+    """Base and quote assets of the symbols an exchange lists, compared by identity so that indexes are cached by it."""
+
+    __slots__ = ("_assets",)
+
+    def __init__(self, assets: dict[str, tuple[str, str]]) -> None:
+        self._assets = assets
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._assets
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def split(self, symbol: str, quote_assets: typing.Sequence[str]) -> tuple[str, str] | None:
+        """Return the listed assets of the symbol, or the ones split by the quote assets for a symbol not listed."""
+        return self._assets.get(symbol) or split_symbol(symbol, quote_assets)
+
+
+def invert_conversion_path(path: tuple[ConversionLeg, ...]) -> tuple[ConversionLeg, ...]:
+    return tuple((symbol, not inverted) for symbol, inverted in reversed(path))
+
+
+def get_conversion_rate(path: tuple[ConversionLeg, ...], currency_pair_bucket: CurrencyPairBucket) -> float | None:
+    conversion_rate = 1.0
+    for symbol, inverted in path:
+        if not (price := currency_pair_bucket.get_conversion_rate(symbol)):
+            return None
+        conversion_rate = conversion_rate / price if inverted else conversion_rate * price
+    return conversion_rate
+
+
+def get_conversion_timestamp(
+    path: tuple[ConversionLeg, ...],
+    currency_pair_bucket: CurrencyPairBucket,
+) -> datetime.datetime:
+    """Return the timestamp of the oldest leg of the path, which the conversion rate is as of."""
+    return min(currency_pair_bucket.get_timestamp(symbol) for symbol, _ in path)
+
+
+class ConversionPathIndex:
+    """Paths converting every asset into every other one through the symbols of a universe.
+
+    Every asset keeps its legs into the assets it is traded against, and its shortest path into every bridge asset. A
+    path between two assets is their direct leg if there is one, otherwise the shortest one through a bridge, the most
+    liquid bridge first, so finding it is bounded by the number of bridges rather than by the size of the universe.
+
+    Symbols are split into their assets as the exchange lists them, so that those quoted in an asset other than a bridge
+    are legs too. Symbols not listed, e.g. before the listing is loaded, are split by the bridge assets they end with.
+    """
+
+    def __init__(
+        self,
+        symbols: typing.Iterable[str],
+        bridge_assets: typing.Sequence[str],
+        symbol_assets: SymbolAssets | None = None,
+    ) -> None:
+        self._bridge_assets = tuple(bridge_assets)
+        # Longer quote assets first, so that e.g. FDUSD is not taken for USD.
+        quote_assets = sorted(self._bridge_assets, key=len, reverse=True)
+        split = symbol_assets.split if symbol_assets else split_symbol
+        self._legs: dict[str, dict[str, ConversionLeg]] = {}
+        for symbol in symbols:
+            # Symbols namespaced by an exchange are only converted by as they are, never along a path.
+            if ":" in symbol or not (assets := split(symbol, quote_assets)):
+                continue
+            base_asset, quote_asset = assets
+            self._legs.setdefault(base_asset, {})[quote_asset] = (symbol, False)
+            # A symbol traded the other way round converts without inverting.
+            self._legs.setdefault(quote_asset, {}).setdefault(base_asset, (symbol, True))
+
+        # Routes of every asset are in the order of the bridges, so that the most liquid one wins a tie.
+        self._routes: dict[str, dict[str, tuple[ConversionLeg, ...]]] = {}
+        for asset, legs in self._legs.items():
+            routes: dict[str, tuple[ConversionLeg, ...]] = {}
+            for bridge_asset in self._bridge_assets:
+                if bridge_asset == asset:
+                    routes[bridge_asset] = ()
+                elif leg := legs.get(bridge_asset):
+                    routes[bridge_asset] = (leg,)
+                elif route := self._find_route(legs, bridge_asset):
+                    routes[bridge_asset] = route
+            self._routes[asset] = routes
+
+    def _find_route(self, legs: dict[str, ConversionLeg], bridge_asset: str) -> tuple[ConversionLeg, ...] | None:
+        for via_asset in self._bridge_assets:
+            if (leg := legs.get(via_asset)) and (via_leg := self._legs[via_asset].get(bridge_asset)):
+                return leg, via_leg
+        return None
+
+    def __len__(self) -> int:
+        return len(self._legs)
+
+    @property
+    def assets(self) -> typing.KeysView[str]:
+        return self._legs.keys()
+
+    def find(self, base_asset: str, quote_asset: str) -> tuple[ConversionLeg, ...] | None:
+        if base_asset == quote_asset or base_asset not in self._legs or quote_asset not in self._legs:
+            return None
+        if leg := self._legs[base_asset].get(quote_asset):
+            return (leg,)
+        base_routes, quote_routes = self._routes[base_asset], self._routes[quote_asset]
+        best_bridge_asset, best_length = None, 0
+        for bridge_asset, base_route in base_routes.items():
+            if (quote_route := quote_routes.get(bridge_asset)) is None:
+                continue
+            if best_bridge_asset is None or len(base_route) + len(quote_route) < best_length:
+                best_bridge_asset, best_length = bridge_asset, len(base_route) + len(quote_route)
+                # Without a direct leg no path through a bridge is shorter than two legs.
+                if best_length <= 2:  # noqa: PLR2004
+                    break
+        if best_bridge_asset is None:
+            return None
+        return base_routes[best_bridge_asset] + invert_conversion_path(quote_routes[best_bridge_asset])
+
+
+@functools.lru_cache(maxsize=8)
+def get_conversion_path_index(
+    symbols: tuple[str, ...],
+    bridge_assets: tuple[str, ...],
+    symbol_assets: SymbolAssets | None = None,
+) -> ConversionPathIndex:
+    """Return the index of conversion paths of the universe, built once per universe and listing of its assets."""
+    return ConversionPathIndex(symbols, bridge_assets, symbol_assets)
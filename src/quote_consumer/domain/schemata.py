@@ -7,10 +7,16 @@ import pydantic
 from fastapi import Query
 
 
+# Number of currency pairs one batch request may ask for.
+BATCH_MAX_ITEMS = 1000
+
+
 class CurrencyPairGetRequest(pydantic.BaseModel):
     base_currency: str = pydantic.Field(Query(..., example="LTC"))
     quote_currency: str = pydantic.Field(Query(..., example="BTC"))
     desired_timestamp: datetime.datetime | None = pydantic.Field(Query(None, example="2024-11-24T12:00:00Z"))
+    # Exchange the quote is of, for symbols namespaced by exchange.
+    exchange: str | None = pydantic.Field(Query(None, example="okx"))
 
     model_config: typing.ClassVar = {
         "json_schema_extra": {
@@ -25,9 +31,16 @@ class CurrencyPairGetRequest(pydantic.BaseModel):
     }
 
 
+class ConversionLeg(pydantic.BaseModel):
+    symbol: str
+    inverted: bool
+
+
 class CurrencyPairGetResponse(pydantic.BaseModel):
     conversion_rate: float
     actual_timestamp_closest_to_desired: str
+    # Symbols the conversion rate is the product of, or of their inverses, as there may be no symbol of the currencies.
+    conversion_path: list[ConversionLeg]
 
     model_config: typing.ClassVar = {
         "json_schema_extra": {
@@ -35,7 +48,37 @@ class CurrencyPairGetResponse(pydantic.BaseModel):
                 {
                     "conversion_rate": "0.00101200",
                     "actual_timestamp_closest_to_desired": "2024-11-23T16:45:31Z",
+                    "conversion_path": [{"symbol": "LTCBTC", "inverted": False}],
                 },
             ],
         },
     }
+
+
+class CurrencyPairBatchItem(pydantic.BaseModel):
+    base_currency: str
+    quote_currency: str
+    desired_timestamp: datetime.datetime | None = None
+    exchange: str | None = None
+
+
+class CurrencyPairBatchRequest(pydantic.BaseModel):
+    items: list[CurrencyPairBatchItem] = pydantic.Field(..., max_length=BATCH_MAX_ITEMS)
+
+    model_config: typing.ClassVar = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "items": [
+                        {"base_currency": "LTC", "quote_currency": "BTC"},
+                        {"base_currency": "ETH", "quote_currency": "BTC", "desired_timestamp": "2024-11-23T16:45:31Z"},
+                    ],
+                },
+            ],
+        },
+    }
+
+
+class CurrencyPairBatchResponse(pydantic.BaseModel):
+    # None for currency pairs we don't have quotes for.
+    items: list[CurrencyPairGetResponse | None]
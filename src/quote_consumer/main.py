@@ -1,13 +1,16 @@
 """App entrypoint."""
 
 import asyncio
+import logging
 
 import fastapi
 from uvicorn import Config, Server
 
-from .adapters import currency_pair_repository
+from .adapters import currency_pair_cache, currency_pair_publisher, currency_pair_repository
 from .api import endpoints
-from .services import currency_pairs, dependencies
+from .domain import exceptions
+from .metrics import monitor_event_loop_lag
+from .services import compaction, currency_pairs, dependencies, retention
 from .settings import AppSettings
 
 
@@ -29,18 +32,42 @@ app.include_router(endpoints.api_router, prefix="/api")
 
 
 async def main() -> None:
+    try:
+        await currency_pair_repository.get_redis_currency_pair_repository().load_scripts()
+    except exceptions.DBConnectionError as ex:
+        logging.exception(f"Failed to load Lua scripts, they will be loaded on first use. {ex.args[0]}")
+
+    currency_pair_repo = currency_pair_cache.get_cached_currency_pair_repository()
+    try:
+        await currency_pair_repo.load_timestamps()
+    except exceptions.DBConnectionError as ex:
+        logging.exception(f"Failed to warm up the cache, it will be warmed up on first use. {ex.args[0]}")
+
     server = Server(Config(app=app, host=AppSettings.quote_consumer_host, port=AppSettings.quote_consumer_port))
     tasks = [
         asyncio.create_task(server.serve()),
+        asyncio.create_task(monitor_event_loop_lag(AppSettings.event_loop_lag_interval)),
+        asyncio.create_task(currency_pair_cache.reconcile_timestamps_on_schedule(currency_pair_repo)),
+        asyncio.create_task(compaction.compact_currency_pairs_on_schedule(currency_pair_repo)),
+        asyncio.create_task(retention.enforce_retention_on_schedule(currency_pair_repo)),
         asyncio.create_task(
             currency_pairs.load_currency_pairs(
                 http_client=dependencies.get_http_client(),
-                currency_pair_repo=currency_pair_repository.RedisCurrencyPairRepository(dependencies.get_db_client()),
+                currency_pair_repo=currency_pair_repo,
+                websocket_client=dependencies.get_websocket_client(),
+                currency_pair_publisher=(
+                    currency_pair_publisher.get_redis_currency_pair_publisher()
+                    if AppSettings.currency_pair_replica
+                    else None
+                ),
             ),
         ),
     ]
 
-    await asyncio.gather(*tasks)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        dependencies.shutdown_parse_executor()
 
 
 def run() -> None:
@@ -0,0 +1,92 @@
+"""App metrics."""
+
+import asyncio
+import bisect
+import collections
+import itertools
+import math
+import time
+
+# Upper bounds, in seconds, of the buckets that stalls of the event loop are counted in.
+EVENT_LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Metrics:
+    def __init__(self, window: int = 1024) -> None:
+        self.counters: collections.Counter[str] = collections.Counter()
+        self.gauges: dict[str, float] = {}
+        # The latest observations of every summary, from which its quantiles are computed.
+        self.observations: collections.defaultdict[str, collections.deque[float]] = collections.defaultdict(
+            lambda: collections.deque(maxlen=window),
+        )
+        # Upper bounds of the buckets of every histogram, and how many values fell into each of them and above the last.
+        # Unlike the observations, these counts add up across instances.
+        self.histogram_buckets: dict[str, tuple[float, ...]] = {}
+        self.histogram_counts: dict[str, list[int]] = {}
+        self.histogram_sums: collections.defaultdict[str, float] = collections.defaultdict(float)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def set(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        self.observations[name].append(value)
+
+    def record(self, name: str, value: float, buckets: tuple[float, ...]) -> None:
+        if name not in self.histogram_counts:
+            self.histogram_buckets[name] = buckets
+            self.histogram_counts[name] = [0] * (len(buckets) + 1)
+        self.histogram_counts[name][bisect.bisect_left(self.histogram_buckets[name], value)] += 1
+        self.histogram_sums[name] += value
+
+    def quantile(self, name: str, quantile: float) -> float | None:
+        if not (observations := self.observations.get(name)):
+            return None
+        ordered = sorted(observations)
+        return ordered[min(math.ceil(quantile * len(ordered)), len(ordered)) - 1]
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "summaries": {
+                name: {
+                    "count": len(observations),
+                    "p50": self.quantile(name, 0.5),
+                    "p95": self.quantile(name, 0.95),
+                    "p99": self.quantile(name, 0.99),
+                    "max": max(observations, default=None),
+                }
+                for name, observations in self.observations.items()
+            },
+            "histograms": {
+                name: {
+                    # Cumulative, as Prometheus buckets: the values less than or equal to every upper bound.
+                    "buckets": dict(
+                        zip(
+                            [*map(str, self.histogram_buckets[name]), "+Inf"],
+                            itertools.accumulate(counts),
+                            strict=True,
+                        ),
+                    ),
+                    "count": sum(counts),
+                    "sum": self.histogram_sums[name],
+                }
+                for name, counts in self.histogram_counts.items()
+            },
+        }
+
+
+AppMetrics = Metrics()
+
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """Record how much later than scheduled the event loop wakes up, i.e. how long it was stalled."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(time.perf_counter() - started - interval, 0)
+        AppMetrics.observe("event_loop_lag_seconds", lag)
+        AppMetrics.record("event_loop_lag_seconds", lag, EVENT_LOOP_LAG_BUCKETS)
@@ -0,0 +1,96 @@
+"""Migrations of the data stored in Redis."""
+
+import array
+import asyncio
+import datetime
+import logging
+
+import redis.asyncio
+
+from .adapters import currency_pair_repository
+from .domain import model
+from .services import dependencies
+
+
+def get_hash_currency_pair_bucket(
+    currency_pairs: dict[str, str],
+    timestamp: datetime.datetime,
+) -> model.CurrencyPairBucket:
+    """Return the bucket stored in the fields of a hash, partial if it is a partial bucket or a delta."""
+    is_partial = currency_pairs.pop(currency_pair_repository.PARTIAL_FIELD, None)
+    is_delta = currency_pairs.pop(currency_pair_repository.DELTA_FIELD, None)
+    return model.CurrencyPairBucket.from_prices(
+        symbols=tuple(currency_pairs),
+        prices=array.array("d", map(float, currency_pairs.values())),
+        timestamp=timestamp,
+        partial=bool(is_partial or is_delta),
+    )
+
+
+async def migrate_currency_pair_buckets_to_packed(
+    client: redis.asyncio.Redis,
+    binary_client: redis.asyncio.Redis,
+) -> int:
+    """Rewrite hash buckets as packed ones, keeping their remaining TTLs, and return the number of migrated buckets.
+
+    Partial buckets and deltas are merged onto the buckets preceding them, which are migrated first, so that they are
+    written in full. Aliases stay aliases of the same bucket.
+    """
+    packed_repo = currency_pair_repository.PackedRedisCurrencyPairRepository(binary_client)
+    migrated = 0
+
+    for tier in (0, *currency_pair_repository.CURRENCY_PAIR_TIERS):
+        index_key = currency_pair_repository.get_index_key(tier)
+        # The latest bucket before the current one that is not an alias, in full, read lazily if already packed.
+        preceding_timestamp: datetime.datetime | None = None
+        preceding_currency_pair_bucket: model.CurrencyPairBucket | None = None
+        for member, score in await client.zrange(index_key, 0, -1, withscores=True):
+            timestamp = datetime.datetime.fromtimestamp(score, datetime.timezone.utc)
+            key = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+            key_type = await client.type(key)
+
+            if key_type == "none":
+                await client.zrem(index_key, member)
+                continue
+            if key_type != "hash":
+                preceding_timestamp, preceding_currency_pair_bucket = timestamp, None
+                continue
+
+            ttl = await client.pttl(key)
+            currency_pairs = currency_pair_repository.decode_fields(await client.hgetall(key))
+            async with binary_client.pipeline(transaction=True) as pipeline:
+                if target_key := currency_pairs.get(currency_pair_repository.ALIAS_FIELD):
+                    packed_repo._queue_alias(pipeline, key, target_key)  # noqa: SLF001
+                else:
+                    currency_pair_bucket = get_hash_currency_pair_bucket(currency_pairs, timestamp)
+                    if currency_pair_bucket.partial and preceding_timestamp:
+                        if not preceding_currency_pair_bucket:
+                            preceding_currency_pair_bucket = await packed_repo._retrieve_currency_pair_bucket(  # noqa: SLF001
+                                preceding_timestamp,
+                            )
+                        currency_pair_bucket = preceding_currency_pair_bucket.merge(currency_pair_bucket)
+                    # Keyframes leave the index alone: close prices of OHLC buckets stay indexed by their own tier only.
+                    packed_repo._queue_keyframe(pipeline, key, currency_pair_bucket)  # noqa: SLF001
+                    preceding_timestamp, preceding_currency_pair_bucket = timestamp, currency_pair_bucket
+                if ttl > 0:
+                    pipeline.pexpire(key, ttl)
+                if member != str(int(score)):
+                    pipeline.zrem(index_key, member)
+                    pipeline.zadd(index_key, {str(int(score)): score})
+                await pipeline.execute()
+            migrated += 1
+
+    return migrated
+
+
+async def main() -> None:
+    migrated = await migrate_currency_pair_buckets_to_packed(
+        dependencies.get_db_client(),
+        dependencies.get_binary_db_client(),
+    )
+    logging.info(f"{migrated} currency pair buckets migrated to the packed storage format.")
+
+
+def run() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
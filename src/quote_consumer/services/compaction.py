@@ -0,0 +1,77 @@
+"""Compaction of old buckets into tiers of OHLC buckets."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from ..adapters.currency_pair_repository import CURRENCY_PAIR_TIERS, AbstractCurrencyPairRepository
+from ..domain import exceptions, model
+from ..metrics import AppMetrics
+from ..settings import AppSettings
+from . import dependencies
+
+
+def get_tier_ages() -> dict[int, int]:
+    """Return the ages after which buckets are compacted into every tier, by the tier, of the tiers compacted into."""
+    ages = dict(
+        zip(
+            CURRENCY_PAIR_TIERS,
+            (AppSettings.currency_pair_5m_tier_age, AppSettings.currency_pair_1h_tier_age),
+            strict=True,
+        ),
+    )
+    return {tier: age for tier, age in ages.items() if age > 0}
+
+
+async def compact_currency_pairs_on_schedule(currency_pair_repo: AbstractCurrencyPairRepository) -> None:
+    if not get_tier_ages():
+        return
+    while True:
+        try:
+            async with dependencies.get_maintenance_lock():
+                await compact_currency_pairs(currency_pair_repo)
+        except exceptions.DBConnectionError as ex:
+            logging.exception(f"Failed to compact currency pairs. {ex.args[0]}")
+        await asyncio.sleep(AppSettings.currency_pair_compaction_interval)
+
+
+async def compact_currency_pairs(
+    currency_pair_repo: AbstractCurrencyPairRepository,
+    now: datetime | None = None,
+) -> int:
+    """Roll buckets older than the age of every tier into OHLC buckets of the tier, and return how many were rolled.
+
+    Buckets of a tier are compacted from the previous tier one window of the width of the tier at a time, the oldest
+    first, so memory does not grow with the retention and the buckets following a window never depend on a compacted
+    one. Windows are compacted once they are over as of the age of the tier.
+    """
+    now = now or datetime.now(timezone.utc)
+    compacted = 0
+    source_tier = 0
+    for tier, age in get_tier_ages().items():
+        cutoff = now - timedelta(seconds=age)
+        while (
+            oldest_timestamp := await currency_pair_repo.retrieve_oldest_currency_pair_timestamp(source_tier)
+        ) and oldest_timestamp < cutoff:
+            start = datetime.fromtimestamp(
+                oldest_timestamp.timestamp() - oldest_timestamp.timestamp() % tier,
+                timezone.utc,
+            )
+            end = start + timedelta(seconds=tier)
+            if end > cutoff:
+                break
+            ohlc_buckets = await currency_pair_repo.retrieve_currency_pair_ohlc_buckets(start, end, source_tier)
+            if not ohlc_buckets:
+                break
+            await currency_pair_repo.create_currency_pair_ohlc_bucket(
+                model.OhlcBucket.merge(ohlc_buckets),
+                tier,
+                [ohlc_bucket.timestamp for ohlc_bucket in ohlc_buckets],
+                source_tier,
+            )
+            compacted += len(ohlc_buckets)
+            AppMetrics.increment(f"currency_pair_buckets_compacted_into_{tier}s", len(ohlc_buckets))
+        source_tier = tier
+    if compacted:
+        logging.info(f"{compacted} buckets of currency pairs compacted.")
+    return compacted
@@ -0,0 +1,59 @@
+"""Services related to paths converting assets through other ones."""
+
+import asyncio
+import datetime
+
+from ..adapters.currency_pair_repository import AbstractCurrencyPairRepository
+from ..domain import model
+from ..settings import AppSettings
+
+
+def get_bridge_assets() -> tuple[str, ...]:
+    return tuple(asset.strip() for asset in AppSettings.exchange_quote_assets.split(",") if asset.strip())
+
+
+class ConversionPaths:
+    """Index of conversion paths of the latest universe of symbols stored, rebuilt whenever the universe changes."""
+
+    def __init__(self) -> None:
+        self.conversion_path_index: model.ConversionPathIndex | None = None
+        self.symbol_assets: model.SymbolAssets | None = None
+        self.symbols: tuple[str, ...] = ()
+        # Set when the universe holds symbols the loaded assets do not list, so that they are loaded again.
+        self.unlisted_symbols = asyncio.Event()
+
+    def update(self, currency_pair_bucket: model.CurrencyPairBucket) -> None:
+        symbols = currency_pair_bucket.symbols
+        if symbols is not self.symbols:
+            self.symbols = symbols
+            if any(":" not in symbol and symbol not in (self.symbol_assets or ()) for symbol in symbols):
+                self.unlisted_symbols.set()
+        self.conversion_path_index = model.get_conversion_path_index(symbols, get_bridge_assets(), self.symbol_assets)
+
+    def update_symbol_assets(self, symbol_assets: model.SymbolAssets) -> None:
+        self.symbol_assets = symbol_assets
+        if self.symbols:
+            self.conversion_path_index = model.get_conversion_path_index(
+                self.symbols, get_bridge_assets(), symbol_assets,
+            )
+
+    def find(self, base_asset: str, quote_asset: str) -> tuple[model.ConversionLeg, ...] | None:
+        if not self.conversion_path_index:
+            return None
+        return self.conversion_path_index.find(base_asset, quote_asset)
+
+
+AppConversionPaths = ConversionPaths()
+
+
+async def retrieve_conversion_path_index(
+    desired_timestamp: datetime.datetime | None,
+    currency_pair_repo: AbstractCurrencyPairRepository,
+) -> model.ConversionPathIndex | None:
+    """Return the index of conversion paths of the universe as of the desired timestamp, the latest one for None."""
+    if not desired_timestamp:
+        return AppConversionPaths.conversion_path_index
+    # The universe may have changed since, so the paths through symbols that are gone or new would lead nowhere.
+    if not (symbols := await currency_pair_repo.retrieve_currency_pair_symbols(desired_timestamp)):
+        return None
+    return model.get_conversion_path_index(symbols, get_bridge_assets(), AppConversionPaths.symbol_assets)
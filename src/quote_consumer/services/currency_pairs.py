@@ -1,62 +1,595 @@
 """Services related to currency pairs."""
 
+import array
 import asyncio
+import concurrent.futures
+import hashlib
+import json
 import logging
+import statistics
+import time
+import typing
 from datetime import datetime, timezone
 
-from ..adapters.currency_pair_repository import AbstractCurrencyPairRepository
+from ..adapters.currency_pair_publisher import AbstractCurrencyPairPublisher
+from ..adapters.currency_pair_repository import AbstractCurrencyPairRepository, get_partial_bucket_limit
+from ..adapters.currency_pair_source import (
+    AbstractCurrencyPairSource,
+    Prices,
+    get_currency_pair_sources,
+    parse_exchange_info,
+)
 from ..adapters.http_client import AbstractHttpClient
+from ..adapters.websocket_client import AbstractWebSocketClient
 from ..domain import exceptions, model
+from ..metrics import AppMetrics
 from ..settings import AppSettings
+from . import dependencies
+from .conversion_paths import AppConversionPaths
+from .fetch_interval import AdaptiveFetchInterval
+
+
+# A snapshot of currency pairs: the scheduled tick it was taken at and its bucket.
+Snapshot = tuple[datetime, model.CurrencyPairBucket]
+
+HEDGE_DELAY_MIN_OBSERVATIONS = 20
 
 
 async def load_currency_pairs(
         http_client: AbstractHttpClient,
         currency_pair_repo: AbstractCurrencyPairRepository,
+        websocket_client: AbstractWebSocketClient | None = None,
+        currency_pair_publisher: AbstractCurrencyPairPublisher | None = None,
+) -> None:
+    # Fetching and storing run concurrently, so a slow Redis never delays the next fetch.
+    snapshots: asyncio.Queue[Snapshot] = asyncio.Queue(maxsize=AppSettings.exchange_queue_size)
+    async with http_client, asyncio.TaskGroup() as task_group:
+        if AppSettings.exchange_ingest_mode == "websocket" and websocket_client:
+            task_group.create_task(stream_currency_pairs(websocket_client, snapshots))
+        else:
+            task_group.create_task(
+                fetch_currency_pairs_on_schedule(
+                    http_client,
+                    snapshots,
+                    adaptive_interval=(
+                        AdaptiveFetchInterval() if AppSettings.exchange_fetch_schedule == "adaptive" else None
+                    ),
+                ),
+            )
+        task_group.create_task(store_currency_pairs(snapshots, currency_pair_repo, currency_pair_publisher))
+        if AppSettings.exchange_info_url:
+            task_group.create_task(load_symbol_assets_on_change(http_client))
+
+
+async def load_symbol_assets_on_change(http_client: AbstractHttpClient) -> None:
+    """Load the assets of symbols at start, and again whenever the universe holds symbols they do not list."""
+    while True:
+        AppConversionPaths.unlisted_symbols.clear()
+        if symbol_assets := await load_symbol_assets(http_client):
+            AppConversionPaths.update_symbol_assets(symbol_assets)
+        await AppConversionPaths.unlisted_symbols.wait()
+
+
+async def load_symbol_assets(http_client: AbstractHttpClient) -> model.SymbolAssets | None:
+    logging.info(f"Trying to load the assets of symbols from {AppSettings.exchange_info_url}.")
+    try:
+        response = await http_client.get(AppSettings.exchange_info_url)
+        symbol_assets = await parse_off_loop(parse_exchange_info, response.content)
+    except (
+        exceptions.HTTPBadRequestError,
+        exceptions.HTTPBadResponseError,
+        ValueError,
+        concurrent.futures.BrokenExecutor,
+    ):
+        logging.exception("Failed to load the assets of symbols.")
+        return None
+    logging.info("Assets of symbols successfully loaded.")
+    return model.SymbolAssets(symbol_assets)
+
+
+def get_next_tick(now: float, interval: float) -> float:
+    """Return the first wall-clock boundary after now, e.g. :00 or :30 of every minute for an interval of 30 s."""
+    if interval <= 0:
+        return now
+    return (now // interval + 1) * interval
+
+
+async def fetch_currency_pairs_on_schedule(
+    http_client: AbstractHttpClient,
+    snapshots: asyncio.Queue[Snapshot],
+    sources: list[AbstractCurrencyPairSource] | None = None,
+    adaptive_interval: AdaptiveFetchInterval | None = None,
+) -> None:
+    """Fetch every source due on a tick concurrently, and merge the latest prices of all sources into a snapshot.
+
+    On ticks only the hot tier is due on, the snapshot is a partial one of the hot tier alone. With an adaptive
+    interval, the intervals of all sources are scaled by the ratio of the adaptive interval to exchange_fetch_interval.
+    """
+    sources = sources if sources is not None else get_currency_pair_sources()
+    prices_by_source: dict[str, Prices] = {}
+    hot_prices_by_source: dict[str, Prices] = {}
+    fingerprints: dict[str, bytes] = {}
+    next_fetches = dict.fromkeys((source.key for source in sources), 0.0)
+    base_interval = min((source.fetch_interval for source in sources), default=AppSettings.exchange_fetch_interval)
+    scale = get_interval_scale(adaptive_interval.interval) if adaptive_interval else 1.0
+    interval = base_interval * scale
+    tick = get_next_tick(time.time(), interval)
+    while True:
+        await asyncio.sleep(max(tick - time.time(), 0))
+        AppMetrics.set("ingest_tick_lag_seconds", time.time() - tick)
+        due_sources = [source for source in sources if next_fetches[source.key] <= tick]
+        await asyncio.gather(
+            *(
+                update_prices_from_source(
+                    http_client,
+                    source,
+                    hot_prices_by_source if source.tier == "hot" else prices_by_source,
+                    fingerprints,
+                )
+                for source in due_sources
+            ),
+        )
+        for source in due_sources:
+            next_fetches[source.key] = get_next_tick(tick, source.fetch_interval * scale)
+        timestamp = datetime.fromtimestamp(tick, timezone.utc)
+        if all(source.tier == "hot" for source in due_sources):
+            # Prices of the full tier are not fetched on the tick, so they are not stored again as of it.
+            currency_pair_bucket = (
+                merge_currency_pairs(hot_prices_by_source, timestamp, partial=True) if hot_prices_by_source else None
+            )
+        elif prices_by_source:
+            currency_pair_bucket = merge_currency_pairs(prices_by_source, timestamp)
+        else:
+            currency_pair_bucket = None
+        if currency_pair_bucket:
+            enqueue_snapshot(snapshots, (timestamp, currency_pair_bucket))
+        if currency_pair_bucket and adaptive_interval:
+            scale = get_interval_scale(adaptive_interval.update(currency_pair_bucket))
+            interval = base_interval * scale
+            # A shorter interval takes effect right away rather than once the fetches already scheduled are due.
+            for source in sources:
+                next_fetches[source.key] = min(
+                    next_fetches[source.key],
+                    get_next_tick(tick, source.fetch_interval * scale),
+                )
+
+        next_tick = get_next_tick(time.time(), interval)
+        if interval > 0 and (missed_ticks := round((next_tick - tick) / interval) - 1) > 0:
+            AppMetrics.increment("ingest_missed_ticks", missed_ticks)
+            logging.warning(f"Fetching currency pairs took longer than the interval, {missed_ticks} ticks missed.")
+        tick = next_tick
+
+
+def get_interval_scale(adaptive_interval: float) -> float:
+    """Return the ratio fetch intervals of all sources are scaled by for the adaptive interval to be the base one."""
+    if AppSettings.exchange_fetch_interval <= 0:
+        return 1.0
+    return adaptive_interval / AppSettings.exchange_fetch_interval
+
+
+async def stream_currency_pairs(
+    websocket_client: AbstractWebSocketClient,
+    snapshots: asyncio.Queue[Snapshot],
+) -> None:
+    """Keep a live table of prices updated tick by tick and flush it into snapshots on wall-clock aligned ticks."""
+    prices: dict[str, float] = {}
+    traded_at: dict[str, float] = {}
+    async with asyncio.TaskGroup() as task_group:
+        task_group.create_task(update_prices(websocket_client, prices, traded_at))
+        task_group.create_task(flush_prices_on_schedule(prices, traded_at, snapshots))
+
+
+async def update_prices(
+    websocket_client: AbstractWebSocketClient,
+    prices: dict[str, float],
+    traded_at: dict[str, float],
+) -> None:
+    async for message in websocket_client.listen(AppSettings.exchange_websocket_url):
+        try:
+            tickers = await parse_off_loop(parse_mini_tickers, message)
+        except (ValueError, AttributeError, TypeError, concurrent.futures.BrokenExecutor):
+            logging.exception("Failed to parse currency pairs.")
+        else:
+            prices.update(tickers)
+            traded_at.update(dict.fromkeys(tickers, time.time()))
+        AppMetrics.increment("websocket_messages")
+
+
+def expire_prices(prices: dict[str, float], traded_at: dict[str, float], now: float) -> None:
+    """Drop the symbols without a trade within the staleness window, so that they are not stamped as fresh prices."""
+    stale_before = now - AppSettings.exchange_price_staleness
+    for symbol in [symbol for symbol, timestamp in traded_at.items() if timestamp < stale_before]:
+        del prices[symbol], traded_at[symbol]
+
+
+def parse_mini_tickers(message: str | bytes) -> dict[str, float]:
+    return {
+        ticker["s"]: float(ticker["c"])
+        for ticker in json.loads(message)
+        if ticker.get("s") and ticker.get("c") is not None
+    }
+
+
+async def parse_off_loop[T](parse: typing.Callable[[typing.Any], T], content: str | bytes) -> T:
+    """Parse a payload in the parse executor, so that requests served on the event loop are not stalled meanwhile."""
+    if AppSettings.exchange_parse_executor == "inline":
+        return parse(content)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(dependencies.get_parse_executor(), parse, content)
+    except concurrent.futures.BrokenExecutor:
+        # A pool whose worker has died stays broken, so the next payload is parsed by a new one.
+        dependencies.shutdown_parse_executor()
+        raise
+
+
+async def flush_prices_on_schedule(
+    prices: dict[str, float],
+    traded_at: dict[str, float],
+    snapshots: asyncio.Queue[Snapshot],
+) -> None:
+    tick = get_next_tick(time.time(), AppSettings.exchange_flush_interval)
+    while True:
+        await asyncio.sleep(max(tick - time.time(), 0))
+        expire_prices(prices, traded_at, time.time())
+        if prices:
+            timestamp = datetime.fromtimestamp(tick, timezone.utc)
+            # Its symbols stay the same interned tuple until a symbol is listed or expires.
+            enqueue_snapshot(
+                snapshots,
+                (
+                    timestamp,
+                    model.CurrencyPairBucket.from_prices(
+                        symbols=tuple(prices),
+                        prices=array.array("d", prices.values()),
+                        timestamp=timestamp,
+                    ),
+                ),
+            )
+        tick = get_next_tick(time.time(), AppSettings.exchange_flush_interval)
+
+
+async def update_prices_from_source(
+    http_client: AbstractHttpClient,
+    source: AbstractCurrencyPairSource,
+    prices_by_source: dict[str, Prices],
+    fingerprints: dict[str, bytes],
+) -> None:
+    """Replace the prices of the source by the ones fetched, or evict them if the fetch fails.
+
+    The prices of a source that failed are not merged into the next buckets, as they would be stamped as fresh ones.
+    """
+    content = await fetch_currency_pairs(
+        http_client,
+        source.url,
+        source.mirror_urls,
+        f"{source.name}_fetch_seconds",
+    )
+    # An unchanged response is not parsed again.
+    if content and (fingerprint := get_fingerprint(content)) == fingerprints.get(source.key):
+        return
+    if not content or not (prices := await parse_prices_from_source(source, content)):
+        prices_by_source.pop(source.name, None)
+        fingerprints.pop(source.key, None)
+        return
+    prices_by_source[source.name] = prices
+    fingerprints[source.key] = fingerprint
+
+
+async def parse_prices_from_source(source: AbstractCurrencyPairSource, content: bytes) -> Prices | None:
+    try:
+        symbols, prices = await parse_off_loop(source.parse, content)
+    except (ValueError, KeyError, AttributeError, TypeError, concurrent.futures.BrokenExecutor):
+        logging.exception(f"Failed to parse currency pairs from {source.name}.")
+        return None
+    # An error of an exchange is a JSON object without tickers, e.g. {"code": -1003}.
+    if not symbols:
+        logging.error(f"Failed to parse currency pairs from {source.name}. No tickers in the response.")
+        return None
+    return symbols, prices
+
+
+def merge_currency_pairs(
+    prices_by_source: dict[str, Prices],
+    timestamp: datetime,
+    partial: bool = False,
+) -> model.CurrencyPairBucket:
+    """Merge prices of all sources into symbols namespaced by source, or into the median price of every symbol."""
+    if AppSettings.exchange_merge_mode == "namespace":
+        symbols = tuple(
+            f"{source}:{symbol}"
+            for source, (source_symbols, _) in prices_by_source.items()
+            for symbol in source_symbols
+        )
+        prices = array.array("d")
+        for _, source_prices in prices_by_source.values():
+            prices.extend(source_prices)
+    elif len(prices_by_source) == 1:
+        # Parsed prices become the bucket as they are.
+        symbols, prices = next(iter(prices_by_source.values()))
+    else:
+        all_prices: dict[str, list[float]] = {}
+        for source_symbols, source_prices in prices_by_source.values():
+            for symbol, price in zip(source_symbols, source_prices, strict=True):
+                all_prices.setdefault(symbol, []).append(price)
+        symbols = tuple(all_prices)
+        prices = array.array("d", (statistics.median(symbol_prices) for symbol_prices in all_prices.values()))
+    return model.CurrencyPairBucket.from_prices(symbols=symbols, prices=prices, timestamp=timestamp, partial=partial)
+
+
+def enqueue_snapshot(snapshots: asyncio.Queue[Snapshot], snapshot: Snapshot) -> None:
+    if snapshots.full():
+        if AppSettings.exchange_queue_policy == "drop":
+            AppMetrics.increment("ingest_snapshots_dropped")
+            logging.warning("Storing currency pairs lags behind, the latest snapshot dropped.")
+            return
+        # Coalesce: pending snapshots give way to the latest one.
+        while not snapshots.empty():
+            snapshots.get_nowait()
+            snapshots.task_done()
+            AppMetrics.increment("ingest_snapshots_coalesced")
+        logging.warning("Storing currency pairs lags behind, pending snapshots coalesced to the latest one.")
+    snapshots.put_nowait(snapshot)
+    AppMetrics.set("ingest_queue_size", snapshots.qsize())
+
+
+async def store_currency_pairs(
+    snapshots: asyncio.Queue[Snapshot],
+    currency_pair_repo: AbstractCurrencyPairRepository,
+    currency_pair_publisher: AbstractCurrencyPairPublisher | None = None,
 ) -> None:
-    async with http_client:
-        while True:
-            if currency_pairs_json := await fetch_currency_pairs(http_client):
-                currency_pair_bucket = create_currency_pair_bucket_from_json(currency_pairs_json)
-                await save_currency_pair_bucket(currency_pair_bucket, currency_pair_repo)
+    previous_currency_pair_bucket: model.CurrencyPairBucket | None = None
+    previous_fingerprint: bytes | None = None
+    buckets_since_keyframe = 0
+    partial_buckets = 0
+    while True:
+        timestamp, currency_pair_bucket = await snapshots.get()
+        full_currency_pair_bucket = currency_pair_bucket
+        if currency_pair_bucket.partial:
+            # Symbols missing in a partial bucket are as of the buckets before it.
+            full_currency_pair_bucket = (
+                previous_currency_pair_bucket.merge(currency_pair_bucket)
+                if previous_currency_pair_bucket
+                else model.CurrencyPairBucket.from_prices(
+                    symbols=currency_pair_bucket.symbols,
+                    prices=currency_pair_bucket.prices,
+                    timestamp=timestamp,
+                )
+            )
+        fingerprint = get_currency_pair_bucket_fingerprint(full_currency_pair_bucket)
+        if currency_pair_bucket.partial and partial_buckets < get_partial_bucket_limit():
+            if await save_currency_pair_partial_bucket(
+                full_currency_pair_bucket,
+                currency_pair_bucket,
+                currency_pair_repo,
+            ):
+                # Deltas are taken against the prices readers see, the ones of partial buckets included.
+                previous_currency_pair_bucket = full_currency_pair_bucket
+                previous_fingerprint = None
+                partial_buckets += 1
+                # Replicas hold all symbols, so they get the hot tier merged into the latest prices of the rest.
+                await publish_currency_pair_bucket(full_currency_pair_bucket, currency_pair_publisher)
+        elif (
+            previous_currency_pair_bucket
+            and fingerprint == previous_fingerprint
+            and can_create_currency_pair_alias(buckets_since_keyframe)
+        ):
+            # The snapshot is unchanged, so it is not stored again.
+            alias_currency_pair_bucket = model.CurrencyPairBucket.from_prices(
+                symbols=previous_currency_pair_bucket.symbols,
+                prices=previous_currency_pair_bucket.prices,
+                timestamp=timestamp,
+            )
+            if await save_currency_pair_alias(
+                alias_currency_pair_bucket,
+                previous_currency_pair_bucket.timestamp,
+                currency_pair_repo,
+            ):
+                buckets_since_keyframe += 1
+                await publish_currency_pair_bucket(alias_currency_pair_bucket, currency_pair_publisher)
+        else:
+            # Reads walk back through a bounded number of partial buckets in a row, so a partial snapshot beyond it,
+            # e.g. while all symbols fail to be fetched, is stored merged into a full one.
+            changed_currency_pair_bucket = get_changed_currency_pair_bucket(
+                full_currency_pair_bucket,
+                previous_currency_pair_bucket,
+                buckets_since_keyframe,
+            )
+            if await save_currency_pair_bucket(
+                full_currency_pair_bucket,
+                currency_pair_repo,
+                changed_currency_pair_bucket,
+            ):
+                previous_currency_pair_bucket = full_currency_pair_bucket
+                previous_fingerprint = fingerprint
+                buckets_since_keyframe = buckets_since_keyframe + 1 if changed_currency_pair_bucket else 0
+                partial_buckets = 0
+                # Built at ingest, and only when the universe changes, so conversions just look their path up.
+                AppConversionPaths.update(full_currency_pair_bucket)
+                await publish_currency_pair_bucket(full_currency_pair_bucket, currency_pair_publisher)
 
-            await asyncio.sleep(AppSettings.exchange_fetch_interval)
+        AppMetrics.set("ingest_store_lag_seconds", time.time() - timestamp.timestamp())
+        AppMetrics.set("ingest_queue_size", snapshots.qsize())
+        snapshots.task_done()
 
 
-async def fetch_currency_pairs(http_client: AbstractHttpClient) -> list[dict] | None:
-    logging.info(f"Trying to fetch currency pairs from {AppSettings.exchange_api_url.unicode_string()}.")
+async def fetch_currency_pairs(
+    http_client: AbstractHttpClient,
+    url: str | None = None,
+    mirror_urls: typing.Sequence[str] = (),
+    latency_metric: str = "exchange_fetch_seconds",
+) -> bytes | None:
+    url = url or AppSettings.exchange_api_url.unicode_string()
+    logging.info(f"Trying to fetch currency pairs from {url}.")
+    started = time.perf_counter()
     try:
-        response = await http_client.get(AppSettings.exchange_api_url.unicode_string())
+        response = await get_hedged(http_client, [url, *mirror_urls], get_hedge_delay(latency_metric))
     except (exceptions.HTTPBadRequestError, exceptions.HTTPBadResponseError) as ex:
         logging.exception(f"Failed to fetch currency pairs. {ex.args[0]}")
     else:
+        AppMetrics.observe(latency_metric, time.perf_counter() - started)
         logging.info("Currency pairs successfully fetched.")
-        return list(response.json())
+        return typing.cast(bytes, response.content)
     return None
 
 
-def create_currency_pair_bucket_from_json(currency_pairs_json: list[dict]) -> model.CurrencyPairBucket:
-    currency_pairs = [
-        model.CurrencyPair(symbol=one_currency_pair.get("symbol"), conversion_rate=one_currency_pair.get("price"))
+def get_hedge_delay(latency_metric: str) -> float:
+    # A p95 of a handful of fetches is mostly noise, so the configured delay is used until enough are observed.
+    if len(AppMetrics.observations.get(latency_metric, ())) < HEDGE_DELAY_MIN_OBSERVATIONS:
+        return AppSettings.exchange_hedge_delay
+    return typing.cast(float, AppMetrics.quantile(latency_metric, 0.95))
+
+
+async def get_hedged(http_client: AbstractHttpClient, urls: typing.Sequence[str], hedge_delay: float) -> typing.Any:
+    """Request the first URL, and the next mirror whenever no response arrives within the hedge delay or one fails.
+
+    The first good response wins and the requests still in flight are cancelled.
+    """
+    if len(urls) == 1:
+        return await http_client.get(urls[0])
+
+    remaining_urls = iter(urls)
+    pending = {asyncio.create_task(http_client.get(next(remaining_urls)))}
+    error: BaseException | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if (error := task.exception()) is None:
+                    return task.result()
+            if (url := next(remaining_urls, None)) is not None:
+                if not done:
+                    AppMetrics.increment("exchange_hedged_requests")
+                    logging.warning(f"No response within {hedge_delay:.3f} s, requesting {url} as well.")
+                pending.add(asyncio.create_task(http_client.get(url)))
+    finally:
+        for task in pending:
+            task.cancel()
+    raise typing.cast(BaseException, error)
+
+
+def get_fingerprint(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def get_currency_pair_bucket_fingerprint(currency_pair_bucket: model.CurrencyPairBucket) -> bytes:
+    fingerprint = hashlib.blake2b(digest_size=16)
+    fingerprint.update("\n".join(currency_pair_bucket.symbols).encode())
+    fingerprint.update(currency_pair_bucket.prices)
+    return fingerprint.digest()
+
+
+def create_currency_pair_bucket_from_json(
+    currency_pairs_json: list[dict],
+    timestamp: datetime | None = None,
+) -> model.CurrencyPairBucket:
+    currency_pairs_json = [
+        one_currency_pair
         for one_currency_pair in currency_pairs_json
+        if one_currency_pair.get("symbol") and one_currency_pair.get("price") is not None
     ]
-    return model.CurrencyPairBucket(
-        currency_pairs=currency_pairs,
-        timestamp=datetime.now(timezone.utc),
+    return model.CurrencyPairBucket.from_prices(
+        symbols=tuple(one_currency_pair["symbol"] for one_currency_pair in currency_pairs_json),
+        prices=array.array("d", (float(one_currency_pair["price"]) for one_currency_pair in currency_pairs_json)),
+        timestamp=timestamp or datetime.now(timezone.utc),
+    )
+
+
+def get_changed_currency_pair_bucket(
+    currency_pair_bucket: model.CurrencyPairBucket,
+    previous_currency_pair_bucket: model.CurrencyPairBucket | None,
+    buckets_since_keyframe: int,
+) -> model.CurrencyPairBucket | None:
+    """Return the currency pairs changed since the previous bucket, or None if the bucket is due as a keyframe."""
+    if (
+        previous_currency_pair_bucket is None
+        or buckets_since_keyframe + 1 >= AppSettings.currency_pair_keyframe_interval
+    ):
+        return None
+    return currency_pair_bucket.diff(previous_currency_pair_bucket)
+
+
+def can_create_currency_pair_alias(buckets_since_keyframe: int) -> bool:
+    # Reads walk back through aliases as well as deltas, so aliases count towards the keyframe interval.
+    return (
+        AppSettings.currency_pair_keyframe_interval == 1
+        or buckets_since_keyframe + 1 < AppSettings.currency_pair_keyframe_interval
     )
 
 
 async def save_currency_pair_bucket(
     currency_pair_bucket: model.CurrencyPairBucket,
     currency_pair_repo: AbstractCurrencyPairRepository,
-) -> None:
+    changed_currency_pair_bucket: model.CurrencyPairBucket | None = None,
+) -> bool:
     try:
-        await currency_pair_repo.create_currency_pair_bucket(currency_pair_bucket=currency_pair_bucket)
+        await currency_pair_repo.create_currency_pair_bucket(
+            currency_pair_bucket=currency_pair_bucket,
+            changed_currency_pair_bucket=changed_currency_pair_bucket,
+        )
     except Exception as ex:
         logging.exception(f"Failed to store currency pairs. {ex.args[0]}")
+        return False
     else:
         logging.info(
             f"Currency pairs successfully stored with key: {
                 currency_pair_bucket.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
             }",
         )
+        return True
+
+
+async def publish_currency_pair_bucket(
+    currency_pair_bucket: model.CurrencyPairBucket,
+    currency_pair_publisher: AbstractCurrencyPairPublisher | None,
+) -> None:
+    if not currency_pair_publisher:
+        return
+    # Replicas resync on the next update, so a failed one is not retried.
+    try:
+        await currency_pair_publisher.publish_currency_pair_bucket(currency_pair_bucket)
+    except Exception as ex:
+        logging.exception(f"Failed to publish currency pairs. {ex.args[0]}")
+
+
+async def save_currency_pair_partial_bucket(
+    currency_pair_bucket: model.CurrencyPairBucket,
+    partial_currency_pair_bucket: model.CurrencyPairBucket,
+    currency_pair_repo: AbstractCurrencyPairRepository,
+) -> bool:
+    try:
+        await currency_pair_repo.create_currency_pair_partial_bucket(
+            currency_pair_bucket=currency_pair_bucket,
+            partial_currency_pair_bucket=partial_currency_pair_bucket,
+        )
+    except Exception as ex:
+        logging.exception(f"Failed to store currency pairs. {ex.args[0]}")
+        return False
+    else:
+        logging.info(
+            f"Hot currency pairs successfully stored with key: {
+                currency_pair_bucket.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+            }",
+        )
+        return True
+
+
+async def save_currency_pair_alias(
+    currency_pair_bucket: model.CurrencyPairBucket,
+    target_timestamp: datetime,
+    currency_pair_repo: AbstractCurrencyPairRepository,
+) -> bool:
+    try:
+        await currency_pair_repo.create_currency_pair_alias(
+            currency_pair_bucket=currency_pair_bucket,
+            target_timestamp=target_timestamp,
+        )
+    except Exception as ex:
+        logging.exception(f"Failed to store currency pairs. {ex.args[0]}")
+        return False
+    else:
+        logging.info(
+            f"Currency pairs unchanged, stored with key: {
+                currency_pair_bucket.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+            } as an alias of {target_timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")}",
+        )
+        return True
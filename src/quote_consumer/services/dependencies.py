@@ -1,10 +1,13 @@
 """Services related to database."""
 
+import asyncio
+import concurrent.futures
+import multiprocessing
 from functools import lru_cache
 
 import redis.asyncio
 
-from ..adapters import http_client
+from ..adapters import http_client, websocket_client
 from ..settings import AppSettings
 
 
@@ -13,6 +16,45 @@ def get_db_client() -> redis.asyncio.Redis:
     return redis.asyncio.Redis(host=AppSettings.db_host, port=AppSettings.db_port, decode_responses=True)
 
 
+@lru_cache
+def get_binary_db_client() -> redis.asyncio.Redis:
+    return redis.asyncio.Redis(host=AppSettings.db_host, port=AppSettings.db_port)
+
+
 @lru_cache
 def get_http_client() -> http_client.AbstractHttpClient:
-    return http_client.HttpxClient()
+    return http_client.HttpxClient(
+        connect_timeout=AppSettings.exchange_connect_timeout,
+        read_timeout=AppSettings.exchange_read_timeout,
+        http2=AppSettings.exchange_http2,
+    )
+
+
+@lru_cache
+def get_parse_executor() -> concurrent.futures.Executor | None:
+    # None stands for the default thread pool of the event loop.
+    if AppSettings.exchange_parse_executor == "process":
+        # A forked worker would inherit the threads and sockets of the server, so it is started from a fresh process.
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return None
+
+
+def shutdown_parse_executor() -> None:
+    """Shut the worker of the parse executor down, if one is started, so that the next payload starts a new one."""
+    if get_parse_executor.cache_info().currsize and (executor := get_parse_executor()):
+        executor.shutdown(wait=False, cancel_futures=True)
+    get_parse_executor.cache_clear()
+
+
+@lru_cache
+def get_maintenance_lock() -> asyncio.Lock:
+    # Compaction and retention both rewrite and delete buckets of tier 0, so they take turns.
+    return asyncio.Lock()
+
+
+@lru_cache
+def get_websocket_client() -> websocket_client.AbstractWebSocketClient:
+    return websocket_client.WebSocketsClient()
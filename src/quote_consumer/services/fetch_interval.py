@@ -0,0 +1,90 @@
+"""Fetch interval adapting to the volatility of prices."""
+
+import logging
+import math
+import statistics
+import typing
+
+from ..adapters.currency_pair_source import get_hot_symbols
+from ..domain import model
+from ..metrics import AppMetrics
+from ..settings import AppSettings
+
+
+Reason = typing.Literal["warming_up", "volatile", "calm", "target_move"]
+
+
+class AdaptiveFetchInterval:
+    """Interval at which prices of the tracked symbols are expected to move by the target move.
+
+    Absolute returns between consecutive buckets are averaged across the tracked symbols (every symbol if none are),
+    brought to one second assuming prices follow a random walk, and smoothed by an exponentially weighted moving
+    average. Prices moving by v per square root of a second are expected to move by the target within
+    (target / v) ** 2 seconds, which is kept between the bounds.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = AppSettings.exchange_min_fetch_interval,
+        max_interval: float = AppSettings.exchange_max_fetch_interval,
+        target_price_move: float = AppSettings.exchange_target_price_move,
+        smoothing: float = AppSettings.exchange_volatility_smoothing,
+        symbols: typing.Sequence[str] | None = None,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_price_move = target_price_move
+        self.smoothing = smoothing
+        self.symbols = symbols if symbols is not None else get_hot_symbols()
+        self.volatility: float | None = None
+        self.interval = min(max(AppSettings.exchange_fetch_interval, min_interval), max_interval)
+        self.reason: Reason = "warming_up"
+        self._previous_currency_pair_bucket: model.CurrencyPairBucket | None = None
+
+    def update(self, currency_pair_bucket: model.CurrencyPairBucket) -> float:
+        """Take the prices of the next bucket into account and return the interval to fetch the one after it in."""
+        previous_currency_pair_bucket = self._previous_currency_pair_bucket
+        self._previous_currency_pair_bucket = currency_pair_bucket
+        if previous_currency_pair_bucket is None:
+            return self.interval
+        elapsed = (currency_pair_bucket.timestamp - previous_currency_pair_bucket.timestamp).total_seconds()
+        absolute_return = get_mean_absolute_return(previous_currency_pair_bucket, currency_pair_bucket, self.symbols)
+        if elapsed <= 0 or absolute_return is None:
+            return self.interval
+
+        volatility = absolute_return / math.sqrt(elapsed)
+        self.volatility = (
+            volatility
+            if self.volatility is None
+            else self.smoothing * volatility + (1 - self.smoothing) * self.volatility
+        )
+        interval = (self.target_price_move / self.volatility) ** 2 if self.volatility else math.inf
+        previous_reason = self.reason
+        if interval <= self.min_interval:
+            self.interval, self.reason = self.min_interval, "volatile"
+        elif interval >= self.max_interval:
+            self.interval, self.reason = self.max_interval, "calm"
+        else:
+            self.interval, self.reason = interval, "target_move"
+
+        AppMetrics.set("exchange_fetch_interval_seconds", self.interval)
+        AppMetrics.set("exchange_volatility", self.volatility)
+        AppMetrics.increment(f"exchange_fetch_interval_reason_{self.reason}")
+        if self.reason != previous_reason:
+            logging.info(f"Fetch interval set to {self.interval:.1f} s ({self.reason}).")
+        return self.interval
+
+
+def get_mean_absolute_return(
+    previous_currency_pair_bucket: model.CurrencyPairBucket,
+    currency_pair_bucket: model.CurrencyPairBucket,
+    symbols: typing.Sequence[str] = (),
+) -> float | None:
+    """Return the mean absolute return of symbols priced in both buckets, or None if there are none."""
+    absolute_returns = [
+        abs(price / previous_price - 1)
+        for symbol in symbols or currency_pair_bucket.symbols
+        if (price := currency_pair_bucket.get_conversion_rate(symbol)) is not None
+        and (previous_price := previous_currency_pair_bucket.get_conversion_rate(symbol))
+    ]
+    return statistics.fmean(absolute_returns) if absolute_returns else None
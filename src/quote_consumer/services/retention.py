@@ -0,0 +1,113 @@
+"""Retention of buckets within their lifetime and the memory budget."""
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+
+from ..adapters.currency_pair_repository import CURRENCY_PAIR_TIERS, AbstractCurrencyPairRepository
+from ..domain import exceptions
+from ..metrics import AppMetrics
+from ..settings import AppSettings
+from . import dependencies
+
+
+# Number of buckets deleted at once.
+EVICTION_BATCH_SIZE = 1000
+# Weight of the latest growth of the footprint in the exponentially weighted moving average of its growth rate.
+GROWTH_RATE_SMOOTHING = 0.2
+
+
+class RetentionManager:
+    """Evicts buckets older than currency_pair_ttl, then the oldest ones for as long as they exceed the memory budget.
+
+    Redis does not expire buckets by itself, so their timestamps are always evicted along with them. The footprint of
+    buckets is exported as currency_pair_memory_bytes, and the days left until it reaches the budget at the rate it
+    has grown at between runs as currency_pair_days_to_memory_budget.
+    """
+
+    def __init__(
+        self,
+        currency_pair_repo: AbstractCurrencyPairRepository,
+        memory_budget: int = AppSettings.currency_pair_memory_budget,
+    ) -> None:
+        self._currency_pair_repo = currency_pair_repo
+        self._memory_budget = memory_budget
+        # The footprint left by the previous run and when it was measured.
+        self._footprint: int | None = None
+        self._measured_at: datetime | None = None
+        # Bytes per second.
+        self._growth_rate: float | None = None
+
+    async def enforce(self, now: datetime | None = None) -> int:
+        """Evict buckets beyond the lifetime and the memory budget, and return how many were evicted."""
+        now = now or datetime.now(timezone.utc)
+        evicted = 0
+        if AppSettings.currency_pair_ttl > 0:
+            before = now - timedelta(seconds=AppSettings.currency_pair_ttl)
+            for tier in (0, *CURRENCY_PAIR_TIERS):
+                while timestamps := await self._currency_pair_repo.delete_oldest_currency_pair_buckets(
+                    tier,
+                    EVICTION_BATCH_SIZE,
+                    before,
+                ):
+                    evicted += len(timestamps)
+                    AppMetrics.increment("currency_pair_buckets_evicted_by_age", len(timestamps))
+                    if len(timestamps) < EVICTION_BATCH_SIZE:
+                        break
+
+        footprint = await self._currency_pair_repo.retrieve_currency_pair_footprint()
+        total_size = sum(size for _, size in footprint.values())
+        self._update_growth_rate(total_size, now)
+        excess: float = total_size - self._memory_budget if self._memory_budget > 0 else 0
+        # Tiers cover consecutive spans of time, the coarsest one the oldest.
+        for tier in reversed((0, *CURRENCY_PAIR_TIERS)):
+            number_of_buckets, size = footprint.get(tier, (0, 0))
+            if excess <= 0 or not number_of_buckets or not size:
+                continue
+            bucket_size = size / number_of_buckets
+            while excess > 0 and (
+                timestamps := await self._currency_pair_repo.delete_oldest_currency_pair_buckets(
+                    tier,
+                    min(math.ceil(excess / bucket_size), EVICTION_BATCH_SIZE),
+                )
+            ):
+                evicted += len(timestamps)
+                excess -= len(timestamps) * bucket_size
+                total_size -= round(len(timestamps) * bucket_size)
+                AppMetrics.increment("currency_pair_buckets_evicted_by_budget", len(timestamps))
+
+        self._footprint = total_size
+        AppMetrics.set("currency_pair_memory_bytes", total_size)
+        if self._memory_budget > 0 and self._growth_rate and self._growth_rate > 0:
+            AppMetrics.set(
+                "currency_pair_days_to_memory_budget",
+                max(self._memory_budget - total_size, 0) / self._growth_rate / 86400,
+            )
+        else:
+            AppMetrics.gauges.pop("currency_pair_days_to_memory_budget", None)
+        if evicted:
+            logging.info(f"{evicted} buckets of currency pairs evicted, {total_size} bytes left.")
+        return evicted
+
+    def _update_growth_rate(self, footprint: int, now: datetime) -> None:
+        """Smooth the growth of the footprint since the previous run, net of compaction and of the eviction by age."""
+        if self._footprint is not None and self._measured_at is not None and now > self._measured_at:
+            growth_rate = (footprint - self._footprint) / (now - self._measured_at).total_seconds()
+            self._growth_rate = (
+                growth_rate
+                if self._growth_rate is None
+                else GROWTH_RATE_SMOOTHING * growth_rate + (1 - GROWTH_RATE_SMOOTHING) * self._growth_rate
+            )
+        self._measured_at = now
+
+
+async def enforce_retention_on_schedule(currency_pair_repo: AbstractCurrencyPairRepository) -> None:
+    retention_manager = RetentionManager(currency_pair_repo)
+    while True:
+        try:
+            async with dependencies.get_maintenance_lock():
+                await retention_manager.enforce()
+        except exceptions.DBConnectionError as ex:
+            logging.exception(f"Failed to enforce retention of currency pairs. {ex.args[0]}")
+        await asyncio.sleep(AppSettings.currency_pair_retention_interval)
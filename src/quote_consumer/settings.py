@@ -1,5 +1,7 @@
 """App configuration."""
 
+import typing
+
 import pydantic
 from pydantic_settings import BaseSettings
 # mypy: disable-error-code="call-overload"
@@ -10,14 +12,92 @@ class Settings(BaseSettings):
     db_host: str = pydantic.Field(default="", env="DB_HOST")
     db_port: int = pydantic.Field(default="", env="DB_PORT")
     currency_pair_ttl: int = pydantic.Field(default=0, env="CURRENCY_PAIR_TTL")
+    currency_pair_lookup_window: int = pydantic.Field(default=86400, env="CURRENCY_PAIR_LOOKUP_WINDOW")
+    currency_pair_cache_size: int = pydantic.Field(default=32, env="CURRENCY_PAIR_CACHE_SIZE")
+    # Seconds after which the cached index of timestamps is reloaded, picking up writes of other processes.
+    currency_pair_cache_reconcile_interval: float = pydantic.Field(
+        default=30, env="CURRENCY_PAIR_CACHE_RECONCILE_INTERVAL",
+    )
+    currency_pair_storage_format: typing.Literal["hash", "packed"] = pydantic.Field(
+        default="hash", env="CURRENCY_PAIR_STORAGE_FORMAT",
+    )
+    currency_pair_compression: bool = pydantic.Field(default=False, env="CURRENCY_PAIR_COMPRESSION")
+    currency_pair_keyframe_interval: int = pydantic.Field(default=10, env="CURRENCY_PAIR_KEYFRAME_INTERVAL")
+    # Ages after which buckets are compacted into OHLC buckets of 5 minutes and then of an hour, 0 to never compact.
+    currency_pair_5m_tier_age: int = pydantic.Field(default=0, env="CURRENCY_PAIR_5M_TIER_AGE")
+    currency_pair_1h_tier_age: int = pydantic.Field(default=0, env="CURRENCY_PAIR_1H_TIER_AGE")
+    currency_pair_compaction_interval: float = pydantic.Field(default=300, env="CURRENCY_PAIR_COMPACTION_INTERVAL")
+    # Bytes of memory buckets may take before the oldest ones are evicted, 0 to evict them by currency_pair_ttl only.
+    currency_pair_memory_budget: int = pydantic.Field(default=0, env="CURRENCY_PAIR_MEMORY_BUDGET")
+    currency_pair_retention_interval: float = pydantic.Field(default=60, env="CURRENCY_PAIR_RETENTION_INTERVAL")
+    # Whether every stored bucket is published to the replicas of the latest currency pairs.
+    currency_pair_replica: bool = pydantic.Field(default=False, env="CURRENCY_PAIR_REPLICA")
 
     # Related to Exchange
     exchange_api_url: pydantic.HttpUrl = pydantic.Field(default="http://example.com", env="EXCHANGE_API_URL")
     exchange_fetch_interval: int = pydantic.Field(default=0, env="EXCHANGE_FETCH_INTERVAL")
+    # Comma-separated mirrors of exchange_api_url, requested when it is slower than usual.
+    exchange_api_mirror_urls: str = pydantic.Field(default="", env="EXCHANGE_API_MIRROR_URLS")
+    exchange_connect_timeout: float = pydantic.Field(default=3, env="EXCHANGE_CONNECT_TIMEOUT")
+    exchange_read_timeout: float = pydantic.Field(default=10, env="EXCHANGE_READ_TIMEOUT")
+    # Delay before requesting a mirror until enough fetches are observed to derive it from their p95 latency.
+    exchange_hedge_delay: float = pydantic.Field(default=1, env="EXCHANGE_HEDGE_DELAY")
+    exchange_http2: bool = pydantic.Field(default=True, env="EXCHANGE_HTTP2")
+    # Comma-separated names of exchanges, e.g. binance,okx.
+    exchange_sources: str = pydantic.Field(default="binance", env="EXCHANGE_SOURCES")
+    # Comma-separated fetch intervals of exchanges differing from exchange_fetch_interval, e.g. okx:60.
+    exchange_source_fetch_intervals: str = pydantic.Field(default="", env="EXCHANGE_SOURCE_FETCH_INTERVALS")
+    exchange_merge_mode: typing.Literal["median", "namespace"] = pydantic.Field(
+        default="median", env="EXCHANGE_MERGE_MODE",
+    )
+    # Comma-separated symbols fetched from Binance every exchange_hot_fetch_interval in between fetches of all symbols.
+    exchange_hot_symbols: str = pydantic.Field(default="", env="EXCHANGE_HOT_SYMBOLS")
+    exchange_hot_fetch_interval: float = pydantic.Field(default=5, env="EXCHANGE_HOT_FETCH_INTERVAL")
+    # Comma-separated assets symbols are quoted in, which also bridge conversions between other assets, the most liquid
+    # first.
+    exchange_quote_assets: str = pydantic.Field(
+        default="USDT,BTC,ETH,BNB,FDUSD,USDC,TUSD,DAI,EUR,TRY,BRL,JPY", env="EXCHANGE_QUOTE_ASSETS",
+    )
+    # Exchange information of Binance the assets of symbols are loaded from, whenever symbols it does not list appear.
+    # Without it symbols are split by the exchange_quote_assets they end with.
+    exchange_info_url: str = pydantic.Field(default="", env="EXCHANGE_INFO_URL")
+    # The adaptive schedule stretches or shrinks every fetch interval in proportion, so that exchange_fetch_interval
+    # becomes the one at which prices of the hot symbols are expected to move by exchange_target_price_move.
+    exchange_fetch_schedule: typing.Literal["fixed", "adaptive"] = pydantic.Field(
+        default="fixed", env="EXCHANGE_FETCH_SCHEDULE",
+    )
+    exchange_min_fetch_interval: float = pydantic.Field(default=5, env="EXCHANGE_MIN_FETCH_INTERVAL")
+    exchange_max_fetch_interval: float = pydantic.Field(default=120, env="EXCHANGE_MAX_FETCH_INTERVAL")
+    exchange_target_price_move: float = pydantic.Field(default=0.001, env="EXCHANGE_TARGET_PRICE_MOVE")
+    # Weight of the latest return in the exponentially weighted moving average of absolute returns.
+    exchange_volatility_smoothing: float = pydantic.Field(default=0.2, env="EXCHANGE_VOLATILITY_SMOOTHING")
+    bybit_api_url: pydantic.HttpUrl = pydantic.Field(
+        default="https://api.bybit.com/v5/market/tickers?category=spot", env="BYBIT_API_URL",
+    )
+    okx_api_url: pydantic.HttpUrl = pydantic.Field(
+        default="https://www.okx.com/api/v5/market/tickers?instType=SPOT", env="OKX_API_URL",
+    )
+    exchange_queue_size: int = pydantic.Field(default=4, env="EXCHANGE_QUEUE_SIZE")
+    exchange_queue_policy: typing.Literal["coalesce", "drop"] = pydantic.Field(
+        default="coalesce", env="EXCHANGE_QUEUE_POLICY",
+    )
+    exchange_ingest_mode: typing.Literal["polling", "websocket"] = pydantic.Field(
+        default="polling", env="EXCHANGE_INGEST_MODE",
+    )
+    exchange_websocket_url: str = pydantic.Field(
+        default="wss://stream.binance.com:9443/ws/!miniTicker@arr", env="EXCHANGE_WEBSOCKET_URL",
+    )
+    exchange_flush_interval: float = pydantic.Field(default=1, env="EXCHANGE_FLUSH_INTERVAL")
+    # Seconds without a trade after which a symbol is dropped from the live table of prices, e.g. once delisted.
+    exchange_price_staleness: float = pydantic.Field(default=60, env="EXCHANGE_PRICE_STALENESS")
+    exchange_parse_executor: typing.Literal["process", "thread", "inline"] = pydantic.Field(
+        default="thread", env="EXCHANGE_PARSE_EXECUTOR",
+    )
 
     # Related to Quote Consumer
     quote_consumer_host: str = pydantic.Field(default="", env="QUOTE_CONSUMER_HOST")
     quote_consumer_port: int = pydantic.Field(default="", env="QUOTE_CONSUMER_PORT")
+    event_loop_lag_interval: float = pydantic.Field(default=0.05, env="EVENT_LOOP_LAG_INTERVAL")
 
 
 AppSettings = Settings()
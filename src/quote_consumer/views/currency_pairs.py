@@ -1,9 +1,16 @@
 """Views related to currency pairs."""
 
+import asyncio
 import datetime
+import typing
 
 from ..adapters.currency_pair_repository import AbstractCurrencyPairRepository
 from ..domain import model
+from ..services.conversion_paths import retrieve_conversion_path_index
+
+
+# Base asset, quote asset, desired timestamp and the exchange symbols are namespaced by, if any.
+CurrencyPairRequest = tuple[str, str, datetime.datetime | None, str | None]
 
 
 async def fetch_currency_pair(
@@ -12,3 +19,99 @@ async def fetch_currency_pair(
         currency_pair_repo: AbstractCurrencyPairRepository,
 ) -> model.CurrencyPairBucket | None:
         return await currency_pair_repo.retrieve_latest_currency_pair(symbol, timestamp)
+
+
+async def fetch_conversion_rate(
+        base_asset: str,
+        quote_asset: str,
+        timestamp: datetime.datetime | None,
+        currency_pair_repo: AbstractCurrencyPairRepository,
+        exchange: str | None = None,
+) -> model.ConversionRate | None:
+        """Return the conversion rate of the symbol of the assets, or of the path between them if there is none.
+
+        Symbols namespaced by an exchange are looked up as they are, paths only lead through the merged ones, of the
+        universe as of the desired timestamp.
+        """
+        symbol = model.get_symbol(base_asset, quote_asset, exchange)
+        if currency_pair_bucket := await fetch_currency_pair(symbol, timestamp, currency_pair_repo):
+                return model.ConversionRate(
+                        conversion_rate=typing.cast(float, currency_pair_bucket.currency_pairs[0].conversion_rate),
+                        timestamp=currency_pair_bucket.timestamp,
+                        path=((symbol, False),),
+                )
+        if exchange or not (
+                (conversion_path_index := await retrieve_conversion_path_index(timestamp, currency_pair_repo))
+                and (path := conversion_path_index.find(base_asset, quote_asset))
+        ):
+                return None
+        if not (
+                currency_pair_bucket := await currency_pair_repo.retrieve_currency_pairs(
+                        [symbol for symbol, _ in path],
+                        timestamp,
+                )
+        ) or (conversion_rate := model.get_conversion_rate(path, currency_pair_bucket)) is None:
+                return None
+        return model.ConversionRate(conversion_rate, model.get_conversion_timestamp(path, currency_pair_bucket), path)
+
+
+async def fetch_currency_pairs(
+        requests: list[CurrencyPairRequest],
+        currency_pair_repo: AbstractCurrencyPairRepository,
+) -> list[model.ConversionRate | None]:
+        """Return the conversion rate of every base asset, quote asset and desired timestamp, in order.
+
+        Paths lead through the universe as of every desired timestamp. Symbols of all the paths sharing a desired
+        timestamp are read at once from the bucket closest to it, and those missing in a partial one from the buckets
+        before it, so every conversion rate is as of its oldest leg. The buckets of all desired timestamps are read
+        together.
+        """
+        desired_timestamps = list(dict.fromkeys(desired_timestamp for _, _, desired_timestamp, _ in requests))
+        conversion_path_indexes = dict(
+                zip(
+                        desired_timestamps,
+                        await asyncio.gather(
+                                *(
+                                        retrieve_conversion_path_index(desired_timestamp, currency_pair_repo)
+                                        for desired_timestamp in desired_timestamps
+                                ),
+                        ),
+                        strict=True,
+                ),
+        )
+        paths = [
+                (
+                        not exchange
+                        and (conversion_path_index := conversion_path_indexes[desired_timestamp])
+                        and conversion_path_index.find(base_asset, quote_asset)
+                )
+                or ((model.get_symbol(base_asset, quote_asset, exchange), False),)
+                for base_asset, quote_asset, desired_timestamp, exchange in requests
+        ]
+        symbols_by_timestamp: dict[datetime.datetime | None, list[str]] = {}
+        for path, (_, _, desired_timestamp, _) in zip(paths, requests, strict=True):
+                symbols = symbols_by_timestamp.setdefault(desired_timestamp, [])
+                symbols.extend(symbol for symbol, _ in path if symbol not in symbols)
+        currency_pair_buckets = dict(
+                zip(
+                        symbols_by_timestamp,
+                        await currency_pair_repo.retrieve_currency_pair_groups(
+                                [
+                                        (symbols, desired_timestamp)
+                                        for desired_timestamp, symbols in symbols_by_timestamp.items()
+                                ],
+                        ),
+                        strict=True,
+                ),
+        )
+        return [
+                model.ConversionRate(
+                        conversion_rate,
+                        model.get_conversion_timestamp(path, currency_pair_bucket),
+                        path,
+                )
+                if (currency_pair_bucket := currency_pair_buckets[desired_timestamp])
+                and (conversion_rate := model.get_conversion_rate(path, currency_pair_bucket)) is not None
+                else None
+                for path, (_, _, desired_timestamp, _) in zip(paths, requests, strict=True)
+        ]
@@ -8,7 +8,7 @@ from . import quote_consumer
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:  # noqa: PLR2004
-        logging.log(logging.ERROR, "Usage: python run.py [api|quote-consumer]")
+        logging.log(logging.ERROR, "Usage: python run.py [api|quote-consumer|migrate-storage|backfill]")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -16,6 +16,10 @@ if __name__ == "__main__":
         currency_conversion_api.main.run()
     elif command == "quote-consumer":
         quote_consumer.main.run()
+    elif command == "migrate-storage":
+        quote_consumer.migrations.run()
+    elif command == "backfill":
+        quote_consumer.backfill.run()
     else:
         logging.log(logging.ERROR, f"Unknown command: {command}")
         sys.exit(1)
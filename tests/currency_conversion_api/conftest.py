@@ -9,9 +9,15 @@ from fastapi.testclient import TestClient
 from src.currency_conversion_api.adapters import http_client
 from src.currency_conversion_api.domain import exceptions
 from src.currency_conversion_api.main import app
+from src.currency_conversion_api.services import dependencies
+from src.currency_conversion_api.views import currency_pairs
 from src.currency_conversion_api.settings import AppSettings
 
 
+def get_conversion_path(params: dict) -> list[dict]:
+    return [{"symbol": f"{params['base_currency']}{params['quote_currency']}", "inverted": False}]
+
+
 class FakeHttpClient(http_client.AbstractHttpClient):
     def __init__(
         self,
@@ -34,6 +40,7 @@ class FakeHttpClient(http_client.AbstractHttpClient):
                         json={
                             "conversion_rate": 100,
                             "actual_timestamp_closest_to_desired": "2020-05-01T00:00:00Z",
+                            "conversion_path": get_conversion_path(params),
                         },
                     )
             return httpx.Response(
@@ -41,11 +48,37 @@ class FakeHttpClient(http_client.AbstractHttpClient):
                     json={
                         "conversion_rate": 500,
                         "actual_timestamp_closest_to_desired": "2025-05-01T00:00:00Z",
+                        "conversion_path": get_conversion_path(params),
                     },
                 )
 
         raise httpx.HTTPStatusError(message=None, request=None, response=None)  # type: ignore[arg-type]
 
+    async def post(self, url: str, json: typing.Any) -> typing.Any:
+        if self.raises_fetch_currency_pairs_error:
+            raise exceptions.HTTPBadResponseError("Failed to make a post request")
+
+        if url.startswith(AppSettings.quote_consumer_api_url):
+            # Currency pairs are as of the desired timestamp, and there are no quotes for AAA.
+            latest_timestamp = "2025-05-01T00:00:00Z"
+            return httpx.Response(
+                status_code=200,
+                json={
+                    "items": [
+                        {
+                            "conversion_rate": 500,
+                            "actual_timestamp_closest_to_desired": item.get("desired_timestamp", latest_timestamp),
+                            "conversion_path": get_conversion_path(item),
+                        }
+                        if item["base_currency"] != "AAA"
+                        else None
+                        for item in json["items"]
+                    ],
+                },
+            )
+
+        raise httpx.HTTPStatusError(message=None, request=None, response=None)  # type: ignore[arg-type]
+
 
     class Response:
         def __init__(self, message: dict) -> None:
@@ -68,6 +101,12 @@ class FakeHttpClientWithNoData(FakeHttpClient):
         FakeHttpClient.__init__(self, raises_fetch_currency_pairs_not_found_error=True)
 
 
+@pytest.fixture(autouse=True)
+def conversion_rate_cache() -> typing.Generator[None, None, None]:
+    yield
+    currency_pairs.AppConversionRateCache.clear()
+
+
 @pytest.fixture
 def fake_http_client() -> http_client.AbstractHttpClient:
     return FakeHttpClient()
@@ -75,20 +114,20 @@ def fake_http_client() -> http_client.AbstractHttpClient:
 
 @pytest.fixture
 def client() -> typing.Generator[TestClient, None, None]:
-    app.dependency_overrides[http_client.HttpxClient] = FakeHttpClient
+    app.dependency_overrides[dependencies.get_http_client] = FakeHttpClient
     yield TestClient(app)
     app.dependency_overrides.clear()
 
 
 @pytest.fixture
 def client_unreachable() -> typing.Generator[TestClient, None, None]:
-    app.dependency_overrides[http_client.HttpxClient] = FakeHttpClientUnreachable
+    app.dependency_overrides[dependencies.get_http_client] = FakeHttpClientUnreachable
     yield TestClient(app)
     app.dependency_overrides.clear()
 
 
 @pytest.fixture
 def client_with_no_data() -> typing.Generator[TestClient, None, None]:
-    app.dependency_overrides[http_client.HttpxClient] = FakeHttpClientWithNoData
+    app.dependency_overrides[dependencies.get_http_client] = FakeHttpClientWithNoData
     yield TestClient(app)
     app.dependency_overrides.clear()
@@ -0,0 +1,179 @@
+"""Unit tests related to the replica of the latest currency pairs."""
+
+import array
+import asyncio
+import fakeredis
+import pytest
+
+from . import conftest
+from ..conftest import str_to_datetime, str_to_timestamp
+from src.currency_conversion_api import domain
+from src.currency_conversion_api.adapters.currency_pair_replica import (
+    CURRENCY_PAIR_SNAPSHOT_KEY,
+    CurrencyPairReplica,
+)
+from src.currency_conversion_api.metrics import AppMetrics
+from src.currency_conversion_api.settings import AppSettings
+from src.currency_conversion_api.views import currency_pairs
+from src.quote_consumer.adapters import currency_pair_codec
+
+
+def pack_update(  # noqa: PLR0913
+    sequence: int,
+    timestamp: str,
+    prices: list[float],
+    symbols: tuple[str, ...] = ("RUBUSD", "USDRUB"),
+    publisher: int = 1,
+    with_symbols: bool = False,
+) -> bytes:
+    return currency_pair_codec.pack_update(
+        publisher,
+        sequence,
+        str_to_timestamp(timestamp),
+        symbols,
+        array.array("d", prices),
+        with_symbols,
+    )
+
+
+async def create_currency_pair_replica(client: fakeredis.FakeAsyncRedis) -> CurrencyPairReplica:
+    await client.set(
+        CURRENCY_PAIR_SNAPSHOT_KEY,
+        pack_update(1, "2025-01-01T00:00:00Z", [100, 0.01], with_symbols=True),
+    )
+    currency_pair_replica = CurrencyPairReplica(client)
+    await currency_pair_replica.resync()
+    return currency_pair_replica
+
+
+class TestCurrencyPairReplica:
+    async def test_resyncs_from_snapshot(self) -> None:
+        currency_pair_replica = await create_currency_pair_replica(fakeredis.FakeAsyncRedis())
+
+        assert currency_pair_replica.retrieve_conversion_rate("RUBUSD") == (
+            100,
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+        assert currency_pair_replica.retrieve_conversion_rate("AAABBB") is None
+
+    async def test_applies_updates_in_sequence(self) -> None:
+        currency_pair_replica = await create_currency_pair_replica(fakeredis.FakeAsyncRedis())
+        resyncs = AppMetrics.counters["currency_pair_replica_resyncs"]
+
+        await currency_pair_replica.apply_update(pack_update(1, "2025-01-01T00:00:00Z", [100, 0.01]))
+        await currency_pair_replica.apply_update(pack_update(2, "2025-01-01T00:00:30Z", [101, 0.01]))
+
+        assert currency_pair_replica.retrieve_conversion_rate("RUBUSD") == (
+            101,
+            str_to_datetime("2025-01-01T00:00:30Z"),
+        )
+        assert AppMetrics.counters["currency_pair_replica_resyncs"] == resyncs
+
+    async def test_resyncs_on_gap(self) -> None:
+        client = fakeredis.FakeAsyncRedis()
+        currency_pair_replica = await create_currency_pair_replica(client)
+        await client.set(
+            CURRENCY_PAIR_SNAPSHOT_KEY,
+            pack_update(3, "2025-01-01T00:01:00Z", [102, 0.01], with_symbols=True),
+        )
+
+        await currency_pair_replica.apply_update(pack_update(3, "2025-01-01T00:01:00Z", [102, 0.01]))
+
+        assert currency_pair_replica.retrieve_conversion_rate("RUBUSD") == (
+            102,
+            str_to_datetime("2025-01-01T00:01:00Z"),
+        )
+
+    async def test_resyncs_on_new_symbols_or_publisher(self) -> None:
+        client = fakeredis.FakeAsyncRedis()
+        currency_pair_replica = await create_currency_pair_replica(client)
+        await client.set(
+            CURRENCY_PAIR_SNAPSHOT_KEY,
+            pack_update(2, "2025-01-01T00:00:30Z", [1, 101], symbols=("AAABBB", "RUBUSD"), with_symbols=True),
+        )
+
+        await currency_pair_replica.apply_update(
+            pack_update(2, "2025-01-01T00:00:30Z", [1, 101], symbols=("AAABBB", "RUBUSD")),
+        )
+        assert currency_pair_replica.retrieve_conversion_rate("RUBUSD") == (
+            101,
+            str_to_datetime("2025-01-01T00:00:30Z"),
+        )
+
+        await client.set(
+            CURRENCY_PAIR_SNAPSHOT_KEY,
+            pack_update(1, "2025-01-01T00:01:00Z", [102, 0.01], publisher=2, with_symbols=True),
+        )
+        await currency_pair_replica.apply_update(pack_update(1, "2025-01-01T00:01:00Z", [102, 0.01], publisher=2))
+        assert currency_pair_replica.retrieve_conversion_rate("RUBUSD") == (
+            102,
+            str_to_datetime("2025-01-01T00:01:00Z"),
+        )
+
+    async def test_converts_latest_without_request(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "max_quote_age", 10**9)
+        currency_pair_replica = await create_currency_pair_replica(fakeredis.FakeAsyncRedis())
+        conversion = domain.model.Conversion(
+            amount=2,
+            base_currency="RUB",
+            quote_currency="USD",
+            desired_timestamp=None,
+        )
+
+        await currency_pairs.convert(conversion, conftest.FakeHttpClientUnreachable(), currency_pair_replica)
+
+        assert conversion.converted_amount == 200  # noqa: PLR2004
+        assert conversion.actual_timestamp_closest_to_desired == str_to_datetime("2025-01-01T00:00:00Z")
+        assert conversion.conversion_path == [{"symbol": "RUBUSD", "inverted": False}]
+
+    async def test_converts_latest_batch_from_single_source(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "max_quote_age", 10**9)
+        currency_pair_replica = await create_currency_pair_replica(fakeredis.FakeAsyncRedis())
+        conversions = [
+            domain.model.Conversion(amount=2, base_currency="RUB", quote_currency="USD", desired_timestamp=None),
+            domain.model.Conversion(amount=2, base_currency="USD", quote_currency="RUB", desired_timestamp=None),
+        ]
+
+        await currency_pairs.convert_batch(conversions, conftest.FakeHttpClientUnreachable(), currency_pair_replica)
+        assert [conversion.converted_amount for conversion in conversions] == [200, 0.02]
+
+        # The replica misses one of the symbols, so none of them is read from it.
+        conversions.append(
+            domain.model.Conversion(amount=2, base_currency="EUR", quote_currency="USD", desired_timestamp=None),
+        )
+        await currency_pairs.convert_batch(conversions, conftest.FakeHttpClient(), currency_pair_replica)
+        assert [conversion.converted_amount for conversion in conversions] == [1000, 1000, 1000]
+
+    async def test_converts_stale_latest_with_request(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "max_quote_age", 60)
+        currency_pair_replica = await create_currency_pair_replica(fakeredis.FakeAsyncRedis())
+        conversion = domain.model.Conversion(
+            amount=2,
+            base_currency="RUB",
+            quote_currency="USD",
+            desired_timestamp=None,
+        )
+
+        with pytest.raises(domain.exceptions.FetchCurrencyPairsError):
+            await currency_pairs.convert(conversion, conftest.FakeHttpClientUnreachable(), currency_pair_replica)
+
+    async def test_resubscribes_after_failure(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("src.currency_conversion_api.adapters.currency_pair_replica.RECONNECT_DELAY", 0)
+        currency_pair_replica = await create_currency_pair_replica(fakeredis.FakeAsyncRedis())
+        resyncs = AppMetrics.counters["currency_pair_replica_resyncs"]
+        resync = currency_pair_replica.resync
+        failures = [ValueError("Unsupported currency pair update format version: 2.")]
+
+        async def fail_once() -> None:
+            if failures:
+                raise failures.pop()
+            await resync()
+
+        monkeypatch.setattr(currency_pair_replica, "resync", fail_once)
+
+        task = asyncio.create_task(currency_pair_replica.replicate())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        assert currency_pair_replica.retrieve_conversion_rate("RUBUSD")
+        assert AppMetrics.counters["currency_pair_replica_resyncs"] == resyncs + 1
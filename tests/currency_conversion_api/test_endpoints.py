@@ -1,5 +1,6 @@
 """Unit tests related to endpoints."""
 
+import datetime
 import http
 
 from fastapi.testclient import TestClient
@@ -14,6 +15,7 @@ class TestFetchCurrencyPair:
         assert fetch_responses.json()["conversion_rate"] == 500  # noqa: PLR2004
         assert fetch_responses.json()["conversion_rate_age_seconds"]
         assert fetch_responses.json()["actual_timestamp_closest_to_desired"] == "2025-05-01T00:00:00Z"
+        assert fetch_responses.json()["conversion_path"] == [{"symbol": "RUBUSD", "inverted": False}]
 
     async def test_cannot_convert_with_outdated_timestamp(self, client: TestClient) -> None:
         fetch_responses = client.get("/api/convert?amount=100&from=rub_with_outdated_timestamp&to=usd")
@@ -39,3 +41,57 @@ class TestFetchCurrencyPair:
 
         assert fetch_responses.status_code == http.HTTPStatus.NOT_FOUND
         assert fetch_responses.json()["detail"] == "Conversion is not possible. We don't have quotes for this pair."
+
+
+class TestConvertBatch:
+    async def test_can_convert_batch(self, client: TestClient) -> None:
+        timestamp = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=5)).strftime(
+            "%Y-%m-%dT%H:%M:%SZ",
+        )
+        fetch_responses = client.post(
+            "/api/convert/batch",
+            json={
+                "items": [
+                    {"amount": 100, "from": "rub", "to": "usd", "desired_timestamp": timestamp},
+                    {"amount": 100, "from": "aaa", "to": "bbb", "desired_timestamp": timestamp},
+                    {"amount": 2, "from": "rub", "to": "usd", "desired_timestamp": timestamp},
+                    {"amount": 100, "from": "rub", "to": "usd"},
+                ],
+            },
+        )
+
+        assert fetch_responses.status_code == http.HTTPStatus.OK
+        items = fetch_responses.json()["items"]
+        assert [item.get("converted_amount") for item in items] == [50_000, None, 1_000, None]
+        assert items[0]["actual_timestamp_closest_to_desired"] == timestamp
+        assert items[0]["conversion_path"] == [{"symbol": "RUBUSD", "inverted": False}]
+        assert items[1] == {"detail": "Conversion is not possible. We don't have quotes for this pair."}
+        assert items[3] == {"detail": "quotes_outdated"}
+
+    async def test_cannot_convert_batch_with_invalid_item(self, client: TestClient) -> None:
+        fetch_responses = client.post(
+            "/api/convert/batch",
+            json={"items": [{"amount": 100, "from": "rub", "to": "usd"}, {"amount": -1, "from": "rub", "to": "usd"}]},
+        )
+
+        assert fetch_responses.status_code == http.HTTPStatus.UNPROCESSABLE_CONTENT
+
+    async def test_cannot_convert_batch_if_unreachable(self, client_unreachable: TestClient) -> None:
+        fetch_responses = client_unreachable.post(
+            "/api/convert/batch",
+            json={"items": [{"amount": 100, "from": "rub", "to": "usd"}]},
+        )
+
+        assert fetch_responses.status_code == http.HTTPStatus.INTERNAL_SERVER_ERROR
+        assert fetch_responses.json()["detail"].startswith(
+            "Error. Failed to get the currency pairs due to unreachanble Quote Consumer endpoint.",
+        )
+
+
+
+class TestFetchMetrics:
+    async def test_can_fetch_metrics(self, client: TestClient) -> None:
+        fetch_responses = client.get("/api/metrics")
+
+        assert fetch_responses.status_code == http.HTTPStatus.OK
+        assert set(fetch_responses.json()) == {"counters", "gauges", "summaries"}
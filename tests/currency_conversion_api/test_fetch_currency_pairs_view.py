@@ -1,10 +1,15 @@
 """Unit tests related to currency pairs view."""
 
+import asyncio
+import datetime
+import httpx
 import pytest
+import typing
 
 from . import conftest
 from ..conftest import str_to_datetime
 from src.currency_conversion_api import domain
+from src.currency_conversion_api.metrics import AppMetrics
 from src.currency_conversion_api.views import currency_pairs
 
 
@@ -21,6 +26,7 @@ async def test_can_fetch_currency_pairs(fake_http_client: conftest.FakeHttpClien
     assert result == {
         "conversion_rate": 500,
         "actual_timestamp_closest_to_desired": "2025-05-01T00:00:00Z",
+        "conversion_path": [{"symbol": "RUBUSD", "inverted": False}],
     }
 
 
@@ -35,3 +41,161 @@ async def test_cannot_fetch_currency_pairs_if_unreachable(fake_http_client: conf
 
     with pytest.raises(domain.exceptions.FetchCurrencyPairsError):
         await currency_pairs.fetch_currency_pairs(conversion, fake_http_client)
+
+
+class CountingHttpClient(conftest.FakeHttpClient):
+    def __init__(self, actual_timestamp: str = "2025-05-01T00:00:00Z") -> None:
+        super().__init__()
+        self.actual_timestamp = actual_timestamp
+        self.calls = 0
+        self.items: list[dict] = []
+
+    async def get(self, url: str, params: dict) -> typing.Any:  # noqa: ARG002
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.raises_fetch_currency_pairs_error:
+            raise domain.exceptions.HTTPBadResponseError("Failed to make a get request")
+        return httpx.Response(
+            status_code=200,
+            json={
+                "conversion_rate": 500,
+                "actual_timestamp_closest_to_desired": self.actual_timestamp,
+                "conversion_path": conftest.get_conversion_path(params),
+            },
+        )
+
+    async def post(self, url: str, json: typing.Any) -> typing.Any:
+        self.calls += 1
+        self.items = json["items"]
+        return await super().post(url, json)
+
+
+def create_conversion(base_currency: str = "RUB", desired_timestamp: str | None = None) -> domain.model.Conversion:
+    return domain.model.Conversion(
+        amount=100,
+        base_currency=base_currency,
+        quote_currency="USD",
+        desired_timestamp=str_to_datetime(desired_timestamp) if desired_timestamp else None,
+    )
+
+
+class TestConversionRateCache:
+    async def test_caches_historical_conversion_rates(self) -> None:
+        http_client = CountingHttpClient()
+        cache = currency_pairs.ConversionRateCache(size=2)
+
+        for _ in range(3):
+            result = await cache.fetch_currency_pairs(create_conversion("RUB", "2025-05-01T00:00:00Z"), http_client)
+
+        assert result["conversion_rate"] == 500  # noqa: PLR2004
+        assert http_client.calls == 1
+
+    async def test_evicts_least_recently_used_conversion_rates(self) -> None:
+        http_client = CountingHttpClient()
+        cache = currency_pairs.ConversionRateCache(size=2)
+
+        for base_currency in ("RUB", "EUR", "RUB", "GBP", "RUB", "EUR"):
+            await cache.fetch_currency_pairs(create_conversion(base_currency, "2025-05-01T00:00:00Z"), http_client)
+
+        assert http_client.calls == 4  # noqa: PLR2004
+
+    async def test_expires_latest_conversion_rates(self) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        http_client = CountingHttpClient(now.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        cache = currency_pairs.ConversionRateCache(latest_ttl=0.05)
+
+        await cache.fetch_currency_pairs(create_conversion(), http_client)
+        await cache.fetch_currency_pairs(create_conversion(), http_client)
+        assert http_client.calls == 1
+
+        await asyncio.sleep(0.05)
+        await cache.fetch_currency_pairs(create_conversion(), http_client)
+        assert http_client.calls == 2  # noqa: PLR2004
+
+    async def test_does_not_cache_outdated_conversion_rates(self) -> None:
+        http_client = CountingHttpClient("2025-05-01T00:00:00Z")
+        cache = currency_pairs.ConversionRateCache()
+
+        await cache.fetch_currency_pairs(create_conversion(), http_client)
+        await cache.fetch_currency_pairs(create_conversion(), http_client)
+
+        assert http_client.calls == 2  # noqa: PLR2004
+
+    async def test_coalesces_concurrent_misses(self) -> None:
+        http_client = CountingHttpClient()
+        cache = currency_pairs.ConversionRateCache()
+        coalesced = AppMetrics.counters["conversion_cache_coalesced"]
+
+        conversion = create_conversion("RUB", "2025-05-01T00:00:00Z")
+        results = await asyncio.gather(*(cache.fetch_currency_pairs(conversion, http_client) for _ in range(3)))
+
+        assert [result["conversion_rate"] for result in results] == [500, 500, 500]
+        assert http_client.calls == 1
+        assert AppMetrics.counters["conversion_cache_coalesced"] == coalesced + 2
+        assert 0 < AppMetrics.gauges["conversion_cache_hit_ratio"] < 1
+
+    async def test_does_not_cache_errors(self) -> None:
+        http_client = CountingHttpClient()
+        http_client.raises_fetch_currency_pairs_error = True
+        cache = currency_pairs.ConversionRateCache()
+
+        for _ in range(2):
+            with pytest.raises(domain.exceptions.FetchCurrencyPairsError):
+                await cache.fetch_currency_pairs(create_conversion("RUB", "2025-05-01T00:00:00Z"), http_client)
+
+        assert http_client.calls == 2  # noqa: PLR2004
+
+
+class TestConvertBatch:
+    async def test_fetches_missing_conversion_rates_at_once(self) -> None:
+        http_client = CountingHttpClient()
+        conversions = [
+            create_conversion("RUB", "2025-05-01T00:00:00Z"),
+            create_conversion("AAA", "2025-05-01T00:00:00Z"),
+            create_conversion("RUB", "2025-05-01T00:00:00Z"),
+            create_conversion("EUR", "2025-04-01T00:00:00Z"),
+        ]
+
+        errors = await currency_pairs.convert_batch(conversions, http_client)
+
+        assert http_client.calls == 1
+        assert len(http_client.items) == 3  # noqa: PLR2004
+        assert [type(error) if error else None for error in errors] == [
+            None,
+            domain.exceptions.FetchCurrencyPairsNotFoundError,
+            None,
+            None,
+        ]
+        assert conversions[2].converted_amount == 50_000  # noqa: PLR2004
+        assert conversions[3].actual_timestamp_closest_to_desired == str_to_datetime("2025-04-01T00:00:00Z")
+
+        # Conversion rates fetched are cached, missing ones are not, so their timestamp is fetched again as a whole.
+        await currency_pairs.convert_batch(
+            [create_conversion("RUB", "2025-05-01T00:00:00Z"), create_conversion("AAA", "2025-05-01T00:00:00Z")],
+            http_client,
+        )
+        assert http_client.calls == 2  # noqa: PLR2004
+        assert http_client.items == [
+            {"base_currency": "RUB", "quote_currency": "USD", "desired_timestamp": "2025-05-01T00:00:00Z"},
+            {"base_currency": "AAA", "quote_currency": "USD", "desired_timestamp": "2025-05-01T00:00:00Z"},
+        ]
+
+        await currency_pairs.convert_batch([create_conversion("EUR", "2025-04-01T00:00:00Z")], http_client)
+        assert http_client.calls == 2  # noqa: PLR2004
+
+    async def test_fetches_conversion_rates_of_exchange(self) -> None:
+        http_client = CountingHttpClient()
+        conversion = create_conversion("RUB", "2025-05-01T00:00:00Z")
+        conversion.exchange = "okx"
+
+        await currency_pairs.convert_batch([create_conversion("RUB", "2025-05-01T00:00:00Z"), conversion], http_client)
+
+        assert http_client.items == [
+            {"base_currency": "RUB", "quote_currency": "USD", "desired_timestamp": "2025-05-01T00:00:00Z"},
+            {
+                "base_currency": "RUB",
+                "quote_currency": "USD",
+                "desired_timestamp": "2025-05-01T00:00:00Z",
+                "exchange": "okx",
+            },
+        ]
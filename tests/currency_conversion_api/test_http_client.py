@@ -6,6 +6,7 @@ from pytest_httpx import HTTPXMock
 
 from src.currency_conversion_api.domain import exceptions
 from src.currency_conversion_api.adapters.http_client import HttpxClient
+from src.currency_conversion_api.metrics import AppMetrics
 
 
 class TestHttpxClient:
@@ -19,3 +20,16 @@ class TestHttpxClient:
         async with HttpxClient() as client:
             with pytest.raises(exceptions.HTTPBadResponseError):
                 await client.get(url="https://test_url", params={})
+
+    async def test_get_exports_requests_in_flight(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(status_code=200)
+        AppMetrics.gauges.pop("quote_consumer_requests_in_flight", None)
+        async with HttpxClient(max_connections=2) as client:
+            await client.get(url="https://test_url", params={})
+        assert AppMetrics.gauges["quote_consumer_requests_in_flight"] == 0
+
+    async def test_post_raises_if_http_status_error(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(method="POST", status_code=400)
+        async with HttpxClient() as client:
+            with pytest.raises(exceptions.HTTPBadResponseError):
+                await client.post(url="https://test_url", json={})
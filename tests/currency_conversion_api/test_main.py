@@ -1,6 +1,14 @@
 """Unit tests related to FastAPI app."""
 
+import fakeredis
+import pytest
+import redis.asyncio
+
+from fastapi.testclient import TestClient
+
 from src.currency_conversion_api.main import app
+from src.currency_conversion_api.services import dependencies
+from src.currency_conversion_api.settings import AppSettings
 
 
 class TestFastapiApp:
@@ -15,3 +23,19 @@ class TestFastapiApp:
         }
         assert app.docs_url == "/api/docs"
         assert app.redoc_url == "/api/redoc"
+
+    def test_lifespan_closes_shared_http_client(self) -> None:
+        with TestClient(app):
+            shared_http_client = dependencies.get_http_client()
+            assert not shared_http_client.client.is_closed
+        assert shared_http_client.client.is_closed
+        assert dependencies.get_http_client() is not shared_http_client
+
+    def test_lifespan_stops_replication(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_replica", True)
+        monkeypatch.setattr(redis.asyncio, "Redis", fakeredis.FakeAsyncRedis)
+        dependencies.get_currency_pair_replica.cache_clear()
+        with TestClient(app):
+            assert dependencies.get_currency_pair_replica()
+        assert dependencies.get_db_client.cache_info().currsize == 0
+        assert dependencies.get_currency_pair_replica.cache_info().currsize == 0
@@ -9,6 +9,17 @@ class TestEnvironmentVariables:
     def test_environment_variables_exist(self) -> None:
         assert os.environ.get("MAX_QUOTE_AGE")
         assert os.environ.get("QUOTE_CONSUMER_API_URL")
+        assert os.environ.get("QUOTE_CONSUMER_CONNECT_TIMEOUT")
+        assert os.environ.get("QUOTE_CONSUMER_READ_TIMEOUT")
+        assert os.environ.get("QUOTE_CONSUMER_POOL_TIMEOUT")
+        assert os.environ.get("QUOTE_CONSUMER_MAX_CONNECTIONS")
+        assert os.environ.get("QUOTE_CONSUMER_MAX_KEEPALIVE_CONNECTIONS")
+        assert os.environ.get("QUOTE_CONSUMER_KEEPALIVE_EXPIRY")
+        assert os.environ.get("QUOTE_CONSUMER_HTTP2")
+        assert os.environ.get("CONVERSION_CACHE_SIZE")
+        assert os.environ.get("CONVERSION_CACHE_LATEST_TTL")
+        assert os.environ.get("DB_PORT")
+        assert os.environ.get("CURRENCY_PAIR_REPLICA")
 
         # Related to Currency Conversion API
         assert os.environ.get("CURRENCY_CONVERSION_API_HOST")
@@ -19,6 +30,15 @@ class TestSettings:
     def test_app_settings_initialized(self) -> None:
         assert AppSettings.max_quote_age
         assert AppSettings.quote_consumer_api_url
+        assert AppSettings.quote_consumer_connect_timeout
+        assert AppSettings.quote_consumer_read_timeout
+        assert AppSettings.quote_consumer_pool_timeout
+        assert AppSettings.quote_consumer_max_connections
+        assert AppSettings.quote_consumer_max_keepalive_connections
+        assert AppSettings.quote_consumer_keepalive_expiry
+        assert AppSettings.conversion_cache_size
+        assert AppSettings.conversion_cache_latest_ttl
+        assert AppSettings.db_port
 
         # Related to Currency Conversion API
         assert AppSettings.currency_conversion_api_host
@@ -1,17 +1,21 @@
 """Quote Consumer fixtures."""
 
+import asyncio
 import datetime
+import fakeredis
 import httpx
 import pytest
 import typing
+import websockets.asyncio.server
 
 from fastapi.testclient import TestClient
 
 from .. import conftest
-from src.quote_consumer.adapters import currency_pair_repository
+from src.quote_consumer.adapters import currency_pair_cache, currency_pair_repository
 from src.quote_consumer.adapters.http_client import AbstractHttpClient
 from src.quote_consumer.domain import exceptions, model
 from src.quote_consumer.main import app
+from src.quote_consumer.services.conversion_paths import AppConversionPaths
 from src.quote_consumer.settings import AppSettings
 
 
@@ -21,6 +25,15 @@ class FakeCurrencyPairRepository(currency_pair_repository.AbstractCurrencyPairRe
         self.available_currency_pair_timestamps: list[dict[str, float]] = []
         self.raises_exception = False
 
+    async def create_currency_pair_bucket(
+        self,
+        currency_pair_bucket: model.CurrencyPairBucket,
+        changed_currency_pair_bucket: model.CurrencyPairBucket | None = None,  # noqa: ARG002
+    ) -> None:
+        await self._create_currency_pairs(currency_pair_bucket.currency_pairs, currency_pair_bucket.timestamp)
+        await self._set_ttl(currency_pair_bucket.timestamp)
+        await self._update_ordered_set_of_timestamps(currency_pair_bucket.timestamp)
+
     async def _create_currency_pairs(
         self,
         currency_pairs: list[model.CurrencyPair],
@@ -29,9 +42,9 @@ class FakeCurrencyPairRepository(currency_pair_repository.AbstractCurrencyPairRe
         if self.raises_exception:
             raise exceptions.DBConnectionError("Error. No connection with DB.")
         for currency_pair in currency_pairs:
-            self.currency_pair_buckets[
-                timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
-            ] = {currency_pair.symbol: str(currency_pair.conversion_rate)}
+            self.currency_pair_buckets.setdefault(
+                timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"), {},
+            )[currency_pair.symbol] = str(currency_pair.conversion_rate)
 
     async def _set_ttl(self, timestamp: datetime.datetime) -> None:
         self.currency_pair_buckets[timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")]["ttl"] = AppSettings.currency_pair_ttl
@@ -57,22 +70,52 @@ class FakeCurrencyPairRepository(currency_pair_repository.AbstractCurrencyPairRe
             timestamp=timestamp,
         )
 
+    async def _retrieve_currency_pair(self, timestamp: datetime.datetime, symbol: str) -> model.CurrencyPair | None:
+        currency_pairs = await self._retrieve_currency_pairs(timestamp, [symbol])
+        return currency_pairs[0] if currency_pairs else None
+
+    async def _retrieve_currency_pairs(
+        self,
+        timestamp: datetime.datetime,
+        symbols: list[str],
+    ) -> list[model.CurrencyPair]:
+        currency_pairs: dict[str | None, str | float] = self.currency_pair_buckets[
+            timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        ]
+        return [
+            model.CurrencyPair(symbol=symbol, conversion_rate=float(currency_pairs[symbol]))
+            for symbol in symbols
+            if symbol in currency_pairs
+        ]
+
     async def _retrieve_latest_timestamp(self) -> datetime.datetime | None:
+        if not self.available_currency_pair_timestamps:
+            return None
         latest_timestamp_str = next(iter(self.available_currency_pair_timestamps[-1]))
         return datetime.datetime.strptime(
             latest_timestamp_str, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc,
             )
 
-    async def _retrieve_timestamp_range(self, start: float, end: float) -> list[datetime.datetime]:
-        timestamps_items = [
-            ts for ts in self.available_currency_pair_timestamps
-            if start <= next(iter(ts.values())) and next(iter(ts.values())) <= end
-        ]
-
-        timestamps_str = [next(iter(ts.keys())) for ts in timestamps_items]
+    async def _retrieve_neighbouring_timestamps(
+        self,
+        desired_timestamp: datetime.datetime,
+    ) -> list[datetime.datetime]:
+        desired_epoch = desired_timestamp.timestamp()
+        epochs = sorted(next(iter(ts.values())) for ts in self.available_currency_pair_timestamps)
+        before = [
+            epoch for epoch in epochs
+            if desired_epoch - AppSettings.currency_pair_lookup_window < epoch <= desired_epoch
+        ][-1:]
+        after = [
+            epoch for epoch in epochs
+            if desired_epoch <= epoch < desired_epoch + AppSettings.currency_pair_lookup_window
+        ][:1]
+        return [datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc) for epoch in before + after]
+
+    async def _retrieve_timestamps(self) -> list[datetime.datetime]:
         return [
-            datetime.datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
-            for ts in timestamps_str
+            datetime.datetime.fromtimestamp(next(iter(ts.values())), datetime.timezone.utc)
+            for ts in self.available_currency_pair_timestamps
         ]
 
 
@@ -122,18 +165,66 @@ class FakeHttpClient(AbstractHttpClient):
         pass
 
 
+@pytest.fixture(autouse=True)
+def conversion_paths() -> typing.Generator[None, None, None]:
+    yield
+    AppConversionPaths.conversion_path_index = None
+    AppConversionPaths.symbol_assets = None
+    AppConversionPaths.symbols = ()
+    AppConversionPaths.unlisted_symbols = asyncio.Event()
+
+
 @pytest.fixture
 def fake_currency_pair_repository() -> currency_pair_repository.AbstractCurrencyPairRepository:
     return FakeCurrencyPairRepository()
 
 
+@pytest.fixture
+def redis_currency_pair_repository() -> currency_pair_repository.RedisCurrencyPairRepository:
+    return currency_pair_repository.RedisCurrencyPairRepository(fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+@pytest.fixture
+def packed_currency_pair_repository() -> currency_pair_repository.PackedRedisCurrencyPairRepository:
+    return currency_pair_repository.PackedRedisCurrencyPairRepository(fakeredis.FakeAsyncRedis())
+
+
+@pytest.fixture
+def cached_currency_pair_repository() -> currency_pair_cache.CachedCurrencyPairRepository:
+    return currency_pair_cache.CachedCurrencyPairRepository(FakeCurrencyPairRepository(), size=2)
+
+
 @pytest.fixture
 def fake_http_client() -> AbstractHttpClient:
     return FakeHttpClient()
 
 
+class FakeWebSocketServer:
+    """Local stand-in of the exchange stream, sending the same messages on every connection and closing it."""
+
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+        self.connections = 0
+        self.url = ""
+
+    async def handle(self, websocket: websockets.asyncio.server.ServerConnection) -> None:
+        self.connections += 1
+        for message in self.messages:
+            await websocket.send(message)
+
+
+@pytest.fixture
+async def fake_websocket_server() -> typing.AsyncGenerator[FakeWebSocketServer, None]:
+    fake_websocket_server = FakeWebSocketServer()
+    async with websockets.asyncio.server.serve(fake_websocket_server.handle, "127.0.0.1", 0) as server:
+        fake_websocket_server.url = f"ws://127.0.0.1:{next(iter(server.sockets)).getsockname()[1]}"
+        yield fake_websocket_server
+
+
 @pytest.fixture
 def client() -> typing.Generator[TestClient, None, None]:
-    app.dependency_overrides[currency_pair_repository.RedisCurrencyPairRepository] = FakeCurrencyPairRepositoryFilled
+    app.dependency_overrides[
+        currency_pair_cache.get_cached_currency_pair_repository
+    ] = FakeCurrencyPairRepositoryFilled
     yield TestClient(app)
     app.dependency_overrides.clear()
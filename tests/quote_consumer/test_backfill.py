@@ -0,0 +1,159 @@
+"""Unit tests related to the backfill of the history from archives of the exchange."""
+
+import contextlib
+import pathlib
+import pytest
+import typing
+import zipfile
+
+from ..conftest import str_to_datetime, str_to_timestamp
+from src.quote_consumer import backfill
+from src.quote_consumer.adapters.currency_pair_repository import RedisCurrencyPairRepository, get_index_key
+from src.quote_consumer.domain import model
+
+
+def create_archives(directory: pathlib.Path) -> list[str]:
+    """Create an archive of klines of a minute, in milliseconds, and a zipped one of trades, in microseconds."""
+    klines = directory / "BTCUSDT-1m-2025-01-01.csv"
+    klines.write_text(
+        "".join(
+            f"{open_time},99,105,98,{100 + minute},1.5,{open_time + 59999},150,10,1,100,0\n"
+            for minute in range(5)
+            for open_time in [int(str_to_timestamp("2025-01-01T00:00:00Z")) * 1000 + minute * 60000]
+        ),
+    )
+    trades = directory / "ETHUSDT-aggTrades-2025-01-01.zip"
+    with zipfile.ZipFile(trades, "w") as archive:
+        archive.writestr(
+            "ETHUSDT-aggTrades-2025-01-01.csv",
+            "agg_trade_id,price,quantity,first_trade_id,last_trade_id,transact_time,is_buyer_maker,is_best_match\n"
+            + "".join(
+                f"{index},{price},0.5,{index},{index},{int(str_to_timestamp(timestamp)) * 1000000},true,true\n"
+                for index, (price, timestamp) in enumerate(
+                    [(10, "2025-01-01T00:00:30Z"), (11, "2025-01-01T00:02:10Z"), (12, "2025-01-01T00:02:50Z")],
+                )
+            ),
+        )
+    return [str(klines), str(trades)]
+
+
+class TestBackfillCurrencyPairs:
+    @pytest.mark.parametrize(
+        "currency_pair_repository",
+        ["redis_currency_pair_repository", "packed_currency_pair_repository"],
+    )
+    async def test_can_backfill_currency_pairs(
+        self,
+        currency_pair_repository: str,
+        request: pytest.FixtureRequest,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        currency_pair_repo: RedisCurrencyPairRepository = request.getfixturevalue(currency_pair_repository)
+
+        progress = await backfill.backfill_currency_pairs(
+            currency_pair_repo,
+            create_archives(tmp_path),
+            interval=60,
+            batch_size=2,
+            concurrency=2,
+            now=str_to_datetime("2025-01-02T00:00:00Z"),
+        )
+
+        assert progress.rows == 8  # noqa: PLR2004
+        assert progress.buckets == 5  # noqa: PLR2004
+        client = currency_pair_repo._client  # noqa: SLF001
+        assert [score for _, score in await client.zrange(get_index_key(0), 0, -1, withscores=True)] == [
+            str_to_timestamp(f"2025-01-01T00:0{minute}:00Z") for minute in range(1, 6)
+        ]
+        currency_pair_bucket = await currency_pair_repo.retrieve_currency_pairs(
+            ["BTCUSDT", "ETHUSDT"],
+            str_to_datetime("2025-01-01T00:03:00Z"),
+        )
+        assert currency_pair_bucket
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="BTCUSDT", conversion_rate=102),
+            model.CurrencyPair(symbol="ETHUSDT", conversion_rate=12),
+        ]
+
+    async def test_backfills_only_before_stored_buckets(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="BTCUSDT", conversion_rate=200)],
+                timestamp=str_to_datetime("2025-01-01T00:03:00Z"),
+            ),
+        )
+
+        progress = await backfill.backfill_currency_pairs(
+            redis_currency_pair_repository,
+            create_archives(tmp_path),
+            interval=60,
+            now=str_to_datetime("2025-01-02T00:00:00Z"),
+        )
+
+        assert progress.buckets == 2  # noqa: PLR2004
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert await client.hgetall("2025-01-01T00:02:00Z") == {"ETHUSDT": "10.0", "BTCUSDT": "101.0"}
+        assert await client.hgetall("2025-01-01T00:03:00Z") == {"BTCUSDT": "200.0"}
+
+
+class TestReadArchives:
+    def test_reads_days_of_symbol_one_after_another(
+        self,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        paths = create_archives(tmp_path)
+        next_day = tmp_path / "BTCUSDT-1m-2025-01-02.csv"
+        open_time = int(str_to_timestamp("2025-01-02T00:00:00Z")) * 1000
+        next_day.write_text(f"{open_time},99,105,98,110,1.5,{open_time + 59999},150,10,1,100,0\n")
+        open_archive = backfill.open_archive
+        opened: list[str] = []
+        open_paths: set[str] = set()
+
+        @contextlib.contextmanager
+        def track_archive(path: str) -> typing.Iterator[typing.IO[bytes]]:
+            open_paths.add(path)
+            opened.append(path)
+            assert len(open_paths) <= 2  # noqa: PLR2004
+            with open_archive(path) as csv_file:
+                yield csv_file
+            open_paths.discard(path)
+
+        monkeypatch.setattr(backfill, "open_archive", track_archive)
+
+        rows = list(backfill.read_archives([str(next_day), *paths]))
+
+        assert [epoch for epoch, _, _ in rows] == sorted(epoch for epoch, _, _ in rows)
+        assert rows[-1] == (str_to_timestamp("2025-01-02T00:01:00Z"), "BTCUSDT", 110)
+        assert opened.index(paths[0]) < opened.index(str(next_day))
+
+    def test_merges_archives_of_day_in_groups(self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        paths = create_archives(tmp_path)
+        for symbol, price in (("SOLUSDT", 1), ("XRPUSDT", 0.5), ("BNBUSDT", 5)):
+            klines = tmp_path / f"{symbol}-1m-2025-01-01.csv"
+            open_time = int(str_to_timestamp("2025-01-01T00:01:00Z")) * 1000
+            klines.write_text(f"{open_time},99,105,98,{price},1.5,{open_time + 59999},150,10,1,100,0\n")
+            paths.append(str(klines))
+        merged_rows = list(backfill.read_archives(paths))
+        open_archive = backfill.open_archive
+        open_paths: set[str] = set()
+
+        @contextlib.contextmanager
+        def track_archive(path: str) -> typing.Iterator[typing.IO[bytes]]:
+            open_paths.add(path)
+            assert len(open_paths) <= 2  # noqa: PLR2004
+            with open_archive(path) as csv_file:
+                yield csv_file
+            open_paths.discard(path)
+
+        monkeypatch.setattr(backfill, "open_archive", track_archive)
+
+        rows = list(backfill.read_archives(paths, max_open_archives=2))
+
+        assert rows == merged_rows
+        assert [epoch for epoch, _, _ in rows] == sorted(epoch for epoch, _, _ in rows)
+        assert len(rows) == 11  # noqa: PLR2004
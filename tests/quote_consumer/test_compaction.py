@@ -0,0 +1,273 @@
+"""Unit tests related to compaction of buckets into tiers of OHLC buckets."""
+
+import datetime
+import pytest
+
+from ..conftest import str_to_datetime, str_to_timestamp
+from src.quote_consumer.adapters.currency_pair_cache import CachedCurrencyPairRepository
+from src.quote_consumer.adapters.currency_pair_repository import RedisCurrencyPairRepository, get_index_key
+from src.quote_consumer.domain import model
+from src.quote_consumer.metrics import AppMetrics
+from src.quote_consumer.services import compaction
+from src.quote_consumer.settings import AppSettings
+
+
+async def create_currency_pair_buckets(
+    currency_pair_repo: RedisCurrencyPairRepository,
+    prices_by_timestamp: dict[str, dict[str, float] | None],
+) -> None:
+    """Store buckets the way they are stored on ingest, None repeating the latest one as an alias."""
+    previous_currency_pair_bucket: model.CurrencyPairBucket | None = None
+    for timestamp, prices in prices_by_timestamp.items():
+        if prices is None and previous_currency_pair_bucket:
+            await currency_pair_repo.create_currency_pair_alias(
+                model.CurrencyPairBucket.from_prices(
+                    symbols=previous_currency_pair_bucket.symbols,
+                    prices=previous_currency_pair_bucket.prices,
+                    timestamp=str_to_datetime(timestamp),
+                ),
+                previous_currency_pair_bucket.timestamp,
+            )
+            continue
+        currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[
+                model.CurrencyPair(symbol=symbol, conversion_rate=price) for symbol, price in (prices or {}).items()
+            ],
+            timestamp=str_to_datetime(timestamp),
+        )
+        await currency_pair_repo.create_currency_pair_bucket(
+            currency_pair_bucket,
+            currency_pair_bucket.diff(previous_currency_pair_bucket) if previous_currency_pair_bucket else None,
+        )
+        previous_currency_pair_bucket = currency_pair_bucket
+
+
+class TestCompactCurrencyPairs:
+    @pytest.fixture(autouse=True)
+    def tiers(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_5m_tier_age", 300)
+        monkeypatch.setattr(AppSettings, "currency_pair_1h_tier_age", 0)
+        monkeypatch.setattr(AppSettings, "currency_pair_keyframe_interval", 8)
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "")
+
+    async def create_currency_pair_buckets(self, currency_pair_repo: RedisCurrencyPairRepository) -> None:
+        await create_currency_pair_buckets(
+            currency_pair_repo,
+            {
+                "2025-01-01T00:00:00Z": {"RUBUSD": 100, "USDRUB": 0.01},
+                "2025-01-01T00:01:00Z": {"RUBUSD": 103, "USDRUB": 0.01},
+                "2025-01-01T00:02:00Z": {"RUBUSD": 99, "USDRUB": 0.01, "AAABBB": 1},
+                "2025-01-01T00:03:00Z": {"RUBUSD": 101, "USDRUB": 0.01, "AAABBB": 1},
+                "2025-01-01T00:04:00Z": None,
+                "2025-01-01T00:05:00Z": None,
+                "2025-01-01T00:06:00Z": None,
+                "2025-01-01T00:07:00Z": {"RUBUSD": 105, "USDRUB": 0.01, "AAABBB": 1},
+                "2025-01-01T00:08:00Z": {"RUBUSD": 104, "USDRUB": 0.01, "AAABBB": 2},
+            },
+        )
+
+    @pytest.mark.parametrize(
+        "currency_pair_repository",
+        ["redis_currency_pair_repository", "packed_currency_pair_repository"],
+    )
+    async def test_compacts_old_buckets_into_ohlc_bucket(
+        self,
+        currency_pair_repository: str,
+        request: pytest.FixtureRequest,
+    ) -> None:
+        currency_pair_repo: RedisCurrencyPairRepository = request.getfixturevalue(currency_pair_repository)
+        await self.create_currency_pair_buckets(currency_pair_repo)
+        compacted = AppMetrics.counters["currency_pair_buckets_compacted_into_300s"]
+
+        assert await compaction.compact_currency_pairs(
+            currency_pair_repo,
+            now=str_to_datetime("2025-01-01T00:10:00Z"),
+        ) == 5  # noqa: PLR2004
+
+        client = currency_pair_repo._client  # noqa: SLF001
+        assert [score for _, score in await client.zrange(get_index_key(0), 0, -1, withscores=True)] == [
+            str_to_timestamp(f"2025-01-01T00:0{minute}:00Z") for minute in range(5, 9)
+        ]
+        assert await client.zrange(get_index_key(300), 0, -1, withscores=True) == [
+            (b"1735689840" if currency_pair_repository.startswith("packed") else "1735689840", 1735689840),
+        ]
+        assert not await client.exists("2025-01-01T00:00:00Z", "2025-01-01T00:03:00Z")
+        assert AppMetrics.counters["currency_pair_buckets_compacted_into_300s"] == compacted + 5
+        [ohlc_bucket] = await currency_pair_repo.retrieve_currency_pair_ohlc_buckets(
+            str_to_datetime("2025-01-01T00:00:00Z"),
+            str_to_datetime("2025-01-01T00:05:00Z"),
+            300,
+        )
+        assert ohlc_bucket.symbols == ("RUBUSD", "USDRUB", "AAABBB")
+        assert ohlc_bucket.prices.tolist() == [[100, 0.01, 1], [103, 0.01, 1], [99, 0.01, 1], [101, 0.01, 1]]
+        assert ohlc_bucket.timestamp == str_to_datetime("2025-01-01T00:04:00Z")
+
+    @pytest.mark.parametrize(
+        ("symbol", "timestamp", "conversion_rate", "actual_timestamp"),
+        [
+            ("RUBUSD", "2025-01-01T00:01:00Z", 101, "2025-01-01T00:04:00Z"),
+            ("AAABBB", "2025-01-01T00:01:00Z", 1, "2025-01-01T00:04:00Z"),
+            ("RUBUSD", "2025-01-01T00:05:00Z", 101, "2025-01-01T00:05:00Z"),
+            ("RUBUSD", "2025-01-01T00:06:00Z", 101, "2025-01-01T00:06:00Z"),
+            ("RUBUSD", "2025-01-01T00:07:00Z", 105, "2025-01-01T00:07:00Z"),
+            ("AAABBB", None, 2, "2025-01-01T00:08:00Z"),
+        ],
+    )
+    @pytest.mark.parametrize(
+        "currency_pair_repository",
+        ["redis_currency_pair_repository", "packed_currency_pair_repository", "cached_redis_currency_pair_repository"],
+    )
+    async def test_retrieves_currency_pairs_from_every_tier(  # noqa: PLR0913
+        self,
+        symbol: str,
+        timestamp: str | None,
+        conversion_rate: float,
+        actual_timestamp: str,
+        currency_pair_repository: str,
+        request: pytest.FixtureRequest,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        currency_pair_repo = (
+            CachedCurrencyPairRepository(redis_currency_pair_repository)
+            if currency_pair_repository.startswith("cached")
+            else request.getfixturevalue(currency_pair_repository)
+        )
+        await self.create_currency_pair_buckets(currency_pair_repo)
+        # Buckets read before compaction are cached.
+        await currency_pair_repo.retrieve_currency_pairs(["RUBUSD"], str_to_datetime("2025-01-01T00:04:00Z"))
+        await currency_pair_repo.retrieve_currency_pairs(["RUBUSD"], str_to_datetime("2025-01-01T00:05:00Z"))
+
+        await compaction.compact_currency_pairs(currency_pair_repo, now=str_to_datetime("2025-01-01T00:10:00Z"))
+
+        desired_timestamp = str_to_datetime(timestamp) if timestamp else None
+        currency_pair_bucket = await currency_pair_repo.retrieve_latest_currency_pair(symbol, desired_timestamp)
+        assert currency_pair_bucket
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol=symbol, conversion_rate=conversion_rate),
+        ]
+        assert currency_pair_bucket.timestamp == str_to_datetime(actual_timestamp)
+        currency_pair_bucket = await currency_pair_repo.retrieve_currency_pairs([symbol], desired_timestamp)
+        assert currency_pair_bucket
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol=symbol, conversion_rate=conversion_rate),
+        ]
+
+    async def test_retargets_aliases_of_compacted_buckets(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+
+        await compaction.compact_currency_pairs(
+            redis_currency_pair_repository,
+            now=str_to_datetime("2025-01-01T00:10:00Z"),
+        )
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert await client.hgetall("2025-01-01T00:04:00Z") == {"RUBUSD": "101.0", "USDRUB": "0.01", "AAABBB": "1.0"}
+        assert await client.hgetall("2025-01-01T00:05:00Z") == {"RUBUSD": "101.0", "USDRUB": "0.01", "AAABBB": "1.0"}
+        assert await client.hgetall("2025-01-01T00:06:00Z") == {"__alias__": "2025-01-01T00:05:00Z"}
+        assert await client.hgetall("2025-01-01T00:07:00Z") == {"RUBUSD": "105.0", "__delta__": "1"}
+
+    async def test_compacts_ohlc_buckets_into_coarser_tier(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_5m_tier_age", 60)
+        monkeypatch.setattr(AppSettings, "currency_pair_1h_tier_age", 3600)
+        await create_currency_pair_buckets(
+            redis_currency_pair_repository,
+            {
+                f"2025-01-01T0{minutes // 60}:{minutes % 60:02}:00Z": {"RUBUSD": price}
+                for minutes, price in zip(range(0, 140, 20), [100, 104, 98, 101, 102, 97, 103], strict=True)
+            },
+        )
+
+        assert await compaction.compact_currency_pairs(
+            redis_currency_pair_repository,
+            now=str_to_datetime("2025-01-01T03:00:00Z"),
+        ) == 13  # noqa: PLR2004
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert not await client.zcard(get_index_key(0))
+        assert await client.zrange(get_index_key(300), 0, -1) == ["1735696800"]
+        assert await client.zrange(get_index_key(3600), 0, -1) == ["1735692000", "1735695600"]
+        ohlc_buckets = await redis_currency_pair_repository.retrieve_currency_pair_ohlc_buckets(
+            str_to_datetime("2025-01-01T00:00:00Z"),
+            str_to_datetime("2025-01-01T02:00:00Z"),
+            3600,
+        )
+        assert [ohlc_bucket.prices.tolist() for ohlc_bucket in ohlc_buckets] == [
+            [[100], [104], [98], [98]],
+            [[101], [102], [97], [97]],
+        ]
+        currency_pair_bucket = await redis_currency_pair_repository.retrieve_latest_currency_pair(
+            "RUBUSD",
+            str_to_datetime("2025-01-01T00:10:00Z"),
+        )
+        assert currency_pair_bucket
+        assert currency_pair_bucket.currency_pairs == [model.CurrencyPair(symbol="RUBUSD", conversion_rate=98)]
+        assert currency_pair_bucket.timestamp == str_to_datetime("2025-01-01T00:40:00Z")
+
+    async def test_forgets_cached_partial_bucket_rewritten_in_full(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "RUBUSD")
+        monkeypatch.setattr(AppSettings, "exchange_hot_fetch_interval", 5)
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 30)
+        currency_pair_repo = CachedCurrencyPairRepository(redis_currency_pair_repository)
+        await create_currency_pair_buckets(
+            currency_pair_repo,
+            {
+                "2025-01-01T00:00:00Z": {"RUBUSD": 100, "USDRUB": 0.01},
+                "2025-01-01T00:04:00Z": {"RUBUSD": 101, "USDRUB": 0.01},
+            },
+        )
+        partial_currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=102)],
+            timestamp=str_to_datetime("2025-01-01T00:05:00Z"),
+            partial=True,
+        )
+        await currency_pair_repo.create_currency_pair_partial_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[
+                    model.CurrencyPair(symbol="RUBUSD", conversion_rate=102),
+                    model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+                ],
+                timestamp=str_to_datetime("2025-01-01T00:05:00Z"),
+            ),
+            partial_currency_pair_bucket,
+        )
+        # The partial bucket is cached before compaction rewrites it in full.
+        await currency_pair_repo.retrieve_currency_pairs(["RUBUSD", "USDRUB"], str_to_datetime("2025-01-01T00:05:00Z"))
+
+        await compaction.compact_currency_pairs(currency_pair_repo, now=str_to_datetime("2025-01-01T00:10:00Z"))
+
+        currency_pair_bucket = await currency_pair_repo.retrieve_currency_pairs(
+            ["RUBUSD", "USDRUB"],
+            str_to_datetime("2025-01-01T00:05:00Z"),
+        )
+        assert currency_pair_bucket
+        assert not currency_pair_bucket.partial
+        assert currency_pair_bucket.get_timestamp("USDRUB") == str_to_datetime("2025-01-01T00:05:00Z")
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=102),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+        ]
+
+    async def test_does_not_compact_without_tiers(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_5m_tier_age", 0)
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+
+        await compaction.compact_currency_pairs_on_schedule(redis_currency_pair_repository)
+
+        assert await redis_currency_pair_repository.retrieve_oldest_currency_pair_timestamp(0) == (
+            datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        )
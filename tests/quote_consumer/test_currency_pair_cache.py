@@ -0,0 +1,250 @@
+"""Unit tests related to currency pair cache."""
+
+import asyncio
+import contextlib
+import datetime
+import pytest
+
+from . import conftest
+from ..conftest import str_to_datetime
+from src.quote_consumer.adapters.currency_pair_cache import (
+    CachedCurrencyPairRepository,
+    reconcile_timestamps_on_schedule,
+)
+from src.quote_consumer.adapters.currency_pair_repository import RedisCurrencyPairRepository
+from src.quote_consumer.domain import exceptions, model
+from src.quote_consumer.metrics import AppMetrics
+from src.quote_consumer.settings import AppSettings
+
+
+def create_currency_pair_bucket(timestamp: datetime.datetime, conversion_rate: float) -> model.CurrencyPairBucket:
+    return model.CurrencyPairBucket(
+        currency_pairs=[
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=conversion_rate),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=1 / conversion_rate),
+        ],
+        timestamp=timestamp,
+    )
+
+
+def get_inner_repository(
+    cached_currency_pair_repository: CachedCurrencyPairRepository,
+) -> conftest.FakeCurrencyPairRepository:
+    return cached_currency_pair_repository._currency_pair_repo  # type: ignore[return-value]  # noqa: SLF001
+
+
+class TestCachedCurrencyPairRepository:
+    async def test_serves_latest_currency_pair_from_memory(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+    ) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        await cached_currency_pair_repository.create_currency_pair_bucket(create_currency_pair_bucket(now, 100))
+        get_inner_repository(cached_currency_pair_repository).currency_pair_buckets.clear()
+        hits = AppMetrics.counters["currency_pair_cache_hits"]
+
+        result = await cached_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+
+        assert result
+        assert result.timestamp == now.replace(microsecond=0)
+        assert result.currency_pairs[0].conversion_rate == 100  # noqa: PLR2004
+        assert AppMetrics.counters["currency_pair_cache_hits"] == hits + 1
+
+    async def test_swaps_latest_currency_pair_bucket_on_write(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+    ) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        await cached_currency_pair_repository.create_currency_pair_bucket(
+            create_currency_pair_bucket(now - datetime.timedelta(seconds=30), 100),
+        )
+        await cached_currency_pair_repository.create_currency_pair_bucket(create_currency_pair_bucket(now, 200))
+
+        result = await cached_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+
+        assert result
+        assert result.currency_pairs[0].conversion_rate == 200  # noqa: PLR2004
+
+    async def test_serves_alias_from_memory(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+    ) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        currency_pair_bucket = create_currency_pair_bucket(now - datetime.timedelta(seconds=30), 100)
+        await cached_currency_pair_repository.create_currency_pair_bucket(currency_pair_bucket)
+        await cached_currency_pair_repository.create_currency_pair_alias(
+            model.CurrencyPairBucket.from_prices(
+                symbols=currency_pair_bucket.symbols,
+                prices=currency_pair_bucket.prices,
+                timestamp=now,
+            ),
+            currency_pair_bucket.timestamp,
+        )
+        get_inner_repository(cached_currency_pair_repository).currency_pair_buckets.clear()
+
+        result = await cached_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+
+        assert result
+        assert result.timestamp == now
+        assert result.currency_pairs[0].conversion_rate == 100  # noqa: PLR2004
+
+    async def test_does_not_cache_failed_write(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+    ) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        await cached_currency_pair_repository.create_currency_pair_bucket(create_currency_pair_bucket(now, 100))
+        get_inner_repository(cached_currency_pair_repository).raises_exception = True
+
+        with contextlib.suppress(exceptions.DBConnectionError):
+            await cached_currency_pair_repository.create_currency_pair_bucket(
+                create_currency_pair_bucket(now + datetime.timedelta(seconds=30), 200),
+            )
+        result = await cached_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+
+        assert result
+        assert result.currency_pairs[0].conversion_rate == 100  # noqa: PLR2004
+
+    async def test_reads_historical_currency_pairs_from_repository(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+    ) -> None:
+        inner_repository = get_inner_repository(cached_currency_pair_repository)
+        await inner_repository.create_currency_pair_bucket(
+            create_currency_pair_bucket(str_to_datetime("2025-01-01T00:00:00Z"), 100),
+        )
+        misses = AppMetrics.counters["currency_pair_cache_misses"]
+
+        first = await cached_currency_pair_repository.retrieve_latest_currency_pair(
+            "RUBUSD",
+            str_to_datetime("2025-01-01T00:10:00Z"),
+        )
+        second = await cached_currency_pair_repository.retrieve_currency_pairs(
+            ["USDRUB", "AAABBB"],
+            str_to_datetime("2024-12-31T23:50:00Z"),
+        )
+
+        assert first
+        assert first.timestamp == str_to_datetime("2025-01-01T00:00:00Z")
+        assert first.currency_pairs[0].conversion_rate == 100  # noqa: PLR2004
+        assert second
+        assert [(pair.symbol, pair.conversion_rate) for pair in second.currency_pairs] == [("USDRUB", 0.01)]
+        assert AppMetrics.counters["currency_pair_cache_misses"] == misses + 2
+        # Buckets only read are not cached, the repository reads just the symbols asked for.
+        assert not cached_currency_pair_repository._currency_pair_buckets  # noqa: SLF001
+
+    async def test_reads_missing_currency_pair_without_whole_bucket(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            create_currency_pair_bucket(str_to_datetime("2025-01-01T00:00:00Z"), 100),
+        )
+        cached_currency_pair_repository = CachedCurrencyPairRepository(redis_currency_pair_repository)
+
+        async def fail(*_: object) -> None:
+            raise AssertionError
+
+        monkeypatch.setattr(redis_currency_pair_repository, "_retrieve_currency_pair_bucket", fail)
+        result = await cached_currency_pair_repository.retrieve_latest_currency_pair(
+            "RUBUSD",
+            str_to_datetime("2025-01-01T00:00:10Z"),
+        )
+        results = await cached_currency_pair_repository.retrieve_currency_pairs(["USDRUB"], None)
+
+        assert result
+        assert result.currency_pairs[0].conversion_rate == 100  # noqa: PLR2004
+        assert results
+        assert results.currency_pairs[0].conversion_rate == 0.01  # noqa: PLR2004
+
+    async def test_evicts_least_recently_written_currency_pair_bucket(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+    ) -> None:
+        timestamps = ("2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z", "2025-01-03T00:00:00Z")
+        for timestamp in timestamps:
+            await cached_currency_pair_repository.create_currency_pair_bucket(
+                create_currency_pair_bucket(str_to_datetime(timestamp), 100),
+            )
+
+        assert list(cached_currency_pair_repository._currency_pair_buckets) == [  # noqa: SLF001
+            int(str_to_datetime("2025-01-02T00:00:00Z").timestamp()),
+            int(str_to_datetime("2025-01-03T00:00:00Z").timestamp()),
+        ]
+
+    async def test_caches_universe_of_historical_timestamp(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+    ) -> None:
+        inner_repository = get_inner_repository(cached_currency_pair_repository)
+        await inner_repository.create_currency_pair_bucket(
+            create_currency_pair_bucket(str_to_datetime("2025-01-01T00:00:00Z"), 100),
+        )
+
+        first = await cached_currency_pair_repository.retrieve_currency_pair_symbols(
+            str_to_datetime("2025-01-01T00:00:10Z"),
+        )
+        inner_repository.currency_pair_buckets.clear()
+        second = await cached_currency_pair_repository.retrieve_currency_pair_symbols(
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        assert first
+        assert {"RUBUSD", "USDRUB"} <= set(first)
+        assert second == first
+
+    async def test_cannot_retrieve_currency_pair_if_empty(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+    ) -> None:
+        assert await cached_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None) is None
+        assert await cached_currency_pair_repository.retrieve_latest_currency_pair(
+            "RUBUSD",
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        ) is None
+
+    async def test_reconciles_timestamps_with_other_processes(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_cache_reconcile_interval", 0.01)
+        inner_repository = get_inner_repository(cached_currency_pair_repository)
+        await cached_currency_pair_repository.create_currency_pair_bucket(
+            create_currency_pair_bucket(str_to_datetime("2025-01-01T00:00:00Z"), 100),
+        )
+        assert await cached_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+
+        # E.g. the backfill command writes an older bucket, and retention of another instance deletes the newer one.
+        await inner_repository.create_currency_pair_bucket(
+            create_currency_pair_bucket(str_to_datetime("2024-12-31T23:59:00Z"), 200),
+        )
+        del inner_repository.available_currency_pair_timestamps[0]
+        task = asyncio.create_task(reconcile_timestamps_on_schedule(cached_currency_pair_repository))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        result = await cached_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+
+        assert result
+        assert result.timestamp == str_to_datetime("2024-12-31T23:59:00Z")
+        assert result.currency_pairs[0].conversion_rate == 200  # noqa: PLR2004
+
+    async def test_keeps_timestamps_without_ttl(
+        self,
+        cached_currency_pair_repository: CachedCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_ttl", 0)
+        for timestamp, conversion_rate in (("2025-01-01T00:00:00Z", 100), ("2025-01-02T00:00:00Z", 200)):
+            await cached_currency_pair_repository.create_currency_pair_bucket(
+                create_currency_pair_bucket(str_to_datetime(timestamp), conversion_rate),
+            )
+
+        result = await cached_currency_pair_repository.retrieve_latest_currency_pair(
+            "RUBUSD",
+            str_to_datetime("2025-01-01T00:00:10Z"),
+        )
+
+        assert result
+        assert result.currency_pairs[0].conversion_rate == 100  # noqa: PLR2004
@@ -0,0 +1,46 @@
+"""Unit tests related to currency pair codec."""
+
+import array
+
+import pytest
+
+from src.quote_consumer.adapters import currency_pair_codec
+
+
+class TestCurrencyPairCodec:
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_can_pack_and_unpack_prices(self, compress: bool) -> None:
+        prices = array.array("d", [100.1, 0.01, 3])
+
+        payload = currency_pair_codec.pack_prices(prices, dictionary_version=42, compress=compress)
+        dictionary_version, unpacked_prices = currency_pair_codec.unpack_prices(payload)
+
+        assert dictionary_version == 42  # noqa: PLR2004
+        assert list(unpacked_prices) == [100.1, 0.01, 3]
+
+    def test_uncompressed_prices_are_stored_at_fixed_offsets(self) -> None:
+        payload = currency_pair_codec.pack_prices(array.array("d", [100.1, 0.01]), 42, compress=False)
+
+        offset = currency_pair_codec.get_price_offset(1)
+
+        assert currency_pair_codec.PRICE.unpack(payload[offset:offset + currency_pair_codec.PRICE.size]) == (0.01,)
+
+    def test_can_pack_and_unpack_symbols(self) -> None:
+        symbols = ("RUBUSD", "USDRUB")
+
+        assert currency_pair_codec.unpack_symbols(currency_pair_codec.pack_symbols(symbols)) == symbols
+        assert currency_pair_codec.unpack_symbols(currency_pair_codec.pack_symbols(())) == ()
+
+    def test_dictionary_version_depends_on_symbols(self) -> None:
+        assert currency_pair_codec.get_dictionary_version(("RUBUSD", "USDRUB")) == (
+            currency_pair_codec.get_dictionary_version(("RUBUSD", "USDRUB"))
+        )
+        assert currency_pair_codec.get_dictionary_version(("RUBUSD", "USDRUB")) != (
+            currency_pair_codec.get_dictionary_version(("USDRUB", "RUBUSD"))
+        )
+
+    def test_cannot_unpack_unsupported_format_version(self) -> None:
+        payload = currency_pair_codec.HEADER.pack(currency_pair_codec.FORMAT_VERSION + 1, 0, 42)
+
+        with pytest.raises(ValueError, match="Unsupported currency pair bucket format version"):
+            currency_pair_codec.unpack_prices(payload)
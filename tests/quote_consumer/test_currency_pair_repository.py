@@ -1,11 +1,21 @@
 """Unit tests related to currency pair repository."""
 
 import datetime
+import fakeredis
 import pytest
+import redis.asyncio
+import typing
 
 from . import conftest
 from ..conftest import str_to_datetime, str_to_timestamp
-from src.quote_consumer.domain import model
+from src.quote_consumer.adapters.currency_pair_repository import (
+    AbstractCurrencyPairRepository,
+    PackedRedisCurrencyPairRepository,
+    RedisCurrencyPairRepository,
+)
+from src.quote_consumer.adapters import currency_pair_codec
+from src.quote_consumer.adapters.currency_pair_cache import CachedCurrencyPairRepository
+from src.quote_consumer.domain import exceptions, model
 from src.quote_consumer.settings import AppSettings
 
 
@@ -23,7 +33,7 @@ class TestCreateCurrencyPairBucket:
 
         assert fake_currency_pair_repository.currency_pair_buckets == {
             currency_pair_bucket.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"): {
-                "RUBUSD": "100",
+                "RUBUSD": "100.0",
                 "ttl": AppSettings.currency_pair_ttl,
             },
         }
@@ -104,6 +114,50 @@ class TestCreateCurrencyPairBucket:
             assert result.currency_pairs[0].symbol == output["symbol"]
             assert result.currency_pairs[0].conversion_rate == output["conversion_rate"]
 
+    @pytest.mark.parametrize(
+        ("symbols", "desired_timestamp", "resulted_conversion_rates"),
+        [
+            (["RUBUSD", "USDRUB"], str_to_datetime("2025-01-01T00:00:00Z"), {"RUBUSD": 100, "USDRUB": 0.01}),
+            (["RUBUSD", "AAABBB"], None, {"RUBUSD": 500}),
+            (["AAABBB"], None, {}),
+        ],
+    )
+    async def test_can_retrieve_currency_pairs(
+        self,
+        symbols: list[str],
+        desired_timestamp: datetime.datetime | None,
+        resulted_conversion_rates: dict[str, float],
+        fake_currency_pair_repository: conftest.FakeCurrencyPairRepository,
+    ) -> None:
+        fake_currency_pair_repository.available_currency_pair_timestamps = [
+            {"2025-01-01T00:00:00Z": str_to_timestamp("2025-01-01T00:00:00Z")},
+            {"2025-05-01T00:00:00Z": str_to_timestamp("2025-05-01T00:00:00Z")},
+        ]
+        fake_currency_pair_repository.currency_pair_buckets = {
+            "2025-01-01T00:00:00Z": {"RUBUSD": 100, "USDRUB": 0.01},
+            "2025-05-01T00:00:00Z": {"RUBUSD": 500, "USDRUB": 0.002},
+        }
+
+        result = await fake_currency_pair_repository.retrieve_currency_pairs(symbols, desired_timestamp)
+
+        assert result
+        assert {
+            currency_pair.symbol: currency_pair.conversion_rate for currency_pair in result.currency_pairs
+        } == resulted_conversion_rates
+
+    async def test_cannot_retrieve_currency_pairs_without_timestamps(
+        self,
+        fake_currency_pair_repository: conftest.FakeCurrencyPairRepository,
+    ) -> None:
+        fake_currency_pair_repository.available_currency_pair_timestamps = [
+            {"2025-01-01T00:00:00Z": str_to_timestamp("2025-01-01T00:00:00Z")},
+        ]
+
+        assert not await fake_currency_pair_repository.retrieve_currency_pairs(
+            ["RUBUSD"],
+            str_to_datetime("2025-03-01T00:00:00Z"),
+        )
+
     @pytest.mark.parametrize(
         ("desired_timestamp", "resulted_timestamp"),
         [
@@ -140,6 +194,7 @@ class TestCreateCurrencyPairBucket:
             (str_to_datetime("2025-02-01T00:00:00Z"), str_to_datetime("2025-02-01T00:00:00Z")),
             (str_to_datetime("2025-02-02T00:00:00Z"), None),
             (str_to_datetime("2025-03-01T12:12:12Z"), str_to_datetime("2025-03-01T00:00:00Z")),
+            (str_to_datetime("2025-02-28T23:59:55Z"), str_to_datetime("2025-03-01T00:00:00Z")),
         ],
     )
     async def test_can_retrieve_timestamp_closest_to_desired(
@@ -161,3 +216,827 @@ class TestCreateCurrencyPairBucket:
         )
 
         assert result == resulted_timestamp
+
+
+class TestRedisCurrencyPairRepository:
+    async def test_can_create_currency_pair_bucket(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[
+                model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+            ],
+            timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        await redis_currency_pair_repository.create_currency_pair_bucket(currency_pair_bucket)
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert await client.hgetall("2025-01-01T00:00:00Z") == {"RUBUSD": "100.0", "USDRUB": "0.01"}
+        # Buckets are evicted along with their timestamps rather than expired.
+        assert await client.ttl("2025-01-01T00:00:00Z") == -1
+        assert await client.zrange("available_currency_pair_timestamps", 0, -1, withscores=True) == [
+            (str(int(str_to_timestamp("2025-01-01T00:00:00Z"))), str_to_timestamp("2025-01-01T00:00:00Z")),
+        ]
+
+    async def test_does_not_create_empty_currency_pair_bucket(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[],
+            timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        await redis_currency_pair_repository.create_currency_pair_bucket(currency_pair_bucket)
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert not await client.exists("2025-01-01T00:00:00Z")
+        assert not await client.zcard("available_currency_pair_timestamps")
+
+    @pytest.mark.parametrize(
+        ("desired_timestamp", "resulted_timestamp"),
+        [
+            (str_to_datetime("2025-01-01T00:00:20Z"), str_to_datetime("2025-01-01T00:00:20Z")),
+            (str_to_datetime("2025-01-01T00:00:05Z"), str_to_datetime("2024-12-31T23:59:50Z")),
+            (str_to_datetime("2025-01-01T00:00:25Z"), str_to_datetime("2025-01-01T00:00:20Z")),
+            (str_to_datetime("2024-12-31T23:59:49Z"), str_to_datetime("2024-12-31T23:59:50Z")),
+            (str_to_datetime("2025-01-02T00:00:20Z"), None),
+            (str_to_datetime("2024-12-30T23:59:50Z"), None),
+        ],
+    )
+    async def test_can_retrieve_timestamp_closest_to_desired(
+        self,
+        desired_timestamp: datetime.datetime,
+        resulted_timestamp: datetime.datetime | None,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        for timestamp in ("2024-12-31T23:59:50Z", "2025-01-01T00:00:20Z"):
+            await redis_currency_pair_repository.create_currency_pair_bucket(
+                model.CurrencyPairBucket(
+                    currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)],
+                    timestamp=str_to_datetime(timestamp),
+                ),
+            )
+
+        result = await redis_currency_pair_repository._retrieve_timestamp_closest_to_desired(  # noqa: SLF001
+            desired_timestamp=desired_timestamp,
+        )
+
+        assert result == resulted_timestamp
+
+    async def test_can_retrieve_currency_pairs_by_symbol(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[
+                    model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                    model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+                ],
+                timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+            ),
+        )
+
+        latest = await redis_currency_pair_repository.retrieve_latest_currency_pair("USDRUB", None)
+        several = await redis_currency_pair_repository.retrieve_currency_pairs(["RUBUSD", "AAABBB", "USDRUB"], None)
+        missing = await redis_currency_pair_repository.retrieve_latest_currency_pair("AAABBB", None)
+
+        assert latest
+        assert [(pair.symbol, pair.conversion_rate) for pair in latest.currency_pairs] == [("USDRUB", 0.01)]
+        assert several
+        assert [(pair.symbol, pair.conversion_rate) for pair in several.currency_pairs] == [
+            ("RUBUSD", 100),
+            ("USDRUB", 0.01),
+        ]
+        assert several.timestamp == str_to_datetime("2025-01-01T00:00:00Z")
+        assert missing is None
+
+    @pytest.mark.parametrize(
+        ("symbol", "desired_timestamp"),
+        [
+            ("RUBUSD", None),
+            ("AAABBB", None),
+            ("RUBUSD", str_to_datetime("1999-12-31T23:59:59Z")),
+            ("RUBUSD", str_to_datetime("2000-02-29T12:00:00Z")),
+            ("RUBUSD", str_to_datetime("2000-03-01T00:00:01Z")),
+            ("RUBUSD", str_to_datetime("2024-02-29T06:30:00Z")),
+            ("RUBUSD", str_to_datetime("2024-12-31T23:59:59Z")),
+            ("RUBUSD", str_to_datetime("2025-01-01T00:00:05Z")),
+            ("RUBUSD", str_to_datetime("2025-06-01T00:00:00Z")),
+            ("AAABBB", str_to_datetime("2025-01-01T00:00:05Z")),
+        ],
+    )
+    async def test_script_matches_multiple_round_trip_lookup(
+        self,
+        symbol: str,
+        desired_timestamp: datetime.datetime | None,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await redis_currency_pair_repository.load_scripts()
+        for conversion_rate, timestamp in enumerate(
+            (
+                "1999-12-31T23:59:59Z",
+                "2000-02-29T12:00:00Z",
+                "2000-03-01T00:00:00Z",
+                "2024-02-29T06:30:00Z",
+                "2024-12-31T23:59:50Z",
+                "2025-01-01T00:00:20Z",
+            ),
+            start=1,
+        ):
+            await redis_currency_pair_repository.create_currency_pair_bucket(
+                model.CurrencyPairBucket(
+                    currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=conversion_rate)],
+                    timestamp=str_to_datetime(timestamp),
+                ),
+            )
+
+        result = await redis_currency_pair_repository.retrieve_latest_currency_pair(symbol, desired_timestamp)
+        expected = await AbstractCurrencyPairRepository.retrieve_latest_currency_pair(
+            redis_currency_pair_repository,
+            symbol,
+            desired_timestamp,
+        )
+
+        if not expected:
+            assert result is None
+        else:
+            assert result
+            assert result.timestamp == expected.timestamp
+            assert result.currency_pairs[0].symbol == expected.currency_pairs[0].symbol
+            assert result.currency_pairs[0].conversion_rate == expected.currency_pairs[0].conversion_rate
+
+    async def test_retrieves_currency_pair_groups_in_two_round_trips(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        for timestamp, conversion_rate in (("2025-01-01T00:00:00Z", 100), ("2025-01-01T00:01:00Z", 101)):
+            await redis_currency_pair_repository.create_currency_pair_bucket(
+                model.CurrencyPairBucket(
+                    currency_pairs=[
+                        model.CurrencyPair(symbol="RUBUSD", conversion_rate=conversion_rate),
+                        model.CurrencyPair(symbol="USDRUB", conversion_rate=1 / conversion_rate),
+                    ],
+                    timestamp=str_to_datetime(timestamp),
+                ),
+            )
+        round_trips = 0
+        execute = redis.asyncio.client.Pipeline.execute
+
+        def count_execute(pipeline: redis.asyncio.client.Pipeline, *args: typing.Any) -> typing.Any:
+            nonlocal round_trips
+            round_trips += 1
+            return execute(pipeline, *args)
+
+        monkeypatch.setattr(redis.asyncio.client.Pipeline, "execute", count_execute)
+        currency_pair_buckets = await redis_currency_pair_repository.retrieve_currency_pair_groups(
+            [
+                (["RUBUSD", "AAABBB"], None),
+                (["USDRUB"], str_to_datetime("2025-01-01T00:00:10Z")),
+                ([], str_to_datetime("2025-01-01T00:00:50Z")),
+                (["RUBUSD"], str_to_datetime("2025-01-03T00:00:00Z")),
+            ],
+        )
+
+        assert round_trips == 2  # noqa: PLR2004
+        assert [
+            (currency_pair_bucket.timestamp, currency_pair_bucket.currency_pairs) if currency_pair_bucket else None
+            for currency_pair_bucket in currency_pair_buckets
+        ] == [
+            (str_to_datetime("2025-01-01T00:01:00Z"), [model.CurrencyPair(symbol="RUBUSD", conversion_rate=101)]),
+            (str_to_datetime("2025-01-01T00:00:00Z"), [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01)]),
+            (str_to_datetime("2025-01-01T00:01:00Z"), []),
+            None,
+        ]
+
+    async def test_cannot_retrieve_latest_timestamp_if_empty(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        assert await redis_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None) is None
+
+
+class TestDeltaRedisCurrencyPairRepository:
+    async def create_currency_pair_buckets(self, currency_pair_repo: RedisCurrencyPairRepository) -> None:
+        previous_currency_pair_bucket = None
+        for timestamp, prices in (
+            ("2025-01-01T00:00:00Z", {"RUBUSD": 100, "USDRUB": 0.01}),
+            ("2025-01-01T00:00:30Z", {"RUBUSD": 101, "USDRUB": 0.01}),
+            ("2025-01-01T00:01:00Z", {"RUBUSD": 101, "USDRUB": 0.01, "AAABBB": 1}),
+        ):
+            currency_pair_bucket = model.CurrencyPairBucket(
+                currency_pairs=[
+                    model.CurrencyPair(symbol=symbol, conversion_rate=price) for symbol, price in prices.items()
+                ],
+                timestamp=str_to_datetime(timestamp),
+            )
+            await currency_pair_repo.create_currency_pair_bucket(
+                currency_pair_bucket,
+                currency_pair_bucket.diff(previous_currency_pair_bucket) if previous_currency_pair_bucket else None,
+            )
+            previous_currency_pair_bucket = currency_pair_bucket
+
+    async def test_stores_only_changed_currency_pairs(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert await client.hgetall("2025-01-01T00:00:00Z") == {"RUBUSD": "100.0", "USDRUB": "0.01"}
+        assert await client.hgetall("2025-01-01T00:00:30Z") == {"RUBUSD": "101.0", "__delta__": "1"}
+        assert await client.hgetall("2025-01-01T00:01:00Z") == {"AAABBB": "1.0", "__delta__": "1"}
+
+    async def test_does_not_expire_buckets_deltas_depend_on(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=101)],
+                timestamp=str_to_datetime("2025-01-01T00:01:30Z"),
+            ),
+            model.CurrencyPairBucket(currency_pairs=[], timestamp=str_to_datetime("2025-01-01T00:01:30Z")),
+        )
+
+        assert await client.ttl("2025-01-01T00:00:00Z") == -1
+        assert await client.ttl("2025-01-01T00:01:30Z") == -1
+        assert await client.hgetall("2025-01-01T00:01:30Z") == {"__delta__": "1"}
+
+    async def test_writes_keyframe_without_preceding_one(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)],
+            timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            currency_pair_bucket,
+            model.CurrencyPairBucket(currency_pairs=[], timestamp=currency_pair_bucket.timestamp),
+        )
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert await client.hgetall("2025-01-01T00:00:00Z") == {"RUBUSD": "100.0"}
+
+    @pytest.mark.parametrize(
+        ("symbol", "timestamp", "conversion_rate"),
+        [
+            ("USDRUB", None, 0.01),
+            ("RUBUSD", None, 101),
+            ("AAABBB", None, 1),
+            ("RUBUSD", "2025-01-01T00:00:30Z", 101),
+            ("USDRUB", "2025-01-01T00:00:30Z", 0.01),
+            ("AAABBB", "2025-01-01T00:00:30Z", None),
+            ("CCCDDD", None, None),
+        ],
+    )
+    async def test_can_retrieve_currency_pair_from_delta(
+        self,
+        symbol: str,
+        timestamp: str | None,
+        conversion_rate: float | None,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+        desired_timestamp = str_to_datetime(timestamp) if timestamp else None
+
+        by_script = await redis_currency_pair_repository.retrieve_latest_currency_pair(symbol, desired_timestamp)
+        by_template = await AbstractCurrencyPairRepository.retrieve_latest_currency_pair(
+            redis_currency_pair_repository,
+            symbol,
+            desired_timestamp,
+        )
+
+        for currency_pair_bucket in (by_script, by_template):
+            if conversion_rate is None:
+                assert currency_pair_bucket is None
+            else:
+                assert currency_pair_bucket
+                assert currency_pair_bucket.currency_pairs == [
+                    model.CurrencyPair(symbol=symbol, conversion_rate=conversion_rate),
+                ]
+
+    async def test_can_retrieve_currency_pair_bucket_from_delta(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+
+        currency_pair_bucket = await redis_currency_pair_repository._retrieve_currency_pair_bucket(  # noqa: SLF001
+            str_to_datetime("2025-01-01T00:01:00Z"),
+        )
+        currency_pairs = await redis_currency_pair_repository.retrieve_currency_pairs(["AAABBB", "USDRUB"], None)
+
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=101),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+            model.CurrencyPair(symbol="AAABBB", conversion_rate=1),
+        ]
+        assert currency_pairs
+        assert currency_pairs.currency_pairs == [
+            model.CurrencyPair(symbol="AAABBB", conversion_rate=1),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+        ]
+
+
+    async def test_reads_whole_buckets_of_delta_chain_only(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # An older keyframe, which the chain of the latest delta does not reach back to.
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=99)],
+                timestamp=str_to_datetime("2024-12-31T23:59:30Z"),
+            ),
+        )
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+        keys: list[str] = []
+        hgetall = redis.asyncio.client.Pipeline.hgetall
+
+        def record_hgetall(pipeline: redis.asyncio.client.Pipeline, key: str) -> typing.Any:
+            keys.append(key)
+            return hgetall(pipeline, key)
+
+        monkeypatch.setattr(redis.asyncio.client.Pipeline, "hgetall", record_hgetall)
+        currency_pair_bucket = await redis_currency_pair_repository._retrieve_currency_pair_bucket(  # noqa: SLF001
+            str_to_datetime("2025-01-01T00:01:00Z"),
+        )
+
+        assert currency_pair_bucket.get_conversion_rate("RUBUSD") == 101  # noqa: PLR2004
+        assert keys == ["2025-01-01T00:01:00Z", "2025-01-01T00:00:30Z", "2025-01-01T00:00:00Z"]
+
+class TestAliasRedisCurrencyPairRepository:
+    async def create_currency_pair_alias(
+        self,
+        currency_pair_repo: RedisCurrencyPairRepository,
+        timestamp: str,
+        target_timestamp: str,
+    ) -> None:
+        await currency_pair_repo.create_currency_pair_alias(
+            model.CurrencyPairBucket(
+                currency_pairs=[
+                    model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                    model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+                ],
+                timestamp=str_to_datetime(timestamp),
+            ),
+            str_to_datetime(target_timestamp),
+        )
+
+    async def test_can_create_currency_pair_alias(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        await TestDeltaRedisCurrencyPairRepository().create_currency_pair_buckets(redis_currency_pair_repository)
+
+        await self.create_currency_pair_alias(
+            redis_currency_pair_repository,
+            "2025-01-01T00:01:30Z",
+            "2025-01-01T00:01:00Z",
+        )
+
+        assert await client.hgetall("2025-01-01T00:01:30Z") == {"__alias__": "2025-01-01T00:01:00Z"}
+        assert await client.ttl("2025-01-01T00:01:30Z") == -1
+        assert await client.zscore(
+            "available_currency_pair_timestamps",
+            str(int(str_to_timestamp("2025-01-01T00:01:30Z"))),
+        ) == str_to_timestamp("2025-01-01T00:01:30Z")
+
+    async def test_writes_currency_pair_bucket_instead_of_alias_of_unknown_one(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_alias(
+            redis_currency_pair_repository,
+            "2025-01-01T00:00:30Z",
+            "2025-01-01T00:00:00Z",
+        )
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert await client.hgetall("2025-01-01T00:00:30Z") == {"RUBUSD": "100.0", "USDRUB": "0.01"}
+
+    async def test_can_retrieve_currency_pairs_through_alias(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await TestDeltaRedisCurrencyPairRepository().create_currency_pair_buckets(redis_currency_pair_repository)
+        await self.create_currency_pair_alias(
+            redis_currency_pair_repository,
+            "2025-01-01T00:01:30Z",
+            "2025-01-01T00:01:00Z",
+        )
+        desired_timestamp = str_to_datetime("2025-01-01T00:01:25Z")
+
+        by_script = await redis_currency_pair_repository.retrieve_latest_currency_pair("USDRUB", desired_timestamp)
+        by_template = await AbstractCurrencyPairRepository.retrieve_latest_currency_pair(
+            redis_currency_pair_repository,
+            "AAABBB",
+            None,
+        )
+        currency_pair_bucket = await redis_currency_pair_repository._retrieve_currency_pair_bucket(  # noqa: SLF001
+            str_to_datetime("2025-01-01T00:01:30Z"),
+        )
+
+        assert by_script
+        assert by_script.timestamp == str_to_datetime("2025-01-01T00:01:30Z")
+        assert by_script.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01)]
+        assert by_template
+        assert by_template.timestamp == str_to_datetime("2025-01-01T00:01:30Z")
+        assert by_template.currency_pairs == [model.CurrencyPair(symbol="AAABBB", conversion_rate=1)]
+        assert currency_pair_bucket.timestamp == str_to_datetime("2025-01-01T00:01:30Z")
+        assert len(currency_pair_bucket.currency_pairs) == 3  # noqa: PLR2004
+
+    async def test_can_retrieve_delta_written_after_alias(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await TestDeltaRedisCurrencyPairRepository().create_currency_pair_buckets(redis_currency_pair_repository)
+        await self.create_currency_pair_alias(
+            redis_currency_pair_repository,
+            "2025-01-01T00:01:30Z",
+            "2025-01-01T00:01:00Z",
+        )
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02)],
+                timestamp=str_to_datetime("2025-01-01T00:02:00Z"),
+            ),
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02)],
+                timestamp=str_to_datetime("2025-01-01T00:02:00Z"),
+            ),
+        )
+
+        by_script = await redis_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+        currency_pairs = await redis_currency_pair_repository.retrieve_currency_pairs(["RUBUSD", "USDRUB"], None)
+
+        assert by_script
+        assert by_script.currency_pairs == [model.CurrencyPair(symbol="RUBUSD", conversion_rate=101)]
+        assert currency_pairs
+        assert currency_pairs.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=101),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02),
+        ]
+
+    async def test_can_retrieve_packed_currency_pairs_through_alias(
+        self,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+    ) -> None:
+        await packed_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)],
+                timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+            ),
+        )
+        await self.create_currency_pair_alias(
+            packed_currency_pair_repository,
+            "2025-01-01T00:00:30Z",
+            "2025-01-01T00:00:00Z",
+        )
+
+        result = await packed_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+
+        client = packed_currency_pair_repository._client  # noqa: SLF001
+        assert await client.get("2025-01-01T00:00:30Z") == currency_pair_codec.pack_alias("2025-01-01T00:00:00Z")
+        assert result
+        assert result.timestamp == str_to_datetime("2025-01-01T00:00:30Z")
+        assert result.currency_pairs == [model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)]
+
+
+class TestPartialRedisCurrencyPairRepository:
+    @pytest.fixture(autouse=True)
+    def hot_tier(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "RUBUSD")
+        monkeypatch.setattr(AppSettings, "exchange_hot_fetch_interval", 5)
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 30)
+
+    async def create_currency_pair_buckets(self, currency_pair_repo: AbstractCurrencyPairRepository) -> None:
+        currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[
+                model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+            ],
+            timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+        await currency_pair_repo.create_currency_pair_bucket(currency_pair_bucket)
+        for timestamp, conversion_rate in (("2025-01-01T00:00:05Z", 101), ("2025-01-01T00:00:10Z", 102)):
+            partial_currency_pair_bucket = model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=conversion_rate)],
+                timestamp=str_to_datetime(timestamp),
+                partial=True,
+            )
+            currency_pair_bucket = currency_pair_bucket.merge(partial_currency_pair_bucket)
+            await currency_pair_repo.create_currency_pair_partial_bucket(
+                currency_pair_bucket,
+                partial_currency_pair_bucket,
+            )
+
+    async def test_stores_only_hot_currency_pairs(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert await client.hgetall("2025-01-01T00:00:05Z") == {"RUBUSD": "101.0", "__partial__": "1"}
+        assert await client.hgetall("2025-01-01T00:00:10Z") == {"RUBUSD": "102.0", "__partial__": "1"}
+
+    @pytest.mark.parametrize(
+        ("symbol", "timestamp", "conversion_rate", "actual_timestamp"),
+        [
+            ("RUBUSD", None, 102, "2025-01-01T00:00:10Z"),
+            ("USDRUB", None, 0.01, "2025-01-01T00:00:00Z"),
+            ("RUBUSD", "2025-01-01T00:00:06Z", 101, "2025-01-01T00:00:05Z"),
+            ("USDRUB", "2025-01-01T00:00:06Z", 0.01, "2025-01-01T00:00:00Z"),
+        ],
+    )
+    async def test_retrieves_currency_pair_with_its_own_timestamp(
+        self,
+        symbol: str,
+        timestamp: str | None,
+        conversion_rate: float,
+        actual_timestamp: str,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        cached_currency_pair_repository = CachedCurrencyPairRepository(redis_currency_pair_repository)
+        await self.create_currency_pair_buckets(cached_currency_pair_repository)
+        desired_timestamp = str_to_datetime(timestamp) if timestamp else None
+
+        by_script = await redis_currency_pair_repository.retrieve_latest_currency_pair(symbol, desired_timestamp)
+        by_cache = await cached_currency_pair_repository.retrieve_latest_currency_pair(symbol, desired_timestamp)
+
+        for currency_pair_bucket in (by_script, by_cache):
+            assert currency_pair_bucket
+            assert currency_pair_bucket.timestamp == str_to_datetime(actual_timestamp)
+            assert currency_pair_bucket.currency_pairs == [
+                model.CurrencyPair(symbol=symbol, conversion_rate=conversion_rate),
+            ]
+
+    async def test_retrieves_currency_pairs_with_their_own_timestamps(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        cached_currency_pair_repository = CachedCurrencyPairRepository(redis_currency_pair_repository)
+        await self.create_currency_pair_buckets(cached_currency_pair_repository)
+
+        by_hash = await redis_currency_pair_repository.retrieve_currency_pairs(["RUBUSD", "USDRUB"], None)
+        by_cache = await cached_currency_pair_repository.retrieve_currency_pairs(["RUBUSD", "USDRUB"], None)
+
+        for currency_pair_bucket in (by_hash, by_cache):
+            assert currency_pair_bucket
+            assert currency_pair_bucket.timestamp == str_to_datetime("2025-01-01T00:00:10Z")
+            assert currency_pair_bucket.get_timestamp("RUBUSD") == str_to_datetime("2025-01-01T00:00:10Z")
+            assert currency_pair_bucket.get_timestamp("USDRUB") == str_to_datetime("2025-01-01T00:00:00Z")
+            assert currency_pair_bucket.currency_pairs == [
+                model.CurrencyPair(symbol="RUBUSD", conversion_rate=102),
+                model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+            ]
+
+    async def test_can_retrieve_delta_written_after_partial_buckets(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+        # The hot symbol is back at the price of the keyframe, which a delta taken against it would miss.
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[
+                    model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                    model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+                ],
+                timestamp=str_to_datetime("2025-01-01T00:00:30Z"),
+            ),
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)],
+                timestamp=str_to_datetime("2025-01-01T00:00:30Z"),
+            ),
+        )
+
+        by_script = await redis_currency_pair_repository.retrieve_latest_currency_pair("USDRUB", None)
+        currency_pair_bucket = await redis_currency_pair_repository._retrieve_currency_pair_bucket(  # noqa: SLF001
+            str_to_datetime("2025-01-01T00:00:30Z"),
+        )
+        currency_pairs = await redis_currency_pair_repository.retrieve_currency_pairs(
+            ["RUBUSD", "USDRUB"],
+            str_to_datetime("2025-01-01T00:00:10Z"),
+        )
+
+        assert by_script
+        assert by_script.timestamp == str_to_datetime("2025-01-01T00:00:30Z")
+        assert by_script.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01)]
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+        ]
+        assert currency_pairs
+        assert currency_pairs.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=102),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+        ]
+
+    @pytest.mark.parametrize("storage_format", ["hash", "cached", "packed"])
+    async def test_retrieves_currency_pair_groups_like_one_at_a_time(
+        self,
+        storage_format: str,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+    ) -> None:
+        currency_pair_repo: AbstractCurrencyPairRepository = {
+            "hash": redis_currency_pair_repository,
+            "cached": CachedCurrencyPairRepository(redis_currency_pair_repository, size=1),
+            "packed": packed_currency_pair_repository,
+        }[storage_format]
+        await self.create_currency_pair_buckets(currency_pair_repo)
+        await currency_pair_repo.create_currency_pair_alias(
+            model.CurrencyPairBucket(currency_pairs=[], timestamp=str_to_datetime("2025-01-01T00:00:15Z")),
+            str_to_datetime("2025-01-01T00:00:10Z"),
+        )
+        groups: list[tuple[list[str], datetime.datetime | None]] = [
+            (["RUBUSD", "USDRUB"], None),
+            (["USDRUB", "RUBUSD"], str_to_datetime("2025-01-01T00:00:06Z")),
+            (["USDRUB"], str_to_datetime("2025-01-01T00:00:01Z")),
+            (["RUBUSD"], str_to_datetime("2024-01-01T00:00:00Z")),
+        ]
+
+        currency_pair_buckets = await currency_pair_repo.retrieve_currency_pair_groups(groups)
+
+        for (symbols, desired_timestamp), currency_pair_bucket in zip(groups, currency_pair_buckets, strict=True):
+            expected = await currency_pair_repo.retrieve_currency_pairs(symbols, desired_timestamp)
+            if not expected:
+                assert not currency_pair_bucket
+                continue
+            assert currency_pair_bucket
+            assert currency_pair_bucket.timestamp == expected.timestamp
+            assert currency_pair_bucket.currency_pairs == expected.currency_pairs
+            assert [currency_pair_bucket.get_timestamp(symbol) for symbol in symbols] == [
+                expected.get_timestamp(symbol) for symbol in symbols
+            ]
+        assert currency_pair_buckets[0]
+        assert currency_pair_buckets[0].timestamp == str_to_datetime("2025-01-01T00:00:15Z")
+        assert len(currency_pair_buckets[0].currency_pairs) == 2  # noqa: PLR2004
+
+    async def test_writes_full_packed_currency_pair_bucket(
+        self,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(packed_currency_pair_repository)
+
+        result = await packed_currency_pair_repository.retrieve_latest_currency_pair("USDRUB", None)
+
+        assert result
+        assert result.timestamp == str_to_datetime("2025-01-01T00:00:10Z")
+        assert result.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01)]
+
+
+class TestPackedRedisCurrencyPairRepository:
+    @pytest.mark.parametrize("compress", [False, True])
+    async def test_can_create_and_retrieve_currency_pair_bucket(
+        self,
+        compress: bool,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+    ) -> None:
+        packed_currency_pair_repository._compress = compress  # noqa: SLF001
+        for conversion_rate, timestamp in enumerate(("2025-01-01T00:00:00Z", "2025-01-01T00:00:30Z"), start=1):
+            await packed_currency_pair_repository.create_currency_pair_bucket(
+                model.CurrencyPairBucket(
+                    currency_pairs=[
+                        model.CurrencyPair(symbol="RUBUSD", conversion_rate=100 * conversion_rate),
+                        model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01 * conversion_rate),
+                    ],
+                    timestamp=str_to_datetime(timestamp),
+                ),
+            )
+
+        latest = await packed_currency_pair_repository.retrieve_latest_currency_pair("USDRUB", None)
+        closest = await packed_currency_pair_repository.retrieve_latest_currency_pair(
+            "RUBUSD",
+            str_to_datetime("2025-01-01T00:00:10Z"),
+        )
+        several = await packed_currency_pair_repository.retrieve_currency_pairs(["USDRUB", "AAABBB", "RUBUSD"], None)
+        missing = await packed_currency_pair_repository.retrieve_latest_currency_pair("AAABBB", None)
+
+        assert latest
+        assert latest.timestamp == str_to_datetime("2025-01-01T00:00:30Z")
+        assert latest.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02)]
+        assert closest
+        assert closest.timestamp == str_to_datetime("2025-01-01T00:00:00Z")
+        assert closest.currency_pairs == [model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)]
+        assert several
+        assert several.currency_pairs == [
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02),
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=200),
+        ]
+        assert missing is None
+
+    async def test_stores_symbol_dictionary_once(
+        self,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+    ) -> None:
+        for timestamp in ("2025-01-01T00:00:00Z", "2025-01-01T00:00:30Z", "2025-01-01T00:01:00Z"):
+            await packed_currency_pair_repository.create_currency_pair_bucket(
+                model.CurrencyPairBucket(
+                    currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)],
+                    timestamp=str_to_datetime(timestamp),
+                ),
+            )
+
+        client = packed_currency_pair_repository._client  # noqa: SLF001
+        assert len(await client.keys("currency_pair_symbols:*")) == 1
+        assert 0 < await client.ttl((await client.keys("currency_pair_symbols:*"))[0]) <= AppSettings.currency_pair_ttl
+        assert len(await client.get("2025-01-01T00:00:30Z")) == currency_pair_codec.get_price_offset(1)
+
+    async def test_keeps_symbol_dictionary_without_ttl(
+        self,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_ttl", 0)
+        client = packed_currency_pair_repository._client  # noqa: SLF001
+        for timestamp in ("2025-01-01T00:00:00Z", "2025-01-01T00:00:30Z", "2025-01-01T00:01:00Z"):
+            await packed_currency_pair_repository.create_currency_pair_bucket(
+                model.CurrencyPairBucket(
+                    currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)],
+                    timestamp=str_to_datetime(timestamp),
+                ),
+            )
+            if timestamp == "2025-01-01T00:00:30Z":
+                # E.g. Redis is flushed, the dictionary is stored again along with the next bucket.
+                await client.delete(*await client.keys("currency_pair_symbols:*"))
+
+        assert await client.ttl((await client.keys("currency_pair_symbols:*"))[0]) == -1
+        assert await packed_currency_pair_repository.retrieve_latest_currency_pair("RUBUSD", None)
+
+    async def test_can_retrieve_currency_pair_written_with_other_dictionary(
+        self,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+    ) -> None:
+        await packed_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[
+                    model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                    model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+                ],
+                timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+            ),
+        )
+        await packed_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02)],
+                timestamp=str_to_datetime("2025-01-01T00:00:30Z"),
+            ),
+        )
+        reader = PackedRedisCurrencyPairRepository(packed_currency_pair_repository._client)  # noqa: SLF001
+
+        old = await packed_currency_pair_repository.retrieve_latest_currency_pair(
+            "USDRUB",
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+        new = await reader.retrieve_latest_currency_pair("USDRUB", None)
+
+        assert old
+        assert old.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01)]
+        assert new
+        assert new.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02)]
+
+    async def test_can_retrieve_currency_pair_bucket_not_migrated_yet(self) -> None:
+        server = fakeredis.FakeServer()
+        hash_currency_pair_repository = RedisCurrencyPairRepository(
+            fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        )
+        packed_currency_pair_repository = PackedRedisCurrencyPairRepository(fakeredis.FakeAsyncRedis(server=server))
+        await hash_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01)],
+                timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+            ),
+        )
+        await packed_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02)],
+                timestamp=str_to_datetime("2025-01-01T00:00:30Z"),
+            ),
+        )
+
+        old = await packed_currency_pair_repository.retrieve_latest_currency_pair(
+            "USDRUB",
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        assert old
+        assert old.timestamp == str_to_datetime("2025-01-01T00:00:00Z")
+        assert old.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01)]
+        with pytest.raises(exceptions.CurrencyPairFormatError):
+            await hash_currency_pair_repository.retrieve_latest_currency_pair("USDRUB", None)
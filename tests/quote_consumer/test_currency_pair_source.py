@@ -0,0 +1,115 @@
+"""Unit tests related to currency pair sources."""
+
+import json
+
+import pydantic
+import pytest
+
+from src.quote_consumer.adapters import currency_pair_source
+from src.quote_consumer.settings import AppSettings
+
+
+class TestCurrencyPairSource:
+    @pytest.mark.parametrize(
+        ("symbol", "normalised_symbol"),
+        [
+            ("BTCUSDT", "BTCUSDT"),
+            ("BTC-USDT", "BTCUSDT"),
+            ("btc/usdt", "BTCUSDT"),
+            ("BTC_USDT", "BTCUSDT"),
+        ],
+    )
+    def test_can_normalise_symbol(self, symbol: str, normalised_symbol: str) -> None:
+        assert currency_pair_source.normalise_symbol(symbol) == normalised_symbol
+
+    @pytest.mark.parametrize(
+        ("source_class", "response"),
+        [
+            (
+                currency_pair_source.BinanceCurrencyPairSource,
+                [{"symbol": "BTCUSDT", "price": "100.5"}, {"symbol": "ETHUSDT"}],
+            ),
+            (
+                currency_pair_source.BybitCurrencyPairSource,
+                {"result": {"list": [{"symbol": "BTCUSDT", "lastPrice": "100.5"}, {"symbol": "ETHUSDT"}]}},
+            ),
+            (
+                currency_pair_source.OkxCurrencyPairSource,
+                {"data": [{"instId": "BTC-USDT", "last": "100.5"}, {"instId": "ETH-USDT", "last": ""}]},
+            ),
+        ],
+    )
+    def test_can_parse_response(
+        self,
+        source_class: type[currency_pair_source.AbstractCurrencyPairSource],
+        response: list | dict,
+    ) -> None:
+        source = source_class("https://exchange.test", 30)
+
+        symbols, prices = source.parse(json.dumps(response).encode())
+
+        assert symbols == ("BTCUSDT",)
+        assert list(prices) == [100.5]
+
+    @pytest.mark.parametrize("response", [b'[{"symbol": "BTCUSDT", "price": "100.5"}', b"malformed"])
+    def test_cannot_parse_malformed_response(self, response: bytes) -> None:
+        source = currency_pair_source.BinanceCurrencyPairSource("https://exchange.test", 30)
+
+        with pytest.raises(ValueError, match="Malformed response of binance"):
+            source.parse(response)
+
+    def test_can_parse_exchange_info(self) -> None:
+        exchange_info = {"symbols": [{"symbol": "BTCAUD", "baseAsset": "BTC", "quoteAsset": "AUD"}]}
+
+        symbol_assets = currency_pair_source.parse_exchange_info(json.dumps(exchange_info).encode())
+
+        assert symbol_assets == {"BTCAUD": ("BTC", "AUD")}
+
+    @pytest.mark.parametrize("response", [b'{"code": -1121}', b'{"symbols": [{"symbol": "BTCAUD"}]}', b"malformed"])
+    def test_cannot_parse_malformed_exchange_info(self, response: bytes) -> None:
+        with pytest.raises(ValueError):  # noqa: PT011
+            currency_pair_source.parse_exchange_info(response)
+
+    def test_can_get_currency_pair_sources(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_sources", "binance, okx")
+        monkeypatch.setattr(AppSettings, "exchange_source_fetch_intervals", "okx:60")
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "")
+
+        sources = currency_pair_source.get_currency_pair_sources()
+
+        assert [(source.name, source.fetch_interval) for source in sources] == [
+            ("binance", AppSettings.exchange_fetch_interval),
+            ("okx", 60),
+        ]
+        assert sources[1].url == AppSettings.okx_api_url.unicode_string()
+
+    def test_binance_source_has_mirrors(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_sources", "binance,okx")
+        monkeypatch.setattr(AppSettings, "exchange_api_mirror_urls", "https://api1.test, https://api2.test")
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "")
+
+        binance_source, okx_source = currency_pair_source.get_currency_pair_sources()
+
+        assert binance_source.mirror_urls == ["https://api1.test", "https://api2.test"]
+        assert okx_source.mirror_urls == ()
+
+    def test_can_get_hot_tier_of_binance(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_sources", "binance,okx")
+        monkeypatch.setattr(AppSettings, "exchange_api_url", pydantic.HttpUrl("https://api.test/ticker/price"))
+        monkeypatch.setattr(AppSettings, "exchange_api_mirror_urls", "https://api1.test/ticker/price")
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "BTCUSDT, ETHUSDT")
+        monkeypatch.setattr(AppSettings, "exchange_hot_fetch_interval", 5)
+
+        *_, hot_source = currency_pair_source.get_currency_pair_sources()
+
+        assert (hot_source.key, hot_source.fetch_interval) == ("binance:hot", 5)
+        assert hot_source.url == "https://api.test/ticker/price?symbols=%5B%22BTCUSDT%22%2C%22ETHUSDT%22%5D"
+        assert hot_source.mirror_urls == [
+            "https://api1.test/ticker/price?symbols=%5B%22BTCUSDT%22%2C%22ETHUSDT%22%5D",
+        ]
+
+    def test_cannot_get_unknown_currency_pair_sources(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_sources", "binance,kraken")
+
+        with pytest.raises(ValueError, match="Unknown exchanges: kraken"):
+            currency_pair_source.get_currency_pair_sources()
@@ -1,13 +1,31 @@
 """Unit tests related to currency pairs service."""
 
+import array
+import asyncio
 import datetime
+import fakeredis
+import httpx
 import logging
 import pytest
+import time
+import typing
 
 from . import conftest
-from ..conftest import str_to_datetime
-from src.quote_consumer.domain import model
-from src.quote_consumer.services import currency_pairs
+from ..conftest import str_to_datetime, str_to_timestamp
+from src.quote_consumer.adapters import currency_pair_codec
+from src.quote_consumer.adapters.currency_pair_publisher import (
+    CURRENCY_PAIR_SNAPSHOT_KEY,
+    CURRENCY_PAIR_UPDATES_CHANNEL,
+    RedisCurrencyPairPublisher,
+)
+from src.quote_consumer.adapters.currency_pair_repository import RedisCurrencyPairRepository
+from src.quote_consumer.adapters.currency_pair_source import BinanceCurrencyPairSource, OkxCurrencyPairSource, Prices
+from src.quote_consumer.adapters.websocket_client import WebSocketsClient
+from src.quote_consumer.domain import exceptions, model
+from src.quote_consumer.metrics import EVENT_LOOP_LAG_BUCKETS, AppMetrics, monitor_event_loop_lag
+from src.quote_consumer.services import currency_pairs, dependencies
+from src.quote_consumer.services.conversion_paths import AppConversionPaths
+from src.quote_consumer.services.fetch_interval import AdaptiveFetchInterval
 from src.quote_consumer.settings import AppSettings
 
 
@@ -36,6 +54,101 @@ class TestFetchCurrencyPairBucket:
         assert "Failed to fetch currency pairs." in caplog.text
 
 
+class TestGetHedged:
+    def create_fake_get(self, delays: dict[str, float], failing_urls: tuple[str, ...] = ()) -> typing.Callable:
+        self.requested_urls: list[str] = []
+        self.cancelled_urls: list[str] = []
+
+        async def get(url: str) -> typing.Any:
+            self.requested_urls.append(url)
+            try:
+                await asyncio.sleep(delays[url])
+            except asyncio.CancelledError:
+                self.cancelled_urls.append(url)
+                raise
+            if url in failing_urls:
+                raise exceptions.HTTPBadResponseError(f"Failed to get {url}")
+            return httpx.Response(status_code=200, content=url.encode())
+
+        return get
+
+    async def test_requests_mirror_if_primary_is_slow(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(fake_http_client, "get", self.create_fake_get({"https://api": 1, "https://api1": 0}))
+        hedged_requests = AppMetrics.counters["exchange_hedged_requests"]
+
+        response = await currency_pairs.get_hedged(fake_http_client, ["https://api", "https://api1"], 0.05)
+        await asyncio.sleep(0)
+
+        assert response.content == b"https://api1"
+        assert self.cancelled_urls == ["https://api"]
+        assert AppMetrics.counters["exchange_hedged_requests"] == hedged_requests + 1
+
+    async def test_does_not_request_mirror_if_primary_is_fast(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(fake_http_client, "get", self.create_fake_get({"https://api": 0, "https://api1": 0}))
+
+        response = await currency_pairs.get_hedged(fake_http_client, ["https://api", "https://api1"], 0.05)
+
+        assert response.content == b"https://api"
+        assert self.requested_urls == ["https://api"]
+
+    async def test_requests_mirror_at_once_if_primary_fails(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(
+            fake_http_client,
+            "get",
+            self.create_fake_get({"https://api": 0, "https://api1": 0}, failing_urls=("https://api",)),
+        )
+
+        response = await asyncio.wait_for(
+            currency_pairs.get_hedged(fake_http_client, ["https://api", "https://api1"], 10),
+            timeout=1,
+        )
+
+        assert response.content == b"https://api1"
+
+    async def test_raises_if_all_mirrors_fail(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(
+            fake_http_client,
+            "get",
+            self.create_fake_get(
+                {"https://api": 0, "https://api1": 0},
+                failing_urls=("https://api", "https://api1"),
+            ),
+        )
+
+        with pytest.raises(exceptions.HTTPBadResponseError):
+            await currency_pairs.get_hedged(fake_http_client, ["https://api", "https://api1"], 0.05)
+
+    async def test_derives_hedge_delay_from_fetch_latency(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_hedge_delay", 1)
+
+        assert currency_pairs.get_hedge_delay("test_hedge_fetch_seconds") == 1
+        for latency in range(1, 101):
+            AppMetrics.observe("test_hedge_fetch_seconds", latency / 1000)
+
+        assert currency_pairs.get_hedge_delay("test_hedge_fetch_seconds") == 0.095  # noqa: PLR2004
+
+    async def test_observes_fetch_latency(self, fake_http_client: conftest.FakeHttpClient) -> None:
+        await currency_pairs.fetch_currency_pairs(fake_http_client, latency_metric="test_fetch_seconds")
+
+        assert len(AppMetrics.observations["test_fetch_seconds"]) == 1
+
+
 class TestCreateCurrencyBucketFromJSON:
     async def test_can_create_currency_pair_bucket_from_json(
         self,
@@ -51,6 +164,51 @@ class TestCreateCurrencyBucketFromJSON:
         assert currency_pair_bucket.currency_pairs[1].conversion_rate == currency_pairs_json[1]["price"]
         assert isinstance(currency_pair_bucket.timestamp, datetime.datetime)
 
+    async def test_skips_malformed_currency_pairs_from_json(
+        self,
+    ) -> None:
+        currency_pairs_json = [{"symbol": "RUBUSD", "price": "100.5"}, {"symbol": "USDRUB"}, {"price": "200"}]
+
+        currency_pair_bucket = currency_pairs.create_currency_pair_bucket_from_json(currency_pairs_json)
+
+        assert currency_pair_bucket.symbols == ("RUBUSD",)
+        assert currency_pair_bucket.get_conversion_rate("RUBUSD") == 100.5  # noqa: PLR2004
+
+
+
+class TestGetChangedCurrencyPairBucket:
+    def test_can_get_changed_currency_pair_bucket(self) -> None:
+        previous_currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[
+                model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+            ],
+            timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+        currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[
+                model.CurrencyPair(symbol="RUBUSD", conversion_rate=101),
+                model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+            ],
+            timestamp=str_to_datetime("2025-01-01T00:00:30Z"),
+        )
+
+        changed_currency_pair_bucket = currency_pairs.get_changed_currency_pair_bucket(
+            currency_pair_bucket,
+            previous_currency_pair_bucket,
+            0,
+        )
+
+        assert changed_currency_pair_bucket
+        assert changed_currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=101),
+        ]
+        assert currency_pairs.get_changed_currency_pair_bucket(currency_pair_bucket, None, 0) is None
+        assert currency_pairs.get_changed_currency_pair_bucket(
+            currency_pair_bucket,
+            previous_currency_pair_bucket,
+            AppSettings.currency_pair_keyframe_interval - 1,
+        ) is None
 
 
 class TestSaveCurrencyPairBucket:
@@ -92,3 +250,785 @@ class TestSaveCurrencyPairBucket:
             )
 
         assert "Failed to store currency pairs." in caplog.text
+
+
+class TestSaveCurrencyPairAlias:
+    def test_fingerprints_identical_snapshots_equally(self) -> None:
+        assert currency_pairs.get_fingerprint(b'[{"symbol": "RUBUSD", "price": "100"}]') == (
+            currency_pairs.get_fingerprint(b'[{"symbol": "RUBUSD", "price": "100"}]')
+        )
+        assert currency_pairs.get_fingerprint(b'[{"symbol": "RUBUSD", "price": "100"}]') != (
+            currency_pairs.get_fingerprint(b'[{"symbol": "RUBUSD", "price": "101"}]')
+        )
+
+    def test_aliases_count_towards_keyframe_interval(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_keyframe_interval", 3)
+
+        assert currency_pairs.can_create_currency_pair_alias(1)
+        assert not currency_pairs.can_create_currency_pair_alias(2)
+
+    def test_can_always_create_alias_without_delta_buckets(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_keyframe_interval", 1)
+
+        assert currency_pairs.can_create_currency_pair_alias(100)
+
+    async def test_can_save_currency_pair_alias(
+        self,
+        fake_currency_pair_repository: conftest.FakeCurrencyPairRepository,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        currency_pair_bucket = model.CurrencyPairBucket(
+            currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)],
+            timestamp=str_to_datetime("2025-01-01T00:00:30Z"),
+        )
+
+        with caplog.at_level(logging.INFO):
+            saved = await currency_pairs.save_currency_pair_alias(
+                currency_pair_bucket,
+                str_to_datetime("2025-01-01T00:00:00Z"),
+                fake_currency_pair_repository,
+            )
+
+        assert saved
+        assert fake_currency_pair_repository.currency_pair_buckets["2025-01-01T00:00:30Z"]["RUBUSD"] == "100.0"
+        assert (
+            "Currency pairs unchanged, stored with key: 2025-01-01T00:00:30Z as an alias of 2025-01-01T00:00:00Z"
+            in caplog.text
+        )
+
+
+class TestScheduleCurrencyPairs:
+    @pytest.fixture(autouse=True)
+    def parse_inline(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Starting a worker process takes longer than the ticks of these tests.
+        monkeypatch.setattr(AppSettings, "exchange_parse_executor", "inline")
+
+    @pytest.mark.parametrize(
+        ("now", "interval", "next_tick"),
+        [
+            (65, 30, 90),
+            (60, 30, 90),
+            (89.9, 30, 90),
+            (65, 0, 65),
+        ],
+    )
+    def test_can_get_next_tick(self, now: float, interval: float, next_tick: float) -> None:
+        assert currency_pairs.get_next_tick(now, interval) == next_tick
+
+    async def test_fetches_currency_pairs_on_wall_clock_boundaries(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def get_prices(url: str) -> typing.Any:  # noqa: ARG001
+            return httpx.Response(status_code=200, json=[{"symbol": "RUBUSD", "price": "100"}])
+
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 0.05)
+        monkeypatch.setattr(fake_http_client, "get", get_prices)
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+
+        task = asyncio.create_task(
+            currency_pairs.fetch_currency_pairs_on_schedule(
+                fake_http_client,
+                snapshots,
+                [BinanceCurrencyPairSource("https://binance.test", 0.05)],
+            ),
+        )
+        await asyncio.sleep(0.18)
+        task.cancel()
+
+        timestamps = [snapshots.get_nowait()[0].timestamp() for _ in range(snapshots.qsize())]
+        assert len(timestamps) >= 2  # noqa: PLR2004
+        assert all(round(timestamp / 0.05, 3).is_integer() for timestamp in timestamps)
+
+    async def test_counts_missed_ticks(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def get_slowly(url: str) -> typing.Any:
+            await asyncio.sleep(0.12)
+            return await conftest.FakeHttpClient.get(fake_http_client, url)
+
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 0.05)
+        monkeypatch.setattr(fake_http_client, "get", get_slowly)
+        missed_ticks = AppMetrics.counters["ingest_missed_ticks"]
+
+        task = asyncio.create_task(
+            currency_pairs.fetch_currency_pairs_on_schedule(
+                fake_http_client,
+                asyncio.Queue(),
+                [BinanceCurrencyPairSource(AppSettings.exchange_api_url.unicode_string(), 0.05)],
+            ),
+        )
+        await asyncio.sleep(0.25)
+        task.cancel()
+
+        assert AppMetrics.counters["ingest_missed_ticks"] > missed_ticks
+
+    async def test_fetches_sources_concurrently(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        responses = {
+            "https://binance.test": [{"symbol": "BTCUSDT", "price": "100"}],
+            "https://okx.test": {"data": [{"instId": "BTC-USDT", "last": "102"}]},
+        }
+
+        async def get_slowly(url: str) -> typing.Any:
+            await asyncio.sleep(0.1)
+            return httpx.Response(status_code=200, json=responses[url])
+
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 0.2)
+        monkeypatch.setattr(AppSettings, "exchange_merge_mode", "namespace")
+        monkeypatch.setattr(fake_http_client, "get", get_slowly)
+        missed_ticks = AppMetrics.counters["ingest_missed_ticks"]
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+
+        task = asyncio.create_task(
+            currency_pairs.fetch_currency_pairs_on_schedule(
+                fake_http_client,
+                snapshots,
+                [
+                    BinanceCurrencyPairSource("https://binance.test", 0.2),
+                    OkxCurrencyPairSource("https://okx.test", 0.2),
+                ],
+            ),
+        )
+        _, currency_pair_bucket = await asyncio.wait_for(snapshots.get(), timeout=1)
+        task.cancel()
+
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="binance:BTCUSDT", conversion_rate=100),
+            model.CurrencyPair(symbol="okx:BTCUSDT", conversion_rate=102),
+        ]
+        # Two sources of 0.1 s each fit into a tick of 0.2 s only if they are fetched concurrently.
+        assert AppMetrics.counters["ingest_missed_ticks"] == missed_ticks
+
+    async def test_fetches_sources_on_their_own_intervals(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        fetched_urls: list[str] = []
+
+        async def get_prices(url: str) -> typing.Any:
+            fetched_urls.append(url)
+            return httpx.Response(status_code=200, json=[])
+
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 0.05)
+        monkeypatch.setattr(fake_http_client, "get", get_prices)
+
+        task = asyncio.create_task(
+            currency_pairs.fetch_currency_pairs_on_schedule(
+                fake_http_client,
+                asyncio.Queue(),
+                [
+                    BinanceCurrencyPairSource("https://fast.test", 0.05),
+                    OkxCurrencyPairSource("https://slow.test", 10),
+                ],
+            ),
+        )
+        await asyncio.sleep(0.3)
+        task.cancel()
+
+        assert fetched_urls.count("https://fast.test") >= 3  # noqa: PLR2004
+        assert fetched_urls.count("https://slow.test") == 1
+
+
+    async def test_fetches_hot_tier_in_between(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        responses = {
+            "https://all.test": [{"symbol": "BTCUSDT", "price": "100"}, {"symbol": "AAABBB", "price": "1"}],
+            "https://hot.test": [{"symbol": "BTCUSDT", "price": "101"}],
+        }
+
+        async def get_prices(url: str) -> typing.Any:
+            return httpx.Response(status_code=200, json=responses[url])
+
+        monkeypatch.setattr(fake_http_client, "get", get_prices)
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+
+        task = asyncio.create_task(
+            currency_pairs.fetch_currency_pairs_on_schedule(
+                fake_http_client,
+                snapshots,
+                [
+                    BinanceCurrencyPairSource("https://all.test", 10),
+                    BinanceCurrencyPairSource("https://hot.test", 0.05, tier="hot"),
+                ],
+            ),
+        )
+        await asyncio.sleep(0.18)
+        task.cancel()
+
+        currency_pair_buckets = [snapshots.get_nowait()[1] for _ in range(snapshots.qsize())]
+        assert len(currency_pair_buckets) >= 2  # noqa: PLR2004
+        assert not currency_pair_buckets[0].partial
+        assert currency_pair_buckets[0].symbols == ("BTCUSDT", "AAABBB")
+        assert all(currency_pair_bucket.partial for currency_pair_bucket in currency_pair_buckets[1:])
+        assert currency_pair_buckets[-1].currency_pairs == [model.CurrencyPair(symbol="BTCUSDT", conversion_rate=101)]
+
+
+    async def test_skips_hot_tick_of_failed_fetch(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def get_prices(url: str) -> typing.Any:
+            if url == "https://hot.test":
+                return httpx.Response(status_code=200, content=b"")
+            return httpx.Response(status_code=200, json=[{"symbol": "BTCUSDT", "price": "100"}])
+
+        monkeypatch.setattr(fake_http_client, "get", get_prices)
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+
+        task = asyncio.create_task(
+            currency_pairs.fetch_currency_pairs_on_schedule(
+                fake_http_client,
+                snapshots,
+                [
+                    BinanceCurrencyPairSource("https://all.test", 10),
+                    BinanceCurrencyPairSource("https://hot.test", 0.05, tier="hot"),
+                ],
+            ),
+        )
+        await asyncio.sleep(0.18)
+        task.cancel()
+
+        assert snapshots.qsize() == 1
+        assert not snapshots.get_nowait()[1].partial
+
+
+    async def test_scales_intervals_by_adaptive_interval(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        class VolatileFetchInterval(AdaptiveFetchInterval):
+            def update(self, currency_pair_bucket: model.CurrencyPairBucket) -> float:  # noqa: ARG002
+                return 0.05
+
+        adaptive_interval = VolatileFetchInterval()
+        adaptive_interval.interval = 0.05
+
+        fetched_urls: list[str] = []
+
+        async def get_prices(url: str) -> typing.Any:
+            fetched_urls.append(url)
+            return httpx.Response(status_code=200, json=[{"symbol": "BTCUSDT", "price": "100"}])
+
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 10)
+        monkeypatch.setattr(fake_http_client, "get", get_prices)
+
+        task = asyncio.create_task(
+            currency_pairs.fetch_currency_pairs_on_schedule(
+                fake_http_client,
+                asyncio.Queue(),
+                [BinanceCurrencyPairSource("https://binance.test", 10)],
+                adaptive_interval,
+            ),
+        )
+        await asyncio.sleep(0.3)
+        task.cancel()
+
+        assert len(fetched_urls) >= 3  # noqa: PLR2004
+
+
+def stall_event_loop() -> None:
+    """Block the event loop the way a parse on it would."""
+    time.sleep(0.05)
+
+
+class TestParseOffLoop:
+    @pytest.mark.parametrize("parse_executor", ["process", "thread", "inline"])
+    async def test_can_parse_off_loop(self, parse_executor: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_parse_executor", parse_executor)
+        dependencies.shutdown_parse_executor()
+
+        symbols, prices = await currency_pairs.parse_off_loop(
+            BinanceCurrencyPairSource("https://binance.test", 30).parse,
+            b'[{"symbol": "RUBUSD", "price": "100"}]',
+        )
+        dependencies.shutdown_parse_executor()
+
+        assert symbols == ("RUBUSD",)
+        assert list(prices) == [100]
+
+    def test_shuts_parse_executor_down(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_parse_executor", "process")
+        dependencies.shutdown_parse_executor()
+        parse_executor = dependencies.get_parse_executor()
+
+        dependencies.shutdown_parse_executor()
+
+        assert parse_executor
+        with pytest.raises(RuntimeError):
+            parse_executor.submit(int)
+        assert dependencies.get_parse_executor.cache_info().currsize == 0
+
+    async def test_raises_parse_errors_of_worker(self) -> None:
+        with pytest.raises(ValueError, match="Expecting value"):
+            await currency_pairs.parse_off_loop(currency_pairs.parse_mini_tickers, "malformed")
+
+    async def test_monitors_event_loop_lag(self) -> None:
+        stall_bucket = EVENT_LOOP_LAG_BUCKETS.index(0.05)
+        stalls = sum(AppMetrics.histogram_counts.get("event_loop_lag_seconds", [])[stall_bucket:])
+        task = asyncio.create_task(monitor_event_loop_lag(0.01))
+        await asyncio.sleep(0.015)
+        stall_event_loop()
+        await asyncio.sleep(0.015)
+        task.cancel()
+
+        assert max(AppMetrics.observations["event_loop_lag_seconds"]) >= 0.04  # noqa: PLR2004
+        assert sum(AppMetrics.histogram_counts["event_loop_lag_seconds"][stall_bucket:]) > stalls
+
+
+class TestMergeCurrencyPairs:
+    prices_by_source: typing.ClassVar[dict[str, Prices]] = {
+        "binance": (("BTCUSDT", "ETHUSDT"), array.array("d", [100, 10])),
+        "bybit": (("BTCUSDT",), array.array("d", [104])),
+        "okx": (("BTCUSDT", "SOLUSDT"), array.array("d", [101, 1])),
+    }
+
+    def test_can_merge_currency_pairs_into_median(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_merge_mode", "median")
+
+        currency_pair_bucket = currency_pairs.merge_currency_pairs(
+            self.prices_by_source,
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="BTCUSDT", conversion_rate=101),
+            model.CurrencyPair(symbol="ETHUSDT", conversion_rate=10),
+            model.CurrencyPair(symbol="SOLUSDT", conversion_rate=1),
+        ]
+        assert currency_pair_bucket.timestamp == str_to_datetime("2025-01-01T00:00:00Z")
+
+    def test_can_merge_currency_pairs_into_namespaces(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_merge_mode", "namespace")
+
+        currency_pair_bucket = currency_pairs.merge_currency_pairs(
+            self.prices_by_source,
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        assert currency_pair_bucket.get_conversion_rate("bybit:BTCUSDT") == 104  # noqa: PLR2004
+        assert currency_pair_bucket.get_conversion_rate("okx:SOLUSDT") == 1
+        assert currency_pair_bucket.get_conversion_rate("BTCUSDT") is None
+
+    def test_uses_prices_of_single_source_as_they_are(self) -> None:
+        prices_by_source = {"binance": self.prices_by_source["binance"]}
+
+        currency_pair_bucket = currency_pairs.merge_currency_pairs(
+            prices_by_source,
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        assert currency_pair_bucket.prices is prices_by_source["binance"][1]
+
+
+class TestUpdatePricesFromSource:
+    async def test_evicts_prices_on_malformed_response(
+        self,
+        fake_http_client: conftest.FakeHttpClient,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        caplog.set_level(logging.ERROR)
+        prices_by_source: dict[str, Prices] = {"binance": (("RUBUSD",), array.array("d", [100]))}
+
+        await currency_pairs.update_prices_from_source(
+            fake_http_client,
+            BinanceCurrencyPairSource(AppSettings.exchange_api_url.unicode_string(), 30),
+            prices_by_source,
+            {},
+        )
+
+        assert "binance" not in prices_by_source
+        assert "Failed to parse currency pairs from binance. No tickers in the response." in caplog.text
+
+    async def test_evicts_prices_on_failed_fetch(self, fake_http_client: conftest.FakeHttpClient) -> None:
+        fake_http_client.raises_exception = True
+        prices_by_source: dict[str, Prices] = {
+            "binance": (("RUBUSD",), array.array("d", [100])),
+            "okx": (("RUBUSD",), array.array("d", [101])),
+        }
+        fingerprints = {"binance": b"fingerprint"}
+
+        await currency_pairs.update_prices_from_source(
+            fake_http_client,
+            BinanceCurrencyPairSource(AppSettings.exchange_api_url.unicode_string(), 30),
+            prices_by_source,
+            fingerprints,
+        )
+
+        assert list(prices_by_source) == ["okx"]
+        assert not fingerprints
+
+
+class TestEnqueueSnapshot:
+    def create_full_queue(self) -> asyncio.Queue[currency_pairs.Snapshot]:
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue(maxsize=2)
+        for timestamp in ("2025-01-01T00:00:00Z", "2025-01-01T00:00:30Z"):
+            snapshots.put_nowait(self.create_snapshot(timestamp))
+        return snapshots
+
+    def create_snapshot(self, timestamp: str) -> currency_pairs.Snapshot:
+        return str_to_datetime(timestamp), model.CurrencyPairBucket(
+            currency_pairs=[],
+            timestamp=str_to_datetime(timestamp),
+        )
+
+    def test_coalesces_pending_snapshots_to_latest(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_queue_policy", "coalesce")
+        snapshots = self.create_full_queue()
+        coalesced = AppMetrics.counters["ingest_snapshots_coalesced"]
+
+        currency_pairs.enqueue_snapshot(snapshots, self.create_snapshot("2025-01-01T00:01:00Z"))
+
+        assert snapshots.qsize() == 1
+        assert snapshots.get_nowait()[0] == str_to_datetime("2025-01-01T00:01:00Z")
+        assert AppMetrics.counters["ingest_snapshots_coalesced"] == coalesced + 2
+
+    def test_drops_latest_snapshot(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_queue_policy", "drop")
+        snapshots = self.create_full_queue()
+        dropped = AppMetrics.counters["ingest_snapshots_dropped"]
+
+        currency_pairs.enqueue_snapshot(snapshots, self.create_snapshot("2025-01-01T00:01:00Z"))
+
+        assert snapshots.qsize() == 2  # noqa: PLR2004
+        assert snapshots.get_nowait()[0] == str_to_datetime("2025-01-01T00:00:00Z")
+        assert AppMetrics.counters["ingest_snapshots_dropped"] == dropped + 1
+
+
+class TestStoreCurrencyPairs:
+    async def test_can_store_snapshots(
+        self,
+        fake_currency_pair_repository: conftest.FakeCurrencyPairRepository,
+    ) -> None:
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+        for timestamp, conversion_rate in (
+            ("2025-01-01T00:00:00Z", 100),
+            ("2025-01-01T00:00:30Z", 100),
+            ("2025-01-01T00:01:30Z", 101),
+        ):
+            snapshots.put_nowait(
+                (
+                    str_to_datetime(timestamp),
+                    model.CurrencyPairBucket(
+                        currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=conversion_rate)],
+                        timestamp=str_to_datetime(timestamp),
+                    ),
+                ),
+            )
+
+        task = asyncio.create_task(currency_pairs.store_currency_pairs(snapshots, fake_currency_pair_repository))
+        await snapshots.join()
+        task.cancel()
+
+        assert fake_currency_pair_repository.currency_pair_buckets["2025-01-01T00:00:00Z"]["RUBUSD"] == "100.0"
+        assert fake_currency_pair_repository.currency_pair_buckets["2025-01-01T00:00:30Z"]["RUBUSD"] == "100.0"
+        assert "2025-01-01T00:01:00Z" not in fake_currency_pair_repository.currency_pair_buckets
+        assert fake_currency_pair_repository.currency_pair_buckets["2025-01-01T00:01:30Z"]["RUBUSD"] == "101.0"
+
+
+    async def test_indexes_conversion_paths_of_stored_snapshots(
+        self,
+        fake_currency_pair_repository: conftest.FakeCurrencyPairRepository,
+    ) -> None:
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+        snapshots.put_nowait(
+            (
+                str_to_datetime("2025-01-01T00:00:00Z"),
+                model.CurrencyPairBucket(
+                    currency_pairs=[
+                        model.CurrencyPair(symbol="BTCUSDT", conversion_rate=100000),
+                        model.CurrencyPair(symbol="ETHBTC", conversion_rate=0.02),
+                    ],
+                    timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+                ),
+            ),
+        )
+
+        task = asyncio.create_task(currency_pairs.store_currency_pairs(snapshots, fake_currency_pair_repository))
+        await snapshots.join()
+        task.cancel()
+
+        assert AppConversionPaths.find("ETH", "USDT") == (("ETHBTC", False), ("BTCUSDT", False))
+
+    async def test_loads_symbol_assets_when_unlisted_symbols_are_stored(
+        self,
+        fake_currency_pair_repository: conftest.FakeCurrencyPairRepository,
+        fake_http_client: conftest.FakeHttpClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        listed_symbols = [{"symbol": "BTCUSDT", "baseAsset": "BTC", "quoteAsset": "USDT"}]
+        requested_urls = []
+
+        async def get_exchange_info(url: str) -> typing.Any:
+            requested_urls.append(url)
+            return httpx.Response(status_code=200, json={"symbols": listed_symbols})
+
+        monkeypatch.setattr(AppSettings, "exchange_info_url", "https://binance.test/exchangeInfo")
+        monkeypatch.setattr(fake_http_client, "get", get_exchange_info)
+        loading_task = asyncio.create_task(currency_pairs.load_symbol_assets_on_change(fake_http_client))
+        await asyncio.sleep(0.1)
+        listed_symbols.append({"symbol": "BTCAUD", "baseAsset": "BTC", "quoteAsset": "AUD"})
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+        snapshots.put_nowait(
+            (
+                str_to_datetime("2025-01-01T00:00:00Z"),
+                model.CurrencyPairBucket(
+                    currency_pairs=[
+                        model.CurrencyPair(symbol="BTCUSDT", conversion_rate=100000),
+                        model.CurrencyPair(symbol="BTCAUD", conversion_rate=150000),
+                    ],
+                    timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+                ),
+            ),
+        )
+
+        storing_task = asyncio.create_task(
+            currency_pairs.store_currency_pairs(snapshots, fake_currency_pair_repository),
+        )
+        await snapshots.join()
+        await asyncio.sleep(0.1)
+        storing_task.cancel()
+        loading_task.cancel()
+
+        assert requested_urls == ["https://binance.test/exchangeInfo"] * 2
+        assert AppConversionPaths.find("AUD", "USDT") == (("BTCAUD", True), ("BTCUSDT", False))
+
+    async def test_publishes_stored_snapshots(
+        self,
+        fake_currency_pair_repository: conftest.FakeCurrencyPairRepository,
+    ) -> None:
+        client = fakeredis.FakeAsyncRedis()
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+        for timestamp, conversion_rate in (("2025-01-01T00:00:00Z", 100), ("2025-01-01T00:00:30Z", 100)):
+            snapshots.put_nowait(
+                (
+                    str_to_datetime(timestamp),
+                    model.CurrencyPairBucket(
+                        currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=conversion_rate)],
+                        timestamp=str_to_datetime(timestamp),
+                    ),
+                ),
+            )
+
+        async with client.pubsub() as pubsub:
+            await pubsub.subscribe(CURRENCY_PAIR_UPDATES_CHANNEL)
+            task = asyncio.create_task(
+                currency_pairs.store_currency_pairs(
+                    snapshots,
+                    fake_currency_pair_repository,
+                    RedisCurrencyPairPublisher(client),
+                ),
+            )
+            await snapshots.join()
+            task.cancel()
+            # The confirmation of the subscription comes first.
+            messages = [await pubsub.get_message(ignore_subscribe_messages=True, timeout=1) for _ in range(3)]
+            updates = [message["data"] for message in messages if message]
+
+        # Both the bucket and the alias of it are published, without symbols, by the same publisher in sequence.
+        headers = [currency_pair_codec.UPDATE_HEADER.unpack_from(update) for update in updates]
+        assert [(flags, sequence, epoch) for _, flags, _, sequence, epoch, _ in headers] == [
+            (0, 1, str_to_timestamp("2025-01-01T00:00:00Z")),
+            (0, 2, str_to_timestamp("2025-01-01T00:00:30Z")),
+        ]
+        assert headers[0][2] == headers[1][2]
+        snapshot = await client.get(CURRENCY_PAIR_SNAPSHOT_KEY)
+        assert snapshot
+        assert currency_pair_codec.UPDATE_HEADER.unpack_from(snapshot) == (
+            headers[1][0],
+            currency_pair_codec.SYMBOLS,
+            *headers[1][2:],
+        )
+        assert snapshot.endswith(currency_pair_codec.pack_symbols(("RUBUSD",)) + updates[1][-8:])
+
+    async def test_stores_partial_snapshots_of_hot_tier(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "RUBUSD")
+        monkeypatch.setattr(AppSettings, "exchange_hot_fetch_interval", 10)
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 30)
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+        snapshots.put_nowait(
+            (
+                str_to_datetime("2025-01-01T00:00:00Z"),
+                model.CurrencyPairBucket(
+                    currency_pairs=[
+                        model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                        model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+                    ],
+                    timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+                ),
+            ),
+        )
+        for timestamp, conversion_rate in (
+            ("2025-01-01T00:00:10Z", 101),
+            ("2025-01-01T00:00:20Z", 102),
+            ("2025-01-01T00:00:30Z", 103),
+        ):
+            snapshots.put_nowait(
+                (
+                    str_to_datetime(timestamp),
+                    model.CurrencyPairBucket(
+                        currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=conversion_rate)],
+                        timestamp=str_to_datetime(timestamp),
+                        partial=True,
+                    ),
+                ),
+            )
+
+        task = asyncio.create_task(currency_pairs.store_currency_pairs(snapshots, redis_currency_pair_repository))
+        await snapshots.join()
+        task.cancel()
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert await client.hgetall("2025-01-01T00:00:10Z") == {"RUBUSD": "101.0", "__partial__": "1"}
+        assert await client.hgetall("2025-01-01T00:00:20Z") == {"RUBUSD": "102.0", "__partial__": "1"}
+        # A third partial bucket in a row exceeds the hot ticks fitting between two fetches of all symbols.
+        assert await client.hgetall("2025-01-01T00:00:30Z") == {"RUBUSD": "103.0", "__delta__": "1"}
+        result = await redis_currency_pair_repository.retrieve_latest_currency_pair("USDRUB", None)
+        assert result
+        assert result.timestamp == str_to_datetime("2025-01-01T00:00:30Z")
+
+    async def test_publishes_partial_snapshots_merged(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "RUBUSD")
+        monkeypatch.setattr(AppSettings, "exchange_hot_fetch_interval", 10)
+        monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 30)
+        published: list[model.CurrencyPairBucket] = []
+
+        class FakeCurrencyPairPublisher:
+            async def publish_currency_pair_bucket(self, currency_pair_bucket: model.CurrencyPairBucket) -> None:
+                published.append(currency_pair_bucket)
+
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+        snapshots.put_nowait(
+            (
+                str_to_datetime("2025-01-01T00:00:00Z"),
+                model.CurrencyPairBucket(
+                    currency_pairs=[
+                        model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+                        model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+                    ],
+                    timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+                ),
+            ),
+        )
+        snapshots.put_nowait(
+            (
+                str_to_datetime("2025-01-01T00:00:10Z"),
+                model.CurrencyPairBucket(
+                    currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=101)],
+                    timestamp=str_to_datetime("2025-01-01T00:00:10Z"),
+                    partial=True,
+                ),
+            ),
+        )
+
+        task = asyncio.create_task(
+            currency_pairs.store_currency_pairs(
+                snapshots,
+                redis_currency_pair_repository,
+                FakeCurrencyPairPublisher(),
+            ),
+        )
+        await snapshots.join()
+        task.cancel()
+
+        assert [currency_pair_bucket.timestamp for currency_pair_bucket in published] == [
+            str_to_datetime("2025-01-01T00:00:00Z"),
+            str_to_datetime("2025-01-01T00:00:10Z"),
+        ]
+        assert published[1].currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=101),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+        ]
+
+
+class TestStreamCurrencyPairs:
+    async def test_flushes_live_prices_into_snapshots(
+        self,
+        fake_websocket_server: conftest.FakeWebSocketServer,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        fake_websocket_server.messages = [
+            '[{"s": "RUBUSD", "c": "100.5"}, {"s": "USDRUB", "c": "0.01"}]',
+            '[{"s": "RUBUSD", "c": "101.5"}]',
+            "malformed",
+        ]
+        monkeypatch.setattr(AppSettings, "exchange_websocket_url", fake_websocket_server.url)
+        monkeypatch.setattr(AppSettings, "exchange_flush_interval", 0.05)
+        monkeypatch.setattr(AppSettings, "exchange_parse_executor", "inline")
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+
+        task = asyncio.create_task(
+            currency_pairs.stream_currency_pairs(WebSocketsClient(reconnect_delay=10), snapshots),
+        )
+        async def get_latest_snapshot() -> currency_pairs.Snapshot:
+            while True:
+                timestamp, currency_pair_bucket = await snapshots.get()
+                if (
+                    isinstance(currency_pair_bucket, model.CurrencyPairBucket)
+                    and currency_pair_bucket.get_conversion_rate("RUBUSD") == 101.5  # noqa: PLR2004
+                ):
+                    return timestamp, currency_pair_bucket
+
+        timestamp, currency_pair_bucket = await asyncio.wait_for(get_latest_snapshot(), timeout=1)
+        task.cancel()
+
+        assert isinstance(currency_pair_bucket, model.CurrencyPairBucket)
+        assert currency_pair_bucket.timestamp == timestamp
+        assert round(timestamp.timestamp() / 0.05, 3).is_integer()
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=101.5),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+        ]
+
+    def test_expires_prices_without_trades(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "exchange_price_staleness", 60)
+        prices = {"RUBUSD": 100.0, "USDRUB": 0.01}
+        traded_at = {"RUBUSD": 1000.0, "USDRUB": 1050.0}
+
+        currency_pairs.expire_prices(prices, traded_at, 1100)
+
+        assert prices == {"USDRUB": 0.01}
+        assert traded_at == {"USDRUB": 1050.0}
+
+    async def test_can_store_flushed_snapshots(
+        self,
+        fake_currency_pair_repository: conftest.FakeCurrencyPairRepository,
+    ) -> None:
+        snapshots: asyncio.Queue[currency_pairs.Snapshot] = asyncio.Queue()
+        for timestamp in ("2025-01-01T00:00:00Z", "2025-01-01T00:00:01Z"):
+            snapshots.put_nowait(
+                (
+                    str_to_datetime(timestamp),
+                    model.CurrencyPairBucket(
+                        currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=100)],
+                        timestamp=str_to_datetime(timestamp),
+                    ),
+                ),
+            )
+
+        task = asyncio.create_task(currency_pairs.store_currency_pairs(snapshots, fake_currency_pair_repository))
+        await snapshots.join()
+        task.cancel()
+
+        assert fake_currency_pair_repository.currency_pair_buckets["2025-01-01T00:00:00Z"]["RUBUSD"] == "100.0"
+        assert fake_currency_pair_repository.currency_pair_buckets["2025-01-01T00:00:01Z"]["RUBUSD"] == "100.0"
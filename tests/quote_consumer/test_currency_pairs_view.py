@@ -1,9 +1,14 @@
 """Unit tests related to currency pairs view."""
 
+import datetime
 import pytest
 
 from . import conftest
 from ..conftest import str_to_datetime, str_to_timestamp
+from src.quote_consumer.adapters.currency_pair_repository import RedisCurrencyPairRepository
+from src.quote_consumer.domain import model
+from src.quote_consumer.services.conversion_paths import AppConversionPaths
+from src.quote_consumer.settings import AppSettings
 from src.quote_consumer.views import currency_pairs
 
 
@@ -82,3 +87,189 @@ async def test_can_retrieve_latest_currency_pair(
         assert result.timestamp == output["timestamp"]
         assert result.currency_pairs[0].symbol == output["symbol"]
         assert result.currency_pairs[0].conversion_rate == output["conversion_rate"]
+
+
+async def test_can_retrieve_currency_pairs_sharing_bucket(
+    redis_currency_pair_repository: RedisCurrencyPairRepository,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    for timestamp, conversion_rate in (("2025-01-01T00:00:00Z", 100), ("2025-01-01T00:01:00Z", 101)):
+        await redis_currency_pair_repository.create_currency_pair_bucket(
+            model.CurrencyPairBucket(
+                currency_pairs=[
+                    model.CurrencyPair(symbol="RUBUSD", conversion_rate=conversion_rate),
+                    model.CurrencyPair(symbol="USDRUB", conversion_rate=1 / conversion_rate),
+                ],
+                timestamp=str_to_datetime(timestamp),
+            ),
+        )
+    retrievals: list[list[tuple[list[str], datetime.datetime | None]]] = []
+    retrieve_currency_pair_groups = redis_currency_pair_repository.retrieve_currency_pair_groups
+
+    async def spy(
+        groups: list[tuple[list[str], datetime.datetime | None]],
+    ) -> list[model.CurrencyPairBucket | None]:
+        retrievals.append(groups)
+        return await retrieve_currency_pair_groups(groups)
+
+    monkeypatch.setattr(redis_currency_pair_repository, "retrieve_currency_pair_groups", spy)
+
+    results = await currency_pairs.fetch_currency_pairs(
+        [
+            ("RUB", "USD", None, None),
+            ("AAA", "BBB", None, None),
+            ("USD", "RUB", None, None),
+            ("RUB", "USD", str_to_datetime("2025-01-01T00:00:10Z"), None),
+            ("RUB", "USD", None, None),
+        ],
+        redis_currency_pair_repository,
+    )
+
+    assert retrievals == [
+        [(["RUBUSD", "AAABBB", "USDRUB"], None), (["RUBUSD"], str_to_datetime("2025-01-01T00:00:10Z"))],
+    ]
+    assert [(result.conversion_rate, result.timestamp) if result else None for result in results] == [
+        (101, str_to_datetime("2025-01-01T00:01:00Z")),
+        None,
+        (1 / 101, str_to_datetime("2025-01-01T00:01:00Z")),
+        (100, str_to_datetime("2025-01-01T00:00:00Z")),
+        (101, str_to_datetime("2025-01-01T00:01:00Z")),
+    ]
+
+
+async def test_can_triangulate_conversion_rate(redis_currency_pair_repository: RedisCurrencyPairRepository) -> None:
+    currency_pair_bucket = model.CurrencyPairBucket(
+        currency_pairs=[
+            model.CurrencyPair(symbol="BTCUSDT", conversion_rate=100000),
+            model.CurrencyPair(symbol="LTCBTC", conversion_rate=0.001),
+            model.CurrencyPair(symbol="ETHUSDT", conversion_rate=2000),
+        ],
+        timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+    )
+    await redis_currency_pair_repository.create_currency_pair_bucket(currency_pair_bucket)
+    AppConversionPaths.update(currency_pair_bucket)
+
+    conversion_rate = await currency_pairs.fetch_conversion_rate("LTC", "ETH", None, redis_currency_pair_repository)
+    results = await currency_pairs.fetch_currency_pairs(
+        [("ETH", "LTC", None, None), ("BTC", "USDT", None, None), ("AAA", "USDT", None, None)],
+        redis_currency_pair_repository,
+    )
+
+    assert conversion_rate
+    assert conversion_rate.conversion_rate == pytest.approx(0.05)
+    assert conversion_rate.timestamp == str_to_datetime("2025-01-01T00:00:00Z")
+    assert conversion_rate.path == (("LTCBTC", False), ("BTCUSDT", False), ("ETHUSDT", True))
+    assert results[0]
+    assert results[0].conversion_rate == pytest.approx(20)
+    assert results[0].path == (("ETHUSDT", False), ("BTCUSDT", True), ("LTCBTC", True))
+    assert results[1]
+    assert results[1].path == (("BTCUSDT", False),)
+    assert results[2] is None
+
+
+async def test_can_fetch_conversion_rate_of_exchange(
+    redis_currency_pair_repository: RedisCurrencyPairRepository,
+) -> None:
+    await redis_currency_pair_repository.create_currency_pair_bucket(
+        model.CurrencyPairBucket(
+            currency_pairs=[
+                model.CurrencyPair(symbol="binance:BTCUSDT", conversion_rate=100000),
+                model.CurrencyPair(symbol="okx:BTCUSDT", conversion_rate=100100),
+            ],
+            timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+        ),
+    )
+
+    conversion_rate = await currency_pairs.fetch_conversion_rate(
+        "BTC", "USDT", None, redis_currency_pair_repository, exchange="okx",
+    )
+    results = await currency_pairs.fetch_currency_pairs(
+        [("BTC", "USDT", None, "binance"), ("BTC", "USDT", None, None)],
+        redis_currency_pair_repository,
+    )
+
+    assert conversion_rate
+    assert conversion_rate.conversion_rate == 100100  # noqa: PLR2004
+    assert conversion_rate.path == (("okx:BTCUSDT", False),)
+    assert results[0]
+    assert results[0].conversion_rate == 100000  # noqa: PLR2004
+    assert results[1] is None
+
+
+async def test_returns_timestamp_of_oldest_leg(
+    redis_currency_pair_repository: RedisCurrencyPairRepository,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "BTCUSDT")
+    monkeypatch.setattr(AppSettings, "exchange_hot_fetch_interval", 5)
+    monkeypatch.setattr(AppSettings, "exchange_fetch_interval", 30)
+    currency_pair_bucket = model.CurrencyPairBucket(
+        currency_pairs=[
+            model.CurrencyPair(symbol="BTCUSDT", conversion_rate=100000),
+            model.CurrencyPair(symbol="ETHUSDT", conversion_rate=2000),
+        ],
+        timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+    )
+    await redis_currency_pair_repository.create_currency_pair_bucket(currency_pair_bucket)
+    AppConversionPaths.update(currency_pair_bucket)
+    partial_currency_pair_bucket = model.CurrencyPairBucket(
+        currency_pairs=[model.CurrencyPair(symbol="BTCUSDT", conversion_rate=101000)],
+        timestamp=str_to_datetime("2025-01-01T00:00:05Z"),
+        partial=True,
+    )
+    await redis_currency_pair_repository.create_currency_pair_partial_bucket(
+        currency_pair_bucket.merge(partial_currency_pair_bucket),
+        partial_currency_pair_bucket,
+    )
+
+    conversion_rate = await currency_pairs.fetch_conversion_rate("ETH", "BTC", None, redis_currency_pair_repository)
+    results = await currency_pairs.fetch_currency_pairs(
+        [("BTC", "USDT", None, None), ("ETH", "BTC", None, None)],
+        redis_currency_pair_repository,
+    )
+
+    assert conversion_rate
+    assert conversion_rate.timestamp == str_to_datetime("2025-01-01T00:00:00Z")
+    assert [(result.conversion_rate, result.timestamp) if result else None for result in results] == [
+        (101000, str_to_datetime("2025-01-01T00:00:05Z")),
+        (pytest.approx(2000 / 101000), str_to_datetime("2025-01-01T00:00:00Z")),
+    ]
+
+
+async def test_routes_historical_conversion_rate_through_its_universe(
+    redis_currency_pair_repository: RedisCurrencyPairRepository,
+) -> None:
+    await redis_currency_pair_repository.create_currency_pair_bucket(
+        model.CurrencyPairBucket(
+            currency_pairs=[
+                model.CurrencyPair(symbol="BTCUSDT", conversion_rate=100000),
+                model.CurrencyPair(symbol="ETHBTC", conversion_rate=0.02),
+            ],
+            timestamp=str_to_datetime("2025-01-01T00:00:00Z"),
+        ),
+    )
+    currency_pair_bucket = model.CurrencyPairBucket(
+        currency_pairs=[
+            model.CurrencyPair(symbol="BTCUSDT", conversion_rate=101000),
+            model.CurrencyPair(symbol="ETHUSDT", conversion_rate=2100),
+        ],
+        timestamp=str_to_datetime("2025-01-01T00:01:00Z"),
+    )
+    await redis_currency_pair_repository.create_currency_pair_bucket(currency_pair_bucket)
+    AppConversionPaths.update(currency_pair_bucket)
+
+    conversion_rate = await currency_pairs.fetch_conversion_rate(
+        "ETH", "USDT", str_to_datetime("2025-01-01T00:00:00Z"), redis_currency_pair_repository,
+    )
+    results = await currency_pairs.fetch_currency_pairs(
+        [("ETH", "USDT", str_to_datetime("2025-01-01T00:00:00Z"), None), ("ETH", "USDT", None, None)],
+        redis_currency_pair_repository,
+    )
+
+    assert conversion_rate
+    assert conversion_rate.conversion_rate == pytest.approx(2000)
+    assert conversion_rate.path == (("ETHBTC", False), ("BTCUSDT", False))
+    assert [result.path if result else None for result in results] == [
+        (("ETHBTC", False), ("BTCUSDT", False)),
+        (("ETHUSDT", False),),
+    ]
@@ -13,6 +13,7 @@ class TestFetchCurrencyPair:
         assert fetch_responses.json() == {
             "conversion_rate": 500,
             "actual_timestamp_closest_to_desired": "2025-05-01T00:00:00Z",
+            "conversion_path": [{"symbol": "RUBUSD", "inverted": False}],
         }
 
     async def test_can_fetch_currency_pair_with_timestamp(self, client: TestClient) -> None:
@@ -24,6 +25,7 @@ class TestFetchCurrencyPair:
         assert fetch_responses.json() == {
             "conversion_rate": 200,
             "actual_timestamp_closest_to_desired": "2025-02-01T00:00:00Z",
+            "conversion_path": [{"symbol": "RUBUSD", "inverted": False}],
         }
 
     async def test_cannot_fetch_currency_pair_with_invalid_currencies(self, client: TestClient) -> None:
@@ -38,3 +40,50 @@ class TestFetchCurrencyPair:
         )
 
         assert fetch_responses.status_code == http.HTTPStatus.UNPROCESSABLE_CONTENT
+
+
+class TestFetchCurrencyPairs:
+    async def test_can_fetch_currency_pairs(self, client: TestClient) -> None:
+        fetch_responses = client.post(
+            "/api/currency-pairs",
+            json={
+                "items": [
+                    {"base_currency": "rub", "quote_currency": "usd"},
+                    {"base_currency": "aaa", "quote_currency": "bbb"},
+                    {"base_currency": "rub", "quote_currency": "usd", "desired_timestamp": "2025-02-01T11:12:13Z"},
+                ],
+            },
+        )
+
+        assert fetch_responses.status_code == http.HTTPStatus.OK
+        assert fetch_responses.json() == {
+            "items": [
+                {
+                    "conversion_rate": 500,
+                    "actual_timestamp_closest_to_desired": "2025-05-01T00:00:00Z",
+                    "conversion_path": [{"symbol": "RUBUSD", "inverted": False}],
+                },
+                None,
+                {
+                    "conversion_rate": 200,
+                    "actual_timestamp_closest_to_desired": "2025-02-01T00:00:00Z",
+                    "conversion_path": [{"symbol": "RUBUSD", "inverted": False}],
+                },
+            ],
+        }
+
+    async def test_cannot_fetch_currency_pairs_with_invalid_timestamp(self, client: TestClient) -> None:
+        fetch_responses = client.post(
+            "/api/currency-pairs",
+            json={"items": [{"base_currency": "rub", "quote_currency": "usd", "desired_timestamp": "abcdefg"}]},
+        )
+
+        assert fetch_responses.status_code == http.HTTPStatus.UNPROCESSABLE_CONTENT
+
+
+class TestFetchMetrics:
+    async def test_can_fetch_metrics(self, client: TestClient) -> None:
+        fetch_responses = client.get("/api/metrics")
+
+        assert fetch_responses.status_code == http.HTTPStatus.OK
+        assert set(fetch_responses.json()) == {"counters", "gauges", "summaries", "histograms"}
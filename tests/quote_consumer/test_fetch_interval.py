@@ -0,0 +1,78 @@
+"""Unit tests related to the adaptive fetch interval."""
+
+import array
+import datetime
+
+import pytest
+
+from src.quote_consumer.domain import model
+from src.quote_consumer.metrics import AppMetrics
+from src.quote_consumer.services import fetch_interval
+
+
+def create_currency_pair_buckets(conversion_rates: list[float]) -> list[model.CurrencyPairBucket]:
+    return [
+        model.CurrencyPairBucket.from_prices(
+            symbols=("BTCUSDT", "AAABBB"),
+            prices=array.array("d", [conversion_rate, 1]),
+            timestamp=datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(seconds=second),
+        )
+        for second, conversion_rate in enumerate(conversion_rates)
+    ]
+
+
+class TestAdaptiveFetchInterval:
+    @pytest.mark.parametrize(
+        ("conversion_rates", "interval", "reason"),
+        [
+            ([100], 5, "warming_up"),
+            ([100, 101, 100, 101], 1, "volatile"),
+            ([100, 100, 100, 100], 10, "calm"),
+            ([100, 100.05, 100.1, 100.15], pytest.approx(4, rel=0.01), "target_move"),
+        ],
+    )
+    def test_follows_volatility_of_tracked_symbols(
+        self,
+        conversion_rates: list[float],
+        interval: float,
+        reason: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(fetch_interval.AppSettings, "exchange_fetch_interval", 5)
+        adaptive_interval = fetch_interval.AdaptiveFetchInterval(
+            min_interval=1,
+            max_interval=10,
+            target_price_move=0.001,
+            smoothing=0.5,
+            symbols=["BTCUSDT"],
+        )
+
+        for currency_pair_bucket in create_currency_pair_buckets(conversion_rates):
+            adaptive_interval.update(currency_pair_bucket)
+
+        assert adaptive_interval.interval == interval
+        assert adaptive_interval.reason == reason
+
+    def test_exposes_interval_and_reason(self) -> None:
+        adaptive_interval = fetch_interval.AdaptiveFetchInterval(min_interval=1, max_interval=10, symbols=[])
+        calm = AppMetrics.counters["exchange_fetch_interval_reason_calm"]
+
+        for currency_pair_bucket in create_currency_pair_buckets([100, 100]):
+            adaptive_interval.update(currency_pair_bucket)
+
+        assert AppMetrics.gauges["exchange_fetch_interval_seconds"] == 10  # noqa: PLR2004
+        assert AppMetrics.gauges["exchange_volatility"] == 0
+        assert AppMetrics.counters["exchange_fetch_interval_reason_calm"] == calm + 1
+
+    def test_can_get_mean_absolute_return(self) -> None:
+        previous_currency_pair_bucket, currency_pair_bucket = create_currency_pair_buckets([100, 102])
+
+        assert fetch_interval.get_mean_absolute_return(
+            previous_currency_pair_bucket,
+            currency_pair_bucket,
+        ) == pytest.approx(0.01)
+        assert fetch_interval.get_mean_absolute_return(
+            previous_currency_pair_bucket,
+            currency_pair_bucket,
+            ["CCCDDD"],
+        ) is None
@@ -1,5 +1,6 @@
 """Unit tests related to HTTP client."""
 
+import httpx
 import pytest
 
 from pytest_httpx import HTTPXMock
@@ -19,3 +20,11 @@ class TestHttpxClient:
         async with HttpxClient() as client:
             with pytest.raises(exceptions.HTTPBadResponseError):
                 await client.get(url="https://test_url")
+
+    async def test_configures_timeouts_and_http2(self, httpx_mock: HTTPXMock) -> None:
+        httpx_mock.add_response(json=[])
+        async with HttpxClient(connect_timeout=1, read_timeout=2, http2=True) as client:
+            response = await client.get(url="https://test_url")
+
+        assert response.json() == []
+        assert client.client.timeout == httpx.Timeout(2, connect=1)
@@ -0,0 +1,33 @@
+"""Unit tests related to app metrics."""
+
+from src.quote_consumer.metrics import Metrics
+
+
+class TestMetrics:
+    def test_can_compute_quantiles(self) -> None:
+        metrics = Metrics()
+        for value in range(1, 101):
+            metrics.observe("fetch_seconds", value)
+
+        assert metrics.quantile("fetch_seconds", 0.5) == 50  # noqa: PLR2004
+        assert metrics.quantile("fetch_seconds", 0.99) == 99  # noqa: PLR2004
+        assert metrics.quantile("unknown_seconds", 0.99) is None
+        assert metrics.snapshot()["summaries"] == {
+            "fetch_seconds": {"count": 100, "p50": 50, "p95": 95, "p99": 99, "max": 100},
+        }
+
+    def test_keeps_latest_observations(self) -> None:
+        metrics = Metrics(window=2)
+        for value in (100, 1, 2):
+            metrics.observe("fetch_seconds", value)
+
+        assert metrics.quantile("fetch_seconds", 1) == 2  # noqa: PLR2004
+
+    def test_counts_values_into_histogram_buckets(self) -> None:
+        metrics = Metrics()
+        for value in (0.5, 1, 3, 10):
+            metrics.record("lag_seconds", value, (1, 5))
+
+        assert metrics.snapshot()["histograms"] == {
+            "lag_seconds": {"buckets": {"1": 2, "5": 3, "+Inf": 4}, "count": 4, "sum": 14.5},
+        }
@@ -0,0 +1,118 @@
+"""Unit tests related to migrations."""
+
+import fakeredis
+
+from ..conftest import str_to_datetime, str_to_timestamp
+from src.quote_consumer import migrations
+from src.quote_consumer.adapters.currency_pair_repository import (
+    PackedRedisCurrencyPairRepository,
+    RedisCurrencyPairRepository,
+    get_index_key,
+)
+from src.quote_consumer.domain import model
+
+
+class TestMigrateCurrencyPairBucketsToPacked:
+    async def test_can_migrate_currency_pair_buckets_to_packed(self) -> None:
+        server = fakeredis.FakeServer()
+        client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        binary_client = fakeredis.FakeAsyncRedis(server=server)
+        await client.hset("2025-01-01T00:00:00Z", mapping={"RUBUSD": "100", "USDRUB": "0.01"})
+        await client.expire("2025-01-01T00:00:00Z", 1000)
+        await client.zadd(
+            "available_currency_pair_timestamps",
+            {
+                "2025-01-01T00:00:00Z": str_to_timestamp("2025-01-01T00:00:00Z"),
+                "2024-12-31T00:00:00Z": str_to_timestamp("2024-12-31T00:00:00Z"),
+            },
+        )
+
+        migrated = await migrations.migrate_currency_pair_buckets_to_packed(client, binary_client)
+        result = await PackedRedisCurrencyPairRepository(binary_client).retrieve_currency_pairs(
+            ["RUBUSD", "USDRUB"],
+            str_to_datetime("2025-01-01T00:00:00Z"),
+        )
+
+        assert migrated == 1
+        assert result
+        assert result.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=100),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+        ]
+        assert await client.type("2025-01-01T00:00:00Z") == "string"
+        assert 0 < await client.ttl("2025-01-01T00:00:00Z") <= 1000  # noqa: PLR2004
+        assert await client.zrange("available_currency_pair_timestamps", 0, -1) == [
+            str(int(str_to_timestamp("2025-01-01T00:00:00Z"))),
+        ]
+
+    async def test_keeps_ohlc_buckets_in_their_tier(self) -> None:
+        server = fakeredis.FakeServer()
+        client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        binary_client = fakeredis.FakeAsyncRedis(server=server)
+        await client.hset("2025-01-01T00:04:00Z", mapping={"RUBUSD": "101"})
+        await client.zadd(get_index_key(300), {"1735689840": str_to_timestamp("2025-01-01T00:04:00Z")})
+
+        migrated = await migrations.migrate_currency_pair_buckets_to_packed(client, binary_client)
+        result = await PackedRedisCurrencyPairRepository(binary_client).retrieve_latest_currency_pair(
+            "RUBUSD",
+            str_to_datetime("2025-01-01T00:01:00Z"),
+        )
+
+        assert migrated == 1
+        assert result
+        assert result.currency_pairs == [model.CurrencyPair(symbol="RUBUSD", conversion_rate=101)]
+        assert not await client.zcard("available_currency_pair_timestamps")
+
+    async def test_writes_partial_and_delta_buckets_in_full(self) -> None:
+        server = fakeredis.FakeServer()
+        client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        binary_client = fakeredis.FakeAsyncRedis(server=server)
+        hash_repo = RedisCurrencyPairRepository(client)
+        currency_pair_buckets = [
+            model.CurrencyPairBucket(
+                currency_pairs=[
+                    model.CurrencyPair(symbol="RUBUSD", conversion_rate=rub_usd),
+                    model.CurrencyPair(symbol="USDRUB", conversion_rate=usd_rub),
+                ],
+                timestamp=str_to_datetime(timestamp),
+            )
+            for timestamp, rub_usd, usd_rub in (
+                ("2025-01-01T00:00:00Z", 100, 0.01),
+                ("2025-01-01T00:01:00Z", 101, 0.01),
+                ("2025-01-01T00:02:00Z", 101, 0.01),
+                ("2025-01-01T00:03:00Z", 101, 0.02),
+            )
+        ]
+        await hash_repo.create_currency_pair_bucket(currency_pair_buckets[0])
+        await hash_repo.create_currency_pair_bucket(
+            currency_pair_buckets[1],
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="RUBUSD", conversion_rate=101)],
+                timestamp=str_to_datetime("2025-01-01T00:01:00Z"),
+            ),
+        )
+        await hash_repo.create_currency_pair_alias(currency_pair_buckets[2], str_to_datetime("2025-01-01T00:01:00Z"))
+        await hash_repo.create_currency_pair_partial_bucket(
+            currency_pair_buckets[3],
+            model.CurrencyPairBucket(
+                currency_pairs=[model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02)],
+                timestamp=str_to_datetime("2025-01-01T00:03:00Z"),
+            ),
+        )
+        # Only the changed symbols of the delta and the hot ones of the partial bucket are stored in them.
+        assert await client.hkeys("2025-01-01T00:01:00Z") == ["RUBUSD", "__delta__"]
+        assert await client.hkeys("2025-01-01T00:03:00Z") == ["USDRUB", "__partial__"]
+
+        migrated = await migrations.migrate_currency_pair_buckets_to_packed(client, binary_client)
+        packed_repo = PackedRedisCurrencyPairRepository(binary_client)
+
+        assert migrated == len(currency_pair_buckets)
+        for timestamp, conversion_rates in (
+            ("2025-01-01T00:01:00Z", [101, 0.01]),
+            ("2025-01-01T00:02:00Z", [101, 0.01]),
+            ("2025-01-01T00:03:00Z", [101, 0.02]),
+        ):
+            assert await client.type(timestamp) == "string"
+            result = await packed_repo.retrieve_currency_pairs(["RUBUSD", "USDRUB"], str_to_datetime(timestamp))
+            assert result
+            assert [currency_pair.conversion_rate for currency_pair in result.currency_pairs] == conversion_rates
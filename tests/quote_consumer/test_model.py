@@ -1,5 +1,6 @@
 """Unit tests related to model."""
 
+import array
 import datetime
 import pytest
 
@@ -48,3 +49,181 @@ class TestCurrencyPairBucket:
 
         with pytest.raises(NotImplementedError):
             hash(currency_pair_bucket)
+
+    def test_can_create_currency_pair_bucket_from_prices(self) -> None:
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        currency_pair_bucket = model.CurrencyPairBucket.from_prices(
+            symbols=("RUBUSD", "USDRUB"),
+            prices=array.array("d", [100.1, 0.01]),
+            timestamp=timestamp,
+        )
+
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="RUBUSD", conversion_rate=100.1),
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+        ]
+        assert currency_pair_bucket.timestamp == timestamp
+
+    def test_can_look_up_conversion_rate_by_symbol(self) -> None:
+        currency_pair_bucket = model.CurrencyPairBucket.from_prices(
+            symbols=("RUBUSD", "USDRUB"),
+            prices=array.array("d", [100.1, 0.01]),
+            timestamp=datetime.datetime.now(datetime.timezone.utc),
+        )
+
+        assert currency_pair_bucket.get_conversion_rate("USDRUB") == 0.01  # noqa: PLR2004
+        assert currency_pair_bucket.get_currency_pair("RUBUSD") == model.CurrencyPair(
+            symbol="RUBUSD",
+            conversion_rate=100.1,
+        )
+        assert currency_pair_bucket.get_conversion_rate("AAABBB") is None
+        assert currency_pair_bucket.get_currency_pair("AAABBB") is None
+
+    def test_currency_pair_buckets_of_same_universe_share_symbols(self) -> None:
+        first = model.CurrencyPairBucket.from_prices(
+            symbols=("RUBUSD", "USDRUB"),
+            prices=array.array("d", [100.1, 0.01]),
+            timestamp=datetime.datetime.now(datetime.timezone.utc),
+        )
+        second = model.CurrencyPairBucket(
+            currency_pairs=[
+                model.CurrencyPair(symbol="RUBUSD", conversion_rate=100.2),
+                model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02),
+            ],
+            timestamp=datetime.datetime.now(datetime.timezone.utc),
+        )
+
+        assert first.symbols is second.symbols
+        assert first._indexes is second._indexes  # noqa: SLF001
+
+    def test_can_diff_currency_pair_buckets(self) -> None:
+        previous = model.CurrencyPairBucket.from_prices(
+            symbols=("RUBUSD", "USDRUB"),
+            prices=array.array("d", [100.1, 0.01]),
+            timestamp=datetime.datetime.now(datetime.timezone.utc),
+        )
+        repriced = model.CurrencyPairBucket.from_prices(
+            symbols=("RUBUSD", "USDRUB"),
+            prices=array.array("d", [100.1, 0.02]),
+            timestamp=datetime.datetime.now(datetime.timezone.utc),
+        )
+        extended = model.CurrencyPairBucket.from_prices(
+            symbols=("AAABBB", "RUBUSD", "USDRUB"),
+            prices=array.array("d", [1, 100.1, 0.01]),
+            timestamp=datetime.datetime.now(datetime.timezone.utc),
+        )
+
+        changed = repriced.diff(previous)
+        added = extended.diff(previous)
+
+        assert changed
+        assert changed.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.02)]
+        assert changed.timestamp == repriced.timestamp
+        assert added
+        assert added.currency_pairs == [model.CurrencyPair(symbol="AAABBB", conversion_rate=1)]
+        assert previous.diff(extended) is None
+
+    def test_can_merge_partial_currency_pair_bucket(self) -> None:
+        full = model.CurrencyPairBucket.from_prices(
+            symbols=("RUBUSD", "USDRUB"),
+            prices=array.array("d", [100.1, 0.01]),
+            timestamp=datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc),
+        )
+        partial = model.CurrencyPairBucket.from_prices(
+            symbols=("USDRUB",),
+            prices=array.array("d", [0.02]),
+            timestamp=datetime.datetime(2025, 1, 1, 0, 0, 5, tzinfo=datetime.timezone.utc),
+            partial=True,
+        )
+
+        merged = full.merge(partial)
+
+        assert not merged.partial
+        assert merged.symbols is full.symbols
+        assert list(merged.prices) == [100.1, 0.02]
+        assert merged.timestamp == partial.timestamp
+
+
+class TestOhlcBucket:
+    def test_can_merge_ohlc_buckets(self) -> None:
+        ohlc_buckets = [
+            model.OhlcBucket.from_currency_pair_bucket(
+                model.CurrencyPairBucket.from_prices(
+                    symbols=symbols,
+                    prices=array.array("d", prices),
+                    timestamp=datetime.datetime(2025, 1, 1, 0, minute, tzinfo=datetime.timezone.utc),
+                ),
+            )
+            for minute, symbols, prices in (
+                (0, ("RUBUSD", "USDRUB"), [100, 0.01]),
+                (1, ("RUBUSD", "USDRUB"), [103, 0.01]),
+                (2, ("RUBUSD",), [99]),
+                (3, ("AAABBB", "RUBUSD"), [1, 101]),
+            )
+        ]
+
+        merged = model.OhlcBucket.merge(ohlc_buckets)
+
+        assert merged.symbols == ("RUBUSD", "USDRUB", "AAABBB")
+        assert merged.prices.tolist() == [[100, 0.01, 1], [103, 0.01, 1], [99, 0.01, 1], [101, 0.01, 1]]
+        assert merged.timestamp == ohlc_buckets[-1].timestamp
+        assert list(merged.close_currency_pair_bucket.prices) == [101, 0.01, 1]
+        assert model.OhlcBucket.merge([merged]).prices.tolist() == merged.prices.tolist()
+
+
+class TestConversionPathIndex:
+    SYMBOLS = ("BTCUSDT", "ETHUSDT", "ETHBTC", "LTCBTC", "EURUSDT", "PLNEUR", "XYZBNB")
+    BRIDGE_ASSETS = ("USDT", "BTC", "ETH", "BNB", "EUR")
+
+    @pytest.mark.parametrize(
+        ("base_asset", "quote_asset", "path"),
+        [
+            ("BTC", "USDT", (("BTCUSDT", False),)),
+            ("USDT", "BTC", (("BTCUSDT", True),)),
+            ("LTC", "USDT", (("LTCBTC", False), ("BTCUSDT", False))),
+            ("PLN", "BTC", (("PLNEUR", False), ("EURUSDT", False), ("BTCUSDT", True))),
+            ("LTC", "XYZ", None),
+            ("BTC", "BTC", None),
+            ("AAA", "USDT", None),
+        ],
+    )
+    def test_can_find_conversion_path(self, base_asset: str, quote_asset: str, path: tuple | None) -> None:
+        conversion_path_index = model.ConversionPathIndex(self.SYMBOLS, self.BRIDGE_ASSETS)
+
+        assert conversion_path_index.find(base_asset, quote_asset) == path
+
+    def test_prefers_most_liquid_bridge(self) -> None:
+        conversion_path_index = model.ConversionPathIndex(
+            ("AAAUSDT", "AAABTC", "BBBUSDT", "BBBBTC"),
+            self.BRIDGE_ASSETS,
+        )
+
+        assert conversion_path_index.find("AAA", "BBB") == (("AAAUSDT", False), ("BBBUSDT", True))
+
+    def test_skips_symbols_of_exchanges(self) -> None:
+        conversion_path_index = model.ConversionPathIndex(("okx:BTCUSDT", "okx:LTCBTC", "BTCUSDT"), self.BRIDGE_ASSETS)
+
+        assert set(conversion_path_index.assets) == {"BTC", "USDT"}
+        assert conversion_path_index.find("LTC", "USDT") is None
+
+    def test_splits_symbols_by_listed_assets(self) -> None:
+        symbol_assets = model.SymbolAssets({"BTCAUD": ("BTC", "AUD")})
+
+        assert model.ConversionPathIndex(("BTCUSDT", "BTCAUD"), self.BRIDGE_ASSETS).find("AUD", "USDT") is None
+        assert model.ConversionPathIndex(("BTCUSDT", "BTCAUD"), self.BRIDGE_ASSETS, symbol_assets).find(
+            "AUD", "USDT",
+        ) == (("BTCAUD", True), ("BTCUSDT", False))
+
+    def test_can_get_conversion_rate(self) -> None:
+        currency_pair_bucket = model.CurrencyPairBucket.from_prices(
+            symbols=("BTCUSDT", "LTCBTC"),
+            prices=array.array("d", [100000, 0.001]),
+            timestamp=datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc),
+        )
+        path = (("LTCBTC", False), ("BTCUSDT", False))
+
+        assert model.get_conversion_rate(path, currency_pair_bucket) == pytest.approx(100)
+        assert model.get_conversion_rate(model.invert_conversion_path(path), currency_pair_bucket) == pytest.approx(
+            0.01,
+        )
+        assert model.get_conversion_rate((("ETHUSDT", False),), currency_pair_bucket) is None
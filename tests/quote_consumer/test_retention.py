@@ -0,0 +1,181 @@
+"""Unit tests related to retention of buckets within their lifetime and the memory budget."""
+
+import asyncio
+import pytest
+
+from ..conftest import str_to_datetime, str_to_timestamp
+from .test_compaction import create_currency_pair_buckets
+from src.quote_consumer.adapters.currency_pair_cache import CachedCurrencyPairRepository
+from src.quote_consumer.adapters.currency_pair_repository import (
+    PackedRedisCurrencyPairRepository,
+    RedisCurrencyPairRepository,
+    get_index_key,
+    get_ohlc_key,
+)
+from src.quote_consumer.domain import model
+from src.quote_consumer.metrics import AppMetrics
+from src.quote_consumer.services import compaction, dependencies, retention
+from src.quote_consumer.services.retention import RetentionManager
+from src.quote_consumer.settings import AppSettings
+
+
+class TestRetentionManager:
+    @pytest.fixture(autouse=True)
+    def settings(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AppSettings, "currency_pair_ttl", 604800)
+        monkeypatch.setattr(AppSettings, "currency_pair_5m_tier_age", 300)
+        monkeypatch.setattr(AppSettings, "currency_pair_1h_tier_age", 0)
+        monkeypatch.setattr(AppSettings, "currency_pair_keyframe_interval", 8)
+        monkeypatch.setattr(AppSettings, "exchange_hot_symbols", "")
+
+    async def create_currency_pair_buckets(self, currency_pair_repo: RedisCurrencyPairRepository) -> None:
+        await create_currency_pair_buckets(
+            currency_pair_repo,
+            {
+                "2025-01-01T00:00:00Z": {"RUBUSD": 100, "USDRUB": 0.01},
+                "2025-01-01T00:01:00Z": {"RUBUSD": 103, "USDRUB": 0.01},
+                "2025-01-01T00:02:00Z": {"RUBUSD": 99, "USDRUB": 0.01, "AAABBB": 1},
+                "2025-01-01T00:03:00Z": {"RUBUSD": 101, "USDRUB": 0.01, "AAABBB": 1},
+                "2025-01-01T00:04:00Z": None,
+                "2025-01-01T00:05:00Z": None,
+                "2025-01-01T00:06:00Z": None,
+                "2025-01-01T00:07:00Z": {"RUBUSD": 105, "USDRUB": 0.01, "AAABBB": 1},
+                "2025-01-01T00:08:00Z": {"RUBUSD": 104, "USDRUB": 0.01, "AAABBB": 2},
+            },
+        )
+
+    @staticmethod
+    async def create_packed_currency_pair_buckets(
+        currency_pair_repo: PackedRedisCurrencyPairRepository,
+        minutes: range,
+    ) -> None:
+        await create_currency_pair_buckets(
+            currency_pair_repo,
+            {f"2025-01-01T00:{minute:02}:00Z": {"RUBUSD": 100 + minute, "USDRUB": 0.01} for minute in minutes},
+        )
+
+    @pytest.mark.parametrize(
+        "currency_pair_repository",
+        ["redis_currency_pair_repository", "packed_currency_pair_repository", "cached_redis_currency_pair_repository"],
+    )
+    async def test_evicts_buckets_older_than_ttl(
+        self,
+        currency_pair_repository: str,
+        request: pytest.FixtureRequest,
+    ) -> None:
+        redis_currency_pair_repo = request.getfixturevalue(currency_pair_repository.removeprefix("cached_"))
+        currency_pair_repo = (
+            CachedCurrencyPairRepository(redis_currency_pair_repo)
+            if currency_pair_repository.startswith("cached")
+            else redis_currency_pair_repo
+        )
+        await self.create_currency_pair_buckets(currency_pair_repo)
+        evicted = AppMetrics.counters["currency_pair_buckets_evicted_by_age"]
+
+        assert await RetentionManager(currency_pair_repo, memory_budget=0).enforce(
+            now=str_to_datetime("2025-01-08T00:05:00Z"),
+        ) == 5  # noqa: PLR2004
+
+        client = redis_currency_pair_repo._client  # noqa: SLF001
+        assert [score for _, score in await client.zrange(get_index_key(0), 0, -1, withscores=True)] == [
+            str_to_timestamp(f"2025-01-01T00:0{minute}:00Z") for minute in range(5, 9)
+        ]
+        assert not await client.exists("2025-01-01T00:00:00Z", "2025-01-01T00:04:00Z")
+        assert AppMetrics.counters["currency_pair_buckets_evicted_by_age"] == evicted + 5
+        # The buckets following the evicted ones no longer depend on them.
+        currency_pair_bucket = await currency_pair_repo.retrieve_currency_pairs(
+            ["USDRUB", "AAABBB"],
+            str_to_datetime("2025-01-01T00:01:00Z"),
+        )
+        assert currency_pair_bucket
+        assert currency_pair_bucket.currency_pairs == [
+            model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01),
+            model.CurrencyPair(symbol="AAABBB", conversion_rate=1),
+        ]
+        assert currency_pair_bucket.timestamp == str_to_datetime("2025-01-01T00:05:00Z")
+        currency_pair_bucket = await currency_pair_repo.retrieve_latest_currency_pair(
+            "USDRUB",
+            str_to_datetime("2025-01-01T00:07:00Z"),
+        )
+        assert currency_pair_bucket
+        assert currency_pair_bucket.currency_pairs == [model.CurrencyPair(symbol="USDRUB", conversion_rate=0.01)]
+
+    async def test_evicts_oldest_buckets_over_memory_budget(
+        self,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_packed_currency_pair_buckets(packed_currency_pair_repository, range(10))
+        footprint = await packed_currency_pair_repository.retrieve_currency_pair_footprint()
+        number_of_buckets, size = footprint[0]
+        assert number_of_buckets == 10  # noqa: PLR2004
+        assert size > 0
+        evicted = AppMetrics.counters["currency_pair_buckets_evicted_by_budget"]
+
+        assert await RetentionManager(packed_currency_pair_repository, memory_budget=size * 6 // 10).enforce(
+            now=str_to_datetime("2025-01-01T00:10:00Z"),
+        ) == 4  # noqa: PLR2004
+
+        client = packed_currency_pair_repository._client  # noqa: SLF001
+        assert [score for _, score in await client.zrange(get_index_key(0), 0, -1, withscores=True)] == [
+            str_to_timestamp(f"2025-01-01T00:0{minute}:00Z") for minute in range(4, 10)
+        ]
+        assert AppMetrics.counters["currency_pair_buckets_evicted_by_budget"] == evicted + 4
+        assert AppMetrics.gauges["currency_pair_memory_bytes"] <= size * 6 // 10
+        assert (await packed_currency_pair_repository.retrieve_currency_pair_footprint())[0][0] == 6  # noqa: PLR2004
+
+    async def test_evicts_coarsest_tier_first(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+        await compaction.compact_currency_pairs(
+            redis_currency_pair_repository,
+            now=str_to_datetime("2025-01-01T00:10:00Z"),
+        )
+        footprint = await redis_currency_pair_repository.retrieve_currency_pair_footprint()
+        assert footprint[300][0] == 1
+        assert footprint[300][1] > 0
+
+        assert await RetentionManager(
+            redis_currency_pair_repository,
+            memory_budget=sum(size for _, size in footprint.values()) - 1,
+        ).enforce(now=str_to_datetime("2025-01-01T00:10:00Z")) == 1
+
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        assert not await client.zcard(get_index_key(300))
+        assert not await client.exists("2025-01-01T00:04:00Z", get_ohlc_key("2025-01-01T00:04:00Z"))
+        assert await client.zcard(get_index_key(0)) == 4  # noqa: PLR2004
+
+    async def test_projects_days_to_memory_budget(
+        self,
+        packed_currency_pair_repository: PackedRedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_packed_currency_pair_buckets(packed_currency_pair_repository, range(2))
+        _, size = (await packed_currency_pair_repository.retrieve_currency_pair_footprint())[0]
+        retention_manager = RetentionManager(packed_currency_pair_repository, memory_budget=size * 50)
+        await retention_manager.enforce(now=str_to_datetime("2025-01-01T00:02:00Z"))
+        assert "currency_pair_days_to_memory_budget" not in AppMetrics.gauges
+
+        await self.create_packed_currency_pair_buckets(packed_currency_pair_repository, range(2, 4))
+        await retention_manager.enforce(now=str_to_datetime("2025-01-01T00:03:00Z"))
+
+        # The footprint grows by one size a minute, and is two sizes now.
+        assert AppMetrics.gauges["currency_pair_memory_bytes"] == size * 2
+        assert AppMetrics.gauges["currency_pair_days_to_memory_budget"] == pytest.approx(48 / 1440)
+
+    async def test_takes_turns_with_compaction(
+        self,
+        redis_currency_pair_repository: RedisCurrencyPairRepository,
+    ) -> None:
+        await self.create_currency_pair_buckets(redis_currency_pair_repository)
+        client = redis_currency_pair_repository._client  # noqa: SLF001
+        dependencies.get_maintenance_lock.cache_clear()
+
+        async with dependencies.get_maintenance_lock():
+            task = asyncio.create_task(retention.enforce_retention_on_schedule(redis_currency_pair_repository))
+            await asyncio.sleep(0.05)
+            assert await client.zcard(get_index_key(0)) == 9  # noqa: PLR2004
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        assert not await client.zcard(get_index_key(0))
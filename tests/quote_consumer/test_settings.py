@@ -10,14 +10,52 @@ class TestEnvironmentVariables:
         # Related to DB
         assert os.environ.get("DB_PORT")
         assert os.environ.get("CURRENCY_PAIR_TTL")
+        assert os.environ.get("CURRENCY_PAIR_LOOKUP_WINDOW")
+        assert os.environ.get("CURRENCY_PAIR_CACHE_SIZE")
+        assert os.environ.get("CURRENCY_PAIR_CACHE_RECONCILE_INTERVAL")
+        assert os.environ.get("CURRENCY_PAIR_STORAGE_FORMAT")
+        assert os.environ.get("CURRENCY_PAIR_COMPRESSION")
+        assert os.environ.get("CURRENCY_PAIR_KEYFRAME_INTERVAL")
+        assert os.environ.get("CURRENCY_PAIR_5M_TIER_AGE")
+        assert os.environ.get("CURRENCY_PAIR_1H_TIER_AGE")
+        assert os.environ.get("CURRENCY_PAIR_COMPACTION_INTERVAL")
+        assert os.environ.get("CURRENCY_PAIR_MEMORY_BUDGET")
+        assert os.environ.get("CURRENCY_PAIR_RETENTION_INTERVAL")
+        assert os.environ.get("CURRENCY_PAIR_REPLICA")
 
         # Related to Exchange
         assert os.environ.get("EXCHANGE_API_URL")
         assert os.environ.get("EXCHANGE_FETCH_INTERVAL")
+        assert os.environ.get("EXCHANGE_API_MIRROR_URLS")
+        assert os.environ.get("EXCHANGE_CONNECT_TIMEOUT")
+        assert os.environ.get("EXCHANGE_READ_TIMEOUT")
+        assert os.environ.get("EXCHANGE_HEDGE_DELAY")
+        assert os.environ.get("EXCHANGE_HTTP2")
+        assert os.environ.get("EXCHANGE_SOURCES")
+        assert os.environ.get("EXCHANGE_SOURCE_FETCH_INTERVALS")
+        assert os.environ.get("EXCHANGE_MERGE_MODE")
+        assert os.environ.get("EXCHANGE_HOT_SYMBOLS")
+        assert os.environ.get("EXCHANGE_QUOTE_ASSETS")
+        assert os.environ.get("EXCHANGE_HOT_FETCH_INTERVAL")
+        assert os.environ.get("EXCHANGE_FETCH_SCHEDULE")
+        assert os.environ.get("EXCHANGE_MIN_FETCH_INTERVAL")
+        assert os.environ.get("EXCHANGE_MAX_FETCH_INTERVAL")
+        assert os.environ.get("EXCHANGE_TARGET_PRICE_MOVE")
+        assert os.environ.get("EXCHANGE_VOLATILITY_SMOOTHING")
+        assert os.environ.get("BYBIT_API_URL")
+        assert os.environ.get("OKX_API_URL")
+        assert os.environ.get("EXCHANGE_QUEUE_SIZE")
+        assert os.environ.get("EXCHANGE_QUEUE_POLICY")
+        assert os.environ.get("EXCHANGE_INGEST_MODE")
+        assert os.environ.get("EXCHANGE_WEBSOCKET_URL")
+        assert os.environ.get("EXCHANGE_FLUSH_INTERVAL")
+        assert os.environ.get("EXCHANGE_PRICE_STALENESS")
+        assert os.environ.get("EXCHANGE_PARSE_EXECUTOR")
 
         # Related to Quote Consumer
         assert os.environ.get("QUOTE_CONSUMER_HOST")
         assert os.environ.get("QUOTE_CONSUMER_PORT")
+        assert os.environ.get("EVENT_LOOP_LAG_INTERVAL")
 
 
 class TestSettings:
@@ -25,11 +63,47 @@ class TestSettings:
         # Related to DB
         assert AppSettings.db_port
         assert AppSettings.currency_pair_ttl
+        assert AppSettings.currency_pair_lookup_window
+        assert AppSettings.currency_pair_cache_size
+        assert AppSettings.currency_pair_cache_reconcile_interval
+        assert AppSettings.currency_pair_storage_format
+        assert AppSettings.currency_pair_keyframe_interval
+        assert AppSettings.currency_pair_5m_tier_age
+        assert AppSettings.currency_pair_1h_tier_age
+        assert AppSettings.currency_pair_compaction_interval
+        assert AppSettings.currency_pair_memory_budget
+        assert AppSettings.currency_pair_retention_interval
 
         # Related to Exchange
         assert AppSettings.exchange_api_url
         assert AppSettings.exchange_fetch_interval
+        assert AppSettings.exchange_api_mirror_urls
+        assert AppSettings.exchange_connect_timeout
+        assert AppSettings.exchange_read_timeout
+        assert AppSettings.exchange_hedge_delay
+        assert AppSettings.exchange_http2
+        assert AppSettings.exchange_sources
+        assert AppSettings.exchange_source_fetch_intervals
+        assert AppSettings.exchange_merge_mode
+        assert AppSettings.exchange_hot_symbols
+        assert AppSettings.exchange_quote_assets
+        assert AppSettings.exchange_hot_fetch_interval
+        assert AppSettings.exchange_fetch_schedule
+        assert AppSettings.exchange_min_fetch_interval
+        assert AppSettings.exchange_max_fetch_interval
+        assert AppSettings.exchange_target_price_move
+        assert AppSettings.exchange_volatility_smoothing
+        assert AppSettings.bybit_api_url
+        assert AppSettings.okx_api_url
+        assert AppSettings.exchange_queue_size
+        assert AppSettings.exchange_queue_policy
+        assert AppSettings.exchange_ingest_mode
+        assert AppSettings.exchange_websocket_url
+        assert AppSettings.exchange_flush_interval
+        assert AppSettings.exchange_price_staleness
+        assert AppSettings.exchange_parse_executor
 
         # Related to Quote Consumer
         assert AppSettings.quote_consumer_host
         assert AppSettings.quote_consumer_port
+        assert AppSettings.event_loop_lag_interval
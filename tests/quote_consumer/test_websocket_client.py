@@ -0,0 +1,44 @@
+"""Unit tests related to WebSocket client."""
+
+import asyncio
+import pytest
+
+from . import conftest
+from src.quote_consumer.adapters.websocket_client import WebSocketsClient
+from src.quote_consumer.metrics import AppMetrics
+
+
+class TestWebSocketsClient:
+    async def test_can_listen_to_stream(self, fake_websocket_server: conftest.FakeWebSocketServer) -> None:
+        fake_websocket_server.messages = ["first", "second"]
+        messages = []
+
+        async for message in WebSocketsClient().listen(fake_websocket_server.url):
+            messages.append(message)
+            if len(messages) == len(fake_websocket_server.messages):
+                break
+
+        assert messages == ["first", "second"]
+
+    async def test_reconnects_when_stream_closes(self, fake_websocket_server: conftest.FakeWebSocketServer) -> None:
+        fake_websocket_server.messages = ["first"]
+        reconnects = AppMetrics.counters["websocket_reconnects"]
+        messages = []
+
+        async for message in WebSocketsClient(reconnect_delay=0.01).listen(fake_websocket_server.url):
+            messages.append(message)
+            if len(messages) == 3:  # noqa: PLR2004
+                break
+
+        assert messages == ["first", "first", "first"]
+        assert fake_websocket_server.connections == 3  # noqa: PLR2004
+        assert AppMetrics.counters["websocket_reconnects"] == reconnects + 2
+
+    async def test_reconnects_when_stream_is_unavailable(self) -> None:
+        reconnects = AppMetrics.counters["websocket_reconnects"]
+        messages = WebSocketsClient(reconnect_delay=0.01).listen("ws://127.0.0.1:1")
+
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(messages.__anext__(), timeout=0.1)
+
+        assert AppMetrics.counters["websocket_reconnects"] > reconnects